@@ -10,6 +10,8 @@ from pathlib import Path
 from threading import RLock
 from typing import Any
 
+from atlas_persistence.write_ahead_log import WriteAheadLog
+
 from .learning_adapter import LearningSource
 from .learning_queue import LearningJob, LearningQueue
 
@@ -19,44 +21,108 @@ class JsonLearningQueue(LearningQueue):
 
     Queued jobs are restored as queued. Jobs that were running when the process
     stopped are treated as interrupted and safely returned to the queue.
+
+    In the default ``"wal"`` mode every mutation appends the job's new state to
+    ``<path>.wal`` and group-commits the fsync; the JSON snapshot at ``path`` is
+    rewritten every ``checkpoint_every`` mutations (and on ``checkpoint()`` or
+    ``close()``). Loading reads the snapshot, replays the log over it, then
+    applies interrupted-job recovery. ``mode="snapshot"`` rewrites the whole
+    file on every mutation.
     """
 
     FORMAT_VERSION = 1
 
-    def __init__(self, path: str | os.PathLike[str]) -> None:
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        mode: str = "wal",
+        checkpoint_every: int = 1000,
+        group_commit_s: float = 0.0,
+    ) -> None:
+        if mode not in ("wal", "snapshot"):
+            raise ValueError("mode must be 'wal' or 'snapshot'")
         self.path = Path(path)
+        self.mode = mode
+        self.checkpoint_every = checkpoint_every
         self._file_lock = RLock()
+        self._wal = (
+            WriteAheadLog(self.path.with_name(self.path.name + ".wal"), group_commit_s=group_commit_s)
+            if mode == "wal"
+            else None
+        )
         super().__init__()
         self._load()
+        if self._wal is not None and (self._wal.records or not self.path.exists()):
+            self.checkpoint()
 
     def submit(self, source: LearningSource, *, priority: int = 50) -> LearningJob:
-        job = super().submit(source, priority=priority)
-        self._persist_or_rollback()
+        with self._lock:
+            job = super().submit(source, priority=priority)
+            seq = self._log(job)
+        self._persist_or_rollback(seq)
         return job
 
     def claim(self) -> LearningJob | None:
-        job = super().claim()
+        with self._lock:
+            job = super().claim()
+            seq = self._log(job) if job is not None else None
         if job is not None:
-            self._persist_or_rollback()
+            self._persist_or_rollback(seq)
         return job
 
     def complete(self, job_id: str) -> LearningJob:
-        job = super().complete(job_id)
-        self._persist_or_rollback()
+        with self._lock:
+            job = super().complete(job_id)
+            seq = self._log(job)
+        self._persist_or_rollback(seq)
         return job
 
     def fail(self, job_id: str, error: str) -> LearningJob:
-        job = super().fail(job_id, error)
-        self._persist_or_rollback()
+        with self._lock:
+            job = super().fail(job_id, error)
+            seq = self._log(job)
+        self._persist_or_rollback(seq)
         return job
 
-    def _persist_or_rollback(self) -> None:
+    def requeue(self, job_id: str, reason: str) -> LearningJob:
+        with self._lock:
+            job = super().requeue(job_id, reason)
+            seq = self._log(job)
+        self._persist_or_rollback(seq)
+        return job
+
+    def _log(self, job: LearningJob) -> int | None:
+        # Written under the queue lock so log order matches mutation order.
+        if self._wal is None:
+            return None
+        return self._wal.write({"op": "job", "job": asdict(job)})
+
+    def _persist_or_rollback(self, seq: int | None = None) -> None:
         try:
-            self._persist()
+            if self._wal is None:
+                self._persist()
+                return
+            self._wal.commit(seq)
+            if self._wal.records >= self.checkpoint_every:
+                self.checkpoint()
         except Exception:
             self._reset_from_disk()
             raise
 
+    def checkpoint(self) -> None:
+        """Write a snapshot of every job and truncate the write-ahead log."""
+
+        with self._lock:
+            self._persist()
+            if self._wal is not None:
+                self._wal.reset()
+
+    def close(self) -> None:
+        if self._wal is not None:
+            self.checkpoint()
+            self._wal.close()
+
     def _reset_from_disk(self) -> None:
         with self._lock:
             self._heap.clear()
@@ -66,21 +132,37 @@ class JsonLearningQueue(LearningQueue):
         self._load()
 
     def _load(self) -> None:
-        if not self.path.exists():
-            return
-        try:
-            raw = json.loads(self.path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError as exc:
-            raise ValueError(f"invalid learning queue JSON: {self.path}") from exc
-
-        if not isinstance(raw, dict):
-            raise ValueError("learning queue root must be an object")
-        if raw.get("format_version") != self.FORMAT_VERSION:
-            raise ValueError("unsupported learning queue format version")
-
-        jobs = raw.get("jobs", [])
-        if not isinstance(jobs, list):
-            raise ValueError("learning queue jobs must be a list")
+        jobs: list[Any] = []
+        if self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"invalid learning queue JSON: {self.path}") from exc
+
+            if not isinstance(raw, dict):
+                raise ValueError("learning queue root must be an object")
+            if raw.get("format_version") != self.FORMAT_VERSION:
+                raise ValueError("unsupported learning queue format version")
+
+            jobs = raw.get("jobs", [])
+            if not isinstance(jobs, list):
+                raise ValueError("learning queue jobs must be a list")
+
+        if self._wal is not None:
+            # Later log entries replace the snapshot's copy of a job; new jobs
+            # keep their submission order.
+            self._wal.records = 0
+            replayed = [
+                entry["job"] for entry in self._wal.replay()
+                if entry.get("op") == "job" and isinstance(entry.get("job"), dict)
+            ]
+            if replayed:
+                merged: dict[str, Any] = {}
+                for item in [*jobs, *replayed]:
+                    if not isinstance(item, dict):
+                        raise ValueError("learning queue job must be an object")
+                    merged[str(item.get("job_id", ""))] = item
+                jobs = list(merged.values())
 
         from heapq import heappush
         for sequence, item in enumerate(jobs):
@@ -149,6 +231,9 @@ class JsonLearningQueue(LearningQueue):
                 "path": str(self.path),
                 "persistent": True,
                 "file_exists": self.path.exists(),
+                "mode": self.mode,
             }
         )
+        if self._wal is not None:
+            status["wal"] = self._wal.health()
         return status
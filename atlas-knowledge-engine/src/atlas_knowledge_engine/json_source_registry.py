@@ -10,30 +10,66 @@ from pathlib import Path
 from threading import RLock
 from typing import Any
 
+from atlas_persistence.write_ahead_log import WriteAheadLog
+
 from .source_registry import SourceRecord, SourceRegistry
 
 
 class JsonSourceRegistry(SourceRegistry):
     """Source registry that survives process restarts.
 
-    Records are loaded when the registry is created and written atomically after
-    each successful mutation. The public API remains compatible with
+    Records are loaded when the registry is created and made durable after each
+    successful mutation. The public API remains compatible with
     ``SourceRegistry`` so callers can replace the in-memory implementation
     without changing the learning pipeline.
+
+    In the default ``"wal"`` mode a registration appends one line to
+    ``<path>.wal`` (fsyncs are group-committed) and the snapshot at ``path`` is
+    rewritten every ``checkpoint_every`` registrations. ``mode="snapshot"``
+    rewrites the snapshot atomically on every registration.
     """
 
     FORMAT_VERSION = 1
 
-    def __init__(self, path: str | os.PathLike[str]) -> None:
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        mode: str = "wal",
+        checkpoint_every: int = 1000,
+        group_commit_s: float = 0.0,
+    ) -> None:
+        if mode not in ("wal", "snapshot"):
+            raise ValueError("mode must be 'wal' or 'snapshot'")
         self.path = Path(path)
+        self.mode = mode
+        self.checkpoint_every = checkpoint_every
         self._file_lock = RLock()
+        self._wal = (
+            WriteAheadLog(self.path.with_name(self.path.name + ".wal"), group_commit_s=group_commit_s)
+            if mode == "wal"
+            else None
+        )
         super().__init__()
         self._load()
+        if self._wal is not None and (self._wal.records or not self.path.exists()):
+            self.checkpoint()
 
     def register(self, record: SourceRecord, *, replace: bool = False) -> SourceRecord:
-        registered = super().register(record, replace=replace)
+        with self._lock:
+            registered = super().register(record, replace=replace)
+            seq = (
+                self._wal.write({"op": "register", "record": asdict(registered)})
+                if self._wal is not None
+                else None
+            )
         try:
-            self._persist()
+            if self._wal is None:
+                self._persist()
+            else:
+                self._wal.commit(seq)
+                if self._wal.records >= self.checkpoint_every:
+                    self.checkpoint()
         except Exception:
             # Restore the in-memory state from the last durable snapshot so a
             # failed disk write cannot leave memory and storage disagreeing.
@@ -41,29 +77,48 @@ class JsonSourceRegistry(SourceRegistry):
             raise
         return registered
 
-    def _load(self) -> None:
-        if not self.path.exists():
-            return
+    def checkpoint(self) -> None:
+        """Write a snapshot of every record and truncate the write-ahead log."""
 
-        with self._file_lock:
-            try:
-                raw = json.loads(self.path.read_text(encoding="utf-8"))
-            except json.JSONDecodeError as exc:
-                raise ValueError(f"invalid source registry JSON: {self.path}") from exc
-
-        if not isinstance(raw, dict):
-            raise ValueError("source registry root must be an object")
-        if raw.get("format_version") != self.FORMAT_VERSION:
-            raise ValueError("unsupported source registry format version")
+        with self._lock:
+            self._persist()
+            if self._wal is not None:
+                self._wal.reset()
 
-        records = raw.get("records", [])
-        if not isinstance(records, list):
-            raise ValueError("source registry records must be a list")
+    def close(self) -> None:
+        if self._wal is not None:
+            self.checkpoint()
+            self._wal.close()
 
-        for item in records:
-            if not isinstance(item, dict):
-                raise ValueError("source registry record must be an object")
-            super().register(self._record_from_dict(item))
+    def _load(self) -> None:
+        if self.path.exists():
+            with self._file_lock:
+                try:
+                    raw = json.loads(self.path.read_text(encoding="utf-8"))
+                except json.JSONDecodeError as exc:
+                    raise ValueError(f"invalid source registry JSON: {self.path}") from exc
+
+            if not isinstance(raw, dict):
+                raise ValueError("source registry root must be an object")
+            if raw.get("format_version") != self.FORMAT_VERSION:
+                raise ValueError("unsupported source registry format version")
+
+            records = raw.get("records", [])
+            if not isinstance(records, list):
+                raise ValueError("source registry records must be a list")
+
+            for item in records:
+                if not isinstance(item, dict):
+                    raise ValueError("source registry record must be an object")
+                super().register(self._record_from_dict(item))
+
+        if self._wal is not None:
+            # Each logged registration already succeeded once; replaying with
+            # replace=True makes re-applying one the snapshot covers a no-op.
+            self._wal.records = 0
+            for entry in self._wal.replay():
+                if entry.get("op") == "register" and isinstance(entry.get("record"), dict):
+                    super().register(self._record_from_dict(entry["record"]), replace=True)
 
     def _reset_from_disk(self) -> None:
         with self._lock:
@@ -127,6 +182,9 @@ class JsonSourceRegistry(SourceRegistry):
                 "path": str(self.path),
                 "persistent": True,
                 "file_exists": self.path.exists(),
+                "mode": self.mode,
             }
         )
+        if self._wal is not None:
+            status["wal"] = self._wal.health()
         return status
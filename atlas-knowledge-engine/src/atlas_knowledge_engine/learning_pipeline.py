@@ -2,23 +2,33 @@
 
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from hashlib import sha256
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
 from .confidence_engine import ConfidenceAssessment, ConfidenceEngine
 from .duplicate_detector import DuplicateDetector
-from .learning_adapter import AdapterRegistry, ExtractedContent, LearningSource
+from .learning_adapter import AdapterRegistry, ExtractedContent, LearningAdapter, LearningSource
 from .learning_queue import LearningJob, LearningQueue
+from .pipeline_metrics import PipelineMetrics
 from .source_registry import SourceRecord, SourceRegistry
 
+if TYPE_CHECKING:
+    from .learning_workers import LearningWorkerPool
+
 PipelineHook = Callable[[ExtractedContent], None]
+ExtractFn = Callable[[LearningAdapter, LearningSource], ExtractedContent]
 
 
 class DuplicateSourceError(RuntimeError):
     """Raised when a source or its normalized content already exists."""
 
 
+class JobAbandonedError(RuntimeError):
+    """Raised when a worker pool gave a job back to the queue mid-processing."""
+
+
 @dataclass(frozen=True, slots=True)
 class LearningResult:
     job_id: str
@@ -54,6 +64,8 @@ class LearningPipeline:
         self.source_registry = source_registry or SourceRegistry()
         self.duplicate_detector = duplicate_detector or DuplicateDetector(self.source_registry)
         self.confidence_engine = confidence_engine or ConfidenceEngine()
+        self.metrics = PipelineMetrics()
+        self.workers: LearningWorkerPool | None = None
 
     def submit(self, source: LearningSource, *, priority: int = 50) -> LearningJob:
         adapter = self.adapters.resolve(source)
@@ -64,11 +76,66 @@ class LearningPipeline:
         job = self.queue.claim()
         if job is None:
             return None
+        return self.process_job(job)
 
+    def run_workers(
+        self,
+        workers: int,
+        *,
+        adapter_limits: dict[str, int] | None = None,
+        process_workers: int = 0,
+        process_adapters: tuple[str, ...] = (),
+        until_idle: bool = True,
+    ) -> LearningWorkerPool:
+        """Drain the queue with ``workers`` threads.
+
+        ``adapter_limits`` caps concurrent jobs per adapter source type.
+        Adapters named in ``process_adapters`` run ``extract`` in a pool of
+        ``process_workers`` processes (the adapter must be picklable). With
+        ``until_idle`` the call blocks until the queue is empty and returns the
+        stopped pool; otherwise the pool keeps polling until ``stop()``.
+        Hooks run on worker threads and must be thread-safe.
+        """
+
+        from .learning_workers import LearningWorkerPool
+
+        pool = LearningWorkerPool(
+            self,
+            workers,
+            adapter_limits=adapter_limits,
+            process_workers=process_workers,
+            process_adapters=process_adapters,
+        )
+        self.workers = pool
+        pool.start()
+        if until_idle:
+            try:
+                pool.wait_idle()
+            finally:
+                pool.stop()
+        return pool
+
+    def process_job(
+        self,
+        job: LearningJob,
+        *,
+        extract: ExtractFn | None = None,
+        commit_gate: Callable[[], bool] | None = None,
+    ) -> LearningResult:
+        """Process one claimed job.
+
+        ``commit_gate`` is checked after extraction. If it returns False, the job
+        was handed back to the queue and JobAbandonedError is raised without
+        touching the job.
+        """
+
+        started = time.perf_counter()
         try:
             adapter = self.adapters.resolve(job.source)
             adapter.validate(job.source)
-            extracted = adapter.extract(job.source)
+            extracted = extract(adapter, job.source) if extract else adapter.extract(job.source)
+            if commit_gate is not None and not commit_gate():
+                raise JobAbandonedError(job.job_id)
             normalized = self._normalize(extracted)
             digest = sha256(normalized.text.encode("utf-8")).hexdigest()
 
@@ -101,6 +168,7 @@ class LearningPipeline:
                 )
             )
             self.queue.complete(job.job_id)
+            self.metrics.record(time.perf_counter() - started, ok=True)
             return LearningResult(
                 job_id=job.job_id,
                 source_id=enriched.source_id,
@@ -111,8 +179,13 @@ class LearningPipeline:
                 confidence_label=assessment.label,
                 requires_verification=assessment.requires_verification,
             )
+        except JobAbandonedError:
+            raise
         except Exception as exc:
+            if commit_gate is not None and not commit_gate():
+                raise JobAbandonedError(job.job_id) from exc
             self.queue.fail(job.job_id, str(exc))
+            self.metrics.record(time.perf_counter() - started, ok=False)
             raise
 
     @staticmethod
@@ -166,4 +239,6 @@ class LearningPipeline:
             "source_registry": self.source_registry.health(),
             "duplicate_detector": self.duplicate_detector.health(),
             "confidence_engine": self.confidence_engine.health(),
+            "throughput": self.metrics.snapshot(),
+            "workers": self.workers.health() if self.workers is not None else None,
         }
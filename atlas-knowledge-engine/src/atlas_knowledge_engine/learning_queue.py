@@ -65,6 +65,22 @@ class LearningQueue:
         job.error = error
         return job
 
+    def requeue(self, job_id: str, reason: str) -> LearningJob:
+        """Return a running job to the queue (e.g. on worker shutdown)."""
+
+        with self._lock:
+            try:
+                job = self._jobs[job_id]
+            except KeyError as exc:
+                raise KeyError(f"learning job not found: {job_id}") from exc
+            if job.status != "running":
+                raise RuntimeError("job must be running before it can be requeued")
+            job.status = "queued"
+            job.started_at = None
+            job.error = reason
+            heappush(self._heap, (job.priority, next(self._sequence), job.job_id))
+            return job
+
     def _finish(self, job_id: str, status: Literal["completed", "failed"]) -> LearningJob:
         with self._lock:
             try:
@@ -0,0 +1,264 @@
+"""Concurrent worker pool for the ATLAS learning pipeline.
+
+``LearningPipeline.process_next`` handles one job at a time. The pool drains
+the queue with several worker threads so slow, I/O-bound adapters (transcript
+and metadata fetches) overlap:
+
+* per-adapter limits: a claimed job whose adapter is at its limit is parked
+  until a slot frees, while the worker claims other work
+* optional process pool: adapters listed in ``process_adapters`` run
+  ``extract`` in a ``ProcessPoolExecutor`` for CPU-heavy extraction
+* graceful shutdown: ``stop()`` returns parked jobs to ``queued`` at once,
+  waits ``drain_timeout`` for in-flight jobs, then returns any job still
+  extracting to ``queued`` as well. A worker that finishes later discards
+  its result instead of completing the job.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from .learning_adapter import ExtractedContent, LearningAdapter, LearningSource
+from .learning_queue import LearningJob
+
+if TYPE_CHECKING:
+    from .learning_pipeline import ExtractFn, LearningPipeline
+
+logger = logging.getLogger(__name__)
+
+SHUTDOWN_REASON = "returned to queue on worker shutdown"
+
+
+def _extract_in_process(adapter: LearningAdapter, source: LearningSource) -> ExtractedContent:
+    return adapter.extract(source)
+
+
+class LearningWorkerPool:
+    """Thread pool that drains a ``LearningPipeline`` queue."""
+
+    def __init__(
+        self,
+        pipeline: LearningPipeline,
+        workers: int,
+        *,
+        adapter_limits: dict[str, int] | None = None,
+        process_workers: int = 0,
+        process_adapters: tuple[str, ...] = (),
+        idle_wait_s: float = 0.05,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.pipeline = pipeline
+        self.workers = workers
+        self.adapter_limits = {k.strip().lower(): v for k, v in (adapter_limits or {}).items()}
+        self.process_adapters = frozenset(a.strip().lower() for a in process_adapters)
+        self.idle_wait_s = idle_wait_s
+        # Claimed jobs held back by adapter limits; bounded so one saturated
+        # adapter cannot pull the whole queue into the pool.
+        self.max_parked = workers * 4
+        self._executor = (
+            ProcessPoolExecutor(max_workers=process_workers)
+            if process_workers > 0 and self.process_adapters
+            else None
+        )
+        self._cond = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._active: dict[str, int] = {}
+        self._parked: dict[str, deque[LearningJob]] = {}
+        self._in_flight: dict[str, LearningJob] = {}
+        self._committing: set[str] = set()
+        self._abandoned: set[str] = set()
+        self._busy = 0
+        self._errors = 0
+        self._started_at: float | None = None
+        self._stopped_at: float | None = None
+
+    # --- lifecycle -------------------------------------------------------------
+    def start(self) -> None:
+        self._started_at = time.monotonic()
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"learning-worker-{index}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until the queue is empty and no job is in flight."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._idle():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(min(self.idle_wait_s, remaining) if remaining else self.idle_wait_s)
+        return True
+
+    def stop(self, drain_timeout: float = 5.0) -> None:
+        """Stop claiming, drain in-flight jobs, and requeue what is left."""
+
+        self._stopping.set()
+        with self._cond:
+            parked = [job for queue in self._parked.values() for job in queue]
+            self._parked.clear()
+            self._cond.notify_all()
+        for job in parked:
+            self._requeue(job)
+
+        deadline = time.monotonic() + drain_timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+        with self._cond:
+            leftovers = [
+                job for job_id, job in self._in_flight.items()
+                if job_id not in self._committing
+            ]
+            self._abandoned.update(job.job_id for job in leftovers)
+        for job in leftovers:
+            self._requeue(job)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._stopped_at = time.monotonic()
+
+    def _requeue(self, job: LearningJob) -> None:
+        try:
+            self.pipeline.queue.requeue(job.job_id, SHUTDOWN_REASON)
+            self.pipeline.metrics.record_requeue()
+        except (KeyError, RuntimeError) as exc:
+            logger.warning("could not requeue learning job %s: %s", job.job_id, exc)
+
+    # --- scheduling ------------------------------------------------------------
+    def _idle(self) -> bool:
+        return (
+            self._busy == 0
+            and not any(self._parked.values())
+            and self.pipeline.queue.counts()["queued"] == 0
+        )
+
+    def _adapter_key(self, job: LearningJob) -> str:
+        try:
+            return self.pipeline.adapters.resolve(job.source).source_type.strip().lower()
+        except KeyError:
+            return ""      # unroutable: process_job fails it with the resolver error
+
+    def _has_slot(self, key: str) -> bool:
+        limit = self.adapter_limits.get(key)
+        return limit is None or self._active.get(key, 0) < limit
+
+    def _reserve(self, job: LearningJob, key: str) -> None:
+        self._active[key] = self._active.get(key, 0) + 1
+        self._in_flight[job.job_id] = job
+
+    def _acquire(self) -> tuple[LearningJob, str] | None:
+        """Take a parked job with a free slot, else claim one from the queue.
+        Returns None when there is nothing runnable right now. A worker counts
+        as busy while it claims, so ``wait_idle`` cannot miss a claimed job."""
+
+        with self._cond:
+            for key, parked in self._parked.items():
+                if parked and self._has_slot(key):
+                    job = parked.popleft()
+                    self._reserve(job, key)
+                    self._busy += 1
+                    return job, key
+            self._busy += 1
+        job = None
+        try:
+            while not self._stopping.is_set():
+                with self._cond:
+                    if sum(len(parked) for parked in self._parked.values()) >= self.max_parked:
+                        break
+                job = self.pipeline.queue.claim()
+                if job is None:
+                    break
+                key = self._adapter_key(job)
+                with self._cond:
+                    if not self._stopping.is_set():
+                        if self._has_slot(key):
+                            self._reserve(job, key)
+                            return job, key
+                        # Adapter at its limit: park it and keep looking.
+                        self._parked.setdefault(key, deque()).append(job)
+                        job = None
+                        continue
+                break
+        except Exception as exc:  # noqa: BLE001 - a failing queue must not kill the worker
+            logger.warning("learning queue claim failed: %s", exc)
+        with self._cond:
+            self._busy -= 1
+            self._cond.notify_all()
+        if job is not None:
+            self._requeue(job)    # claimed just as stop() began
+        return None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            picked = self._acquire()
+            if picked is None:
+                with self._cond:
+                    if not self._stopping.is_set():
+                        self._cond.wait(self.idle_wait_s)
+                continue
+            job, key = picked
+            try:
+                self._process(job, key)
+            finally:
+                with self._cond:
+                    self._active[key] -= 1
+                    self._in_flight.pop(job.job_id, None)
+                    self._committing.discard(job.job_id)
+                    self._abandoned.discard(job.job_id)
+                    self._busy -= 1
+                    self._cond.notify_all()
+
+    def _process(self, job: LearningJob, key: str) -> None:
+        extract: ExtractFn | None = None
+        if self._executor is not None and key in self.process_adapters:
+            executor = self._executor
+
+            def pooled(adapter: LearningAdapter, source: LearningSource) -> ExtractedContent:
+                return executor.submit(_extract_in_process, adapter, source).result()
+
+            extract = pooled
+
+        def commit_gate() -> bool:
+            with self._cond:
+                if job.job_id in self._abandoned:
+                    return False
+                self._committing.add(job.job_id)
+                return True
+
+        from .learning_pipeline import JobAbandonedError
+
+        try:
+            self.pipeline.process_job(job, extract=extract, commit_gate=commit_gate)
+        except JobAbandonedError:
+            logger.info("learning job %s abandoned on shutdown", job.job_id)
+        except Exception as exc:  # noqa: BLE001 - the job is already marked failed
+            with self._cond:
+                self._errors += 1
+            logger.debug("learning job %s failed: %s", job.job_id, exc)
+
+    # --- status ----------------------------------------------------------------
+    def health(self) -> dict[str, object]:
+        with self._cond:
+            running = self._started_at is not None and self._stopped_at is None
+            return {
+                "running": running,
+                "workers": self.workers,
+                "alive": sum(1 for thread in self._threads if thread.is_alive()),
+                "busy": self._busy,
+                "parked": {k: len(v) for k, v in self._parked.items() if v},
+                "active_by_adapter": {k: v for k, v in self._active.items() if v},
+                "adapter_limits": dict(self.adapter_limits),
+                "process_pool": self._executor is not None,
+                "errors": self._errors,
+            }
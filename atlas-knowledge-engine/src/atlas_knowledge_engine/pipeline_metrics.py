@@ -0,0 +1,57 @@
+"""Throughput and latency counters for the ATLAS learning pipeline."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from threading import Lock
+
+
+class PipelineMetrics:
+    """Thread-safe job counters with a bounded latency window."""
+
+    def __init__(self, window: int = 1000) -> None:
+        self._lock = Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._started = time.monotonic()
+        self.completed = 0
+        self.failed = 0
+        self.requeued = 0
+
+    def record(self, seconds: float, *, ok: bool) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def record_requeue(self) -> None:
+        with self._lock:
+            self.requeued += 1
+
+    def snapshot(self) -> dict[str, object]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            processed = self.completed + self.failed
+
+        def percentile(fraction: float) -> float | None:
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, int(round(fraction * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 3)
+
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "requeued": self.requeued,
+            "jobs_per_second": round(processed / elapsed, 3),
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1] * 1000, 3) if latencies else None,
+                "window": len(latencies),
+            },
+        }
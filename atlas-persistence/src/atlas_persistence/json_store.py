@@ -2,17 +2,36 @@
 
 This store is intentionally small. It is meant for early persistence, not final
 production storage.
+
+Collections are stored as JSON Lines (``<collection>.jsonl``) by default: one
+record per line, so appending a record writes one line instead of rewriting the
+whole file. Existing ``<collection>.json`` files (a single JSON list) are still
+read, and are converted to ``.jsonl`` on the first write. ``mode="json"`` keeps
+the original one-list-per-file behaviour.
+
+A collection can be given a primary key field. Appending a record whose key
+already exists then supersedes the older line (last write wins), lookups by key
+use an in-memory offset index, and the log is compacted once superseded lines
+outnumber live ones.
 """
 
 from __future__ import annotations
 
 import json
+import os
+import threading
+from collections.abc import Iterator, Mapping
 from dataclasses import asdict, is_dataclass
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
 from typing import Any
 
+from .write_ahead_log import truncate_torn_tail
+
+JSONL = "jsonl"
+JSON = "json"
+
 
 def _to_jsonable(value: Any) -> Any:
     """Convert common Python objects into JSON-safe values."""
@@ -30,41 +49,231 @@ def _to_jsonable(value: Any) -> Any:
     return value
 
 
+def _json_line(record: dict[str, Any]) -> bytes:
+    return (json.dumps(record, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class _LogIndex:
+    """Byte offset of the live line per primary key, plus line counts."""
+
+    def __init__(self) -> None:
+        self.offsets: dict[str, int] = {}
+        self.lines = 0
+        self.size = 0
+
+    @property
+    def stale(self) -> int:
+        return self.lines - len(self.offsets)
+
+
 class JsonFileStore:
     """Append-and-read JSON record store.
 
-    Records are stored in one JSON file per collection.
+    Records are stored in one JSON Lines file per collection (or one JSON list
+    per collection with ``mode="json"``).
     """
 
-    def __init__(self, root_dir: str | Path) -> None:
+    def __init__(
+        self,
+        root_dir: str | Path,
+        *,
+        mode: str = JSONL,
+        primary_keys: Mapping[str, str] | None = None,
+        compact_min_stale: int = 1000,
+    ) -> None:
+        if mode not in (JSONL, JSON):
+            raise ValueError(f"Unknown store mode: {mode}")
         self.root_dir = Path(root_dir)
         self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.primary_keys = dict(primary_keys or {})
+        self.compact_min_stale = compact_min_stale
+        self._indexes: dict[str, _LogIndex] = {}
+        self._checked_tails: set[str] = set()
+        self._lock = threading.RLock()
 
-    def _path(self, collection: str) -> Path:
+    def _path(self, collection: str, suffix: str = ".json") -> Path:
         safe_collection = collection.replace("/", "_").replace("..", "_")
-        return self.root_dir / f"{safe_collection}.json"
+        return self.root_dir / f"{safe_collection}{suffix}"
 
+    def _log_path(self, collection: str) -> Path:
+        return self._path(collection, ".jsonl")
+
+    # --- reads ---------------------------------------------------------------
     def read_collection(self, collection: str) -> list[dict[str, Any]]:
+        return list(self.iter_collection(collection))
+
+    def iter_collection(self, collection: str) -> Iterator[dict[str, Any]]:
+        """Stream the live records of a collection in insertion order.
+
+        JSON Lines collections are read one line at a time; legacy ``.json``
+        collections are loaded whole.
+        """
+
+        log_path = self._log_path(collection)
+        if self.mode == JSONL and log_path.exists():
+            yield from self._iter_log(collection, log_path)
+            return
         path = self._path(collection)
         if not path.exists():
-            return []
+            return
+        yield from self._read_json_list(collection, path)
+
+    def get_record(self, collection: str, key: Any) -> dict[str, Any] | None:
+        """Return the live record with primary key ``key``, or None."""
+
+        key_field = self._key_field(collection)
+        with self._lock:
+            log_path = self._log_path(collection)
+            if self.mode == JSON or not log_path.exists():
+                return next(
+                    (r for r in self.iter_collection(collection) if r.get(key_field) == key),
+                    None,
+                )
+            offset = self._index(collection, log_path).offsets.get(str(key))
+            if offset is None:
+                return None
+            with log_path.open("rb") as file:
+                file.seek(offset)
+                return json.loads(file.readline())
+
+    def _read_json_list(self, collection: str, path: Path) -> list[dict[str, Any]]:
         with path.open("r", encoding="utf-8") as file:
             data = json.load(file)
         if not isinstance(data, list):
             raise ValueError(f"Collection must contain a list: {collection}")
         return data
 
+    def _iter_log(self, collection: str, path: Path) -> Iterator[dict[str, Any]]:
+        key_field = self.primary_keys.get(collection)
+        offsets: dict[str, int] = {}
+        if key_field is not None:
+            with self._lock:
+                offsets = dict(self._index(collection, path).offsets)
+        for offset, record in self._scan(path):
+            if key_field is not None:
+                key = record.get(key_field)
+                if key is not None and offsets.get(str(key)) != offset:
+                    continue
+            yield record
+
+    def _scan(self, path: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Yield (byte offset, record) per line. A torn final line (a crash
+        mid-append) is skipped; corruption anywhere else raises."""
+
+        with path.open("rb") as file:
+            offset = 0
+            for raw in file:
+                start = offset
+                offset += len(raw)
+                if not raw.strip():
+                    continue
+                try:
+                    record = json.loads(raw)
+                except json.JSONDecodeError:
+                    if raw.endswith(b"\n"):
+                        raise ValueError(f"Corrupt record at byte {start} in {path.name}") from None
+                    return
+                yield start, record
+
+    def _key_field(self, collection: str) -> str:
+        key_field = self.primary_keys.get(collection)
+        if key_field is None:
+            raise ValueError(f"No primary key configured for collection: {collection}")
+        return key_field
+
+    def _index(self, collection: str, path: Path) -> _LogIndex:
+        index = self._indexes.get(collection)
+        size = path.stat().st_size
+        if index is not None and index.size == size:
+            return index
+        index = _LogIndex()
+        key_field = self.primary_keys.get(collection)
+        for offset, record in self._scan(path):
+            index.lines += 1
+            key = record.get(key_field) if key_field is not None else None
+            if key is not None:
+                index.offsets[str(key)] = offset
+        index.size = size
+        self._indexes[collection] = index
+        return index
+
+    # --- writes --------------------------------------------------------------
     def write_collection(self, collection: str, records: list[dict[str, Any]]) -> None:
-        path = self._path(collection)
-        with path.open("w", encoding="utf-8") as file:
-            json.dump(_to_jsonable(records), file, indent=2, sort_keys=True)
-            file.write("\n")
+        with self._lock:
+            if self.mode == JSON:
+                path = self._path(collection)
+                with path.open("w", encoding="utf-8") as file:
+                    json.dump(_to_jsonable(records), file, indent=2, sort_keys=True)
+                    file.write("\n")
+                return
+            self._write_log(collection, (_to_jsonable(r) for r in records))
 
     def append_record(self, collection: str, record: Any) -> dict[str, Any]:
-        records = self.read_collection(collection)
         json_record = _to_jsonable(record)
         if not isinstance(json_record, dict):
             raise TypeError("Persisted record must serialize to a JSON object")
-        records.append(json_record)
-        self.write_collection(collection, records)
-        return json_record
+        with self._lock:
+            if self.mode == JSON:
+                records = self.read_collection(collection)
+                records.append(json_record)
+                self.write_collection(collection, records)
+                return json_record
+
+            log_path = self._log_path(collection)
+            if not log_path.exists() and self._path(collection).exists():
+                self._migrate(collection)
+            if collection not in self._checked_tails:
+                truncate_torn_tail(log_path)
+                self._checked_tails.add(collection)
+            keyed = collection in self.primary_keys
+            index = self._index(collection, log_path) if keyed and log_path.exists() else None
+            line = _json_line(json_record)
+            with log_path.open("ab") as file:
+                offset = file.tell()
+                file.write(line)
+                file.flush()
+            if keyed and index is None:
+                index = self._index(collection, log_path)
+            elif index is not None and index.size == offset:
+                index.lines += 1
+                index.size = offset + len(line)
+                key_field = self.primary_keys.get(collection)
+                key = json_record.get(key_field) if key_field is not None else None
+                if key is not None:
+                    index.offsets[str(key)] = offset
+                if index.stale >= self.compact_min_stale and index.stale > len(index.offsets):
+                    self.compact(collection)
+            return json_record
+
+    def compact(self, collection: str) -> int:
+        """Rewrite a JSON Lines collection with only its live records.
+        Returns the number of records kept."""
+
+        with self._lock:
+            log_path = self._log_path(collection)
+            if self.mode == JSON or not log_path.exists():
+                return len(self.read_collection(collection))
+            records = list(self._iter_log(collection, log_path))
+            self._write_log(collection, records)
+            return len(records)
+
+    def _migrate(self, collection: str) -> None:
+        # _write_log removes the legacy .json once the .jsonl is in place.
+        self._write_log(collection, self._read_json_list(collection, self._path(collection)))
+
+    def _write_log(self, collection: str, records: Any) -> None:
+        """Atomically replace the collection's log with ``records``."""
+
+        log_path = self._log_path(collection)
+        tmp_path = log_path.with_suffix(".jsonl.tmp")
+        with tmp_path.open("wb") as file:
+            for record in records:
+                file.write(_json_line(record))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, log_path)
+        self._indexes.pop(collection, None)
+        legacy = self._path(collection)
+        if legacy.exists():
+            legacy.unlink()
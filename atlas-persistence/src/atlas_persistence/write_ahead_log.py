@@ -0,0 +1,164 @@
+"""Write-ahead log with group commit for JSON snapshot stores.
+
+A snapshot store (one JSON document rewritten atomically) pays a whole-file
+write plus fsync per mutation. With a write-ahead log the store appends one
+small JSON line per mutation instead and only rewrites the snapshot on a
+checkpoint:
+
+    write(record)   append a line under the caller's state lock; cheap, no I/O
+                    wait. Returns a sequence number.
+    commit(seq)     block until that record is durable. Concurrent committers
+                    share one fsync: the first becomes the leader, flushes and
+                    fsyncs everything written so far, and wakes the others.
+    replay()        yield logged records in order; a torn final line (a crash
+                    mid-append) is ignored.
+    reset()         truncate after the owner has durably written a snapshot
+                    that includes every logged record.
+
+The commit leader fsyncs outside the lock, so `reset()` and `close()` wait
+for any fsync in flight before they close the handle it is using.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+
+def truncate_torn_tail(path: Path) -> None:
+    """Drop a partial final line left by a crash mid-append."""
+
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with path.open("rb+") as file:
+        file.seek(-1, os.SEEK_END)
+        if file.read(1) == b"\n":
+            return
+        pos = file.seek(0, os.SEEK_END)
+        while pos > 0:
+            step = min(4096, pos)
+            file.seek(pos - step)
+            newline = file.read(step).rfind(b"\n")
+            if newline >= 0:
+                pos = pos - step + newline + 1
+                break
+            pos -= step
+        file.truncate(pos)
+
+
+class WriteAheadLog:
+    """Append-only JSON Lines mutation log with group-committed fsyncs."""
+
+    def __init__(self, path: str | os.PathLike[str], *, group_commit_s: float = 0.0) -> None:
+        self.path = Path(path)
+        self.group_commit_s = group_commit_s
+        self._cond = threading.Condition()
+        self._handle: Any = None
+        self._written = 0
+        self._durable = 0
+        self._syncing = False
+        self.records = 0
+        self.fsyncs = 0
+        self.commits = 0
+
+    def replay(self) -> Iterator[dict[str, Any]]:
+        if not self.path.exists():
+            return
+        with self.path.open("rb") as file:
+            for raw in file:
+                if not raw.strip():
+                    continue
+                try:
+                    record = json.loads(raw)
+                except json.JSONDecodeError:
+                    if raw.endswith(b"\n"):
+                        raise ValueError(f"corrupt write-ahead log entry: {self.path}") from None
+                    return
+                self.records += 1
+                yield record
+
+    def write(self, record: dict[str, Any]) -> int:
+        line = (json.dumps(record, sort_keys=True, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._cond:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                truncate_torn_tail(self.path)
+                self._handle = self.path.open("ab")
+            self._handle.write(line)
+            self._written += 1
+            self.records += 1
+            return self._written
+
+    def commit(self, seq: int) -> None:
+        with self._cond:
+            self.commits += 1
+            while self._durable < seq:
+                if not self._syncing:
+                    self._syncing = True
+                    break
+                self._cond.wait()
+            else:
+                return
+        try:
+            if self.group_commit_s > 0:
+                time.sleep(self.group_commit_s)
+            with self._cond:
+                target = self._written
+                self._handle.flush()
+                fileno = self._handle.fileno()
+            os.fsync(fileno)
+            with self._cond:
+                self._durable = max(self._durable, target)
+                self.fsyncs += 1
+        finally:
+            with self._cond:
+                self._syncing = False
+                self._cond.notify_all()
+
+    def reset(self) -> None:
+        """Truncate the log. Only call once a snapshot covering every
+        written record is durable."""
+
+        with self._cond:
+            self._wait_for_sync()
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            if self.path.exists():
+                with self.path.open("wb") as file:
+                    file.flush()
+                    os.fsync(file.fileno())
+            self._durable = self._written
+            self.records = 0
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            self._wait_for_sync()
+            if self._handle is not None:
+                self._handle.flush()
+                os.fsync(self._handle.fileno())
+                self._handle.close()
+                self._handle = None
+            self._durable = self._written
+
+    def _wait_for_sync(self) -> None:
+        # Caller holds self._cond; the leader clears _syncing once its
+        # fsync has returned.
+        while self._syncing:
+            self._cond.wait()
+
+    def health(self) -> dict[str, object]:
+        with self._cond:
+            return {
+                "path": str(self.path),
+                "records": self.records,
+                "commits": self.commits,
+                "fsyncs": self.fsyncs,
+                "group_commit_s": self.group_commit_s,
+            }
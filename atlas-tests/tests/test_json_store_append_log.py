@@ -0,0 +1,77 @@
+"""Tests for the JSON Lines append log in JsonFileStore."""
+
+import json
+
+import pytest
+
+from atlas_persistence.json_store import JsonFileStore
+
+
+def test_append_writes_one_line_per_record(tmp_path):
+    store = JsonFileStore(tmp_path)
+
+    for index in range(3):
+        store.append_record("events", {"id": f"e{index}", "n": index})
+
+    lines = (tmp_path / "events.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["n"] for line in lines] == [0, 1, 2]
+    assert [r["id"] for r in store.iter_collection("events")] == ["e0", "e1", "e2"]
+
+
+def test_legacy_json_collection_is_read_then_migrated(tmp_path):
+    legacy = tmp_path / "knowledge_relationships.json"
+    legacy.write_text(json.dumps([{"id": "r1"}, {"id": "r2"}], indent=2), encoding="utf-8")
+    store = JsonFileStore(tmp_path)
+
+    assert [r["id"] for r in store.read_collection("knowledge_relationships")] == ["r1", "r2"]
+
+    store.append_record("knowledge_relationships", {"id": "r3"})
+
+    assert not legacy.exists()
+    assert [r["id"] for r in store.read_collection("knowledge_relationships")] == ["r1", "r2", "r3"]
+
+
+def test_primary_key_index_supersedes_and_compacts(tmp_path):
+    store = JsonFileStore(tmp_path, primary_keys={"tasks": "id"}, compact_min_stale=3)
+
+    store.append_record("tasks", {"id": "t1", "status": "queued"})
+    store.append_record("tasks", {"id": "t2", "status": "queued"})
+    store.append_record("tasks", {"id": "t1", "status": "running"})
+
+    assert store.get_record("tasks", "t1")["status"] == "running"
+    assert store.get_record("tasks", "missing") is None
+    assert [r["status"] for r in store.read_collection("tasks")] == ["queued", "running"]
+
+    store.append_record("tasks", {"id": "t1", "status": "done"})
+    store.append_record("tasks", {"id": "t2", "status": "done"})
+
+    lines = (tmp_path / "tasks.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert {r["id"]: r["status"] for r in store.read_collection("tasks")} == {"t1": "done", "t2": "done"}
+
+
+def test_torn_final_line_is_skipped_and_repaired(tmp_path):
+    store = JsonFileStore(tmp_path)
+    store.append_record("memory", {"id": "m1"})
+    with (tmp_path / "memory.jsonl").open("ab") as file:
+        file.write(b'{"id": "m2", "trunc')
+
+    assert [r["id"] for r in store.read_collection("memory")] == ["m1"]
+
+    JsonFileStore(tmp_path).append_record("memory", {"id": "m3"})
+    assert [r["id"] for r in store.read_collection("memory")] == ["m1", "m3"]
+
+
+def test_corrupt_middle_line_raises(tmp_path):
+    (tmp_path / "memory.jsonl").write_bytes(b'{"id": "m1"}\nnot json\n{"id": "m2"}\n')
+
+    with pytest.raises(ValueError):
+        JsonFileStore(tmp_path).read_collection("memory")
+
+
+def test_json_mode_keeps_single_list_file(tmp_path):
+    store = JsonFileStore(tmp_path, mode="json")
+    store.append_record("sources", {"id": "s1"})
+
+    assert json.loads((tmp_path / "sources.json").read_text(encoding="utf-8")) == [{"id": "s1"}]
+    assert not (tmp_path / "sources.jsonl").exists()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from atlas_knowledge_engine.json_learning_queue import JsonLearningQueue
+from atlas_knowledge_engine.json_source_registry import JsonSourceRegistry
+from atlas_knowledge_engine.learning_adapter import LearningSource
+from atlas_knowledge_engine.source_registry import SourceRecord
+from atlas_persistence import write_ahead_log as wal_module
+from atlas_persistence.write_ahead_log import WriteAheadLog
+
+
+def _snapshot_jobs(path):
+    return json.loads(path.read_text(encoding="utf-8"))["jobs"]
+
+
+def test_mutations_append_to_wal_and_replay_recovers_running_job(tmp_path):
+    path = tmp_path / "learning-queue.json"
+    queue = JsonLearningQueue(path)
+    done = queue.submit(LearningSource("youtube", "https://youtu.be/done"))
+    queue.claim()
+    queue.complete(done.job_id)
+    running = queue.submit(LearningSource("youtube", "https://youtu.be/running"))
+    queue.claim()
+
+    # No checkpoint yet: the snapshot is still the empty one from creation.
+    assert _snapshot_jobs(path) == []
+    assert len((tmp_path / "learning-queue.json.wal").read_text(encoding="utf-8").splitlines()) == 5
+
+    restored = JsonLearningQueue(path)
+    assert restored.get(done.job_id).status == "completed"
+    recovered = restored.get(running.job_id)
+    assert recovered.status == "queued"
+    assert recovered.error == "recovered after interrupted processing"
+    assert restored.claim().job_id == running.job_id
+    # Opening with a non-empty log checkpoints it into the snapshot.
+    assert len(_snapshot_jobs(path)) == 2
+
+
+def test_checkpoint_truncates_wal(tmp_path):
+    path = tmp_path / "learning-queue.json"
+    queue = JsonLearningQueue(path, checkpoint_every=3)
+    for index in range(4):
+        queue.submit(LearningSource("youtube", f"https://youtu.be/{index}"))
+
+    assert len(_snapshot_jobs(path)) == 3
+    assert queue.health()["wal"]["records"] == 1
+    queue.close()
+    assert len(_snapshot_jobs(path)) == 4
+    assert JsonLearningQueue(path).counts()["queued"] == 4
+
+
+def test_snapshot_mode_still_rewrites_file(tmp_path):
+    path = tmp_path / "learning-queue.json"
+    queue = JsonLearningQueue(path, mode="snapshot")
+    queue.submit(LearningSource("youtube", "https://youtu.be/a"))
+
+    assert len(_snapshot_jobs(path)) == 1
+    assert not (tmp_path / "learning-queue.json.wal").exists()
+
+
+def test_concurrent_commits_share_fsyncs(tmp_path):
+    wal = WriteAheadLog(tmp_path / "log.wal", group_commit_s=0.01)
+
+    def worker(index):
+        for step in range(5):
+            wal.commit(wal.write({"worker": index, "step": step}))
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(list(wal.replay())) == 40
+    assert wal.commits == 40
+    assert wal.fsyncs < 40
+
+
+def test_reset_waits_for_the_leaders_fsync(tmp_path, monkeypatch):
+    wal = WriteAheadLog(tmp_path / "log.wal")
+    in_fsync, release = threading.Event(), threading.Event()
+    synced = []
+    real_fsync = wal_module.os.fsync
+
+    def slow_fsync(fileno):
+        if not in_fsync.is_set():
+            in_fsync.set()
+            release.wait(5)
+        real_fsync(fileno)            # EBADF if the handle was closed meanwhile
+        synced.append(fileno)
+
+    monkeypatch.setattr(wal_module.os, "fsync", slow_fsync)
+    leader = threading.Thread(target=wal.commit, args=(wal.write({"n": 1}),))
+    leader.start()
+    assert in_fsync.wait(5)
+    resetter = threading.Thread(target=wal.reset)
+    resetter.start()
+    resetter.join(0.2)
+    assert resetter.is_alive()        # blocked while the fsync is in flight
+    release.set()
+    leader.join(5)
+    resetter.join(5)
+    assert not resetter.is_alive() and len(synced) == 2
+    assert wal.health()["fsyncs"] == 1 and (tmp_path / "log.wal").read_bytes() == b""
+
+
+def test_torn_wal_tail_is_ignored_and_trimmed(tmp_path):
+    wal_path = tmp_path / "log.wal"
+    wal_path.write_bytes(b'{"n": 1}\n{"n": 2, "tru')
+    wal = WriteAheadLog(wal_path)
+
+    assert [entry["n"] for entry in wal.replay()] == [1]
+    wal.commit(wal.write({"n": 3}))
+    assert [entry["n"] for entry in WriteAheadLog(wal_path).replay()] == [1, 3]
+
+
+def test_source_registry_replays_wal_including_replacements(tmp_path):
+    path = tmp_path / "sources.json"
+    registry = JsonSourceRegistry(path)
+    registry.register(SourceRecord("youtube", "v1", "First", "hash-1"))
+    registry.register(SourceRecord("youtube", "v1", "First (edited)", "hash-2"), replace=True)
+    registry.register(SourceRecord("youtube", "v2", "Second", "hash-3"))
+
+    restored = JsonSourceRegistry(path)
+    assert restored.get("youtube", "v1").title == "First (edited)"
+    assert restored.find_by_hash("hash-1") is None
+    assert restored.find_by_hash("hash-3").source_id == "v2"
+    assert restored.health()["wal"]["records"] == 0
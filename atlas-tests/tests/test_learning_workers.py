@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from atlas_knowledge_engine.json_learning_queue import JsonLearningQueue
+from atlas_knowledge_engine.learning_adapter import (
+    AdapterRegistry,
+    ExtractedContent,
+    LearningSource,
+)
+from atlas_knowledge_engine.learning_pipeline import LearningPipeline
+from atlas_knowledge_engine.learning_workers import SHUTDOWN_REASON
+
+
+class SlowAdapter:
+    def __init__(self, source_type: str, delay: float = 0.02) -> None:
+        self.source_type = source_type
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def can_handle(self, source: LearningSource) -> bool:
+        return source.source_type == self.source_type
+
+    def validate(self, source: LearningSource) -> None:
+        pass
+
+    def extract(self, source: LearningSource) -> ExtractedContent:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return ExtractedContent(
+            source_type=self.source_type,
+            source_id=source.locator,
+            title=f"Title {source.locator}",
+            text=f"Body of {source.locator}",
+        )
+
+
+def _pipeline(*adapters, queue=None) -> LearningPipeline:
+    registry = AdapterRegistry()
+    for adapter in adapters:
+        registry.register(adapter)
+    return LearningPipeline(registry, queue)
+
+
+def test_run_workers_drains_queue_concurrently() -> None:
+    adapter = SlowAdapter("note")
+    pipeline = _pipeline(adapter)
+    for index in range(24):
+        pipeline.submit(LearningSource("note", f"n{index}"))
+
+    started = time.perf_counter()
+    pipeline.run_workers(6)
+    elapsed = time.perf_counter() - started
+
+    assert pipeline.queue.counts() == {"queued": 0, "running": 0, "completed": 24, "failed": 0}
+    assert adapter.peak > 1
+    assert elapsed < 24 * adapter.delay
+    health = pipeline.health()
+    assert health["throughput"]["completed"] == 24
+    assert health["throughput"]["latency_ms"]["p95"] is not None
+    assert health["workers"]["running"] is False
+
+
+def test_adapter_limits_cap_concurrency_per_adapter() -> None:
+    limited = SlowAdapter("video")
+    free = SlowAdapter("note", delay=0.005)
+    pipeline = _pipeline(limited, free)
+    for index in range(8):
+        pipeline.submit(LearningSource("video", f"v{index}"))
+        pipeline.submit(LearningSource("note", f"n{index}"))
+
+    pipeline.run_workers(4, adapter_limits={"video": 1})
+
+    assert limited.peak == 1
+    assert pipeline.queue.counts()["completed"] == 16
+
+
+def test_failures_are_counted_and_do_not_stop_workers() -> None:
+    class Flaky(SlowAdapter):
+        def extract(self, source: LearningSource) -> ExtractedContent:
+            if source.locator.endswith("3"):
+                raise RuntimeError("boom")
+            return super().extract(source)
+
+    pipeline = _pipeline(Flaky("note", delay=0.001))
+    for index in range(6):
+        pipeline.submit(LearningSource("note", f"n{index}"))
+
+    pipeline.run_workers(3)
+
+    assert pipeline.queue.counts()["failed"] == 1
+    assert pipeline.health()["throughput"]["failed"] == 1
+
+
+def test_stop_returns_in_flight_jobs_to_queue(tmp_path) -> None:
+    adapter = SlowAdapter("note", delay=0.5)
+    queue = JsonLearningQueue(tmp_path / "queue.json")
+    pipeline = _pipeline(adapter, queue=queue)
+    jobs = [pipeline.submit(LearningSource("note", f"n{index}")) for index in range(4)]
+
+    pool = pipeline.run_workers(2, until_idle=False)
+    time.sleep(0.1)
+    pool.stop(drain_timeout=0.05)
+    time.sleep(0.6)   # let the abandoned extractions finish and be discarded
+
+    assert queue.counts() == {"queued": 4, "running": 0, "completed": 0, "failed": 0}
+    requeued = [queue.get(job.job_id) for job in jobs if queue.get(job.job_id).error]
+    assert len(requeued) == 2
+    assert all(job.error == SHUTDOWN_REASON for job in requeued)
+    assert JsonLearningQueue(tmp_path / "queue.json").counts()["queued"] == 4
@@ -187,21 +187,25 @@ memory = Memory()
 # Convenience wiring used by the FastAPI app at startup.
 # ---------------------------------------------------------------------------
 
-async def attach_mongo_on_startup() -> None:
+async def attach_mongo_on_startup(db=None) -> None:
     """Wire `memory` to MongoDB using MONGO_URL + DB_NAME from the env.
 
+    Pass `db` to reuse the host app's database handle (and its connection
+    pool) instead of opening a client here.
+
     Safe to call even if the env vars are missing — we simply log and
     leave the singleton in pure in-memory mode.
     """
     mongo_url = os.environ.get("MONGO_URL")
     db_name = os.environ.get("DB_NAME")
-    if not mongo_url or not db_name:
+    if db is None and (not mongo_url or not db_name):
         logger.info("MONGO_URL or DB_NAME not set — memory stays in-memory only")
         return
     try:
-        from motor.motor_asyncio import AsyncIOMotorClient
-        client = AsyncIOMotorClient(mongo_url)
-        db = client[db_name]
+        if db is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            client = AsyncIOMotorClient(mongo_url)
+            db = client[db_name]
         loop = asyncio.get_running_loop()
         memory.bind_mongo(db, loop)
         await memory.hydrate()
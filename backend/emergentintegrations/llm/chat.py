@@ -8,7 +8,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
 
 import httpx
 
@@ -25,12 +25,16 @@ class LlmChat:
         api_key: str,
         session_id: str,
         system_message: str,
+        client_factory: Optional[Callable[[str], httpx.AsyncClient]] = None,
     ) -> None:
         self.api_key = api_key
         self.session_id = session_id
         self.system_message = system_message
         self.provider = "openai"
         self.model = "gpt-4.1-mini"
+        # base_url -> long-lived pooled client. Without one, each call opens
+        # (and closes) its own client.
+        self.client_factory = client_factory
 
     def with_model(self, provider: str, model: str) -> "LlmChat":
         self.provider = (provider or "openai").lower()
@@ -57,12 +61,14 @@ class LlmChat:
             "stream": False,
         }
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{base_url.rstrip('/')}/chat/completions",
-                headers=headers,
-                json=payload,
+        url = f"{base_url.rstrip('/')}/chat/completions"
+        if self.client_factory is not None:
+            response = await self.client_factory(base_url).post(
+                url, headers=headers, json=payload,
             )
+        else:
+            async with httpx.AsyncClient(timeout=120.0) as client:
+                response = await client.post(url, headers=headers, json=payload)
         response.raise_for_status()
         data = response.json()
         try:
@@ -52,6 +52,7 @@ class SimulationKind(str, Enum):
     TIMELINE = "timeline"     # critical-path schedule
     COST = "cost"             # rolled-up cost estimate
     THERMAL = "thermal"       # ODE-based thermal sim (scipy.integrate.solve_ivp)
+    THERMAL_NETWORK = "thermal_network"   # per-part sparse thermal network
 
 
 # --- Sub-documents ----------------------------------------------------------
@@ -7,10 +7,10 @@ import os
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 from datetime import datetime, timezone
+from services import mongo
 from services.knowledge_core import get_knowledge_core
 
 load_dotenv()
@@ -18,10 +18,8 @@ load_dotenv()
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
 
 # MongoDB connection
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "atlas_core")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
+db = mongo.db(DB_NAME)
 
 # Emergent LLM Key
 EMERGENT_LLM_KEY = os.environ.get("EMERGENT_LLM_KEY", "")
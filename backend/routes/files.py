@@ -8,18 +8,16 @@ from uuid import uuid4
 from typing import List
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query
 from fastapi.responses import FileResponse
-from motor.motor_asyncio import AsyncIOMotorClient
 
 from models.file_model import FileMetadata, FileUploadResponse, FileCategoryUpdate
+from services import mongo
 from services.ai_categorizer import categorize_file_with_ai, get_available_sections
 
 router = APIRouter(prefix="/api/files", tags=["Files"])
 
 # MongoDB connection
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "atlas_core")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
+db = mongo.db(DB_NAME)
 
 # File storage directory
 UPLOAD_DIR = "/app/uploads"
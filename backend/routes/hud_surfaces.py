@@ -10,15 +10,14 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
-from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, Field
 
+from services import mongo
+
 router = APIRouter(prefix="/api", tags=["HUD Surfaces"])
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client = AsyncIOMotorClient(MONGO_URL)
-db = _client[DB_NAME]
+db = mongo.db(DB_NAME)
 events_col = db["atlas_events"]
 settings_col = db["atlas_settings"]
 
@@ -17,21 +17,19 @@ from urllib.parse import parse_qs, urlparse
 from uuid import uuid4
 
 from fastapi import APIRouter, HTTPException
-from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, Field
 from youtube_transcript_api import YouTubeTranscriptApi
 
 from routing.topic_router import AI_DISPLAY, route_topic
 from routes.learning import persist_pipeline
+from services import mongo
 
 logger = logging.getLogger("atlas.intake")
 
 router = APIRouter(prefix="/api/intake", tags=["Intake"])
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client = AsyncIOMotorClient(MONGO_URL)
-db = _client[DB_NAME]
+db = mongo.db(DB_NAME)
 archive_col = db["atlas_archive"]
 
 
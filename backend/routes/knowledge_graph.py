@@ -96,3 +96,48 @@ async def neighborhood(node_id: str, depth: int = Query(1, ge=1, le=3)):
         return graph.neighborhood(node_id, depth=depth)
     except graph.KnowledgeGraphError as exc:
         raise HTTPException(404, str(exc)) from exc
+
+
+@router.get("/k-hop/{node_id}")
+async def k_hop(
+    node_id: str,
+    k: int = Query(2, ge=1, le=6),
+    edge_type: Optional[List[str]] = Query(None),
+    direction: str = "both",
+    min_weight: float = Query(0.0, ge=0.0, le=1.0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+):
+    try:
+        return graph.k_hop(node_id, k, edge_types=edge_type, direction=direction,
+                           min_weight=min_weight, limit=limit)
+    except graph.KnowledgeGraphError as exc:
+        raise HTTPException(404 if "unknown node_id" in str(exc) else 422, str(exc)) from exc
+
+
+@router.get("/path")
+async def shortest_path(
+    source_node_id: str,
+    target_node_id: str,
+    weighted: bool = False,
+    edge_type: Optional[List[str]] = Query(None),
+    direction: str = "both",
+):
+    try:
+        return graph.shortest_path(source_node_id, target_node_id, weighted=weighted,
+                                   edge_types=edge_type, direction=direction)
+    except graph.KnowledgeGraphError as exc:
+        raise HTTPException(404 if "unknown node_id" in str(exc) else 422, str(exc)) from exc
+
+
+class SubgraphRequest(BaseModel):
+    node_ids: List[str] = Field(min_length=1, max_length=500)
+    edge_types: Optional[List[str]] = None
+    expand: int = Field(default=0, ge=0, le=3)
+
+
+@router.post("/subgraph")
+async def subgraph(req: SubgraphRequest):
+    try:
+        return graph.subgraph(req.node_ids, edge_types=req.edge_types, expand=req.expand)
+    except graph.KnowledgeGraphError as exc:
+        raise HTTPException(422, str(exc)) from exc
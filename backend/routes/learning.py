@@ -18,20 +18,18 @@ from uuid import uuid4
 from dotenv import load_dotenv
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 from fastapi import APIRouter, HTTPException, Query
-from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, Field
 
 from routing.topic_router import AI_DISPLAY
+from services import mongo
 
 load_dotenv()
 logger = logging.getLogger("atlas.learning")
 
 router = APIRouter(prefix="/api/learning", tags=["Learning"])
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client = AsyncIOMotorClient(MONGO_URL)
-db = _client[DB_NAME]
+db = mongo.db(DB_NAME)
 knowledge_col = db["knowledge"]
 lessons_col = db["lessons"]
 projects_col = db["projects"]
@@ -7,6 +7,9 @@ Exposes:
   PUT  /api/llm/persona-models — update one or more persona settings
   POST /api/llm/test           — fire a single prompt at the configured
                                   provider for a persona (round-trip test)
+  GET  /api/llm/cache-stats    — response-cache hit rate and savings per caller
+  DELETE /api/llm/cache        — drop cached responses (optionally one namespace)
+  GET  /api/llm/scheduler      — per-provider queues, waits, budgets, spill-over
 """
 import logging
 from typing import Dict, Optional
@@ -14,6 +17,7 @@ from typing import Dict, Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
+from services import llm_cache, llm_scheduler
 from services.llm_provider import (
     DEFAULT_PERSONA_MODELS,
     EMERGENT_MODEL_MAP,
@@ -92,3 +96,18 @@ async def test_llm(req: TestRequest):
     except Exception as exc:
         raise HTTPException(502, f"LLM call failed: {exc}") from exc
     return result
+
+
+@router.get("/cache-stats")
+async def llm_cache_stats():
+    return llm_cache.stats()
+
+
+@router.get("/scheduler")
+async def llm_scheduler_stats():
+    return llm_scheduler.stats()
+
+
+@router.delete("/cache")
+async def clear_llm_cache(namespace: Optional[str] = None):
+    return await llm_cache.clear(namespace)
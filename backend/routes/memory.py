@@ -8,10 +8,13 @@ Public API:
   POST /api/membank/reinforce/{id} — bump freshness when reused
   DELETE /api/membank/{id}         — remove a memory
   POST /api/membank/graph/triple   — add a graph triple
+  POST /api/membank/graph/triples  — add many graph triples in one write
   GET  /api/membank/graph/list     — list triples
   GET  /api/membank/graph/around   — neighbourhood around a node
   GET  /api/membank/embed-settings — current embedding provider per persona
   PUT  /api/membank/embed-settings — update embedding provider per persona
+  GET  /api/membank/embed-stats    — embedding cache / micro-batch counters
+  GET  /api/membank/graph/cache-stats — adjacency cache counters
 
 Note: this lives at /api/membank/* (not /api/memory/*) so it doesn't
 collide with the existing `/api/memory/feed` event-stream endpoint in
@@ -248,6 +251,15 @@ async def add_triple(req: TripleRequest):
     )
 
 
+class TriplesRequest(BaseModel):
+    triples: List[TripleRequest] = Field(min_length=1, max_length=1000)
+
+
+@router.post("/graph/triples")
+async def add_triples(req: TriplesRequest):
+    return await mb.add_triples([t.model_dump() for t in req.triples])
+
+
 @router.get("/graph/list")
 async def list_triples(
     node: Optional[str] = None,
@@ -323,3 +335,15 @@ async def update_embed_settings(req: EmbedSettingsUpdate):
     if res.get("updated", 0) == 0:
         raise HTTPException(400, "no valid updates (provider must be hash, ollama, st, or emergent)")
     return res
+
+
+@router.get("/embed-stats")
+async def embed_stats():
+    """Vector-cache hit rate and micro-batch sizes for the embed pipeline."""
+    return mb.embed_stats()
+
+
+@router.get("/graph/cache-stats")
+async def graph_cache_stats():
+    """Adjacency-cache hit rate and write-through counters for graph memory."""
+    return mb.graph_cache_stats()
@@ -35,6 +35,19 @@ async def scan(req: ScanReq):
     return res
 
 
+class ScanBatchReq(BaseModel):
+    scans: List[ScanReq] = Field(..., min_length=1, max_length=500)
+
+
+@router.post("/scan/batch")
+async def scan_batch(req: ScanBatchReq):
+    """Analyse a burst of scans (e.g. a handheld sweep) in one call.
+    Invalid scans come back with their errors; the rest are stored."""
+    specs = [NIRSpectrum(**s.model_dump()) for s in req.scans]
+    items = await nir_svc.ingest_and_analyse_many(specs)
+    return {"count": len(items), "ok": sum(1 for r in items if r.get("ok")), "items": items}
+
+
 class SyntheticReq(BaseModel):
     material_name: str
     label: Optional[str] = None
@@ -74,6 +87,11 @@ async def result(spectrum_id: str):
     return res
 
 
+@router.get("/library/cache-stats")
+async def library_cache_stats():
+    return nir_svc.library_cache_stats()
+
+
 @router.get("/library")
 async def library():
     items = await nir_svc.list_library()
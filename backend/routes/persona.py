@@ -2,10 +2,13 @@
 Persona Chat REST surface — Phase 8a.
 
 POST   /api/persona/{persona}/chat           → ChatResponse
+POST   /api/persona/{persona}/chat/stream    → SSE: session, delta…, done
+WS     /api/persona/{persona}/chat/ws        → same events, one turn per message
 GET    /api/persona/{persona}/sessions       → list ChatSession
 GET    /api/persona/sessions/{session_id}    → {session, messages}
 DELETE /api/persona/sessions/{session_id}    → {ok}
 GET    /api/persona/list                     → list PersonaInfo
+GET    /api/persona/context-stats            → retrieval cache hit rate
 
 `persona` ∈ {ajani, minerva, hermes, council}. Anything else returns 400.
 
@@ -15,13 +18,17 @@ add an `X-Atlas-Role` gate later for multi-user deployments.
 """
 from __future__ import annotations
 
-from typing import List, Optional
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
 from models.persona_models import (
     ChatRequest, ChatResponse, Persona, PersonaInfo,
 )
+import services.context_retrieval as retrieval
 import services.persona_chat as svc
 
 router = APIRouter(prefix="/api/persona", tags=["Persona"])
@@ -46,6 +53,12 @@ async def list_personas():
     return svc.list_personas()
 
 
+@router.get("/context-stats")
+async def context_stats():
+    """Hybrid retrieval cache hit rate and token budget."""
+    return retrieval.stats()
+
+
 # ---------------------------------------------------------------------------
 # Chat
 # ---------------------------------------------------------------------------
@@ -58,6 +71,60 @@ async def post_chat(persona: str, req: ChatRequest):
         raise HTTPException(400, str(exc)) from exc
 
 
+def _sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@router.post("/{persona}/chat/stream")
+async def post_chat_stream(persona: str, req: ChatRequest):
+    """Same turn as POST /chat, streamed as server-sent events:
+    `session`, then `delta` (per persona; council interleaves its three
+    voices, each closed by `voice_done`), `reset` if a provider fell back
+    mid-stream, and finally `done` with the ChatResponse."""
+    p = _validate(persona)
+    events = svc.chat_stream_any(p, req)
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            async for event in events:
+                yield _sse(event)
+        except Exception as exc:    # noqa: BLE001
+            yield _sse({"type": "error", "detail": str(exc)[:300]})
+
+    return StreamingResponse(
+        body(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{persona}/chat/ws")
+async def chat_ws(websocket: WebSocket, persona: str):
+    """Send one ChatRequest JSON per turn; receive the same events as the
+    SSE stream. The socket stays open for follow-up turns."""
+    p = (persona or "").lower()
+    if p not in _VALID:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            try:
+                req = ChatRequest(**payload)
+            except (TypeError, ValidationError) as exc:
+                await websocket.send_json({"type": "error", "detail": str(exc)[:300]})
+                continue
+            try:
+                async for event in svc.chat_stream_any(p, req):    # type: ignore[arg-type]
+                    await websocket.send_json(event)
+            except WebSocketDisconnect:
+                raise
+            except Exception as exc:    # noqa: BLE001
+                await websocket.send_json({"type": "error", "detail": str(exc)[:300]})
+    except WebSocketDisconnect:
+        return
+
+
 # ---------------------------------------------------------------------------
 # Sessions
 # ---------------------------------------------------------------------------
@@ -10,6 +10,7 @@ from typing import Any, Dict, Optional
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
+from services import mongo
 from services import research_orchestrator as ro
 from services import blueprint_forge as bf
 from services import lesson_generator as lg
@@ -107,20 +108,14 @@ async def projects_evaluate():
 
 @router.get("/projects")
 async def projects_list(limit: int = Query(50, ge=1, le=200)):
-    from motor.motor_asyncio import AsyncIOMotorClient
-    import os
-    cli = AsyncIOMotorClient(os.environ.get("MONGO_URL"))
-    db = cli[os.environ.get("DB_NAME", "test_database")]
+    db = mongo.db()
     items = await db["projects_queue"].find({}, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(length=limit)
     return {"count": len(items), "items": items}
 
 
 @router.get("/project-recommendations")
 async def project_recommendations(limit: int = Query(50, ge=1, le=200)):
-    from motor.motor_asyncio import AsyncIOMotorClient
-    import os
-    cli = AsyncIOMotorClient(os.environ.get("MONGO_URL"))
-    db = cli[os.environ.get("DB_NAME", "test_database")]
+    db = mongo.db()
     items = await db["project_recommendations"].find({}, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(length=limit)
     return {"count": len(items), "items": items}
 
@@ -156,10 +151,7 @@ class LessonModeReq(BaseModel):
 
 @router.post("/lesson/regenerate")
 async def lesson_regenerate(req: LessonModeReq):
-    from motor.motor_asyncio import AsyncIOMotorClient
-    import os
-    cli = AsyncIOMotorClient(os.environ.get("MONGO_URL"))
-    db = cli[os.environ.get("DB_NAME", "test_database")]
+    db = mongo.db()
     kb = await db["knowledge_records"].find_one({"id": req.knowledge_id}, {"_id": 0})
     if not kb:
         raise HTTPException(404, "knowledge_id not found")
@@ -188,10 +188,10 @@ class TelemetryRequest(BaseModel):
 async def push_telemetry(device_id: str, req: TelemetryRequest):
     """Device push — no role check; devices on the local LAN report freely.
     The role check happens on COMMANDS, not on telemetry reports."""
-    d = await robot.get_device(device_id)
-    if not d:
+    rec = await robot.ingest_telemetry(device_id, req.payload, source=req.source)
+    if rec is None:
         raise HTTPException(404, "device not found")
-    return await robot.ingest_telemetry(device_id, req.payload, source=req.source)
+    return rec
 
 
 @router.get("/devices/{device_id}/telemetry")
@@ -199,6 +199,26 @@ async def history(device_id: str, limit: int = Query(50, ge=1, le=500)):
     return {"items": await robot.telemetry_history(device_id, limit=limit)}
 
 
+@router.get("/devices/{device_id}/telemetry/series")
+async def telemetry_series(
+    device_id: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    resolution: str = Query("auto", description="auto | raw | 1m | 1h | 1d"),
+    keys: Optional[str] = Query(None, description="comma-separated payload keys"),
+):
+    """Downsampled history for HUD charts — defaults to the last 24 h at
+    the finest resolution that fits."""
+    from services.telemetry_store import TelemetryQueryError
+    try:
+        return await robot.telemetry_series(
+            device_id, start=start, end=end, resolution=resolution,
+            keys=[k.strip() for k in keys.split(",") if k.strip()] if keys else None,
+        )
+    except TelemetryQueryError as exc:
+        raise HTTPException(400, str(exc))
+
+
 # --- Commands --------------------------------------------------------------
 class CommandRequest(BaseModel):
     kind: CommandKind
@@ -288,6 +308,35 @@ async def mqtt_status():
     return mqtt_bridge.status()
 
 
+@router.get("/telemetry/ingest/status")
+async def telemetry_ingest_status():
+    """Buffer depth, flush counters and cache size of the telemetry
+    ingest engine."""
+    from services import telemetry_ingest
+    return telemetry_ingest.status()
+
+
+@router.post("/telemetry/compact")
+async def telemetry_compact(role: Role = Depends(_role_from_header)):
+    """Run the telemetry retention job now (roll up + delete expired raw
+    readings, drop expired minute buckets). Owner-only."""
+    if role != Role.OWNER:
+        raise HTTPException(403, "telemetry compaction is owner-only")
+    from services import telemetry_store
+    return await telemetry_store.compact()
+
+
+@router.post("/telemetry/backfill")
+async def telemetry_backfill(force: bool = Query(False),
+                             role: Role = Depends(_role_from_header)):
+    """Roll raw readings that predate the bucket store into series
+    buckets. Runs once per database unless `force`. Owner-only."""
+    if role != Role.OWNER:
+        raise HTTPException(403, "telemetry backfill is owner-only")
+    from services import telemetry_store
+    return await telemetry_store.backfill(force=force)
+
+
 @router.get("/sentinel/watcher/status")
 async def watcher_status():
     """Operational view of the Sentinel autonomic watcher (Phase 8h).
@@ -16,9 +16,10 @@ from uuid import uuid4
 from dotenv import load_dotenv
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 from fastapi import APIRouter, HTTPException, Query
-from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, Field
 
+from services import mongo
+
 load_dotenv()
 
 logger = logging.getLogger("atlas.sandbox")
@@ -26,10 +27,8 @@ logger = logging.getLogger("atlas.sandbox")
 router = APIRouter(prefix="/api/sandbox", tags=["Sandbox"])
 
 # --- MongoDB ----------------------------------------------------------------
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "atlas_core")
-_client = AsyncIOMotorClient(MONGO_URL)
-db = _client[DB_NAME]
+db = mongo.db(DB_NAME)
 runs_col = db["sandbox_runs"]      # mastery-curve history
 saved_col = db["sandbox_saved"]    # named, pinned configurations
 
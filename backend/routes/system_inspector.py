@@ -1,9 +1,11 @@
 """ATLAS System Inspector routes."""
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 
-from services import system_inspector
+from models.robot_models import Role
+from routes.robot import _role_from_header
+from services import index_manifest, mongo, provider_clients, system_inspector
 
 router = APIRouter(prefix="/api/system-inspector", tags=["ATLAS System Inspector"])
 
@@ -17,6 +19,31 @@ async def health():
     }
 
 
+@router.get("/mongo")
+async def mongo_pool():
+    return mongo.pool_stats()
+
+
+@router.get("/llm-pool")
+async def llm_pool():
+    """Pooled provider clients and per-provider queue depth."""
+    return provider_clients.stats()
+
+
+@router.get("/indexes")
+async def index_explain():
+    """Explain the hot service queries; lists any that still COLLSCAN."""
+    return await index_manifest.explain_report()
+
+
+@router.post("/indexes/bootstrap")
+async def index_bootstrap(role: Role = Depends(_role_from_header)):
+    """Create every index in the manifest. Owner-only."""
+    if role != Role.OWNER:
+        raise HTTPException(403, "index bootstrap is owner-only")
+    return await index_manifest.bootstrap()
+
+
 @router.get("/report")
 async def report():
     return system_inspector.inspect_repository()
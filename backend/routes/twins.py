@@ -10,9 +10,12 @@ DELETE /api/twins/{id}                      → {deleted: id}
 POST   /api/twins/{id}/simulate             → SimulationResult        body: {kind}
 GET    /api/twins/{id}/simulations          → recent sims (≤20)
 GET    /api/twins/simulations/{sim_id}      → SimulationResult
+GET    /api/twins/sim-memo                  → simulation memo hit rate
+POST   /api/twins/thermal/sweep             → thermal percentile envelope + worst case
 
 POST   /api/twins/{id}/deliberate           → CouncilDeliberation     body: {simulation_id?}
 """
+import asyncio
 from typing import List, Optional
 
 from fastapi import APIRouter, Body, HTTPException, Query
@@ -26,6 +29,7 @@ from models.twin_models import (
     TwinStatus,
 )
 from services import digital_twin as dt
+from services.twin_simulator import SWEEP_MAX_POINTS, SWEEP_MAX_SCENARIOS, sweep_thermal
 
 router = APIRouter(prefix="/api/twins", tags=["DigitalTwin"])
 
@@ -49,6 +53,18 @@ class DeliberateRequest(BaseModel):
     simulation_id: Optional[str] = None
 
 
+class ThermalSweepRequest(BaseModel):
+    T_amb_c: List[float] = Field(min_length=1, max_length=100_000)
+    power_w: List[float] = Field(min_length=1, max_length=100_000)
+    R_th_k_w: List[float] = Field(min_length=1, max_length=100_000)
+    C_j_k: float = Field(0.046 * 900.0, gt=0)
+    T_init_c: Optional[float] = None
+    duration_s: float = Field(1800.0, gt=0, le=7 * 24 * 3600)
+    runaway_c: float = 80.0
+    grid: bool = False
+    samples: int = Field(50, ge=2, le=500)
+
+
 # --- Registry --------------------------------------------------------------
 @router.post("/register")
 async def register(req: RegisterRequest):
@@ -93,6 +109,26 @@ async def categories():
     }
 
 
+@router.get("/sim-memo")
+async def sim_memo():
+    return dt.sim_memo_stats()
+
+
+@router.post("/thermal/sweep")
+async def thermal_sweep(req: ThermalSweepRequest):
+    axes = (len(req.T_amb_c), len(req.power_w), len(req.R_th_k_w))
+    n = axes[0] * axes[1] * axes[2] if req.grid else max(axes)
+    if n > SWEEP_MAX_SCENARIOS:
+        raise HTTPException(400, f"grid of {n} scenarios is too large (max {SWEEP_MAX_SCENARIOS:,})")
+    if n * req.samples > SWEEP_MAX_POINTS:
+        raise HTTPException(400, f"{n} scenarios × {req.samples} samples is too large "
+                                 f"(max {SWEEP_MAX_POINTS:,} points)")
+    try:
+        return await asyncio.to_thread(sweep_thermal, **req.model_dump())
+    except ValueError as exc:
+        raise HTTPException(400, str(exc)) from exc
+
+
 @router.get("/simulations/{sim_id}")
 async def get_simulation(sim_id: str):
     sim = await dt.get_simulation(sim_id)
@@ -4,7 +4,10 @@ Weaver routes — Phase 6.
 POST   /api/weaver/parts                       → add a part to the library
 GET    /api/weaver/parts                       → list / search the library
 GET    /api/weaver/parts/{id}                  → fetch one
+PUT    /api/weaver/parts/{id}                  → partial update (re-indexed)
 DELETE /api/weaver/parts/{id}                  → remove one
+POST   /api/weaver/parts/match                 → batch fuzzy name → part match
+GET    /api/weaver/parts/index-stats           → parts search index size
 GET    /api/weaver/parts/categories            → enum introspection
 POST   /api/weaver/parts/seed                  → idempotent starter seed
 
@@ -14,7 +17,7 @@ GET    /api/weaver/plans                       → list plans
 GET    /api/weaver/plans/{id}                  → fetch one
 DELETE /api/weaver/plans/{id}?drop_twin=…      → delete a plan (optional cascade)
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
@@ -24,7 +27,7 @@ from models.weaver_models import (
     Part,
     PartCategory,
 )
-from services import blueprint_parser, parts_db, weaver
+from services import blueprint_parser, parts_db, parts_index, weaver
 
 router = APIRouter(prefix="/api/weaver", tags=["Weaver"])
 
@@ -46,6 +49,43 @@ async def add_part(part: Part):
     return await parts_db.add_part(part)
 
 
+class PartUpdate(BaseModel):
+    name: Optional[str] = None
+    category: Optional[PartCategory] = None
+    description: Optional[str] = None
+    material: Optional[str] = None
+    spec: Optional[Dict[str, Any]] = None
+    unit: Optional[str] = None
+    default_cost: Optional[float] = None
+    default_lead_time_days: Optional[float] = None
+    suppliers: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+
+
+class MatchRequest(BaseModel):
+    names: List[str] = Field(min_length=1, max_length=2000)
+
+
+@router.put("/parts/{part_id}")
+async def update_part(part_id: str, req: PartUpdate):
+    p = await parts_db.update_part(part_id, req.model_dump(mode="json", exclude_unset=True))
+    if not p:
+        raise HTTPException(404, "part not found")
+    return p
+
+
+@router.post("/parts/match")
+async def match_parts(req: MatchRequest):
+    hits = await parts_db.match_many(req.names)
+    return {"count": sum(1 for h in hits if h),
+            "items": [{"name": n, "match": h} for n, h in zip(req.names, hits)]}
+
+
+@router.get("/parts/index-stats")
+async def parts_index_stats():
+    return parts_index.stats()
+
+
 @router.get("/parts")
 async def list_parts(
     category: Optional[PartCategory] = None,
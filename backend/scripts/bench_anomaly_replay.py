@@ -0,0 +1,107 @@
+"""
+Anomaly engine replay benchmark — vectorised engine vs. per-reading loop.
+
+Builds a fleet of simulated ESP32 nodes (hardware/esp32/sim/atlas_node_sim
+`AtlasNode._telemetry_payload`, no HTTP), records `--ticks` telemetry
+rounds with a few injected sensor spikes, then replays the stream through
+`anomaly.score_state` (one reading at a time, dict envelopes) and
+`anomaly_engine.score_batch` (one batch per `--batch` readings), plus
+`anomaly_engine.score` one reading at a time. Checks the Welford results
+agree before reporting throughput.
+
+Usage:
+    cd /app/backend && python -m scripts.bench_anomaly_replay
+    cd /app/backend && python -m scripts.bench_anomaly_replay --devices 500 --ticks 200 --batch 1000
+"""
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from services import anomaly, anomaly_engine
+
+SIM_PATH = Path(__file__).resolve().parents[2] / "hardware" / "esp32" / "sim" / "atlas_node_sim.py"
+
+
+def _load_sim():
+    spec = importlib.util.spec_from_file_location("atlas_node_sim", SIM_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _record(devices: int, ticks: int, seed: int) -> List[Tuple[str, Dict[str, Any]]]:
+    random.seed(seed)
+    sim = _load_sim()
+    nodes = [sim.AtlasNode("http://sim.invalid", f"node-{i:04d}") for i in range(devices)]
+    spikes = {(random.randrange(devices), random.randrange(ticks // 2, ticks)) for _ in range(max(1, devices // 10))}
+    stream = []
+    for t in range(ticks):
+        for i, node in enumerate(nodes):
+            payload = node._telemetry_payload()["payload"]
+            if (i, t) in spikes:
+                payload["sensor_raw"] += 2000
+            stream.append((node.device_id, payload))
+    return stream
+
+
+def main(devices: int, ticks: int, batch: int, seed: int) -> None:
+    stream = _record(devices, ticks, seed)
+    print(f"replaying {len(stream)} readings from {devices} simulated nodes "
+          f"({len(stream[0][1])} keys each), batch={batch}")
+
+    states: Dict[str, Dict[str, Any]] = {}
+    start = time.perf_counter()
+    ref = []
+    for device_id, payload in stream:
+        _, drifting, z = anomaly.score_state(states.setdefault(device_id, {}), payload)
+        ref.append((drifting, z))
+    ref_t = time.perf_counter() - start
+
+    results = {}
+    for detectors in (("welford",), ("welford", "ewma", "window")):
+        anomaly_engine.reset_in_memory_state(detectors=detectors)
+        for device_id in states:
+            anomaly_engine.load(device_id, {})
+        start = time.perf_counter()
+        got = []
+        for i in range(0, len(stream), batch):
+            got.extend(anomaly_engine.score_batch(stream[i:i + batch]))
+        results[detectors] = (time.perf_counter() - start, got)
+
+    anomaly_engine.reset_in_memory_state(detectors=("welford",))
+    for device_id in states:
+        anomaly_engine.load(device_id, {})
+    start = time.perf_counter()
+    single_got = [anomaly_engine.score(device_id, payload) for device_id, payload in stream]
+    single_t = time.perf_counter() - start
+
+    welford_t, welford_got = results[("welford",)]
+    assert [(d, z) for d, z, _ in welford_got] == ref, "engine diverged from score_state"
+    assert single_got == welford_got, "scalar path diverged from score_batch"
+    all_t, all_got = results[("welford", "ewma", "window")]
+
+    def row(label: str, secs: float, flagged: int) -> None:
+        print(f"{label:<28} {secs * 1e3:>9.1f}ms {len(stream) / secs:>12,.0f} rd/s "
+              f"{ref_t / secs:>7.1f}x  flagged={flagged}")
+
+    print(f"{'path':<28} {'total':>11} {'throughput':>17} {'speedup':>8}")
+    row("score_state (per reading)", ref_t, sum(1 for d, _ in ref if d))
+    row("engine · score (per reading)", single_t, sum(1 for d, _, _ in single_got if d))
+    row("engine · welford", welford_t, sum(1 for d, _, _ in welford_got if d))
+    row("engine · welford+ewma+window", all_t, sum(1 for d, _, _ in all_got if d))
+    anomaly_engine.reset_in_memory_state()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.devices, args.ticks, args.batch, args.seed)
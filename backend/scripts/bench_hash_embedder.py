@@ -0,0 +1,77 @@
+"""
+Hash-embedder benchmark — vectorised vs. original pure-Python loop.
+
+Times `hash_embedder.embed` (cold and warm token cache),
+`hash_embedder.embed_many` and the original `embed_reference` on
+100-char, 2k-char and 8k-char inputs, and checks the outputs are
+bit-identical before reporting.
+
+Usage:
+    cd /app/backend && python -m scripts.bench_hash_embedder
+    cd /app/backend && python -m scripts.bench_hash_embedder --repeat 50 --batch 64
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from services import hash_embedder
+
+SIZES = {"100-char": 100, "2k-char": 2_000, "8k-char": 8_000}
+_VOCAB = (
+    "telemetry anomaly envelope thermal resistance actuator servo lidar "
+    "battery voltage council minerva hermes ajani blueprint weaver twin "
+    "simulation spectrum fingerprint calibration torque firmware esp32 "
+    "memory reinforcement freshness decay knowledge graph triple"
+).split()
+
+
+def _corpus(n_chars: int, count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words: List[str] = []
+        while sum(len(w) + 1 for w in words) < n_chars:
+            w = rng.choice(_VOCAB)
+            words.append(w if rng.random() > 0.1 else f"{w}{rng.randint(0, 999)}")
+        texts.append(" ".join(words)[:n_chars])
+    return texts
+
+
+def _time(fn: Callable[[], object], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(repeat: int, batch: int) -> None:
+    print(f"{'input':<10} {'reference':>12} {'numpy cold':>12} {'numpy warm':>12} "
+          f"{'embed_many/txt':>15} {'speedup':>8}")
+    for label, n_chars in SIZES.items():
+        texts = _corpus(n_chars, batch, seed=n_chars)
+        for t in texts:
+            assert hash_embedder.embed_list(t) == hash_embedder.embed_reference(t), label
+
+        ref = _time(lambda: [hash_embedder.embed_reference(t) for t in texts], repeat) / batch
+
+        def cold() -> None:
+            hash_embedder.clear_cache()
+            for t in texts:
+                hash_embedder.embed(t)
+
+        cold_t = _time(cold, repeat) / batch
+        warm = _time(lambda: [hash_embedder.embed(t) for t in texts], repeat) / batch
+        many = _time(lambda: hash_embedder.embed_many(texts), repeat) / batch
+        print(f"{label:<10} {ref * 1e3:>10.3f}ms {cold_t * 1e3:>10.3f}ms {warm * 1e3:>10.3f}ms "
+              f"{many * 1e3:>13.3f}ms {ref / warm:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+    main(args.repeat, args.batch)
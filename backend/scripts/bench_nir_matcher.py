@@ -0,0 +1,98 @@
+"""
+NIR library matching benchmark — per-entry loop vs. `_LibraryMatrix`.
+
+Builds a library of `--library` entries (the seed materials plus random
+references, a third of them with full-spectrum fingerprints of assorted
+lengths) and a burst of `--scans` synthetic scans, then times:
+
+  * loop    — the pre-matrix approach: `_peak_overlap` + `_cosine_score`
+              (fresh `np.interp` resample) for every entry, every scan
+  * matrix  — `_LibraryMatrix.rank` one scan at a time (warm grid)
+  * burst   — `_LibraryMatrix.rank` on the whole burst as one stack
+
+Checks the loop and the matrix agree on every top-5 before reporting.
+
+Usage:
+    cd /app/backend && python -m scripts.bench_nir_matcher
+    cd /app/backend && python -m scripts.bench_nir_matcher --library 20000 --scans 50
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from models.nir_models import LibraryEntry
+from services import nir
+
+
+def _library(n: int, seed: int) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    lib = [LibraryEntry(**s).model_dump() for s in nir.SEED_LIBRARY]
+    for i in range(max(0, n - len(lib))):
+        fp = rng.random(int(rng.integers(128, 512))).tolist() if i % 3 == 0 else None
+        lib.append(LibraryEntry(
+            name=f"ref {i:06d}", category="organic_compound",
+            characteristic_peaks_nm=sorted(rng.uniform(900, 2500, int(rng.integers(1, 8))).tolist()),
+            fingerprint_intensities=fp,
+        ).model_dump())
+    return sorted(lib, key=lambda e: e["name"])
+
+
+def _loop(norm_corr: np.ndarray, peaks_nm: List[float],
+          library: List[Dict[str, Any]]) -> List[Tuple[str, float, int]]:
+    matches = []
+    for entry in library:
+        overlap = nir._peak_overlap(peaks_nm, entry.get("characteristic_peaks_nm") or [])
+        cos = nir._cosine_score(norm_corr, entry.get("fingerprint_intensities"))
+        if cos is None:
+            cos = overlap / max(1, len(entry.get("characteristic_peaks_nm") or []))
+        if cos < 0.10 and overlap == 0:
+            continue
+        matches.append((entry["id"], round(cos, 4), overlap))
+    matches.sort(key=lambda m: (m[1], m[2]), reverse=True)
+    return matches[:5]
+
+
+def _time(fn: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - start) / repeat, out
+
+
+def main(library_size: int, scans: int, repeat: int, seed: int) -> None:
+    library = _library(library_size, seed)
+    names = [s["name"] for s in nir.SEED_LIBRARY]
+    sigs = [nir._analyse_signal(nir.synthesize_spectrum(names[i % len(names)]))
+            for i in range(scans)]
+    norms = np.stack([s["norm"] for s in sigs])
+    peaks = [s["peaks"] for s in sigs]
+
+    build_t, lib = _time(lambda: nir._LibraryMatrix(library), 1)
+    lib.grid(norms.shape[1])
+    loop_t, loop = _time(lambda: [_loop(s["norm"], s["peaks"], library) for s in sigs], 1)
+    one_t, _ = _time(lambda: [lib.rank(n[None, :], [p]) for n, p in zip(norms, peaks)], repeat)
+    burst_t, burst = _time(lambda: lib.rank(norms, peaks), repeat)
+
+    got = [[(m.library_id, m.cosine_score, m.peaks_matched_count) for m in top] for top in burst]
+    assert got == loop, "matrix ranking diverged from the per-entry loop"
+
+    print(f"{len(library)} library entries · {scans} scans · "
+          f"{int(lib.has_fp.sum())} fingerprints · {lib.peak_nm.size} peaks · "
+          f"build {build_t * 1e3:.1f}ms")
+    print(f"{'method':<8} {'total':>12} {'per scan':>12} {'speedup':>9}")
+    for label, t in (("loop", loop_t), ("matrix", one_t), ("burst", burst_t)):
+        print(f"{label:<8} {t * 1e3:>10.1f}ms {t / scans * 1e3:>10.2f}ms {loop_t / t:>8.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--library", type=int, default=5_000)
+    parser.add_argument("--scans", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.library, args.scans, args.repeat, args.seed)
@@ -0,0 +1,94 @@
+"""
+Thermal sweep benchmark — one solve_ivp per scenario vs. `sweep_thermal`.
+
+Draws `--scenarios` Monte-Carlo scenarios (ambient temperature, heat load,
+thermal resistance) around an 18650 cell, then times:
+
+  * loop      — the pre-sweep approach: one scalar `solve_ivp` call per
+                scenario (timed on `--loop-sample` scenarios and scaled up)
+  * ode       — `sweep_thermal(method="ode")`, all scenarios as one system
+  * analytic  — `sweep_thermal()`, closed-form solution of the linear ODE
+
+Checks the three agree on peak temperature before reporting.
+
+Usage:
+    cd /app/backend && python -m scripts.bench_thermal_sweep
+    cd /app/backend && python -m scripts.bench_thermal_sweep --scenarios 100000 --loop-sample 200
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Tuple
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from services.twin_simulator import sweep_thermal
+
+C_J_K = 0.046 * 900.0
+DURATION_S = 1800.0
+
+
+def _scenarios(n: int, seed: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    t_amb = rng.uniform(10.0, 45.0, n)
+    power = rng.lognormal(np.log(0.8), 0.6, n)
+    r_th = rng.uniform(8.0, 25.0, n)
+    return t_amb, power, r_th
+
+
+def _one(t_amb: float, power: float, r_th: float) -> float:
+    sol = solve_ivp(
+        lambda _t, T: [(power - (T[0] - t_amb) / r_th) / C_J_K],
+        (0.0, DURATION_S), [t_amb],
+        max_step=max(1.0, DURATION_S / 200.0), rtol=1e-4, atol=1e-3,
+    )
+    return float(sol.y[0].max())
+
+
+def _time(fn: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - start) / repeat, out
+
+
+def main(scenarios: int, loop_sample: int, repeat: int, seed: int) -> None:
+    t_amb, power, r_th = _scenarios(scenarios, seed)
+    kw = dict(C_j_k=C_J_K, duration_s=DURATION_S)
+
+    k = min(loop_sample, scenarios)
+    loop_t, loop_peaks = _time(
+        lambda: [_one(t_amb[i], power[i], r_th[i]) for i in range(k)], 1)
+    loop_t *= scenarios / k
+    ode_t, ode = _time(lambda: sweep_thermal(t_amb, power, r_th, method="ode", **kw), 1)
+    ana_t, ana = _time(lambda: sweep_thermal(t_amb, power, r_th, **kw), repeat)
+
+    worst_dev = max(abs(ode["T_max_c"]["max"] - ana["T_max_c"]["max"]),
+                    abs(ode["T_max_c"]["p95"] - ana["T_max_c"]["p95"]))
+    analytic_peaks = [sweep_thermal(t_amb[i], power[i], r_th[i], **kw)["T_max_c"]["max"]
+                      for i in range(min(k, 20))]
+    loop_dev = max(abs(a - b) for a, b in zip(analytic_peaks, loop_peaks))
+    assert worst_dev < 0.05 and loop_dev < 0.05, (worst_dev, loop_dev)
+
+    print(f"{scenarios} scenarios · {DURATION_S:.0f}s window · "
+          f"runaway {ana['runaway_count']} ({ana['runaway_fraction']:.2%})")
+    print(f"{'method':<10} {'total':>12} {'per scenario':>14} {'speedup':>9}")
+    for label, t in (("loop", loop_t), ("ode", ode_t), ("analytic", ana_t)):
+        print(f"{label:<10} {t * 1e3:>10.1f}ms {t / scenarios * 1e6:>12.2f}µs {loop_t / t:>8.0f}x")
+    print(f"T_max p50={ana['T_max_c']['p50']} p95={ana['T_max_c']['p95']} "
+          f"worst={ana['worst_case']['T_max_c']} °C "
+          f"(T_amb={ana['worst_case']['T_amb_c']}, P={ana['worst_case']['power_w']} W, "
+          f"R_th={ana['worst_case']['R_th_k_w']} K/W)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", type=int, default=10_000)
+    parser.add_argument("--loop-sample", type=int, default=500,
+                        help="scenarios actually solved one by one; the loop time is scaled up")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.scenarios, args.loop_sample, args.repeat, args.seed)
@@ -2,7 +2,6 @@ from fastapi import FastAPI, APIRouter
 from fastapi.responses import FileResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import sys
 import logging
@@ -64,9 +63,9 @@ from atlas_core import atlas_router as atlas_core_router
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+from services import mongo
+
+db = mongo.db(os.environ['DB_NAME'])
 
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
@@ -207,7 +206,7 @@ from atlas_core.memory.memory import attach_mongo_on_startup as _atlas_attach_mo
 
 @app.on_event("startup")
 async def _wire_atlas_memory():
-    await _atlas_attach_mongo()
+    await _atlas_attach_mongo(db)
 
 
 @app.on_event("startup")
@@ -266,3 +265,87 @@ async def _wire_mission_scheduler():
         await _mission_scheduler.create_indexes()
     except Exception as exc:
         logging.getLogger(__name__).warning("Mission Scheduler persistence skipped: %s", exc)
+
+
+@app.on_event("startup")
+async def _wire_memory_index():
+    try:
+        from services import memory_bank as _memory_bank
+        counts = await _memory_bank.hydrate_index()
+        logging.getLogger(__name__).info("Memory index hydrated: %s memories · %s partitions", counts["memories"], counts["partitions"])
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Memory index hydration skipped: %s", exc)
+
+
+@app.on_event("startup")
+async def _wire_knowledge_search():
+    try:
+        from services import knowledge_ingestion as _knowledge_ingestion
+        counts = await _knowledge_ingestion.hydrate_search_index()
+        logging.getLogger(__name__).info("Knowledge search hydrated: %s records · %s terms", counts["records"], counts["terms"])
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Knowledge search hydration skipped: %s", exc)
+
+
+@app.on_event("startup")
+async def _wire_parts_index():
+    try:
+        from services import parts_db as _parts_db
+        counts = await _parts_db.hydrate_index()
+        logging.getLogger(__name__).info("Parts index hydrated: %s parts · %s tokens", counts["parts"], counts["tokens"])
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Parts index hydration skipped: %s", exc)
+
+
+@app.on_event("startup")
+async def _bootstrap_indexes():
+    try:
+        from services import index_manifest as _index_manifest
+        report = await _index_manifest.bootstrap()
+        logging.getLogger(__name__).info(
+            "Index manifest applied: %s collections · %s errors",
+            len(report["collections"]), report["errors"],
+        )
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Index manifest bootstrap skipped: %s", exc)
+
+
+@app.on_event("startup")
+async def _backfill_telemetry_buckets():
+    try:
+        from services import telemetry_store as _telemetry_store
+        _telemetry_store.schedule_backfill()
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Telemetry bucket backfill skipped: %s", exc)
+
+
+@app.on_event("shutdown")
+async def _flush_telemetry_ingest():
+    try:
+        from services import telemetry_ingest as _telemetry_ingest
+        await _telemetry_ingest.stop()
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Telemetry ingest flush on shutdown failed: %s", exc)
+
+
+@app.on_event("shutdown")
+async def _close_worldwatch_client():
+    try:
+        from services import worldwatch as _worldwatch
+        await _worldwatch.close_client()
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Worldwatch client close failed: %s", exc)
+
+
+@app.on_event("shutdown")
+async def _close_provider_clients():
+    try:
+        from services import provider_clients as _provider_clients
+        await _provider_clients.close()
+    except Exception as exc:
+        logging.getLogger(__name__).warning("Provider client close failed: %s", exc)
+
+
+@app.on_event("shutdown")
+async def _close_mongo():
+    mongo.close()
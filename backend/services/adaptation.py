@@ -34,22 +34,17 @@ from __future__ import annotations
 import logging
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from services import mongo
 
 logger = logging.getLogger("atlas.adaptation")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _learning(): return _db()["user_learning_profile"]
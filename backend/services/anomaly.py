@@ -31,27 +31,26 @@ Warm-up:
 Sigma threshold:
   default 3.0 — standard "outside 3 sigma" convention. Override per-device
   via device.state.anomaly_sigma.
+
+The live ingest path scores with services.anomaly_engine (the same
+Welford maths on NumPy arrays, batched across devices, plus optional
+EWMA / rolling-window detectors); `score_state` stays as the reference
+per-device implementation.
 """
 from __future__ import annotations
 
 import math
-import os
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from services import mongo
 
 _DEFAULT_SIGMA  = 3.0
 _DEFAULT_WARMUP = 10
 
-_client: Optional[AsyncIOMotorClient] = None
-
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(os.environ['MONGO_URL'])
-    return _client[os.environ['DB_NAME']]
+    return mongo.db()
 
 
 def _devices():
@@ -93,20 +92,19 @@ def _z_score(envelope: Dict[str, Any], value: float) -> float:
     return (value - envelope["mean"]) / sd
 
 
-async def update_and_score(
-    device_id: str, payload: Dict[str, Any],
+def score_state(
+    state: Dict[str, Any], payload: Dict[str, Any],
 ) -> Tuple[Dict[str, Any], List[str], Dict[str, float]]:
-    """Update the device's envelopes from this telemetry burst and return:
-        (updated_device_doc, drifting_keys, z_scores_for_drifting)
-
-    Only numeric values are tracked. Non-numeric keys are silently skipped.
-    Boolean values are NOT tracked (they're not anomalies in the statistical sense).
+    """Score one telemetry burst against `state` — no I/O. Updates the
+    envelopes (and anomaly block) inside `state` and returns:
+        (state, drifting_keys, z_scores_for_drifting)
+
+    Only real, finite numbers are tracked; booleans and non-numeric keys
+    are skipped. The reference implementation for the batched ingest path
+    (telemetry_ingest + anomaly_engine), which keeps device state cached
+    in-process and persists it on flush — there is deliberately no
+    per-reading read/write helper here.
     """
-    dev = await _devices().find_one({"id": device_id}, {"_id": 0})
-    if not dev:
-        return {}, [], {}
-
-    state = dict(dev.get("state") or {})
     envelopes: Dict[str, Dict[str, Any]] = dict(state.get("envelopes") or {})
 
     sigma = float(state.get("anomaly_sigma", _DEFAULT_SIGMA))
@@ -136,7 +134,16 @@ async def update_and_score(
         envelopes[key] = _welford_update(env, value)
 
     state["envelopes"] = envelopes
+    apply_anomaly(state, drifting, z_scores, sigma)
+    return state, drifting, z_scores
 
+
+def apply_anomaly(
+    state: Dict[str, Any], drifting: List[str], z_scores: Dict[str, float],
+    sigma: float, detectors: Optional[Dict[str, List[str]]] = None,
+) -> Dict[str, Any]:
+    """Set or clear `state.anomaly` from one scored reading. Shared by
+    `score_state` and the vectorised engine (services.anomaly_engine)."""
     if drifting:
         state["anomaly"] = {
             "drifting_keys": drifting,
@@ -145,16 +152,12 @@ async def update_and_score(
             "sigma_threshold": sigma,
             "last_seen": _now(),
         }
+        if detectors:
+            state["anomaly"]["detectors"] = detectors
     elif "anomaly" in state:
         # All readings are back inside the envelope — clear the flag.
         state.pop("anomaly", None)
-
-    await _devices().update_one(
-        {"id": device_id},
-        {"$set": {"state": state, "updated_at": _now()}},
-    )
-    dev["state"] = state
-    return dev, drifting, z_scores
+    return state
 
 
 async def envelope_summary(device_id: str) -> Dict[str, Any]:
@@ -162,7 +165,8 @@ async def envelope_summary(device_id: str) -> Dict[str, Any]:
     dev = await _devices().find_one({"id": device_id}, {"_id": 0, "state": 1, "name": 1})
     if not dev:
         return {}
-    state = dev.get("state") or {}
+    from services import telemetry_ingest  # local import to avoid circular load
+    state = telemetry_ingest.cached_state(device_id) or dev.get("state") or {}
     envs = state.get("envelopes") or {}
     out = {}
     for k, env in envs.items():
@@ -184,9 +188,13 @@ async def envelope_summary(device_id: str) -> Dict[str, Any]:
 async def reset_envelope(device_id: str) -> bool:
     """Owner-only — wipe the learned envelopes and any current anomaly
     flag (e.g. after a known intentional change to the device)."""
+    from services import telemetry_ingest  # local import to avoid circular load
+    await telemetry_ingest.forget(device_id)
     res = await _devices().update_one(
         {"id": device_id},
         {"$unset": {"state.envelopes": "", "state.anomaly": ""},
-         "$set": {"updated_at": _now()}},
+         "$set": {"updated_at": _now()},
+         # Tells other workers' telemetry caches their envelopes are stale.
+         "$inc": {"envelope_epoch": 1}},
     )
     return res.matched_count > 0
@@ -0,0 +1,451 @@
+"""
+Sentinel anomaly engine — Phase 8b, vectorised.
+
+`anomaly.score_state` walks payload keys in Python and rebuilds the
+device's envelope dict on every reading. This engine keeps every
+(device, key) envelope in NumPy arrays instead:
+
+    rows    — one per cached device (sigma / warm-up per row)
+    columns — one per telemetry key seen by any device
+    n, mean, m2, last_value, last_z       Welford envelope (same maths,
+                                          bit-for-bit, as score_state)
+    ew_mean, ew_var                       EWMA detector state
+    ring[d, k, :ANOMALY_WINDOW]           rolling-window detector buffer
+
+`score_batch([(device_id, payload), ...])` scores a whole telemetry
+batch in one pass: readings are split into "waves" (the j-th reading of
+each device in the batch), so each wave touches every (device, key) at
+most once and is scored + updated with plain array ops while readings of
+one device are still applied in arrival order. `score(device_id,
+payload)` handles a lone reading with scalar maths on the same arrays —
+for one reading the array set-up costs more than the arithmetic.
+
+Detectors (ANOMALY_DETECTORS, comma-separated, default "welford"):
+  welford — z against the all-time Welford mean / stddev (the original)
+  ewma    — z against an exponentially-weighted mean / variance
+            (ANOMALY_EWMA_ALPHA, default 0.1) — adapts to slow drift
+  window  — z against the last ANOMALY_WINDOW readings (default 32)
+A key is drifting when any enabled detector reaches the device's sigma.
+
+The arrays are the live state; `envelopes(device_id)` materialises the
+persisted `state.envelopes` shape, which telemetry_ingest checkpoints on
+an interval. The window ring is not persisted and re-warms after a load.
+"""
+from __future__ import annotations
+
+import math
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DETECTORS = ("welford", "ewma", "window")
+ENABLED = tuple(
+    d for d in (s.strip() for s in os.environ.get("ANOMALY_DETECTORS", "welford").split(","))
+    if d in DETECTORS
+) or ("welford",)
+EWMA_ALPHA = float(os.environ.get("ANOMALY_EWMA_ALPHA", "0.1"))
+WINDOW = max(2, int(os.environ.get("ANOMALY_WINDOW", "32")))
+
+_DEFAULT_SIGMA = 3.0
+_DEFAULT_WARMUP = 10
+
+# (drifting_keys, z_scores_for_drifting, detectors_per_drifting_key)
+Result = Tuple[List[str], Dict[str, float], Dict[str, List[str]]]
+
+_MATRICES = ("n", "mean", "m2", "last_value", "last_z", "ew_mean", "ew_var", "ring_n")
+
+
+class _Bank:
+    """Envelope arrays for every cached device."""
+
+    def __init__(self, window: int = WINDOW, detectors: Sequence[str] = ENABLED):
+        self.window = window
+        self.detectors = tuple(detectors)
+        self.rows: Dict[str, int] = {}
+        self.free: List[int] = []
+        self.cols: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self._alloc(16, 16)
+
+    # --- storage -------------------------------------------------------------
+    def _alloc(self, cap_d: int, cap_k: int) -> None:
+        self.n = np.zeros((cap_d, cap_k), dtype=np.int64)
+        self.ring_n = np.zeros((cap_d, cap_k), dtype=np.int64)
+        for name in ("mean", "m2", "last_value", "ew_mean", "ew_var"):
+            setattr(self, name, np.zeros((cap_d, cap_k), dtype=np.float64))
+        self.last_z = np.full((cap_d, cap_k), np.nan)
+        self.ring = np.zeros((cap_d, cap_k, self.window), dtype=np.float64)
+        self.sigma = np.full(cap_d, _DEFAULT_SIGMA)
+        self.warmup = np.full(cap_d, _DEFAULT_WARMUP, dtype=np.int64)
+        # Flat memoryviews over the same buffers for `score_one`: element
+        # access through them costs a fraction of NumPy scalar indexing.
+        self.flat = {
+            name: memoryview(getattr(self, name).reshape(-1))
+            for name in _MATRICES + ("ring",)
+        }
+
+    def _grow(self, cap_d: int, cap_k: int) -> None:
+        old_d, old_k = self.n.shape
+        saved = {name: getattr(self, name) for name in _MATRICES + ("ring", "sigma", "warmup")}
+        self._alloc(cap_d, cap_k)
+        for name in _MATRICES + ("ring",):
+            getattr(self, name)[:old_d, :old_k] = saved[name]
+        self.sigma[:old_d] = saved["sigma"]
+        self.warmup[:old_d] = saved["warmup"]
+
+    def _col(self, key: str) -> int:
+        col = self.cols.get(key)
+        if col is None:
+            col = len(self.keys)
+            if col >= self.n.shape[1]:
+                self._grow(self.n.shape[0], self.n.shape[1] * 2)
+            self.cols[key] = col
+            self.keys.append(key)
+        return col
+
+    def _clear_row(self, row: int) -> None:
+        for name in _MATRICES:
+            getattr(self, name)[row] = 0
+        self.last_z[row] = np.nan
+        self.ring[row] = 0.0
+
+    # --- devices -------------------------------------------------------------
+    def load(self, device_id: str, state: Dict[str, Any]) -> int:
+        row = self.rows.get(device_id)
+        if row is not None:
+            return row
+        if self.free:
+            row = self.free.pop()
+        else:
+            row = len(self.rows)
+            if row >= self.n.shape[0]:
+                self._grow(self.n.shape[0] * 2, self.n.shape[1])
+        self.rows[device_id] = row
+        self._clear_row(row)
+        self.sigma[row] = float(state.get("anomaly_sigma", _DEFAULT_SIGMA))
+        self.warmup[row] = int(state.get("anomaly_warmup", _DEFAULT_WARMUP))
+        for key, env in (state.get("envelopes") or {}).items():
+            col = self._col(key)
+            n = int(env.get("n", 0))
+            mean = float(env.get("mean", 0.0))
+            m2 = float(env.get("m2", 0.0))
+            self.n[row, col] = n
+            self.mean[row, col] = mean
+            self.m2[row, col] = m2
+            self.last_value[row, col] = float(env.get("last_value") or 0.0)
+            last_z = env.get("last_z")
+            self.last_z[row, col] = np.nan if last_z is None else float(last_z)
+            self.ew_mean[row, col] = float(env.get("ewma", mean))
+            self.ew_var[row, col] = float(env.get("ewm_var", m2 / (n - 1) if n > 1 else 0.0))
+        return row
+
+    def evict(self, device_id: str) -> None:
+        row = self.rows.pop(device_id, None)
+        if row is not None:
+            self._clear_row(row)
+            self.free.append(row)
+
+    def envelopes(self, device_id: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        row = self.rows.get(device_id)
+        if row is None:
+            return None
+        n = self.n[row].tolist()
+        cols = [c for c in range(len(self.keys)) if n[c] > 0]
+        mean, m2 = self.mean[row].tolist(), self.m2[row].tolist()
+        last_value, last_z = self.last_value[row].tolist(), self.last_z[row].tolist()
+        ew_mean, ew_var = self.ew_mean[row].tolist(), self.ew_var[row].tolist()
+        out: Dict[str, Dict[str, Any]] = {}
+        for c in cols:
+            env: Dict[str, Any] = {
+                "n": n[c], "mean": mean[c], "m2": m2[c], "last_value": last_value[c],
+                "ewma": ew_mean[c], "ewm_var": ew_var[c],
+            }
+            if not math.isnan(last_z[c]):
+                env["last_z"] = last_z[c]
+            out[self.keys[c]] = env
+        return out
+
+    # --- scoring -------------------------------------------------------------
+    def score_batch(self, readings: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Result]:
+        results: List[Result] = [([], {}, {}) for _ in readings]
+        wave_l: List[int] = []
+        item_l: List[int] = []
+        row_l: List[int] = []
+        col_l: List[int] = []
+        val_l: List[float] = []
+        seen: Dict[str, int] = {}
+        cols_get = self.cols.get
+        for i, (device_id, payload) in enumerate(readings):
+            row = self.rows.get(device_id)
+            if row is None:
+                continue
+            wave = seen.get(device_id, 0)
+            seen[device_id] = wave + 1
+            for key, raw in payload.items():
+                # Same filter as anomaly.score_state — real, finite numbers
+                # only. Exact-type check first: JSON payloads are plain
+                # int/float, and bool is excluded by it.
+                kind = type(raw)
+                if kind is not float and kind is not int:
+                    if isinstance(raw, bool) or not isinstance(raw, (int, float)):
+                        continue
+                value = float(raw)
+                if value - value != 0.0:        # NaN or ±inf
+                    continue
+                col = cols_get(key)
+                if col is None:
+                    col = self._col(key)
+                wave_l.append(wave)
+                item_l.append(i)
+                row_l.append(row)
+                col_l.append(col)
+                val_l.append(value)
+        if not val_l:
+            return results
+
+        waves = np.asarray(wave_l, dtype=np.int64)
+        rows = np.asarray(row_l, dtype=np.int64)
+        cols = np.asarray(col_l, dtype=np.int64)
+        values = np.asarray(val_l, dtype=np.float64)
+        n_waves = int(waves.max()) + 1
+        for wave in range(n_waves):
+            idx = np.nonzero(waves == wave)[0] if n_waves > 1 else np.arange(len(values))
+            fired = self._score_wave(rows[idx], cols[idx], values[idx])
+            for name, hits, z in fired:
+                for j, zj in zip(idx[hits].tolist(), z[hits].tolist()):
+                    drifting, z_scores, detectors = results[item_l[j]]
+                    key = self.keys[col_l[j]]
+                    if key not in detectors:
+                        drifting.append(key)
+                        z_scores[key] = round(zj, 3)
+                        detectors[key] = []
+                    detectors[key].append(name)
+        # Keep payload order for drifting keys, like score_state.
+        for i, (drifting, _, _) in enumerate(results):
+            if len(drifting) > 1:
+                order = {k: pos for pos, k in enumerate(readings[i][1])}
+                drifting.sort(key=order.__getitem__)
+        return results
+
+    def score_one(self, device_id: str, payload: Dict[str, Any]) -> Result:
+        """Score + learn a single reading with scalar maths.
+
+        For one reading the per-call cost of building and indexing arrays
+        in `score_batch` outweighs the work, so this walks the keys like
+        `anomaly.score_state` does and reads / writes the row in place
+        through the flat memoryviews. Same operations in the same order as
+        `_score_wave`, so the two paths agree exactly."""
+        result: Result = ([], {}, {})
+        row = self.rows.get(device_id)
+        if row is None:
+            return result
+        items: List[Tuple[str, int, float]] = []
+        cols_get = self.cols.get
+        for key, raw in payload.items():
+            kind = type(raw)
+            if kind is not float and kind is not int:
+                if isinstance(raw, bool) or not isinstance(raw, (int, float)):
+                    continue
+            value = float(raw)
+            if value - value != 0.0:            # NaN or ±inf
+                continue
+            col = cols_get(key)
+            if col is None:
+                col = self._col(key)
+            items.append((key, col, value))
+        if not items:
+            return result
+
+        # Views are taken after `_col`, which may reallocate the arrays.
+        flat = self.flat
+        n_f, mean_f, m2_f = flat["n"], flat["mean"], flat["m2"]
+        last_value_f, last_z_f = flat["last_value"], flat["last_z"]
+        ew_mean_f, ew_var_f = flat["ew_mean"], flat["ew_var"]
+        ring_f, ring_n_f = flat["ring"], flat["ring_n"]
+        base = row * self.n.shape[1]
+        window = self.window
+        sigma = self.sigma.item(row)
+        warmup = self.warmup.item(row)
+        detectors = self.detectors
+        # The ring only feeds the window detector and is never persisted.
+        track_window = "window" in detectors
+        drifting, z_scores, fired_by = result
+        for key, col, v in items:
+            i = base + col
+            n = n_f[i]
+            mean = mean_f[i]
+            m2 = m2_f[i]
+            ew_mean = ew_mean_f[i]
+            ew_var = ew_var_f[i]
+            ring_n = ring_n_f[i]
+            warm = n >= warmup
+            hits: List[Tuple[str, float]] = []
+            if warm:
+                sd = math.sqrt(m2 / (n - 1) if n >= 2 else 0.0)
+                z = (v - mean) / sd if sd > 0 else 0.0
+                last_z_f[i] = z
+                if "welford" in detectors and abs(z) >= sigma:
+                    hits.append(("welford", z))
+                if "ewma" in detectors:
+                    ew_sd = math.sqrt(ew_var)
+                    z_e = (v - ew_mean) / ew_sd if ew_sd > 0 else 0.0
+                    if abs(z_e) >= sigma:
+                        hits.append(("ewma", z_e))
+                if track_window:
+                    cnt = min(ring_n, window)
+                    if cnt >= 2:
+                        # Full-length masked sums, as in _score_wave.
+                        buf = self.ring[row, col]
+                        mask = np.arange(window) < cnt
+                        w_mean = float((buf * mask).sum() / cnt)
+                        w_sd = math.sqrt(float((((buf - w_mean) * mask) ** 2).sum() / (cnt - 1)))
+                        if w_sd > 0:
+                            z_w = (v - w_mean) / w_sd
+                            if abs(z_w) >= sigma:
+                                hits.append(("window", z_w))
+            if hits:
+                drifting.append(key)
+                z_scores[key] = round(hits[0][1], 3)
+                fired_by[key] = [name for name, _ in hits]
+
+            n1 = n + 1
+            delta = v - mean
+            mean1 = mean + delta / n1
+            n_f[i] = n1
+            mean_f[i] = mean1
+            m2_f[i] = m2 + delta * (v - mean1)
+            last_value_f[i] = v
+
+            if n == 0:
+                ew_mean_f[i] = v
+                ew_var_f[i] = 0.0
+            else:
+                diff = v - ew_mean
+                incr = EWMA_ALPHA * diff
+                ew_mean_f[i] = ew_mean + incr
+                ew_var_f[i] = (1.0 - EWMA_ALPHA) * (ew_var + diff * incr)
+
+            if track_window:
+                ring_f[i * window + ring_n % window] = v
+            ring_n_f[i] = ring_n + 1
+        return result
+
+    def _score_wave(
+        self, d: np.ndarray, k: np.ndarray, v: np.ndarray,
+    ) -> List[Tuple[str, np.ndarray, np.ndarray]]:
+        """Score + update one wave (each (d, k) appears at most once).
+        Returns [(detector, hit_mask, z)] for enabled detectors."""
+        n = self.n[d, k]
+        mean = self.mean[d, k]
+        m2 = self.m2[d, k]
+        sigma = self.sigma[d]
+        warm = n >= self.warmup[d]
+        fired: List[Tuple[str, np.ndarray, np.ndarray]] = []
+
+        # Score BEFORE update — compare against the previously learned
+        # distribution. Same operations as anomaly._z_score; always
+        # computed because last_z is part of the persisted envelope.
+        var = np.divide(m2, n - 1, out=np.zeros_like(m2), where=n >= 2)
+        sd = np.sqrt(var)
+        z = np.divide(v - mean, sd, out=np.zeros_like(v), where=warm & (sd > 0))
+        self.last_z[d, k] = np.where(warm, z, self.last_z[d, k])
+        if "welford" in self.detectors:
+            fired.append(("welford", warm & (np.abs(z) >= sigma), z))
+
+        ew_mean = self.ew_mean[d, k]
+        ew_var = self.ew_var[d, k]
+        if "ewma" in self.detectors:
+            ew_sd = np.sqrt(ew_var)
+            z_e = np.divide(v - ew_mean, ew_sd, out=np.zeros_like(v), where=warm & (ew_sd > 0))
+            fired.append(("ewma", warm & (np.abs(z_e) >= sigma), z_e))
+
+        ring_n = self.ring_n[d, k]
+        if "window" in self.detectors:
+            buf = self.ring[d, k]                                   # (E, W)
+            cnt = np.minimum(ring_n, self.window)
+            mask = np.arange(self.window)[None, :] < cnt[:, None]
+            denom = np.maximum(cnt, 1)
+            w_mean = (buf * mask).sum(axis=1) / denom
+            w_var = (((buf - w_mean[:, None]) * mask) ** 2).sum(axis=1) / np.maximum(cnt - 1, 1)
+            w_sd = np.sqrt(w_var)
+            ok = warm & (cnt >= 2) & (w_sd > 0)
+            z_w = np.divide(v - w_mean, w_sd, out=np.zeros_like(v), where=ok)
+            fired.append(("window", ok & (np.abs(z_w) >= sigma), z_w))
+
+        # Welford update — identical arithmetic to anomaly._welford_update.
+        n1 = n + 1
+        delta = v - mean
+        mean1 = mean + delta / n1
+        self.n[d, k] = n1
+        self.mean[d, k] = mean1
+        self.m2[d, k] = m2 + delta * (v - mean1)
+        self.last_value[d, k] = v
+
+        diff = v - ew_mean
+        incr = EWMA_ALPHA * diff
+        first = n == 0
+        self.ew_mean[d, k] = np.where(first, v, ew_mean + incr)
+        self.ew_var[d, k] = np.where(first, 0.0, (1.0 - EWMA_ALPHA) * (ew_var + diff * incr))
+
+        self.ring[d, k, ring_n % self.window] = v
+        self.ring_n[d, k] = ring_n + 1
+        return fired
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "devices": len(self.rows),
+            "keys": len(self.keys),
+            "capacity": list(self.n.shape),
+            "window": self.window,
+            "detectors": list(self.detectors),
+            "bytes": int(sum(getattr(self, a).nbytes for a in _MATRICES + ("ring",))),
+        }
+
+
+_BANK = _Bank()
+
+
+# --- Module API ---------------------------------------------------------------
+def load(device_id: str, state: Dict[str, Any]) -> None:
+    """Seed a device's envelopes from its persisted `state` (no-op when
+    already cached)."""
+    _BANK.load(device_id, state)
+
+
+def is_loaded(device_id: str) -> bool:
+    return device_id in _BANK.rows
+
+
+def evict(device_id: str) -> None:
+    _BANK.evict(device_id)
+
+
+def sigma(device_id: str) -> float:
+    row = _BANK.rows.get(device_id)
+    return float(_BANK.sigma[row]) if row is not None else _DEFAULT_SIGMA
+
+
+def score(device_id: str, payload: Dict[str, Any]) -> Result:
+    """Score + learn one reading on the scalar path."""
+    return _BANK.score_one(device_id, payload)
+
+
+def score_batch(readings: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Result]:
+    """Score + learn a batch of (device_id, payload) readings in arrival
+    order. Readings for devices that aren't loaded yield empty results."""
+    return _BANK.score_batch(readings)
+
+
+def envelopes(device_id: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Persistable `state.envelopes` for a cached device, else None."""
+    return _BANK.envelopes(device_id)
+
+
+def stats() -> Dict[str, Any]:
+    return _BANK.stats()
+
+
+def reset_in_memory_state(*, detectors: Optional[Sequence[str]] = None, window: Optional[int] = None) -> None:
+    global _BANK
+    _BANK = _Bank(window=window or WINDOW, detectors=detectors or ENABLED)
@@ -21,22 +21,16 @@ from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 from uuid import uuid4
 
-from motor.motor_asyncio import AsyncIOMotorClient
-
+from services import mongo
 from services.llm_provider import send as llm_send
 
 logger = logging.getLogger("atlas.blueprint_forge")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _utc(): return datetime.now(timezone.utc).isoformat()
@@ -181,10 +181,10 @@ async def match_against_library(
     parts: List[ExtractedPart],
 ) -> List[ExtractedPart]:
     """For every extracted part, try to attach a library_part_id + confidence.
-    Returns NEW list (does not mutate input)."""
+    Returns NEW list (does not mutate input). One batched index lookup."""
+    hits = await parts_db.match_many(p.name for p in parts)
     enriched: List[ExtractedPart] = []
-    for p in parts:
-        hit = await parts_db.match_part(p.name)
+    for p, hit in zip(parts, hits):
         if hit:
             enriched.append(p.model_copy(update={
                 "library_part_id": hit["id"],
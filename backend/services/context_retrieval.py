@@ -0,0 +1,326 @@
+"""
+Hybrid context retrieval for persona chat.
+
+One call returns a persona's grounded context for a turn, replacing the
+separate Memory Bank / Knowledge Bank fetches that `persona_chat` used to
+concatenate:
+
+  * candidates come from the Memory Bank vector index (persona-scoped
+    cosine + freshness) and the Knowledge Bank BM25 index, each
+    over-fetched ×CANDIDATE_FACTOR so fusion has something to choose from
+  * the candidates are fused with reciprocal-rank fusion (RRF) over three
+    rankings: memories by vector score, records by BM25, and every
+    candidate by a local BM25 over its own text, so memories and records
+    compete on one lexical scale
+  * the fused list is rendered into the prompt's context block until
+    PERSONA_CONTEXT_TOKENS (≈4 chars per token) is spent; a line that
+    doesn't fit is dropped whole instead of truncating the prompt
+  * results are cached per (query hash, persona, top-k) for
+    PERSONA_CONTEXT_CACHE_S, long enough to cover one council turn.
+    `retrieve_many` serves the council's three voices with one Memory Bank
+    read and one Knowledge Bank read in total.
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import services.knowledge_ingestion as kbase
+import services.memory_bank as mb
+from services.knowledge_search import tokenize
+
+logger = logging.getLogger("atlas.context_retrieval")
+
+RRF_K = 60
+CANDIDATE_FACTOR = 2
+MEMORY_MIN_SCORE = 0.10
+TOKEN_BUDGET = int(os.environ.get("PERSONA_CONTEXT_TOKENS", "1200"))
+CACHE_TTL_S = float(os.environ.get("PERSONA_CONTEXT_CACHE_S", "30"))
+CACHE_MAX_ITEMS = 256
+
+# Local BM25 over the candidate texts (a few dozen short documents).
+_K1 = 1.2
+_B = 0.75
+
+
+@dataclass
+class RetrievedContext:
+    persona: str
+    memories: List[Dict[str, Any]]
+    knowledge: List[Dict[str, Any]]
+    block: str
+    tokens: int
+    dropped: int = 0
+    fused: List[Tuple[str, float]] = field(default_factory=list)
+
+
+CacheKey = Tuple[str, str, int, int, int]
+_CACHE: "OrderedDict[CacheKey, Tuple[float, RetrievedContext]]" = OrderedDict()
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "retrievals": 0}
+
+
+def query_hash(query: str) -> str:
+    """Whitespace/case-insensitive hash of a chat message."""
+    norm = " ".join((query or "").lower().split())
+    return hashlib.sha256(norm.encode("utf-8", "replace")).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, (len(text) + 3) // 4)
+
+
+# ---------------------------------------------------------------------------
+# Rendering — one prompt line per candidate
+# ---------------------------------------------------------------------------
+def _memory_line(row: Dict[str, Any]) -> str:
+    snip = (row.get("content") or "")[:240].strip()
+    tags = ", ".join((row.get("tags") or [])[:5])
+    score = row.get("score")
+    score_s = f" · sim={score:.2f}" if isinstance(score, (int, float)) else ""
+    return f"  • [{tags}]{score_s} {snip}"
+
+
+def _knowledge_line(row: Dict[str, Any]) -> str:
+    title = (row.get("title") or "untitled")[:120]
+    summary = (row.get("summary") or "")[:200]
+    url = row.get("source_url") or ""
+    return f"  • {title} — {summary}  [{url}]"
+
+
+def _render(memory_lines: List[str], knowledge_lines: List[str]) -> str:
+    mem = "\n".join(memory_lines) or \
+        "  (none yet — this is the first relevant insight on this topic.)"
+    kno = "\n".join(knowledge_lines) or "  (no matching ingested sources yet.)"
+    return (
+        f"YOUR DOMAIN MEMORIES (most relevant first):\n{mem}\n\n"
+        f"INGESTED KNOWLEDGE (most relevant first):\n{kno}"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Fusion
+# ---------------------------------------------------------------------------
+def _candidate_text(kind: str, row: Dict[str, Any]) -> str:
+    if kind == "m":
+        return row.get("content") or ""
+    return " ".join([
+        row.get("title") or "", row.get("summary") or "",
+        " ".join(row.get("key_points") or []),
+    ])
+
+
+def _lexical_scores(query: str, texts: List[str]) -> List[float]:
+    """BM25 of `query` against each text, with IDF over just these texts."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not texts:
+        return [0.0] * len(texts)
+    docs = [tokenize(t) for t in texts]
+    n = len(docs)
+    avgdl = max(sum(len(d) for d in docs) / n, 1e-9)
+    tfs = []
+    df: Dict[str, int] = {}
+    for toks in docs:
+        tf: Dict[str, int] = {}
+        for tok in toks:
+            tf[tok] = tf.get(tok, 0) + 1
+        tfs.append(tf)
+        for term in terms:
+            if term in tf:
+                df[term] = df.get(term, 0) + 1
+    scores = []
+    for toks, tf in zip(docs, tfs):
+        score = 0.0
+        for term in terms:
+            f = tf.get(term, 0)
+            if not f:
+                continue
+            idf = math.log(1.0 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * f * (_K1 + 1.0) / (f + _K1 * (1.0 - _B + _B * len(toks) / avgdl))
+        scores.append(score)
+    return scores
+
+
+def _rrf(rankings: List[List[str]]) -> Dict[str, float]:
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (RRF_K + rank)
+    return fused
+
+
+def fuse(
+    query: str,
+    persona: str,
+    memories: List[Dict[str, Any]],
+    knowledge: List[Dict[str, Any]],
+    *,
+    memory_top_k: int,
+    knowledge_top_k: int,
+    token_budget: int = TOKEN_BUDGET,
+) -> RetrievedContext:
+    """RRF-fuse the candidates, then fill the context block in fused order
+    until `token_budget` or each section's top-k is reached."""
+    rows: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for row in memories:
+        rows.setdefault(f"m:{row.get('id')}", ("m", row))
+    for row in knowledge:
+        rows.setdefault(f"k:{row.get('id')}", ("k", row))
+    keys = list(rows)
+    lexical = _lexical_scores(query, [_candidate_text(*rows[k]) for k in keys])
+    by_lexical = [k for k, s in sorted(zip(keys, lexical), key=lambda p: -p[1]) if s > 0]
+    fused = _rrf([
+        [k for k in keys if k.startswith("m:")],      # vector order
+        [k for k in keys if k.startswith("k:")],      # BM25 order
+        by_lexical,
+    ])
+    order = sorted(keys, key=lambda k: -fused[k])
+
+    picked: Dict[str, List[Dict[str, Any]]] = {"m": [], "k": []}
+    lines: Dict[str, List[str]] = {"m": [], "k": []}
+    caps = {"m": memory_top_k, "k": knowledge_top_k}
+    spent = dropped = 0
+    for key in order:
+        kind, row = rows[key]
+        if len(picked[kind]) >= caps[kind]:
+            continue
+        line = _memory_line(row) if kind == "m" else _knowledge_line(row)
+        cost = estimate_tokens(line)
+        if spent + cost > token_budget:
+            dropped += 1
+            continue
+        spent += cost
+        picked[kind].append(row)
+        lines[kind].append(line)
+    return RetrievedContext(
+        persona=persona,
+        memories=picked["m"],
+        knowledge=picked["k"],
+        block=_render(lines["m"], lines["k"]),
+        tokens=spent,
+        dropped=dropped,
+        fused=[(k, round(fused[k], 5)) for k in order],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Retrieval + per-turn cache
+# ---------------------------------------------------------------------------
+def _cache_get(key: CacheKey) -> Optional[RetrievedContext]:
+    entry = _CACHE.get(key)
+    if entry is None or entry[0] < time.monotonic():
+        if entry is not None:
+            del _CACHE[key]
+        return None
+    _CACHE.move_to_end(key)
+    return entry[1]
+
+
+def _cache_put(key: CacheKey, ctx: RetrievedContext) -> None:
+    if CACHE_TTL_S <= 0:
+        return
+    _CACHE[key] = (time.monotonic() + CACHE_TTL_S, ctx)
+    _CACHE.move_to_end(key)
+    while len(_CACHE) > CACHE_MAX_ITEMS:
+        _CACHE.popitem(last=False)
+
+
+async def _memory_candidates(query: str, personas: List[str], top_k: int) -> Dict[str, List[Dict[str, Any]]]:
+    if top_k <= 0:
+        return {p: [] for p in personas}
+    try:
+        return await mb.search_memory_many(
+            query, personas, top_k=top_k * CANDIDATE_FACTOR, min_score=MEMORY_MIN_SCORE,
+        )
+    except Exception as exc:    # noqa: BLE001
+        logger.warning("memory search failed for personas=%s: %s", personas, exc)
+        return {p: [] for p in personas}
+
+
+async def _knowledge_candidates(query: str, personas: List[str], top_k: int) -> Dict[str, List[Dict[str, Any]]]:
+    if top_k <= 0:
+        return {p: [] for p in personas}
+    try:
+        return await kbase.search_many(query, personas, limit=top_k * CANDIDATE_FACTOR)
+    except Exception as exc:    # noqa: BLE001
+        logger.warning("knowledge search failed for personas=%s: %s", personas, exc)
+        return {p: [] for p in personas}
+
+
+async def retrieve_many(
+    query: str,
+    personas: List[str],
+    *,
+    memory_top_k: int = 3,
+    knowledge_top_k: int = 3,
+    token_budget: Optional[int] = None,
+) -> Dict[str, RetrievedContext]:
+    """Grounded context for each persona. Cached personas are served from
+    the cache; the rest share one Memory Bank and one Knowledge Bank read."""
+    budget = TOKEN_BUDGET if token_budget is None else int(token_budget)
+    qhash = query_hash(query)
+    out: Dict[str, RetrievedContext] = {}
+    missing: List[str] = []
+    for persona in dict.fromkeys(personas):
+        cached = _cache_get((qhash, persona, memory_top_k, knowledge_top_k, budget))
+        if cached is not None:
+            _STATS["hits"] += 1
+            out[persona] = cached
+        else:
+            _STATS["misses"] += 1
+            missing.append(persona)
+    if not missing:
+        return out
+    _STATS["retrievals"] += 1
+    if (query or "").strip():
+        memories, knowledge = await asyncio.gather(
+            _memory_candidates(query, missing, memory_top_k),
+            _knowledge_candidates(query, missing, knowledge_top_k),
+        )
+    else:
+        memories = knowledge = {p: [] for p in missing}
+    for persona in missing:
+        ctx = fuse(
+            query, persona, memories.get(persona, []), knowledge.get(persona, []),
+            memory_top_k=memory_top_k, knowledge_top_k=knowledge_top_k,
+            token_budget=budget,
+        )
+        _cache_put((qhash, persona, memory_top_k, knowledge_top_k, budget), ctx)
+        out[persona] = ctx
+    return out
+
+
+async def retrieve(
+    query: str,
+    persona: str,
+    *,
+    memory_top_k: int = 3,
+    knowledge_top_k: int = 3,
+    token_budget: Optional[int] = None,
+) -> RetrievedContext:
+    contexts = await retrieve_many(
+        query, [persona], memory_top_k=memory_top_k,
+        knowledge_top_k=knowledge_top_k, token_budget=token_budget,
+    )
+    return contexts[persona]
+
+
+def stats() -> Dict[str, Any]:
+    lookups = _STATS["hits"] + _STATS["misses"]
+    return {
+        **_STATS,
+        "cached": len(_CACHE),
+        "hit_rate": round(_STATS["hits"] / lookups, 4) if lookups else 0.0,
+        "ttl_s": CACHE_TTL_S,
+        "token_budget": TOKEN_BUDGET,
+    }
+
+
+def reset_in_memory_state() -> None:
+    _CACHE.clear()
+    for key in _STATS:
+        _STATS[key] = 0
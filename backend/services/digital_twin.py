@@ -14,11 +14,15 @@ This service is hardware-agnostic by design. Real-world I/O, robot control,
 and physics integration land in Phase 7 (Robot Control Layer); Weaver
 (Phase 6) consumes the same registry through `integrations`.
 """
+import asyncio
+import hashlib
+import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from services import mongo
 from services import memory_bank as mb
 from models.twin_models import (
     CouncilDeliberation,
@@ -34,16 +38,13 @@ from services.twin_simulator import simulate as run_simulation
 
 logger = logging.getLogger("atlas.digital_twin")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
+# Simulation results memoised per (twin state hash, kind).
+SIM_MEMO_MAX = int(os.environ.get("TWIN_SIM_MEMO_MAX", "512"))
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _twins():
@@ -131,23 +132,95 @@ async def delete_twin(twin_id: str) -> bool:
 async def run_and_persist_simulation(
     twin_id: str, kind: SimulationKind,
 ) -> Optional[SimulationResult]:
-    twin_doc = await _twins().find_one({"id": twin_id}, {"_id": 0})
-    if not twin_doc:
-        return None
-    twin = DigitalTwin(**twin_doc)
-    result = run_simulation(twin, kind)
-    await _sims().insert_one(result.model_dump())
-    await _twins().update_one(
-        {"id": twin_id},
-        {"$set": {
-            "last_simulation_id": result.id,
-            "state.status": TwinStatus.SIMULATED.value,
-            "updated_at": _now(),
-        }},
+    results = await run_and_persist_simulations(twin_id, [kind])
+    return results[kind] if results else None
+
+
+# --- Batch runner + memo ----------------------------------------------------
+# The engines are deterministic functions of the twin's spec, so results are
+# memoised on a hash of the state with component ids replaced by their
+# position — a re-spawned twin of an unchanged blueprint hits the memo even
+# though it gets fresh ids. Cached results are stored id-free and re-bound to
+# the caller's twin on the way out.
+_SIM_MEMO: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_MEMO_STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+_PER_RUN_FIELDS = ("id", "twin_id", "revision", "created_at")
+
+
+def state_hash(twin: DigitalTwin) -> str:
+    """Hash of everything the engines read: category plus the twin state,
+    minus bookkeeping (status, revision, timestamps) and component ids."""
+    state = twin.state.model_dump(
+        mode="json", exclude={"status", "revision", "updated_at"},
     )
+    position = {c["id"]: i for i, c in enumerate(state["components"])}
+    for c in state["components"]:
+        c["id"] = position[c["id"]]
+    for d in state["dependencies"]:
+        d["from_component"] = position.get(d["from_component"], d["from_component"])
+        d["to_component"] = position.get(d["to_component"], d["to_component"])
+    payload = json.dumps({"category": twin.category.value, "state": state},
+                         sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _rebind_component_ids(node: Any, mapping: Dict[Any, Any]) -> None:
+    """Rewrite every `component_id` in a result doc through `mapping` —
+    timeline rows as well as the hotspot lists the thermal engines put in
+    `metrics`."""
+    if isinstance(node, dict):
+        cid = node.get("component_id")
+        if isinstance(cid, (str, int)) and cid in mapping:
+            node["component_id"] = mapping[cid]
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                _rebind_component_ids(value, mapping)
+    elif isinstance(node, list):
+        for value in node:
+            if isinstance(value, (dict, list)):
+                _rebind_component_ids(value, mapping)
+
+
+def _memo_put(key: Tuple[str, str], twin: DigitalTwin, result: SimulationResult) -> None:
+    doc = result.model_dump(mode="json", exclude=set(_PER_RUN_FIELDS))
+    _rebind_component_ids(doc, {c.id: i for i, c in enumerate(twin.state.components)})
+    _SIM_MEMO[key] = doc
+    _SIM_MEMO.move_to_end(key)
+    while len(_SIM_MEMO) > SIM_MEMO_MAX:
+        _SIM_MEMO.popitem(last=False)
+
+
+def _memo_get(key: Tuple[str, str], twin: DigitalTwin) -> Optional[SimulationResult]:
+    doc = _SIM_MEMO.get(key)
+    if doc is None:
+        return None
+    _SIM_MEMO.move_to_end(key)
+    doc = json.loads(json.dumps(doc))       # cached template stays pristine
+    _rebind_component_ids(doc, dict(enumerate(c.id for c in twin.state.components)))
+    return SimulationResult(**doc, twin_id=twin.id, revision=twin.state.revision)
+
+
+def sim_memo_stats() -> Dict[str, Any]:
+    lookups = _MEMO_STATS["hits"] + _MEMO_STATS["misses"]
+    return {
+        **_MEMO_STATS,
+        "size": len(_SIM_MEMO),
+        "max_items": SIM_MEMO_MAX,
+        "hit_rate": round(_MEMO_STATS["hits"] / lookups, 4) if lookups else 0.0,
+    }
+
+
+def reset_sim_memo() -> None:
+    _SIM_MEMO.clear()
+    for k in _MEMO_STATS:
+        _MEMO_STATS[k] = 0
+
+
+async def _remember_simulation(twin: DigitalTwin, result: SimulationResult) -> None:
     # Memory wiring:
     #   * a permanent project memory describing the sim
     #   * a research-category "success-memory" or "failure-memory" depending on result
+    kind = result.kind
     body = (
         f"TWIN SIM · {twin.name} · {kind.value}\n"
         f"score={result.score:.2f} ok={result.ok}\n"
@@ -157,19 +230,79 @@ async def run_and_persist_simulation(
             if result.failures else ""
         )
     )
-    await mb.auto_store(
-        body, persona=twin.owner_agent, category="project",
-        source_type="twin_sim", source_id=result.id,
-        tags=[twin.category.value, kind.value, "twin"],
-    )
     success_tag = "success-memory" if result.ok else "failure-memory"
-    await mb.auto_store(
-        f"{success_tag} · {twin.name} · {kind.value}\n" + body,
-        persona=twin.owner_agent, category="research",
-        source_type="twin_sim", source_id=result.id,
-        tags=[twin.category.value, kind.value, success_tag, "twin"],
+    await asyncio.gather(
+        mb.auto_store(
+            body, persona=twin.owner_agent, category="project",
+            source_type="twin_sim", source_id=result.id,
+            tags=[twin.category.value, kind.value, "twin"],
+        ),
+        mb.auto_store(
+            f"{success_tag} · {twin.name} · {kind.value}\n" + body,
+            persona=twin.owner_agent, category="research",
+            source_type="twin_sim", source_id=result.id,
+            tags=[twin.category.value, kind.value, success_tag, "twin"],
+        ),
+    )
+
+
+async def run_and_persist_simulations(
+    twin_id: str,
+    kinds: Iterable[SimulationKind],
+    *,
+    twin_doc: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[SimulationKind, SimulationResult]]:
+    """Run several engines against one twin in a single pass.
+
+    The twin is read once (or taken from `twin_doc`), memo misses run
+    concurrently off the event loop, every result lands in one
+    `insert_many`, and the twin is touched once. Only freshly computed
+    results are written to the memory bank — a memo hit is a repeat of a
+    sim that has already been remembered. Returns {kind: result} in the
+    order asked, or None when the twin doesn't exist."""
+    if twin_doc is None:
+        twin_doc = await _twins().find_one({"id": twin_id}, {"_id": 0})
+    if not twin_doc:
+        return None
+    twin = DigitalTwin(**twin_doc)
+    kinds = list(dict.fromkeys(kinds))
+    digest = state_hash(twin)
+
+    results: Dict[SimulationKind, SimulationResult] = {}
+    pending: List[SimulationKind] = []
+    for kind in kinds:
+        hit = _memo_get((digest, kind.value), twin)
+        if hit is None:
+            _MEMO_STATS["misses"] += 1
+            pending.append(kind)
+        else:
+            _MEMO_STATS["hits"] += 1
+            results[kind] = hit
+    fresh = await asyncio.gather(
+        *(asyncio.to_thread(run_simulation, twin, kind) for kind in pending)
+    )
+    for kind, result in zip(pending, fresh):
+        _memo_put((digest, kind.value), twin, result)
+        results[kind] = result
+    ordered = {kind: results[kind] for kind in kinds}
+    if not ordered:
+        return ordered
+
+    await _sims().insert_many(
+        [{**r.model_dump(), "state_hash": digest} for r in ordered.values()],
+        ordered=False,
+    )
+    await _twins().update_one(
+        {"id": twin_id},
+        {"$set": {
+            "last_simulation_id": ordered[kinds[-1]].id,
+            "state.status": TwinStatus.SIMULATED.value,
+            "updated_at": _now(),
+        }},
     )
-    return result
+    # Fresh results only; the embed micro-batcher coalesces the concurrent stores.
+    await asyncio.gather(*(_remember_simulation(twin, r) for r in fresh))
+    return ordered
 
 
 async def list_simulations(twin_id: str, limit: int = 20) -> List[Dict[str, Any]]:
@@ -239,8 +372,10 @@ async def deliberate(
     # Run all three personas concurrently — cuts deliberation latency ~3×.
     async def _one(persona: str, cfg: Dict[str, str]) -> DeliberationVoice:
         try:
+            # Re-deliberating an unchanged twin + simulation is a cache hit.
             res = await llm_send(persona, cfg["system"], context,
-                                 session_id=f"twin-delib-{twin_id}-{persona}")
+                                 session_id=f"twin-delib-{twin_id}-{persona}",
+                                 cache="digital_twin.deliberate", cache_ttl_s=24 * 3600)
             text = (res.get("text") or "").strip()
         except Exception as exc:    # noqa: BLE001
             logger.warning("twin deliberation %s failed: %s", persona, exc)
@@ -0,0 +1,136 @@
+"""
+Embedding pipeline helpers for the Memory Bank.
+
+Two small building blocks used by `memory_bank.embed`:
+
+  * VectorLRU     — content-hash LRU of vectors keyed by
+                    (provider, model, sha256(text)), so re-embedding the
+                    same telemetry line / chat turn / lesson is free
+  * MicroBatcher  — coalesces concurrent single-text requests for the
+                    same (provider, model) into one batched upstream call
+                    (ST `encode(list)`, OpenAI multi-input, Ollama
+                    `/api/embed`). A batch is flushed when it reaches
+                    `max_batch` texts or after `window_s`, whichever
+                    comes first; every caller gets its own vector or the
+                    batch's exception back.
+
+Both are process-local and dependency-free; the provider calls
+themselves stay in `memory_bank`.
+"""
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("atlas.embed_pipeline")
+
+CacheKey = Tuple[str, str, str]
+BatchKey = Tuple[str, str]
+FlushFn = Callable[[str, str, List[str]], Awaitable[List[List[float]]]]
+
+
+def content_key(provider: str, model: str, text: str) -> CacheKey:
+    digest = hashlib.sha256(text.encode("utf-8", "replace")).hexdigest()
+    return (provider, model, digest)
+
+
+class VectorLRU:
+    """Bounded LRU of embedding vectors. Returns copies so callers can
+    never mutate a cached vector in place."""
+
+    def __init__(self, max_items: int = 4096):
+        self.max_items = max(0, int(max_items))
+        self._items: "OrderedDict[CacheKey, List[float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey) -> Optional[List[float]]:
+        vec = self._items.get(key)
+        if vec is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return list(vec)
+
+    def put(self, key: CacheKey, vec: List[float]) -> None:
+        if self.max_items == 0:
+            return
+        self._items[key] = list(vec)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class MicroBatcher:
+    """Coalesce concurrent `submit()` calls per (provider, model)."""
+
+    def __init__(self, flush: FlushFn, *, max_batch: int = 32, window_s: float = 0.005):
+        self._flush = flush
+        self.max_batch = max(1, int(max_batch))
+        self.window_s = max(0.0, float(window_s))
+        self._pending: Dict[BatchKey, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[BatchKey, asyncio.TimerHandle] = {}
+        self.batches = 0
+        self.texts = 0
+
+    async def submit(self, provider: str, model: str, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        key = (provider, model)
+        fut: asyncio.Future = loop.create_future()
+        queue = self._pending.setdefault(key, [])
+        queue.append((text, fut))
+        if len(queue) >= self.max_batch:
+            self._dispatch(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window_s, self._dispatch, key)
+        return await fut
+
+    def _dispatch(self, key: BatchKey) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            asyncio.get_running_loop().create_task(self._run(key, batch))
+
+    async def _run(self, key: BatchKey, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        provider, model = key
+        self.batches += 1
+        self.texts += len(batch)
+        try:
+            vecs = await self._flush(provider, model, [text for text, _ in batch])
+            if len(vecs) != len(batch):
+                raise RuntimeError(f"{provider} returned {len(vecs)} vectors for {len(batch)} texts")
+        except Exception as exc:    # noqa: BLE001 — surfaced to every waiter
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for (_, fut), vec in zip(batch, vecs):
+            if not fut.done():
+                fut.set_result(vec)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "pending": sum(len(v) for v in self._pending.values()),
+        }
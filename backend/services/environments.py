@@ -11,28 +11,22 @@ import logging
 import os
 from typing import Any, Dict, List, Optional, Tuple
 
-from motor.motor_asyncio import AsyncIOMotorClient
-
 from models.environment_models import (
     EnvironmentAssignmentResult,
     EnvironmentCategory,
     Obstacle,
     TwinEnvironment,
 )
+from services import mongo
 from services import memory_bank as mb
 
 logger = logging.getLogger("atlas.environments")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _envs():
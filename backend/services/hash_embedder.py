@@ -0,0 +1,144 @@
+"""
+Feature-hash embedder ('hash' provider, atlas-hash-v1).
+
+Vectorised re-implementation of the Memory Bank's default embedder.
+The output is bit-for-bit identical to the original pure-Python loop
+(kept below as `embed_reference` for tests and benchmarks):
+
+  * every word and every char-3-gram is hashed with
+    blake2b(digest_size=4) → big-endian uint32 — memoised per token, so
+    the hot path is one dict lookup instead of hash + hexdigest + int();
+    trigrams are packed into int64 codes and de-duplicated per text
+  * bucket contributions are summed with `np.bincount`, which adds the
+    weights in stream order exactly like the original `vec[i] += w`
+  * the L2 norm uses the same sequential float64 sum as the original
+
+`embed_many(texts)` returns an (n, EMBED_DIM) float64 matrix for batch
+callers (ingestion, re-indexing).
+"""
+import hashlib
+import math
+import re
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+EMBED_DIM = 384
+WORD_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.3          # tri-grams weighted less than words
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_TOKEN_CACHE_MAX = 200_000
+_PACK_MIN_CHARS = 256
+
+
+class _TokenHashes(dict):
+    """token → uint32 blake2b hash; computed on first sight only."""
+
+    def __missing__(self, token: str) -> int:
+        if len(self) >= _TOKEN_CACHE_MAX:
+            self.clear()
+        h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=4).digest(), "big")
+        self[token] = h
+        return h
+
+
+class _TrigramHashes(dict):
+    """Packed trigram code (3 × 21-bit code points) → uint32 blake2b hash."""
+
+    def __missing__(self, code: int) -> int:
+        if len(self) >= _TOKEN_CACHE_MAX:
+            self.clear()
+        gram = chr(code >> 42) + chr((code >> 21) & _CP_MASK) + chr(code & _CP_MASK)
+        h = _HASHES[gram]
+        self[code] = h
+        return h
+
+
+_CP_MASK = (1 << 21) - 1
+_HASHES = _TokenHashes()
+_TRIGRAMS = _TrigramHashes()
+
+
+def _lookup(cache: dict, keys: list) -> np.ndarray:
+    return np.fromiter(map(cache.__getitem__, keys), dtype=np.int64, count=len(keys))
+
+
+def _trigram_hashes(padded: str) -> np.ndarray:
+    """Hash of every char-3-gram of `padded`, in order. Trigrams are packed
+    into int64 codes and de-duplicated with np.unique, so each distinct
+    trigram costs one cache lookup no matter how often it repeats. Short
+    strings skip the packing — plain slicing is cheaper below that size."""
+    if len(padded) < _PACK_MIN_CHARS:
+        return _lookup(_HASHES, [padded[i:i + 3] for i in range(len(padded) - 2)])
+    cps = np.frombuffer(padded.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    codes = (cps[:-2] << 42) | (cps[1:-1] << 21) | cps[2:]
+    uniq, inverse = np.unique(codes, return_inverse=True)
+    return _lookup(_TRIGRAMS, uniq.tolist())[inverse]
+
+
+def _raw_vector(text: str) -> np.ndarray:
+    lower = text.lower()
+    wh = _lookup(_HASHES, _WORD_RE.findall(lower))
+    gh = _trigram_hashes(f"  {lower}  ")
+    buckets = np.concatenate((wh % EMBED_DIM, gh % EMBED_DIM))
+    weights = np.concatenate((
+        np.where(wh & 1, WORD_WEIGHT, -WORD_WEIGHT),
+        np.where(gh & 2, 1.0, -1.0) * TRIGRAM_WEIGHT,
+    ))
+    return np.bincount(buckets, weights=weights, minlength=EMBED_DIM)
+
+
+def _normalised(vec: np.ndarray) -> np.ndarray:
+    # Sequential Python sum keeps the norm bit-identical to the original.
+    norm = math.sqrt(sum((vec * vec).tolist())) or 1.0
+    return vec / norm
+
+
+def embed(text: str) -> np.ndarray:
+    """One text → float64 vector of length EMBED_DIM (zeros for empty text)."""
+    if not text:
+        return np.zeros(EMBED_DIM, dtype=np.float64)
+    return _normalised(_raw_vector(text))
+
+
+def embed_list(text: str) -> List[float]:
+    return embed(text).tolist()
+
+
+def embed_many(texts: Iterable[str]) -> np.ndarray:
+    """Batch API — row i is `embed(texts[i])`."""
+    texts = list(texts)
+    out = np.zeros((len(texts), EMBED_DIM), dtype=np.float64)
+    for i, text in enumerate(texts):
+        if text:
+            out[i] = _normalised(_raw_vector(text))
+    return out
+
+
+def cache_info() -> Dict[str, int]:
+    return {"tokens": len(_HASHES), "trigrams": len(_TRIGRAMS), "max_tokens": _TOKEN_CACHE_MAX}
+
+
+def clear_cache() -> None:
+    _HASHES.clear()
+    _TRIGRAMS.clear()
+
+
+def embed_reference(text: str) -> List[float]:
+    """The original pure-Python implementation — benchmark/test oracle only."""
+    vec = [0.0] * EMBED_DIM
+    if not text:
+        return vec
+    lower = text.lower()
+    for w in _WORD_RE.findall(lower):
+        h = int(hashlib.blake2b(w.encode(), digest_size=4).hexdigest(), 16)
+        sign = 1.0 if (h & 1) else -1.0
+        vec[h % EMBED_DIM] += sign
+    padded = f"  {lower}  "
+    for i in range(len(padded) - 2):
+        g = padded[i:i + 3]
+        h = int(hashlib.blake2b(g.encode(), digest_size=4).hexdigest(), 16)
+        sign = 1.0 if (h & 2) else -1.0
+        vec[h % EMBED_DIM] += sign * 0.3
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
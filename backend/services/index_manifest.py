@@ -0,0 +1,227 @@
+"""
+Declarative index manifest for the hot backend collections.
+
+The older services (memory bank, graph triples, persona chat, research
+queue, knowledge ingestion) never created indexes, so their filtered +
+sorted reads turn into collection scans as data grows. Instead of adding
+`create_indexes()` to each of them, the indexes live here, next to the
+queries they serve:
+
+  * `MANIFEST`  — collection → IndexModel list. Every index is named, so a
+                  changed spec shows up as a conflict instead of a silent
+                  second index.
+  * `bootstrap()` — applies the manifest at startup. Idempotent: Mongo
+                  treats re-creating an identical index as a no-op. A
+                  conflicting or unbuildable index (e.g. duplicates under a
+                  unique key) is reported and skipped, never raised.
+  * `PROBES` / `explain_report()` — representative service queries run
+                  through `explain`; any plan that contains a COLLSCAN is
+                  flagged so a new query shape without an index is visible.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING as ASC, DESCENDING as DESC, IndexModel
+from pymongo.errors import OperationFailure
+
+from services import mongo
+
+logger = logging.getLogger("atlas.index_manifest")
+
+
+def _ix(keys: List[Tuple[str, int]], name: str, **opts: Any) -> IndexModel:
+    return IndexModel(keys, name=name, **opts)
+
+
+MANIFEST: Dict[str, List[IndexModel]] = {
+    "memory_bank": [
+        _ix([("id", ASC)], "id_unique", unique=True),
+        # list_memories: optional persona/category filter, newest reference first
+        _ix([("persona", ASC), ("category", ASC), ("last_referenced", DESC)],
+            "persona_category_last_referenced"),
+        _ix([("category", ASC), ("last_referenced", DESC)], "category_last_referenced"),
+        _ix([("last_referenced", DESC)], "last_referenced"),
+        # memory_index.sync: rows created since the watermark
+        _ix([("created_at", ASC)], "created_at"),
+    ],
+    "graph_triples": [
+        # add_triple upserts on (from, to, relation)
+        _ix([("from_node", ASC), ("to_node", ASC), ("relation", ASC)],
+            "edge_unique", unique=True),
+        # neighborhood / list_triples: each $or branch sorted by weight
+        _ix([("from_node", ASC), ("weight", DESC)], "from_node_weight"),
+        _ix([("to_node", ASC), ("weight", DESC)], "to_node_weight"),
+        _ix([("relation", ASC), ("weight", DESC)], "relation_weight"),
+    ],
+    "robot_telemetry": [
+        _ix([("device_id", ASC), ("received_at", DESC)], "device_id_1_received_at_-1"),
+        _ix([("received_at", ASC)], "received_at_1"),
+    ],
+    "robot_telemetry_buckets": [
+        _ix([("device_id", ASC), ("resolution", ASC), ("bucket_start", ASC)],
+            "device_id_1_resolution_1_bucket_start_1", unique=True),
+    ],
+    "robot_telemetry_meta": [
+        _ix([("id", ASC)], "id_unique", unique=True),
+    ],
+    "robot_devices": [
+        _ix([("id", ASC)], "id_unique", unique=True),
+        _ix([("updated_at", DESC)], "updated_at"),
+    ],
+    "persona_messages": [
+        _ix([("session_id", ASC), ("created_at", ASC)], "session_created_at"),
+    ],
+    "persona_sessions": [
+        _ix([("id", ASC)], "id_unique", unique=True),
+        _ix([("persona", ASC), ("updated_at", DESC)], "persona_updated_at"),
+        _ix([("updated_at", DESC)], "updated_at"),
+    ],
+    "research_queue": [
+        _ix([("id", ASC)], "id_unique", unique=True),
+        _ix([("item_hash", ASC)], "item_hash"),
+        _ix([("state", ASC), ("created_at", DESC)], "state_created_at"),
+        _ix([("domain", ASC), ("created_at", DESC)], "domain_created_at"),
+        _ix([("created_at", DESC)], "created_at"),
+    ],
+    "knowledge_records": [
+        _ix([("id", ASC)], "id", sparse=True),
+        _ix([("source_hash", ASC)], "source_hash", sparse=True),
+        _ix([("tags", ASC), ("updated_at", DESC)], "tags_updated_at"),
+        _ix([("source_type", ASC), ("updated_at", DESC)], "source_type_updated_at"),
+        _ix([("updated_at", DESC)], "updated_at"),
+    ],
+    "weaver_parts": [
+        _ix([("id", ASC)], "id"),
+        _ix([("updated_at", DESC)], "updated_at"),
+    ],
+    "worldwatch_updates": [
+        _ix([("entry_hash", ASC)], "entry_hash"),
+        _ix([("domain", ASC), ("captured_at", DESC)], "domain_captured_at"),
+        _ix([("captured_at", DESC)], "captured_at"),
+    ],
+    "llm_cache": [
+        _ix([("key", ASC)], "key_unique", unique=True),
+        _ix([("namespace", ASC)], "namespace"),
+        # Mongo's TTL monitor drops rows once expires_at passes.
+        _ix([("expires_at", ASC)], "expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+
+# (label, collection, filter, sort) — one per hot service read path.
+PROBES: List[Tuple[str, str, Dict[str, Any], Optional[Dict[str, int]]]] = [
+    ("memory_bank.list_memories(persona, category)", "memory_bank",
+     {"persona": "minerva", "category": "research"}, {"last_referenced": -1}),
+    ("memory_bank.list_memories(category)", "memory_bank",
+     {"category": "research"}, {"last_referenced": -1}),
+    ("memory_bank.search_memory hydrate-by-id", "memory_bank",
+     {"id": {"$in": ["probe"]}}, None),
+    ("memory_index.sync", "memory_bank",
+     {"created_at": {"$gte": "1970-01-01"}}, None),
+    ("memory_bank.neighborhood", "graph_triples",
+     {"$or": [{"from_node": {"$in": ["probe"]}}, {"to_node": {"$in": ["probe"]}}]},
+     {"weight": -1}),
+    ("memory_bank.add_triple", "graph_triples",
+     {"from_node": "a", "to_node": "b", "relation": "r"}, None),
+    ("memory_bank.list_triples(relation)", "graph_triples",
+     {"relation": "r"}, {"weight": -1}),
+    ("robot.telemetry_history", "robot_telemetry",
+     {"device_id": "probe"}, {"received_at": -1}),
+    ("telemetry_store.series(raw)", "robot_telemetry",
+     {"device_id": "probe", "received_at": {"$gte": "a", "$lt": "b"}},
+     {"received_at": -1}),
+    ("persona_chat._recent_turns", "persona_messages",
+     {"session_id": "probe"}, {"created_at": -1}),
+    ("persona_chat.list_sessions(persona)", "persona_sessions",
+     {"persona": "minerva"}, {"updated_at": -1}),
+    ("research_orchestrator.run_cycle(investigate)", "research_queue",
+     {"state": {"$in": ["queued", "discovered"]}}, {"created_at": -1}),
+    ("research_orchestrator.enqueue_item(dedupe)", "research_queue",
+     {"item_hash": "probe"}, None),
+    ("knowledge_ingestion.get_by_url", "knowledge_records",
+     {"source_hash": "probe"}, None),
+    ("knowledge_ingestion.search(q) hit fetch", "knowledge_records",
+     {"id": {"$in": ["probe"]}}, None),
+    ("knowledge_search.sync", "knowledge_records",
+     {"updated_at": {"$gte": "1970-01-01"}}, None),
+    ("knowledge_ingestion.search(tag)", "knowledge_records",
+     {"tags": "probe"}, {"updated_at": -1}),
+    ("parts_db.get_parts", "weaver_parts",
+     {"id": {"$in": ["probe"]}}, None),
+    ("parts_index.sync", "weaver_parts",
+     {"updated_at": {"$gte": "1970-01-01"}}, None),
+    ("worldwatch._ingest_entry(dedupe)", "worldwatch_updates",
+     {"entry_hash": "probe"}, None),
+    ("llm_cache.lookup(store)", "llm_cache",
+     {"key": "probe"}, None),
+]
+
+
+async def bootstrap(collections: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Create every manifest index. Safe to run on every startup."""
+    report: Dict[str, Any] = {"collections": {}, "errors": 0}
+    for name, models in MANIFEST.items():
+        if collections is not None and name not in collections:
+            continue
+        col = mongo.collection(name)
+        entry: Dict[str, Any] = {"ensured": [], "errors": []}
+        try:
+            entry["ensured"] = await col.create_indexes(models)
+        except OperationFailure:
+            # One bad index fails the whole batch; retry one by one so the
+            # rest still get built and the culprit is named.
+            for model in models:
+                spec = model.document
+                try:
+                    await col.create_indexes([model])
+                    entry["ensured"].append(spec["name"])
+                except OperationFailure as exc:
+                    entry["errors"].append({"index": spec["name"],
+                                            "msg": str(exc)[:200]})
+                    logger.warning("index %s.%s not built: %s",
+                                   name, spec["name"], exc)
+        report["errors"] += len(entry["errors"])
+        report["collections"][name] = entry
+    return report
+
+
+def _stages(plan: Any) -> List[str]:
+    """Every `stage` name in an explain plan tree."""
+    out: List[str] = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            out.append(plan["stage"])
+        for value in plan.values():
+            out.extend(_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            out.extend(_stages(value))
+    return out
+
+
+async def explain_report() -> Dict[str, Any]:
+    """Explain each probe query and flag the ones that COLLSCAN."""
+    db = mongo.db()
+    rows: List[Dict[str, Any]] = []
+    for label, name, filt, sort in PROBES:
+        cmd: Dict[str, Any] = {"find": name, "filter": filt, "limit": 50}
+        if sort:
+            cmd["sort"] = sort
+        try:
+            res = await db.command("explain", cmd, verbosity="queryPlanner")
+        except OperationFailure as exc:
+            rows.append({"query": label, "collection": name, "error": str(exc)[:200]})
+            continue
+        winning = (res.get("queryPlanner") or {}).get("winningPlan") or {}
+        stages = _stages(winning)
+        rows.append({
+            "query": label,
+            "collection": name,
+            "collscan": "COLLSCAN" in stages,
+            "in_memory_sort": "SORT" in stages,
+            "stages": stages,
+        })
+    flagged = [r["query"] for r in rows if r.get("collscan")]
+    return {"probes": len(rows), "collscans": flagged, "results": rows}
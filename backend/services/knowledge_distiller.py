@@ -102,8 +102,10 @@ async def distill(source: FetchedSource, *, force_agent: Optional[str] = None) -
         "Distil this into the JSON schema. Remember: own wording, concise, no verbatim copying."
     )
     try:
+        # Re-ingesting a URL with unchanged text re-asks the same question.
         res = await llm_send(persona, system, user,
-                             session_id=f"knowledge-distill-{persona}")
+                             session_id=f"knowledge-distill-{persona}",
+                             cache="knowledge_distiller", cache_ttl_s=30 * 24 * 3600)
         raw = (res.get("text") or "").strip()
     except Exception as exc:    # noqa: BLE001
         logger.warning("distill LLM call failed: %s", exc)
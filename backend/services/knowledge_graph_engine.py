@@ -3,11 +3,24 @@
 Connects projects, discoveries, sources, subjects, blueprints, and AI owners into
 queryable relationships. V1 is deterministic in-memory with optional MongoDB
 persistence, matching the Research Lab pattern.
+
+Edges are indexed as they are created or hydrated:
+  * adjacency — outgoing and incoming edge ids per node, per edge type, so
+    traversals touch only the edges at each frontier node
+  * ordered views — per node, per edge type, per (node, edge type) and
+    overall, kept sorted by `updated_at` so `list_edges` never re-sorts
+
+On top of the adjacency: `neighborhood`, weighted `k_hop`, `shortest_path`
+and `subgraph`.
 """
 from __future__ import annotations
 
+import heapq
+import math
+from bisect import insort
+from collections import deque
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from uuid import uuid4
 
 VALID_NODE_TYPES = {
@@ -20,10 +33,28 @@ VALID_EDGE_TYPES = {
     "improves", "depends_on", "cites", "created_from", "reviewed_by", "affects"
 }
 
+VALID_DIRECTIONS = {"out", "in", "both"}
+
 _NODES: Dict[str, Dict[str, Any]] = {}
 _EDGES: Dict[str, Dict[str, Any]] = {}
 _DB: Any = None
 
+# Adjacency: node_id → edge_type → edge ids (insertion order).
+_OUT: Dict[str, Dict[str, List[str]]] = {}
+_IN: Dict[str, Dict[str, List[str]]] = {}
+# Ordered views: ascending (updated_at, -seq, edge_id) keys; read reversed.
+# `seq` is the edge's insertion number, so ties keep insertion order exactly
+# like the stable sort `list_edges` used to do.
+_SortKey = Tuple[str, int, str]
+_SEQ: Dict[str, int] = {}
+_ORDER_ALL: List[_SortKey] = []
+_ORDER_BY_NODE: Dict[str, List[_SortKey]] = {}
+_ORDER_BY_TYPE: Dict[str, List[_SortKey]] = {}
+_ORDER_BY_NODE_TYPE: Dict[Tuple[str, str], List[_SortKey]] = {}
+# Key fields of each edge as indexed, so a re-created edge id can be
+# unindexed after _EDGES already holds the replacement.
+_INDEXED: Dict[str, Dict[str, Any]] = {}
+
 
 class KnowledgeGraphError(RuntimeError):
     """Raised when a graph operation is invalid."""
@@ -132,41 +163,130 @@ def create_edge(
         "updated_at": _utc_now(),
     }
     _EDGES[eid] = edge
+    _index_edge(edge)
     return edge
 
 
+# ---------------------------------------------------------------------------
+# Edge indexes
+# ---------------------------------------------------------------------------
+def _sort_key(edge: Dict[str, Any]) -> _SortKey:
+    return (edge.get("updated_at") or "", -_SEQ[edge["edge_id"]], edge["edge_id"])
+
+
+def _unindex_edge(edge: Dict[str, Any]) -> None:
+    eid = edge["edge_id"]
+    src, dst, etype = edge["source_node_id"], edge["target_node_id"], edge["edge_type"]
+    _OUT[src][etype].remove(eid)
+    _IN[dst][etype].remove(eid)
+    key = _sort_key(edge)
+    for view in {id(v): v for v in (
+        _ORDER_ALL, _ORDER_BY_TYPE[etype], _ORDER_BY_NODE[src], _ORDER_BY_NODE[dst],
+        _ORDER_BY_NODE_TYPE[(src, etype)], _ORDER_BY_NODE_TYPE[(dst, etype)],
+    )}.values():
+        view.remove(key)
+
+
+def _index_edge(edge: Dict[str, Any]) -> None:
+    """Add `edge` (already stored in _EDGES) to the adjacency and ordered
+    views. Re-indexing an existing edge id replaces its old entries."""
+    eid = edge["edge_id"]
+    if eid in _SEQ:
+        old = _INDEXED.get(eid)
+        if old is not None:
+            _unindex_edge(old)
+    else:
+        _SEQ[eid] = len(_SEQ)
+    src, dst, etype = edge["source_node_id"], edge["target_node_id"], edge["edge_type"]
+    _OUT.setdefault(src, {}).setdefault(etype, []).append(eid)
+    _IN.setdefault(dst, {}).setdefault(etype, []).append(eid)
+    key = _sort_key(edge)
+    insort(_ORDER_ALL, key)
+    insort(_ORDER_BY_TYPE.setdefault(etype, []), key)
+    for nid in {src, dst}:                  # a self-loop is listed once
+        insort(_ORDER_BY_NODE.setdefault(nid, []), key)
+        insort(_ORDER_BY_NODE_TYPE.setdefault((nid, etype), []), key)
+    _INDEXED[eid] = {k: edge[k] for k in ("edge_id", "source_node_id", "target_node_id",
+                                          "edge_type", "updated_at")}
+
+
+def _clear_indexes() -> None:
+    for index in (_OUT, _IN, _SEQ, _ORDER_BY_NODE, _ORDER_BY_TYPE, _ORDER_BY_NODE_TYPE, _INDEXED):
+        index.clear()
+    _ORDER_ALL.clear()
+
+
+def _check_direction(direction: str) -> None:
+    if direction not in VALID_DIRECTIONS:
+        raise KnowledgeGraphError(f"invalid direction: {direction}")
+
+
+def _check_edge_types(edge_types: Optional[Iterable[str]]) -> Optional[Set[str]]:
+    if edge_types is None:
+        return None
+    wanted = set(edge_types)
+    bad = wanted - VALID_EDGE_TYPES
+    if bad:
+        raise KnowledgeGraphError(f"invalid edge_type: {sorted(bad)[0]}")
+    return wanted
+
+
+def _incident(
+    node_id: str, direction: str = "both", edge_types: Optional[Set[str]] = None,
+) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """(edge, neighbour id) for each edge at `node_id`."""
+    if direction in ("out", "both"):
+        for etype, eids in _OUT.get(node_id, {}).items():
+            if edge_types is None or etype in edge_types:
+                for eid in eids:
+                    yield _EDGES[eid], _EDGES[eid]["target_node_id"]
+    if direction in ("in", "both"):
+        for etype, eids in _IN.get(node_id, {}).items():
+            if edge_types is None or etype in edge_types:
+                for eid in eids:
+                    edge = _EDGES[eid]
+                    if direction == "both" and edge["source_node_id"] == node_id:
+                        continue            # self-loop already yielded as outgoing
+                    yield edge, edge["source_node_id"]
+
+
+def _by_insertion(eids: Iterable[str]) -> List[Dict[str, Any]]:
+    return [_EDGES[eid] for eid in sorted(eids, key=_SEQ.__getitem__)]
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
 def list_edges(node_id: Optional[str] = None, edge_type: Optional[str] = None) -> List[Dict[str, Any]]:
     if edge_type and edge_type not in VALID_EDGE_TYPES:
         raise KnowledgeGraphError(f"invalid edge_type: {edge_type}")
-    edges = list(_EDGES.values())
-    if node_id:
-        edges = [e for e in edges if e["source_node_id"] == node_id or e["target_node_id"] == node_id]
-    if edge_type:
-        edges = [e for e in edges if e["edge_type"] == edge_type]
-    return sorted(edges, key=lambda e: e["updated_at"], reverse=True)
+    if node_id and edge_type:
+        view = _ORDER_BY_NODE_TYPE.get((node_id, edge_type), [])
+    elif node_id:
+        view = _ORDER_BY_NODE.get(node_id, [])
+    elif edge_type:
+        view = _ORDER_BY_TYPE.get(edge_type, [])
+    else:
+        view = _ORDER_ALL
+    return [_EDGES[key[2]] for key in reversed(view)]
 
 
 def neighborhood(node_id: str, depth: int = 1) -> Dict[str, Any]:
     if node_id not in _NODES:
         raise KnowledgeGraphError(f"unknown node_id: {node_id}")
     depth = max(1, min(3, int(depth)))
-    seen_nodes = {node_id}
-    frontier = {node_id}
-    found_edges: Dict[str, Dict[str, Any]] = {}
-
-    for _ in range(depth):
-        next_frontier = set()
-        for edge in _EDGES.values():
-            s = edge["source_node_id"]
-            t = edge["target_node_id"]
-            if s in frontier or t in frontier:
-                found_edges[edge["edge_id"]] = edge
-                if s not in seen_nodes:
-                    next_frontier.add(s)
-                if t not in seen_nodes:
-                    next_frontier.add(t)
-                seen_nodes.add(s)
-                seen_nodes.add(t)
+    seen_nodes = {node_id: None}        # dict as an ordered set (BFS order)
+    frontier = [node_id]
+    found_edges: Dict[str, int] = {}    # edge id → level it was first reached
+
+    for level in range(depth):
+        next_frontier = []
+        for nid in frontier:
+            for edge, other in _incident(nid):
+                found_edges.setdefault(edge["edge_id"], level)
+                if other not in seen_nodes:
+                    seen_nodes[other] = None
+                    next_frontier.append(other)
         frontier = next_frontier
         if not frontier:
             break
@@ -174,11 +294,176 @@ def neighborhood(node_id: str, depth: int = 1) -> Dict[str, Any]:
     return {
         "center": _NODES[node_id],
         "nodes": [_NODES[nid] for nid in seen_nodes],
-        "edges": list(found_edges.values()),
+        "edges": [_EDGES[eid] for eid in sorted(
+            found_edges, key=lambda eid: (found_edges[eid], _SEQ[eid]))],
         "depth": depth,
     }
 
 
+def k_hop(
+    node_id: str,
+    k: int = 2,
+    *,
+    edge_types: Optional[Iterable[str]] = None,
+    direction: str = "both",
+    min_weight: float = 0.0,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Nodes within `k` hops of `node_id`, ranked by path strength — the
+    best product of edge weights over any path of ≤ k hops (so a strong
+    two-hop link can outrank a weak direct one). Edges below `min_weight`
+    are not followed."""
+    if node_id not in _NODES:
+        raise KnowledgeGraphError(f"unknown node_id: {node_id}")
+    _check_direction(direction)
+    wanted = _check_edge_types(edge_types)
+    k = max(1, min(6, int(k)))
+
+    best: Dict[str, Tuple[float, int]] = {node_id: (1.0, 0)}   # node → (strength, hops)
+    via: Dict[str, str] = {}                                     # node → edge id of best path
+    frontier = {node_id: 1.0}
+    for hop in range(1, k + 1):
+        improved: Dict[str, float] = {}
+        for nid, strength in frontier.items():
+            for edge, other in _incident(nid, direction, wanted):
+                if edge["weight"] < min_weight or edge["weight"] <= 0.0:
+                    continue
+                score = strength * edge["weight"]
+                if score > best.get(other, (0.0, 0))[0] and score > improved.get(other, 0.0):
+                    improved[other] = score
+                    via[other] = edge["edge_id"]
+        for nid, score in improved.items():
+            best[nid] = (score, hop)
+        frontier = improved
+        if not frontier:
+            break
+
+    ranked = sorted((nid for nid in best if nid != node_id),
+                    key=lambda nid: (-best[nid][0], best[nid][1], nid))
+    if limit is not None:
+        ranked = ranked[:max(0, int(limit))]
+    return {
+        "center": _NODES[node_id],
+        "k": k,
+        "nodes": [
+            {**_NODES[nid], "strength": round(best[nid][0], 6), "hops": best[nid][1],
+             "via_edge_id": via[nid]}
+            for nid in ranked
+        ],
+        "edges": _by_insertion({via[nid] for nid in ranked}),
+    }
+
+
+def shortest_path(
+    source_node_id: str,
+    target_node_id: str,
+    *,
+    weighted: bool = False,
+    edge_types: Optional[Iterable[str]] = None,
+    direction: str = "both",
+) -> Dict[str, Any]:
+    """Fewest-hops path (BFS), or with `weighted=True` the strongest path —
+    Dijkstra on cost −ln(weight), i.e. the path maximising the product of
+    edge weights. Zero-weight edges are never traversed in weighted mode."""
+    for nid in (source_node_id, target_node_id):
+        if nid not in _NODES:
+            raise KnowledgeGraphError(f"unknown node_id: {nid}")
+    _check_direction(direction)
+    wanted = _check_edge_types(edge_types)
+
+    prev: Dict[str, Tuple[str, str]] = {}      # node → (previous node, edge id)
+    found = source_node_id == target_node_id
+    if not found and not weighted:
+        seen = {source_node_id}
+        queue = deque([source_node_id])
+        while queue and not found:
+            nid = queue.popleft()
+            for edge, other in _incident(nid, direction, wanted):
+                if other in seen:
+                    continue
+                seen.add(other)
+                prev[other] = (nid, edge["edge_id"])
+                if other == target_node_id:
+                    found = True
+                    break
+                queue.append(other)
+    elif not found:
+        dist = {source_node_id: 0.0}
+        heap = [(0.0, source_node_id)]
+        done: Set[str] = set()
+        while heap:
+            cost, nid = heapq.heappop(heap)
+            if nid in done:
+                continue
+            if nid == target_node_id:
+                found = True
+                break
+            done.add(nid)
+            for edge, other in _incident(nid, direction, wanted):
+                if edge["weight"] <= 0.0 or other in done:
+                    continue
+                step = cost - math.log(edge["weight"])
+                if step < dist.get(other, math.inf):
+                    dist[other] = step
+                    prev[other] = (nid, edge["edge_id"])
+                    heapq.heappush(heap, (step, other))
+
+    if not found:
+        return {"found": False, "nodes": [], "edges": [], "hops": None, "strength": None}
+    path = [target_node_id]
+    edge_ids: List[str] = []
+    while path[-1] != source_node_id:
+        before, eid = prev[path[-1]]
+        edge_ids.append(eid)
+        path.append(before)
+    path.reverse()
+    edge_ids.reverse()
+    strength = 1.0
+    for eid in edge_ids:
+        strength *= _EDGES[eid]["weight"]
+    return {
+        "found": True,
+        "nodes": [_NODES[nid] for nid in path],
+        "edges": [_EDGES[eid] for eid in edge_ids],
+        "hops": len(edge_ids),
+        "strength": round(strength, 6),
+    }
+
+
+def subgraph(
+    node_ids: Iterable[str],
+    *,
+    edge_types: Optional[Iterable[str]] = None,
+    expand: int = 0,
+) -> Dict[str, Any]:
+    """The induced subgraph on `node_ids` (unknown ids are reported, not
+    raised), optionally grown by `expand` hops first."""
+    wanted = _check_edge_types(edge_types)
+    node_ids = list(node_ids)
+    members = {nid: None for nid in node_ids if nid in _NODES}
+    missing = [nid for nid in node_ids if nid not in _NODES]
+    frontier = list(members)
+    for _ in range(max(0, min(3, int(expand)))):
+        grown = []
+        for nid in frontier:
+            for _edge, other in _incident(nid, "both", wanted):
+                if other not in members:
+                    members[other] = None
+                    grown.append(other)
+        frontier = grown
+    edge_ids = {
+        edge["edge_id"]
+        for nid in members
+        for edge, other in _incident(nid, "out", wanted)
+        if other in members
+    }
+    return {
+        "nodes": [_NODES[nid] for nid in members],
+        "edges": _by_insertion(edge_ids),
+        "missing": missing,
+    }
+
+
 def stats() -> Dict[str, Any]:
     by_type: Dict[str, int] = {}
     for node in _NODES.values():
@@ -216,8 +501,10 @@ async def hydrate_from_mongo() -> Dict[str, int]:
     _EDGES.clear()
     for node in nodes:
         _NODES[node["node_id"]] = node
+    _clear_indexes()
     for edge in edges:
         _EDGES[edge["edge_id"]] = edge
+        _index_edge(edge)
     return {"nodes": len(_NODES), "edges": len(_EDGES)}
 
 
@@ -235,3 +522,4 @@ async def create_indexes() -> None:
 def reset_in_memory_state() -> None:
     _NODES.clear()
     _EDGES.clear()
+    _clear_indexes()
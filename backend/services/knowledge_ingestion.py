@@ -20,11 +20,10 @@ Storage:
                                           council               → category=council  (permanent)
                                         a project_id forces category=project (permanent)
 """
+import asyncio
 import logging
 import os
-from typing import Any, Dict, List, Optional
-
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Any, Dict, List, Optional, Tuple
 
 from models.knowledge_models import (
     Distillation,
@@ -33,28 +32,28 @@ from models.knowledge_models import (
     SourceType,
     url_hash,
 )
+from services import knowledge_search as ksearch
+from services import mongo
 from services import memory_bank as mb
 from services.knowledge_distiller import distill
 from services.source_fetchers import IngestError, fetch
 
 logger = logging.getLogger("atlas.knowledge_ingestion")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _records():
     return _db()["knowledge_records"]
 
 
+_SEARCH_LOCK: Optional[asyncio.Lock] = None
+
+
 # --- Category decision -----------------------------------------------------
 def _category_for(agent: str, project_id: Optional[str]) -> str:
     if project_id:
@@ -116,6 +115,7 @@ async def ingest_url(
         memory_bank_id=mb_id,
     )
     await _records().insert_one(record.model_dump())
+    ksearch.upsert(record.model_dump())
     await _wire_graph(record)
     return {"record": _strip(record.model_dump()), "reused": False,
             "memory_bank_id": mb_id}
@@ -172,6 +172,7 @@ async def _reinforce(
     )
     # Re-wire any new graph nodes the merge introduced.
     if refreshed:
+        ksearch.upsert(refreshed)
         await _wire_graph(KnowledgeRecord(**refreshed))
     return {"record": _strip(refreshed or existing), "reused": True,
             "memory_bank_id": mb_id}
@@ -185,41 +186,72 @@ async def _wire_graph(rec: KnowledgeRecord) -> None:
          agent           -> studies    -> concept
     """
     src_id = rec.id
+    triples: List[Dict[str, Any]] = []
     # concept -> relates_to -> tag
     for concept in rec.concepts:
         for tag in rec.tags[:5]:    # cap edges so we don't explode the graph
-            try:
-                await mb.add_triple(from_node=concept, to_node=tag,
-                                    relation="relates_to",
-                                    source_id=src_id, weight=1.0)
-            except Exception as exc:    # noqa: BLE001
-                logger.debug("triple skip %s→%s: %s", concept, tag, exc)
+            triples.append({"from_node": concept, "to_node": tag,
+                            "relation": "relates_to"})
     # project -> uses -> concept
     for pid in rec.related_projects:
         for concept in rec.concepts:
-            try:
-                await mb.add_triple(from_node=pid, to_node=concept,
-                                    relation="uses",
-                                    source_id=src_id, weight=1.0)
-            except Exception:    # noqa: BLE001
-                pass
+            triples.append({"from_node": pid, "to_node": concept,
+                            "relation": "uses"})
     # agent -> studies -> concept
     for agent in rec.related_agents:
         for concept in rec.concepts:
-            try:
-                await mb.add_triple(from_node=agent, to_node=concept,
-                                    relation="studies",
-                                    source_id=src_id, weight=1.0)
-            except Exception:    # noqa: BLE001
-                pass
+            triples.append({"from_node": agent, "to_node": concept,
+                            "relation": "studies"})
+    if not triples:
+        return
+    # One unordered bulk upsert; a bad triple doesn't stop the others.
+    try:
+        await mb.add_triples(
+            {**t, "source_id": src_id, "weight": 1.0} for t in triples
+        )
+    except Exception as exc:    # noqa: BLE001
+        logger.debug("triple wiring for %s partially failed: %s", src_id, exc)
 
 
 # --- Search & view ---------------------------------------------------------
+async def _ensure_search_index() -> None:
+    """Hydrate the lexical index on first use, then catch up on records
+    written by other workers / pipelines."""
+    global _SEARCH_LOCK
+    if not ksearch.is_hydrated():
+        if _SEARCH_LOCK is None:
+            _SEARCH_LOCK = asyncio.Lock()
+        async with _SEARCH_LOCK:
+            if not ksearch.is_hydrated():
+                await ksearch.hydrate(_records())
+        return
+    await ksearch.sync(_records())
+
+
+async def hydrate_search_index() -> Dict[str, Any]:
+    """Startup hook — build the knowledge search index."""
+    return await ksearch.hydrate(_records())
+
+
 async def search(
     *, q: Optional[str] = None, agent: Optional[str] = None,
     project_id: Optional[str] = None, source_type: Optional[str] = None,
-    tag: Optional[str] = None, limit: int = 30,
+    tag: Optional[str] = None, boost_agent: Optional[str] = None,
+    limit: int = 30,
 ) -> List[Dict[str, Any]]:
+    """With `q`: BM25-ranked hits from `knowledge_search`, fetched in one
+    `id $in` query. Without: newest records matching the filters.
+    `boost_agent` ranks that persona's records higher without excluding
+    the rest."""
+    if q and q.strip():
+        await _ensure_search_index()
+        hits = ksearch.search(
+            q, agent=agent, project_id=project_id, source_type=source_type,
+            tag=tag.lower() if tag else None, boost_agent=boost_agent,
+            limit=limit,
+        )
+        return (await _records_for_hits([hits]))[0]
+
     filt: Dict[str, Any] = {}
     if agent:
         filt["related_agents"] = agent
@@ -229,17 +261,48 @@ async def search(
         filt["source_type"] = source_type
     if tag:
         filt["tags"] = tag.lower()
-    if q:
-        # Mongo text-ish: regex across title + summary + tags
-        regex = {"$regex": re.escape(q), "$options": "i"}
-        filt["$or"] = [
-            {"title": regex}, {"summary": regex}, {"tags": regex},
-            {"concepts": regex},
-        ]
     cur = _records().find(filt, {"_id": 0}).sort("updated_at", -1).limit(limit)
     return [_strip(d) async for d in cur]
 
 
+async def search_many(
+    q: str, boost_agents: List[str], *, limit: int = 30,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """`search(q=..., boost_agent=a)` for several agents at once — one
+    in-process ranking per agent, ONE Mongo read for all of their hits."""
+    if not (q or "").strip():
+        return {a: [] for a in boost_agents}
+    await _ensure_search_index()
+    hit_lists = [ksearch.search(q, boost_agent=a, limit=limit) for a in boost_agents]
+    return dict(zip(boost_agents, await _records_for_hits(hit_lists)))
+
+
+async def _records_for_hits(
+    hit_lists: List[List[Tuple[str, float]]],
+) -> List[List[Dict[str, Any]]]:
+    """Fetch the records for one or more ranked hit lists in a single
+    `id $in` query, preserving each list's order and adding `search_score`."""
+    ids = list(dict.fromkeys(rid for hits in hit_lists for rid, _ in hits))
+    if not ids:
+        return [[] for _ in hit_lists]
+    docs = {d["id"]: d async for d in _records().find(
+        {"id": {"$in": ids}}, {"_id": 0},
+    )}
+    out: List[List[Dict[str, Any]]] = []
+    for hits in hit_lists:
+        rows = []
+        for rid, score in hits:
+            doc = docs.get(rid)
+            if doc is None:
+                ksearch.remove(rid)      # deleted by another worker
+                continue
+            doc = dict(doc)
+            doc["search_score"] = round(score, 4)
+            rows.append(_strip(doc))
+        out.append(rows)
+    return out
+
+
 async def get(record_id: str) -> Optional[Dict[str, Any]]:
     return await _records().find_one({"id": record_id}, {"_id": 0})
 
@@ -253,12 +316,11 @@ async def delete(record_id: str) -> bool:
     if not rec:
         return False
     await _records().delete_one({"id": record_id})
+    ksearch.remove(record_id)
     return True
 
 
 # --- Helpers ---------------------------------------------------------------
-import re
-
 def _compose_body(d: Distillation, src: FetchedSource) -> str:
     """The searchable text written into memory_bank — the architect's distilled
     knowledge, NEVER the raw transcript / readme / page body."""
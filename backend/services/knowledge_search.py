@@ -0,0 +1,267 @@
+"""
+Knowledge Bank lexical search index.
+
+In-process BM25 inverted index over `knowledge_records`, so
+`knowledge_ingestion.search(q=...)` is one ranked lookup instead of an
+unanchored `$regex` over four fields (which can never use a Mongo index).
+
+  * fields are weighted BM25F-style: title ×3, tags / concepts ×2,
+    summary / key points ×1 — a term in the title outranks the same term
+    buried in the summary
+  * multi-term queries are scored as a sum over terms; a term that isn't in
+    the vocabulary expands to indexed terms it prefixes ("robot" →
+    "robotics"), keeping the old substring behaviour for partial words
+  * the agent / project / source_type / tag filters are applied inside the
+    index, and `boost_agent` multiplies records tagged for that persona by
+    1 + KBASE_PERSONA_BOOST instead of filtering to them
+
+Mongo stays the source of truth, same contract as `memory_index`: hydrated
+at startup, kept in sync by ingest/reinforce/delete in this process, and
+catching up on rows written elsewhere (other workers, the research
+orchestrator, the YouTube pipeline) by `updated_at` every
+`KBASE_SEARCH_SYNC_S` seconds. Records deleted elsewhere drop out when the
+search fetches its hits by id.
+"""
+import bisect
+import math
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+SYNC_INTERVAL_S = float(os.environ.get("KBASE_SEARCH_SYNC_S", "5"))
+PERSONA_BOOST = float(os.environ.get("KBASE_PERSONA_BOOST", "0.5"))
+K1 = 1.2
+B = 0.75
+MAX_PREFIX_EXPANSION = 8
+
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "tags": 2.0,
+    "concepts": 2.0,
+    "summary": 1.0,
+    "key_points": 1.0,
+}
+
+INDEX_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "summary": 1, "key_points": 1, "tags": 1,
+    "concepts": 1, "related_agents": 1, "related_projects": 1,
+    "source_type": 1, "updated_at": 1,
+}
+
+STOPWORDS = frozenset({
+    "the", "and", "for", "with", "what", "when", "where", "why", "how",
+    "this", "that", "these", "those", "are", "was", "were", "have", "has",
+    "had", "do", "does", "did", "can", "could", "should", "would", "you",
+    "your", "yours", "we", "they", "them", "our", "their", "but", "not",
+    "tell", "give", "say", "ask", "please", "briefly", "summarise",
+    "summarize", "explain", "about", "into", "from", "than", "then",
+    "very", "just", "really", "kind", "of", "in", "on", "at", "to", "by",
+    "or", "as", "is", "be", "it", "an", "a", "i", "me", "my", "mine",
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9_\-]*")
+
+
+def tokenize(text: str) -> List[str]:
+    out = []
+    for tok in _TOKEN_RE.findall((text or "").lower()):
+        tok = tok.strip("-_")
+        if len(tok) < 2 or tok in STOPWORDS:
+            continue
+        # Fold plain plurals so "sensors" matches "sensor".
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        out.append(tok)
+    return out
+
+
+def _field_text(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return str(value or "")
+
+
+class _Doc:
+    __slots__ = ("tf", "length", "agents", "projects", "source_type", "tags")
+
+    def __init__(self, doc: Dict[str, Any]):
+        tf: Dict[str, float] = {}
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            for tok in tokenize(_field_text(doc.get(field))):
+                tf[tok] = tf.get(tok, 0.0) + weight
+                length += weight
+        self.tf = tf
+        self.length = length
+        self.agents = frozenset(doc.get("related_agents") or ())
+        self.projects = frozenset(doc.get("related_projects") or ())
+        source_type = doc.get("source_type")
+        self.source_type = getattr(source_type, "value", source_type)
+        self.tags = frozenset(doc.get("tags") or ())
+
+
+_DOCS: Dict[str, _Doc] = {}
+_POSTINGS: Dict[str, Dict[str, float]] = {}
+_STATE: Dict[str, Any] = {
+    "hydrated": False, "watermark": "", "last_sync": 0.0,
+    "total_length": 0.0, "vocab": None,
+}
+
+
+def is_hydrated() -> bool:
+    return bool(_STATE["hydrated"])
+
+
+def upsert(doc: Dict[str, Any]) -> None:
+    rid = doc.get("id")
+    if not rid:
+        return
+    remove(rid)
+    entry = _Doc(doc)
+    _DOCS[rid] = entry
+    _STATE["total_length"] += entry.length
+    for term, tf in entry.tf.items():
+        postings = _POSTINGS.get(term)
+        if postings is None:
+            postings = _POSTINGS[term] = {}
+            _STATE["vocab"] = None
+        postings[rid] = tf
+
+
+def remove(record_id: str) -> bool:
+    entry = _DOCS.pop(record_id, None)
+    if entry is None:
+        return False
+    _STATE["total_length"] -= entry.length
+    for term in entry.tf:
+        postings = _POSTINGS.get(term)
+        if postings is None:
+            continue
+        postings.pop(record_id, None)
+        if not postings:
+            del _POSTINGS[term]
+            _STATE["vocab"] = None
+    return True
+
+
+def _note_watermark(doc: Dict[str, Any]) -> None:
+    updated = str(doc.get("updated_at") or "")
+    if updated > _STATE["watermark"]:
+        _STATE["watermark"] = updated
+
+
+async def hydrate(collection: Any) -> Dict[str, Any]:
+    """(Re)build the index from every knowledge record."""
+    _DOCS.clear()
+    _POSTINGS.clear()
+    _STATE.update(watermark="", total_length=0.0, vocab=None)
+    async for doc in collection.find({}, INDEX_PROJECTION):
+        upsert(doc)
+        _note_watermark(doc)
+    _STATE.update(hydrated=True, last_sync=time.monotonic())
+    return stats()
+
+
+async def sync(collection: Any, *, force: bool = False) -> int:
+    """Re-index rows inserted or updated since the last hydrate/sync."""
+    if not force and time.monotonic() - _STATE["last_sync"] < SYNC_INTERVAL_S:
+        return 0
+    _STATE["last_sync"] = time.monotonic()
+    seen = 0
+    async for doc in collection.find(
+        {"updated_at": {"$gte": _STATE["watermark"]}}, INDEX_PROJECTION,
+    ):
+        upsert(doc)
+        _note_watermark(doc)
+        seen += 1
+    return seen
+
+
+def _vocab() -> List[str]:
+    if _STATE["vocab"] is None:
+        _STATE["vocab"] = sorted(_POSTINGS)
+    return _STATE["vocab"]
+
+
+def _expand(term: str) -> List[str]:
+    """Indexed terms for one query term: itself, or (if unknown) the
+    terms it prefixes, most common first."""
+    if term in _POSTINGS:
+        return [term]
+    if len(term) < 4:
+        return []
+    vocab = _vocab()
+    i = bisect.bisect_left(vocab, term)
+    found = []
+    while i < len(vocab) and vocab[i].startswith(term):
+        found.append(vocab[i])
+        i += 1
+    found.sort(key=lambda t: -len(_POSTINGS[t]))
+    return found[:MAX_PREFIX_EXPANSION]
+
+
+def _matches(entry: _Doc, agent: Optional[str], project_id: Optional[str],
+             source_type: Optional[str], tag: Optional[str]) -> bool:
+    if agent and agent not in entry.agents:
+        return False
+    if project_id and project_id not in entry.projects:
+        return False
+    if source_type and entry.source_type != source_type:
+        return False
+    if tag and tag not in entry.tags:
+        return False
+    return True
+
+
+def search(
+    query: str, *,
+    agent: Optional[str] = None,
+    project_id: Optional[str] = None,
+    source_type: Optional[str] = None,
+    tag: Optional[str] = None,
+    boost_agent: Optional[str] = None,
+    limit: int = 30,
+) -> List[Tuple[str, float]]:
+    """Top `limit` (record_id, score) pairs for a free-text query."""
+    n = len(_DOCS)
+    if not n:
+        return []
+    avgdl = max(_STATE["total_length"] / n, 1e-9)
+    scores: Dict[str, float] = {}
+    for term in dict.fromkeys(tokenize(query)):
+        for indexed in _expand(term):
+            postings = _POSTINGS[indexed]
+            df = len(postings)
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            for rid, tf in postings.items():
+                dl = _DOCS[rid].length
+                gain = idf * tf * (K1 + 1.0) / (tf + K1 * (1.0 - B + B * dl / avgdl))
+                scores[rid] = scores.get(rid, 0.0) + gain
+    ranked: List[Tuple[str, float]] = []
+    filtered = agent or project_id or source_type or tag
+    for rid, score in scores.items():
+        entry = _DOCS[rid]
+        if filtered and not _matches(entry, agent, project_id, source_type, tag):
+            continue
+        if boost_agent and boost_agent in entry.agents:
+            score *= 1.0 + PERSONA_BOOST
+        ranked.append((rid, score))
+    ranked.sort(key=lambda hit: (-hit[1], hit[0]))
+    return ranked[:limit]
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "records": len(_DOCS),
+        "terms": len(_POSTINGS),
+        "hydrated": is_hydrated(),
+        "watermark": _STATE["watermark"],
+    }
+
+
+def reset_in_memory_state() -> None:
+    _DOCS.clear()
+    _POSTINGS.clear()
+    _STATE.update(hydrated=False, watermark="", last_sync=0.0,
+                  total_length=0.0, vocab=None)
@@ -37,25 +37,20 @@ from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, urldefrag
 from uuid import uuid4
 
-from motor.motor_asyncio import AsyncIOMotorClient
-
+from services import mongo
 from services import memory_bank as mb
 from services import knowledge_ingestion as ki
+from services import llm_scheduler
 from services.source_fetchers import IngestError, classify, _fetch_github  # type: ignore
 from services.lesson_generator import generate_lesson as _generate_lesson
 
 logger = logging.getLogger("atlas.knowledge_watcher")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _watchers(): return _db()["watchers"]
@@ -148,6 +143,7 @@ async def list_sources(kind: Optional[str] = None) -> List[Dict[str, Any]]:
 
 
 # --- Run a watcher ---------------------------------------------------------
+@llm_scheduler.with_priority("batch", caller="knowledge_watcher")
 async def run_github_watcher(
     source_id: str, *, generate_lesson: bool = True, max_links: int = 40,
 ) -> Dict[str, Any]:
@@ -31,23 +31,17 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-from motor.motor_asyncio import AsyncIOMotorClient
-
+from services import mongo
 from services import llm_provider, memory_bank as mb
 from services import adaptation as ad
 
 logger = logging.getLogger("atlas.lesson_generator")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _lessons(): return _db()["lessons"]
@@ -144,7 +138,9 @@ async def generate_lesson(
         f"Reply with the JSON only."
     )
 
-    result = await llm_provider.send(agent or "minerva", _SYS, user_msg)
+    # Lessons are background output; they queue behind interactive chat.
+    result = await llm_provider.send(agent or "minerva", _SYS, user_msg,
+                                     cache="lesson_generator", priority="batch")
     raw = (result.get("text") or "").strip()
     data = _safe_json(raw)
     if not data:
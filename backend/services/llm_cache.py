@@ -0,0 +1,305 @@
+"""
+Response cache for `llm_provider.send`.
+
+Several background callers re-ask the LLM the exact same question: the
+knowledge distiller on a re-ingested URL, WorldWatch summarising a story
+that several feeds carry, lesson regeneration, twin deliberation over an
+unchanged twin. Callers opt in per call with a namespace
+(`send(..., cache="worldwatch.what_changed")`); nothing is cached otherwise.
+
+Tiers, checked in order:
+
+  * exact    — sha256 of (persona, provider, model, system, user) in an
+               in-process LRU (LLM_CACHE_MAX_ITEMS) with a per-entry TTL.
+  * store    — the same key in the `llm_cache` Mongo collection, so hits
+               survive restarts. A TTL index on `expires_at` purges old rows;
+               Mongo failures degrade to a miss, never an error.
+  * semantic — opt-in (`cache_semantic=True`). The user text is embedded with
+               the local hash embedder and compared by cosine against earlier
+               prompts with the same namespace, persona, model and system
+               prompt; ≥ LLM_CACHE_SIM_THRESHOLD reuses that answer. Process-
+               local, capped at LLM_CACHE_SEMANTIC_MAX prompts per partition.
+               The hash embedder is bag-of-words, so prompts one word apart
+               ("lower" / "higher cost") score ≈ 0.98: only opt in where
+               such a swap can't change the answer.
+
+Only clean answers are stored (no provider fallback, non-empty text).
+`stats()` reports per-namespace hit rate plus the provider latency and
+estimated tokens the hits saved.
+
+Tuning: LLM_CACHE (0 disables), LLM_CACHE_TTL_S, LLM_CACHE_MAX_ITEMS,
+LLM_CACHE_SIM_THRESHOLD, LLM_CACHE_SEMANTIC_MAX.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services import hash_embedder, mongo
+
+logger = logging.getLogger("atlas.llm_cache")
+
+ENABLED = os.environ.get("LLM_CACHE", "1").lower() not in ("0", "false", "no")
+DEFAULT_TTL_S = float(os.environ.get("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+MAX_ITEMS = int(os.environ.get("LLM_CACHE_MAX_ITEMS", "2048"))
+SIM_THRESHOLD = float(os.environ.get("LLM_CACHE_SIM_THRESHOLD", "0.97"))
+SEMANTIC_MAX = int(os.environ.get("LLM_CACHE_SEMANTIC_MAX", "512"))
+
+_FIELDS = ("text", "provider_used", "model_used")
+
+# key → (expires_monotonic, entry)
+_ENTRIES: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+# (namespace, persona, provider, model, system hash) → key → (expires, unit vector)
+Partition = Tuple[str, str, str, str, str]
+_SEMANTIC: Dict[Partition, "OrderedDict[str, Tuple[float, np.ndarray]]"] = {}
+_COUNTERS = ("lookups", "exact_hits", "store_hits", "semantic_hits", "misses",
+             "stores", "saved_ms", "saved_tokens_est")
+_STATS: Dict[str, Dict[str, float]] = {}
+
+
+def _col():
+    return mongo.collection("llm_cache")
+
+
+def _sha(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update((part or "").encode("utf-8", "replace"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def key_for(persona: str, provider: str, model: str, system_msg: str, user_text: str) -> str:
+    return _sha((persona or "").lower(), provider, model, system_msg, user_text)
+
+
+def _partition(namespace: str, persona: str, provider: str, model: str, system_msg: str) -> Partition:
+    return (namespace, (persona or "").lower(), provider, model, _sha(system_msg)[:16])
+
+
+def _ns(namespace: str) -> Dict[str, float]:
+    s = _STATS.get(namespace)
+    if s is None:
+        s = _STATS[namespace] = {k: 0 for k in _COUNTERS}
+    return s
+
+
+def _tokens_est(*texts: str) -> int:
+    return sum((len(t or "") + 3) // 4 for t in texts)
+
+
+# ---------------------------------------------------------------------------
+# In-process tiers
+# ---------------------------------------------------------------------------
+def _mem_get(key: str) -> Optional[Dict[str, Any]]:
+    entry = _ENTRIES.get(key)
+    if entry is None:
+        return None
+    if entry[0] < time.monotonic():
+        del _ENTRIES[key]
+        return None
+    _ENTRIES.move_to_end(key)
+    return entry[1]
+
+
+def _mem_put(key: str, entry: Dict[str, Any], ttl_s: float) -> None:
+    _ENTRIES[key] = (time.monotonic() + ttl_s, entry)
+    _ENTRIES.move_to_end(key)
+    while len(_ENTRIES) > MAX_ITEMS:
+        _ENTRIES.popitem(last=False)
+
+
+def _semantic_match(part: Partition, vec: np.ndarray) -> Optional[str]:
+    bucket = _SEMANTIC.get(part)
+    if not bucket or not vec.any():
+        return None
+    now = time.monotonic()
+    for key in [k for k, (exp, _) in bucket.items() if exp < now]:
+        del bucket[key]
+    if not bucket:
+        return None
+    keys = list(bucket)
+    sims = np.stack([bucket[k][1] for k in keys]) @ vec
+    best = int(np.argmax(sims))
+    return keys[best] if sims[best] >= SIM_THRESHOLD else None
+
+
+def _semantic_put(part: Partition, key: str, vec: np.ndarray, ttl_s: float) -> None:
+    if not vec.any():
+        return
+    bucket = _SEMANTIC.setdefault(part, OrderedDict())
+    bucket[key] = (time.monotonic() + ttl_s, vec)
+    bucket.move_to_end(key)
+    while len(bucket) > SEMANTIC_MAX:
+        bucket.popitem(last=False)
+
+
+# ---------------------------------------------------------------------------
+# Mongo tier
+# ---------------------------------------------------------------------------
+async def _store_get(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        doc = await _col().find_one(
+            {"key": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+            {"_id": 0},
+        )
+    except Exception as exc:    # noqa: BLE001
+        logger.warning("llm_cache read failed: %s", exc)
+        return None
+    return doc
+
+
+async def _store_put(key: str, namespace: str, entry: Dict[str, Any], ttl_s: float) -> None:
+    now = datetime.now(timezone.utc)
+    doc = {
+        "key": key, "namespace": namespace, **entry,
+        "created_at": now, "expires_at": now + timedelta(seconds=ttl_s),
+    }
+    try:
+        await _col().update_one({"key": key}, {"$set": doc}, upsert=True)
+    except Exception as exc:    # noqa: BLE001
+        logger.warning("llm_cache write failed: %s", exc)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+def _hit(namespace: str, tier: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    s = _ns(namespace)
+    s[f"{tier}_hits"] += 1
+    s["saved_ms"] += float(entry.get("latency_ms") or 0.0)
+    s["saved_tokens_est"] += int(entry.get("tokens_est") or 0)
+    out = {f: entry.get(f) for f in _FIELDS}
+    out["fallback_reason"] = None
+    out["cache_hit"] = tier
+    return out
+
+
+async def lookup(
+    namespace: str,
+    persona: str,
+    provider: str,
+    model: str,
+    system_msg: str,
+    user_text: str,
+    *,
+    semantic: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """A cached `send` result ({text, provider_used, model_used,
+    fallback_reason, cache_hit}) or None on a miss."""
+    s = _ns(namespace)
+    s["lookups"] += 1
+    key = key_for(persona, provider, model, system_msg, user_text)
+    entry = _mem_get(key)
+    if entry is not None:
+        return _hit(namespace, "exact", entry)
+    doc = await _store_get(key)
+    if doc is not None:
+        entry = {f: doc.get(f) for f in (*_FIELDS, "latency_ms", "tokens_est")}
+        expires = doc["expires_at"]
+        if expires.tzinfo is None:      # motor returns naive UTC by default
+            expires = expires.replace(tzinfo=timezone.utc)
+        remaining = (expires - datetime.now(timezone.utc)).total_seconds()
+        _mem_put(key, entry, max(remaining, 1.0))
+        return _hit(namespace, "store", entry)
+    if semantic:
+        part = _partition(namespace, persona, provider, model, system_msg)
+        near = _semantic_match(part, hash_embedder.embed(user_text))
+        entry = _mem_get(near) if near else None
+        if entry is not None:
+            return _hit(namespace, "semantic", entry)
+    s["misses"] += 1
+    return None
+
+
+async def store(
+    namespace: str,
+    persona: str,
+    provider: str,
+    model: str,
+    system_msg: str,
+    user_text: str,
+    text: str,
+    *,
+    latency_ms: float,
+    ttl_s: Optional[float] = None,
+    semantic: bool = False,
+) -> None:
+    """Remember a clean `send` answer under the prompt it came from."""
+    ttl = DEFAULT_TTL_S if ttl_s is None else float(ttl_s)
+    if ttl <= 0 or not (text or "").strip():
+        return
+    key = key_for(persona, provider, model, system_msg, user_text)
+    entry = {
+        "text": text, "provider_used": provider, "model_used": model,
+        "latency_ms": round(float(latency_ms), 2),
+        "tokens_est": _tokens_est(system_msg, user_text, text),
+    }
+    _mem_put(key, entry, ttl)
+    if semantic:
+        part = _partition(namespace, persona, provider, model, system_msg)
+        _semantic_put(part, key, hash_embedder.embed(user_text), ttl)
+    _ns(namespace)["stores"] += 1
+    await _store_put(key, namespace, entry, ttl)
+
+
+async def clear(namespace: Optional[str] = None) -> Dict[str, Any]:
+    """Drop cached answers — one namespace, or everything."""
+    if namespace is None:
+        dropped = len(_ENTRIES)
+        _ENTRIES.clear()
+        _SEMANTIC.clear()
+        filt: Dict[str, Any] = {}
+    else:
+        # Exact-tier keys don't carry their namespace; the Mongo rows do.
+        keys: List[str] = []
+        for part in [p for p in _SEMANTIC if p[0] == namespace]:
+            keys.extend(_SEMANTIC.pop(part))
+        filt = {"namespace": namespace}
+        try:
+            async for doc in _col().find(filt, {"_id": 0, "key": 1}):
+                keys.append(doc["key"])
+        except Exception as exc:    # noqa: BLE001
+            logger.warning("llm_cache clear scan failed: %s", exc)
+        dropped = sum(1 for k in set(keys) if _ENTRIES.pop(k, None) is not None)
+    try:
+        res = await _col().delete_many(filt)
+        stored = res.deleted_count
+    except Exception as exc:    # noqa: BLE001
+        logger.warning("llm_cache clear failed: %s", exc)
+        stored = 0
+    return {"namespace": namespace, "memory_dropped": dropped, "store_dropped": stored}
+
+
+def stats() -> Dict[str, Any]:
+    namespaces = {}
+    for name, s in sorted(_STATS.items()):
+        hits = s["exact_hits"] + s["store_hits"] + s["semantic_hits"]
+        namespaces[name] = {
+            **{k: (round(v, 2) if isinstance(v, float) else v) for k, v in s.items()},
+            "hit_rate": round(hits / s["lookups"], 4) if s["lookups"] else 0.0,
+        }
+    return {
+        "enabled": ENABLED,
+        "ttl_s": DEFAULT_TTL_S,
+        "cached": len(_ENTRIES),
+        "max_items": MAX_ITEMS,
+        "semantic_threshold": SIM_THRESHOLD,
+        "semantic_prompts": sum(len(b) for b in _SEMANTIC.values()),
+        "saved_ms": round(sum(s["saved_ms"] for s in _STATS.values()), 2),
+        "saved_tokens_est": int(sum(s["saved_tokens_est"] for s in _STATS.values())),
+        "namespaces": namespaces,
+    }
+
+
+def reset_in_memory_state() -> None:
+    _ENTRIES.clear()
+    _SEMANTIC.clear()
+    _STATS.clear()
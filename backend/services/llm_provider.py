@@ -19,17 +19,36 @@ Design constraints:
   - Per-call provider/model override (kwargs win over persona settings)
   - No singleton at module import — clients are lazy-instantiated so
     importing this file never hits the network
+  - HTTP connections are pooled per base URL and each provider has a
+    concurrency limit (see `provider_clients`), so council fan-out reuses
+    warm keep-alive connections instead of reconnecting per call
+  - Repeatable background prompts can opt into the response cache with
+    `send(..., cache="<namespace>")` (see `llm_cache`)
+  - Every call is admitted by `llm_scheduler` (priority classes, budgets,
+    back-pressure, spill-over to a secondary provider) before it reaches a
+    provider, so background work can't starve interactive chat
+
+Streaming: `stream(...)` is the async-generator twin of `send(...)`. It
+yields `{"type": "delta", "text": ...}` events as tokens arrive (Ollama and
+LM Studio via OpenAI-style SSE; Emergent's LlmChat has no streaming API,
+so its whole reply arrives as one delta) and finishes with a
+`{"type": "done", ...}` event carrying the same fields `send` returns.
 """
 import asyncio
+import json
 import logging
 import os
-from typing import Any, Dict, Optional, Tuple
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 from uuid import uuid4
 
 import httpx
 from dotenv import load_dotenv
 from emergentintegrations.llm.chat import LlmChat, UserMessage
-from motor.motor_asyncio import AsyncIOMotorClient
+from services import llm_cache
+from services import llm_scheduler
+from services import mongo
+from services import provider_clients
 
 load_dotenv()
 logger = logging.getLogger("atlas.llm_provider")
@@ -37,7 +56,6 @@ logger = logging.getLogger("atlas.llm_provider")
 EMERGENT_LLM_KEY = os.environ.get("EMERGENT_LLM_KEY", "")
 OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
 LMSTUDIO_BASE_URL = os.environ.get("LMSTUDIO_BASE_URL", "http://localhost:1234/v1")
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
 
 # --- Persona defaults --------------------------------------------------------
@@ -63,14 +81,10 @@ EMERGENT_MODEL_MAP = {
 
 
 # --- Mongo settings access ---------------------------------------------------
-_mongo_client: Optional[AsyncIOMotorClient] = None
 
 
 def _get_settings_collection():
-    global _mongo_client
-    if _mongo_client is None:
-        _mongo_client = AsyncIOMotorClient(MONGO_URL)
-    return _mongo_client[DB_NAME]["atlas_settings"]
+    return mongo.collection("atlas_settings", db_name=DB_NAME)
 
 
 async def get_persona_model(persona: str) -> Tuple[str, str]:
@@ -127,8 +141,10 @@ async def _send_emergent(system_msg: str, user_text: str, model: str, session_id
         api_key=EMERGENT_LLM_KEY,
         session_id=session_id,
         system_message=system_msg,
+        client_factory=provider_clients.client,
     ).with_model(*provider_pair)
-    raw = await chat.send_message(UserMessage(text=user_text))
+    async with provider_clients.slot("emergent"):
+        raw = await chat.send_message(UserMessage(text=user_text))
     return raw if isinstance(raw, str) else ""
 
 
@@ -143,9 +159,9 @@ async def _send_ollama(system_msg: str, user_text: str, model: str) -> str:
         ],
         "stream": False,
     }
-    async with httpx.AsyncClient(timeout=120.0) as client:
+    async with provider_clients.slot("ollama"):
         try:
-            resp = await client.post(url, json=payload)
+            resp = await provider_clients.client(OLLAMA_HOST).post(url, json=payload)
         except httpx.RequestError as exc:
             raise OllamaUnreachable(f"Cannot reach Ollama at {OLLAMA_HOST}: {exc}") from exc
         if resp.status_code >= 400:
@@ -168,9 +184,9 @@ async def _send_lmstudio(system_msg: str, user_text: str, model: str) -> str:
         ],
         "stream": False,
     }
-    async with httpx.AsyncClient(timeout=120.0) as client:
+    async with provider_clients.slot("lmstudio"):
         try:
-            resp = await client.post(url, json=payload)
+            resp = await provider_clients.client(LMSTUDIO_BASE_URL).post(url, json=payload)
         except httpx.RequestError as exc:
             raise LMStudioUnreachable(f"Cannot reach LM Studio at {LMSTUDIO_BASE_URL}: {exc}") from exc
         if resp.status_code >= 400:
@@ -182,6 +198,79 @@ async def _send_lmstudio(system_msg: str, user_text: str, model: str) -> str:
         raise LMStudioError(f"Malformed LM Studio response: {exc}") from exc
 
 
+async def _stream_openai_compat(
+    provider: str, url: str, payload: Dict[str, Any], label: str,
+    unreachable: type, error: type,
+) -> AsyncIterator[str]:
+    """POST an OpenAI-compatible chat completion with `stream: true` and
+    yield each content delta from the SSE `data:` lines. The provider slot
+    is held until the stream ends."""
+    payload = {**payload, "stream": True}
+    async with provider_clients.slot(provider):
+        try:
+            async with provider_clients.client(url).stream("POST", url, json=payload) as resp:
+                if resp.status_code >= 400:
+                    body = (await resp.aread()).decode("utf-8", "replace")
+                    raise error(f"{label} HTTP {resp.status_code}: {body[:200]}")
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        return
+                    try:
+                        delta = json.loads(data)["choices"][0].get("delta") or {}
+                    except (ValueError, KeyError, IndexError) as exc:
+                        raise error(f"Malformed {label} stream chunk: {exc}") from exc
+                    text = delta.get("content")
+                    if text:
+                        yield text
+        except httpx.RequestError as exc:
+            raise unreachable(f"Cannot reach {label} at {url}: {exc}") from exc
+
+
+def _stream_ollama(system_msg: str, user_text: str, model: str) -> AsyncIterator[str]:
+    return _stream_openai_compat(
+        "ollama", f"{OLLAMA_HOST.rstrip('/')}/v1/chat/completions",
+        {"model": model, "messages": [
+            {"role": "system", "content": system_msg},
+            {"role": "user", "content": user_text},
+        ]},
+        "Ollama", OllamaUnreachable, OllamaError,
+    )
+
+
+def _stream_lmstudio(system_msg: str, user_text: str, model: str) -> AsyncIterator[str]:
+    return _stream_openai_compat(
+        "lmstudio", f"{LMSTUDIO_BASE_URL.rstrip('/')}/chat/completions",
+        {"model": model, "messages": [
+            {"role": "system", "content": system_msg},
+            {"role": "user", "content": user_text},
+        ]},
+        "LM Studio", LMStudioUnreachable, LMStudioError,
+    )
+
+
+async def _stream_emergent(system_msg: str, user_text: str, model: str, session_id: str) -> AsyncIterator[str]:
+    """LlmChat has no streaming call — the full reply is one delta."""
+    text = await _send_emergent(system_msg, user_text, model, session_id)
+    if text:
+        yield text
+
+
+async def _send_emergent_admitted(
+    system_msg: str, user_text: str, session_id: str, *,
+    tokens: int, priority: Optional[str], persona: str,
+) -> str:
+    """Emergent gpt-5.2 fallback call, admitted on the emergent gate."""
+    async with llm_scheduler.admit("emergent", "gpt-5.2", tokens=tokens,
+                                   priority=priority, caller=persona) as grant:
+        text = await _send_emergent(system_msg, user_text, "gpt-5.2", session_id)
+        grant.settle(llm_scheduler.count_tokens(
+            system_msg, user_text, text if isinstance(text, str) else ""))
+    return text
+
+
 # --- Exceptions (local-provider unreachable triggers fallback) ---------------
 class OllamaUnreachable(Exception): pass    # noqa: E701
 class OllamaError(Exception): pass          # noqa: E701
@@ -198,6 +287,10 @@ async def send(
     provider_override: Optional[str] = None,
     model_override: Optional[str] = None,
     session_id: Optional[str] = None,
+    cache: Optional[str] = None,
+    cache_ttl_s: Optional[float] = None,
+    cache_semantic: bool = False,
+    priority: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Send one prompt to the best LLM for `persona`.
 
@@ -205,6 +298,17 @@ async def send(
     Fallback rules:
       - ollama unreachable / error → emergent gpt-5.2
       - lmstudio unreachable / error → emergent gpt-5.2
+
+    `cache="<namespace>"` opts the call into the response cache (see
+    `llm_cache`); the result then also carries `cache_hit` (None on a miss,
+    else "exact" / "store" / "semantic"). `cache_semantic=True` additionally
+    reuses answers to near-identical prompts.
+
+    The call is admitted through `llm_scheduler` first: `priority`
+    ("interactive" / "autonomic" / "batch") overrides the ambient class. A
+    call spilled to the secondary provider reports `fallback_reason`
+    "spilled: <provider> backlog". Raises `LLMBackpressure` when the class
+    queue is full.
     """
     sid = session_id or f"{persona}-{uuid4().hex[:12]}"
     provider, model = await get_persona_model(persona)
@@ -212,37 +316,158 @@ async def send(
         provider = provider_override.lower()
     if model_override:
         model = model_override
+    if provider not in ("ollama", "lmstudio"):
+        provider = "emergent"
+
+    use_cache = bool(cache) and llm_cache.ENABLED
+    if use_cache:
+        hit = await llm_cache.lookup(cache, persona, provider, model, system_msg,
+                                     user_text, semantic=cache_semantic)
+        if hit is not None:
+            return hit
+    requested = (provider, model)
+    started = time.perf_counter()
 
     fallback_reason: Optional[str] = None
     text = ""
 
-    try:
-        if provider == "ollama":
-            text = await _send_ollama(system_msg, user_text, model)
-        elif provider == "lmstudio":
-            text = await _send_lmstudio(system_msg, user_text, model)
-        else:
-            text = await _send_emergent(system_msg, user_text, model, sid)
-            provider = "emergent"
-    except (OllamaUnreachable, OllamaError, LMStudioUnreachable, LMStudioError) as exc:
-        fallback_reason = str(exc)[:200]
-        logger.warning("LLM fallback to emergent (%s): %s", provider, fallback_reason)
-        text = await _send_emergent(system_msg, user_text, "gpt-5.2", sid)
-        provider = "emergent"
-        model = "gpt-5.2"
-    except Exception as exc:  # pragma: no cover — last-resort
-        logger.exception("LLM send failed for persona=%s: %s", persona, exc)
-        raise
-
+    tokens = llm_scheduler.estimate_tokens(system_msg, user_text)
+    local_failed = False
+    async with llm_scheduler.admit(provider, model, tokens=tokens,
+                                   priority=priority, caller=persona) as grant:
+        if grant.spilled_from:
+            provider, model = grant.provider, grant.model
+            fallback_reason = f"spilled: {grant.spilled_from} backlog"
+        try:
+            if provider == "ollama":
+                text = await _send_ollama(system_msg, user_text, model)
+            elif provider == "lmstudio":
+                text = await _send_lmstudio(system_msg, user_text, model)
+            else:
+                text = await _send_emergent(system_msg, user_text, model, sid)
+                provider = "emergent"
+        except (OllamaUnreachable, OllamaError, LMStudioUnreachable, LMStudioError) as exc:
+            fallback_reason = str(exc)[:200]
+            logger.warning("LLM fallback to emergent (%s): %s", provider, fallback_reason)
+            local_failed = True
+        except Exception as exc:  # pragma: no cover — last-resort
+            logger.exception("LLM send failed for persona=%s: %s", persona, exc)
+            raise
+        grant.settle(llm_scheduler.count_tokens(
+            system_msg, user_text, text if isinstance(text, str) else ""))
+
+    # Fallbacks leave the local slot and are admitted on the emergent gate,
+    # so they wait for (and are charged to) Emergent's own budgets.
+    if local_failed:
+        text = await _send_emergent_admitted(system_msg, user_text, sid,
+                                             tokens=tokens, priority=priority, persona=persona)
+        provider, model = "emergent", "gpt-5.2"
     if not isinstance(text, str) or not text.strip():
         # Final defensive fallback — never let the caller see None
         logger.warning("Empty LLM response for persona=%s provider=%s", persona, provider)
-        text = await _send_emergent(system_msg, user_text, "gpt-5.2", f"{sid}-retry")
+        text = await _send_emergent_admitted(system_msg, user_text, f"{sid}-retry",
+                                             tokens=tokens, priority=priority, persona=persona)
+        provider, model = "emergent", "gpt-5.2"
+        fallback_reason = fallback_reason or "empty_response_retry"
+
+    out = {
+        "text": text,
+        "provider_used": provider,
+        "model_used": model,
+        "fallback_reason": fallback_reason,
+    }
+    if use_cache:
+        out["cache_hit"] = None
+        if fallback_reason is None:
+            await llm_cache.store(
+                cache, persona, *requested, system_msg, user_text, text,
+                latency_ms=(time.perf_counter() - started) * 1000.0,
+                ttl_s=cache_ttl_s, semantic=cache_semantic,
+            )
+    return out
+
+
+async def stream(
+    persona: str,
+    system_msg: str,
+    user_text: str,
+    *,
+    provider_override: Optional[str] = None,
+    model_override: Optional[str] = None,
+    session_id: Optional[str] = None,
+    priority: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Streaming `send`. Yields delta events, then one done event with
+    {text, provider_used, model_used, fallback_reason}.
+
+    Same fallback rules as `send`. If a local provider fails after some
+    tokens were already yielded, a `{"type": "reset"}` event tells the
+    consumer to discard them before the Emergent fallback streams in.
+    The scheduler slot is held until the stream finishes; a fallback first
+    releases it and is admitted on the emergent gate.
+    """
+    sid = session_id or f"{persona}-{uuid4().hex[:12]}"
+    provider, model = await get_persona_model(persona)
+    if provider_override:
+        provider = provider_override.lower()
+    if model_override:
+        model = model_override
+    if provider not in ("ollama", "lmstudio"):
         provider = "emergent"
-        model = "gpt-5.2"
+
+    fallback_reason: Optional[str] = None
+    parts = []
+    tokens = llm_scheduler.estimate_tokens(system_msg, user_text)
+    local_failed = False
+    async with llm_scheduler.admit(provider, model, tokens=tokens,
+                                   priority=priority, caller=persona) as grant:
+        if grant.spilled_from:
+            provider, model = grant.provider, grant.model
+            fallback_reason = f"spilled: {grant.spilled_from} backlog"
+        try:
+            if provider == "ollama":
+                source = _stream_ollama(system_msg, user_text, model)
+            elif provider == "lmstudio":
+                source = _stream_lmstudio(system_msg, user_text, model)
+            else:
+                source = _stream_emergent(system_msg, user_text, model, sid)
+                provider = "emergent"
+            async for chunk in source:
+                parts.append(chunk)
+                yield {"type": "delta", "text": chunk}
+        except (OllamaUnreachable, OllamaError, LMStudioUnreachable, LMStudioError) as exc:
+            fallback_reason = str(exc)[:200]
+            logger.warning("LLM stream fallback to emergent (%s): %s", provider, fallback_reason)
+            local_failed = True
+        grant.settle(llm_scheduler.count_tokens(system_msg, user_text, "".join(parts)))
+
+    # As in `send`: the fallback gets its own admission on the emergent gate.
+    if local_failed:
+        if parts:
+            parts = []
+            yield {"type": "reset", "reason": fallback_reason}
+        provider, model = "emergent", "gpt-5.2"
+        async with llm_scheduler.admit(provider, model, tokens=tokens,
+                                       priority=priority, caller=persona) as fallback:
+            async for chunk in _stream_emergent(system_msg, user_text, model, sid):
+                parts.append(chunk)
+                yield {"type": "delta", "text": chunk}
+            fallback.settle(llm_scheduler.count_tokens(system_msg, user_text, "".join(parts)))
+
+    text = "".join(parts)
+    if not text.strip():
+        logger.warning("Empty LLM stream for persona=%s provider=%s", persona, provider)
+        if parts:
+            yield {"type": "reset", "reason": "empty_response_retry"}
+        text = await _send_emergent_admitted(system_msg, user_text, f"{sid}-retry",
+                                             tokens=tokens, priority=priority, persona=persona)
+        provider, model = "emergent", "gpt-5.2"
         fallback_reason = fallback_reason or "empty_response_retry"
+        if text:
+            yield {"type": "delta", "text": text}
 
-    return {
+    yield {
+        "type": "done",
         "text": text,
         "provider_used": provider,
         "model_used": model,
@@ -256,30 +481,34 @@ async def health() -> Dict[str, Any]:
 
     Cheap: skips Emergent (always assumed reachable if key present), just
     pings Ollama /api/tags and LM Studio /v1/models with a 3s timeout.
+    Also reports the pooled-client and per-provider queue metrics.
     """
     out: Dict[str, Any] = {
         "emergent": {"configured": bool(EMERGENT_LLM_KEY), "ok": bool(EMERGENT_LLM_KEY)},
         "ollama":   {"host": OLLAMA_HOST, "ok": False, "models": [], "error": None},
         "lmstudio": {"host": LMSTUDIO_BASE_URL, "ok": False, "models": [], "error": None},
     }
-    async with httpx.AsyncClient(timeout=3.0) as client:
-        # Ollama
-        try:
-            r = await client.get(f"{OLLAMA_HOST.rstrip('/')}/api/tags")
-            if r.status_code < 400:
-                out["ollama"]["ok"] = True
-                data = r.json()
-                out["ollama"]["models"] = [m.get("name") for m in data.get("models", [])][:20]
-        except Exception as exc:
-            out["ollama"]["error"] = str(exc)[:120]
-        # LM Studio
-        try:
-            r = await client.get(f"{LMSTUDIO_BASE_URL.rstrip('/')}/models")
-            if r.status_code < 400:
-                out["lmstudio"]["ok"] = True
-                data = r.json()
-                models = data.get("data", []) if isinstance(data, dict) else []
-                out["lmstudio"]["models"] = [m.get("id") for m in models][:20]
-        except Exception as exc:
-            out["lmstudio"]["error"] = str(exc)[:120]
+    # Ollama
+    try:
+        r = await provider_clients.client(OLLAMA_HOST).get(
+            f"{OLLAMA_HOST.rstrip('/')}/api/tags", timeout=3.0)
+        if r.status_code < 400:
+            out["ollama"]["ok"] = True
+            data = r.json()
+            out["ollama"]["models"] = [m.get("name") for m in data.get("models", [])][:20]
+    except Exception as exc:
+        out["ollama"]["error"] = str(exc)[:120]
+    # LM Studio
+    try:
+        r = await provider_clients.client(LMSTUDIO_BASE_URL).get(
+            f"{LMSTUDIO_BASE_URL.rstrip('/')}/models", timeout=3.0)
+        if r.status_code < 400:
+            out["lmstudio"]["ok"] = True
+            data = r.json()
+            models = data.get("data", []) if isinstance(data, dict) else []
+            out["lmstudio"]["models"] = [m.get("id") for m in models][:20]
+    except Exception as exc:
+        out["lmstudio"]["error"] = str(exc)[:120]
+    out["pool"] = provider_clients.stats()
+    out["scheduler"] = llm_scheduler.stats()
     return out
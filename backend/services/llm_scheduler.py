@@ -0,0 +1,437 @@
+"""
+Priority-aware admission control for LLM calls.
+
+Everything that reaches `llm_provider.send` / `stream` used to go straight to
+the provider, so a research cycle's batch of distillations and lessons could
+hold every provider slot while the HUD chat waited behind it. Calls now pass
+through one gate per provider first:
+
+  * priority classes  — interactive > autonomic > batch. A call's class is
+                        the `priority=` kwarg, else the ambient class set
+                        with `priority(...)` / `@with_priority(...)` (a
+                        context variable, so tasks spawned inside a research
+                        cycle inherit "batch"), else LLM_DEFAULT_PRIORITY.
+                        A waiter is promoted one class per
+                        LLM_SCHED_AGING_S waited, so batch work is delayed,
+                        never starved.
+  * fair queuing      — within a class, callers (the ambient caller name,
+                        else the persona) are served round-robin, so one
+                        chatty flow can't monopolise its class.
+  * budgets           — concurrency (the provider's `provider_clients`
+                        limit) plus optional token buckets: LLM_RPM_<P>
+                        requests/min and LLM_TPM_<P> tokens/min, charged with
+                        an estimate up front and settled with the real size.
+  * back-pressure     — each class queue is bounded (LLM_QUEUE_MAX_<CLASS>);
+                        past it the call fails fast with `LLMBackpressure`.
+  * spill-over        — when the primary is backed up (LLM_SPILL_AFTER
+                        waiters ahead, or its token budget is dry) the call
+                        is admitted on LLM_SPILL_<P> ("provider:model")
+                        instead, if that one isn't backed up too. Local
+                        providers spill to Emergent by default, matching the
+                        error fallback in `llm_provider`.
+
+LLM_SCHEDULER=0 turns admission control off (every call is admitted at once).
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional, Tuple
+
+from services import provider_clients
+
+PRIORITIES = ("interactive", "autonomic", "batch")
+_RANK = {p: i for i, p in enumerate(PRIORITIES)}
+
+ENABLED = os.environ.get("LLM_SCHEDULER", "1").lower() not in ("0", "false", "no")
+DEFAULT_PRIORITY = os.environ.get("LLM_DEFAULT_PRIORITY", "interactive")
+AGING_S = float(os.environ.get("LLM_SCHED_AGING_S", "20"))
+SPILL_AFTER = int(os.environ.get("LLM_SPILL_AFTER", "2"))
+COMPLETION_TOKENS_EST = int(os.environ.get("LLM_COMPLETION_TOKENS_EST", "500"))
+
+DEFAULT_QUEUE_MAX = {"interactive": 64, "autonomic": 32, "batch": 16}
+DEFAULT_SPILL = {
+    "ollama": "emergent:gpt-5.2",
+    "lmstudio": "emergent:gpt-5.2",
+}
+
+
+class LLMBackpressure(RuntimeError):
+    """A priority class's queue for a provider is full."""
+
+
+_CONTEXT: ContextVar[Optional[Tuple[str, Optional[str]]]] = ContextVar("llm_priority", default=None)
+
+
+def _check(priority: str) -> str:
+    if priority not in _RANK:
+        raise ValueError(f"unknown LLM priority {priority!r} (expected one of {PRIORITIES})")
+    return priority
+
+
+@contextmanager
+def priority(cls: str, caller: Optional[str] = None) -> Iterator[None]:
+    """Run the enclosed LLM calls (and tasks spawned inside) as `cls`."""
+    token = _CONTEXT.set((_check(cls), caller))
+    try:
+        yield
+    finally:
+        _CONTEXT.reset(token)
+
+
+def with_priority(cls: str, caller: Optional[str] = None):
+    """Decorator form of `priority` for async entry points."""
+    _check(cls)
+
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with priority(cls, caller):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def current() -> Tuple[str, Optional[str]]:
+    return _CONTEXT.get() or (DEFAULT_PRIORITY, None)
+
+
+def count_tokens(*texts: str) -> int:
+    """≈4 characters per token."""
+    return sum((len(t or "") + 3) // 4 for t in texts)
+
+
+def estimate_tokens(*prompt: str) -> int:
+    """Prompt tokens plus the expected completion, charged at admission."""
+    return count_tokens(*prompt) + COMPLETION_TOKENS_EST
+
+
+# ---------------------------------------------------------------------------
+# Budgets
+# ---------------------------------------------------------------------------
+class _Bucket:
+    """Token bucket refilled continuously at `per_minute / 60` per second."""
+    __slots__ = ("capacity", "rate", "level", "stamp")
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.stamp = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def eta(self, need: float) -> float:
+        """Seconds until `need` (clamped to capacity) is available."""
+        self._refill()
+        short = min(need, self.capacity) - self.level
+        return short / self.rate if short > 0 else 0.0
+
+    def take(self, n: float) -> None:
+        self._refill()
+        # May go negative (settling an underestimate); refill repays it.
+        self.level = min(self.capacity, self.level - n)
+
+
+def _bucket(env: str) -> Optional[_Bucket]:
+    try:
+        per_minute = float(os.environ.get(env) or 0)
+    except ValueError:
+        per_minute = 0.0
+    return _Bucket(per_minute) if per_minute > 0 else None
+
+
+def _queue_max(cls: str) -> int:
+    raw = os.environ.get(f"LLM_QUEUE_MAX_{cls.upper()}")
+    try:
+        return int(raw) if raw else DEFAULT_QUEUE_MAX[cls]
+    except ValueError:
+        return DEFAULT_QUEUE_MAX[cls]
+
+
+def _spill_target(provider: str) -> Optional[Tuple[str, str]]:
+    raw = os.environ.get(f"LLM_SPILL_{provider.upper()}", DEFAULT_SPILL.get(provider, ""))
+    target, _, model = raw.partition(":")
+    target = target.strip().lower()
+    if not target or target == provider:
+        return None
+    return target, (model.strip() or "gpt-5.2")
+
+
+# ---------------------------------------------------------------------------
+# Per-provider gate
+# ---------------------------------------------------------------------------
+class _Waiter:
+    __slots__ = ("priority", "caller", "tokens", "fut", "enqueued")
+
+    def __init__(self, priority: str, caller: str, tokens: int, fut: "asyncio.Future[None]"):
+        self.priority = priority
+        self.caller = caller
+        self.tokens = tokens
+        self.fut = fut
+        self.enqueued = time.monotonic()
+
+
+class _Gate:
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.limit = provider_clients.limit_for(provider)
+        self.rpm = _bucket(f"LLM_RPM_{provider.upper()}")
+        self.tpm = _bucket(f"LLM_TPM_{provider.upper()}")
+        self.in_flight = 0
+        # class → caller → FIFO of waiters; OrderedDict order is the
+        # round-robin order (a served caller moves to the back).
+        self.queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {
+            p: OrderedDict() for p in PRIORITIES
+        }
+        self.depth = {p: 0 for p in PRIORITIES}
+        self.admitted = {p: 0 for p in PRIORITIES}
+        self.rejected = {p: 0 for p in PRIORITIES}
+        self.wait_ms_total = {p: 0.0 for p in PRIORITIES}
+        self.wait_ms_max = {p: 0.0 for p in PRIORITIES}
+        self.spilled_out = 0
+        self.spilled_in = 0
+        self.tokens_charged = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # -- budgets ------------------------------------------------------------
+    def budget_eta(self, tokens: int) -> float:
+        eta = 0.0
+        if self.rpm is not None:
+            eta = max(eta, self.rpm.eta(1))
+        if self.tpm is not None:
+            eta = max(eta, self.tpm.eta(tokens))
+        return eta
+
+    def _charge(self, tokens: int) -> None:
+        if self.rpm is not None:
+            self.rpm.take(1)
+        if self.tpm is not None:
+            self.tpm.take(tokens)
+        self.tokens_charged += tokens
+
+    def settle(self, estimated: int, actual: int) -> None:
+        if self.tpm is not None and actual != estimated:
+            self.tpm.take(actual - estimated)
+        self.tokens_charged += actual - estimated
+
+    # -- queue --------------------------------------------------------------
+    def waiting(self) -> int:
+        return sum(self.depth.values())
+
+    def queued_ahead(self, cls: str) -> int:
+        """Waiters that would be served before a new `cls` arrival."""
+        return sum(self.depth[p] for p in PRIORITIES if _RANK[p] <= _RANK[cls])
+
+    def would_wait(self, tokens: int) -> bool:
+        return self.in_flight >= self.limit or self.waiting() > 0 or self.budget_eta(tokens) > 0
+
+    def backed_up(self, cls: str, tokens: int) -> bool:
+        if not self.would_wait(tokens):
+            return False
+        return (self.queued_ahead(cls) >= SPILL_AFTER
+                or self.depth[cls] >= _queue_max(cls)
+                or self.budget_eta(tokens) > 0)
+
+    def _pick(self) -> Optional[_Waiter]:
+        now = time.monotonic()
+        best: Optional[Tuple[int, float, _Waiter]] = None
+        for cls in PRIORITIES:
+            callers = self.queues[cls]
+            if not callers:
+                continue
+            head = next(iter(callers.values()))[0]
+            rank = _RANK[cls]
+            if AGING_S > 0:
+                rank -= int((now - head.enqueued) / AGING_S)
+            if best is None or (rank, head.enqueued) < best[:2]:
+                best = (rank, head.enqueued, head)
+        return best[2] if best else None
+
+    def _remove(self, w: _Waiter, *, served: bool) -> None:
+        callers = self.queues[w.priority]
+        fifo = callers.pop(w.caller)
+        if served:
+            fifo.popleft()
+        else:
+            fifo.remove(w)
+        if fifo:
+            callers[w.caller] = fifo        # back of the round-robin
+        self.depth[w.priority] -= 1
+
+    def _record(self, cls: str, waited_ms: float) -> None:
+        self.admitted[cls] += 1
+        self.wait_ms_total[cls] += waited_ms
+        self.wait_ms_max[cls] = max(self.wait_ms_max[cls], waited_ms)
+
+    def _pump(self) -> None:
+        while self.in_flight < self.limit:
+            w = self._pick()
+            if w is None:
+                return
+            eta = self.budget_eta(w.tokens)
+            if eta > 0:
+                self._wake_in(eta)
+                return
+            self._remove(w, served=True)
+            self._charge(w.tokens)
+            self.in_flight += 1
+            self._record(w.priority, (time.monotonic() - w.enqueued) * 1000.0)
+            w.fut.set_result(None)
+
+    def _wake_in(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        if self._timer is not None and self._timer_loop is loop:
+            return
+        self._timer_loop = loop
+        self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = self._timer_loop = None
+        self._pump()
+
+    async def acquire(self, cls: str, caller: str, tokens: int) -> None:
+        if not self.would_wait(tokens):
+            self._charge(tokens)
+            self.in_flight += 1
+            self._record(cls, 0.0)
+            return
+        if self.depth[cls] >= _queue_max(cls):
+            self.rejected[cls] += 1
+            raise LLMBackpressure(
+                f"{self.provider} {cls} queue full ({self.depth[cls]} waiting)")
+        w = _Waiter(cls, caller, tokens, asyncio.get_running_loop().create_future())
+        self.queues[cls].setdefault(caller, deque()).append(w)
+        self.depth[cls] += 1
+        self._pump()
+        try:
+            await w.fut
+        except asyncio.CancelledError:
+            if w.fut.done() and not w.fut.cancelled():
+                self.release()              # granted just as we were cancelled
+            else:
+                self._remove(w, served=False)
+                self._pump()
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._pump()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": dict(self.depth),
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+            "avg_wait_ms": {
+                p: round(self.wait_ms_total[p] / self.admitted[p], 2) if self.admitted[p] else 0.0
+                for p in PRIORITIES
+            },
+            "max_wait_ms": {p: round(v, 2) for p, v in self.wait_ms_max.items()},
+            "spilled_out": self.spilled_out,
+            "spilled_in": self.spilled_in,
+            "tokens_charged": self.tokens_charged,
+            "rpm_available": round(self.rpm.level, 1) if self.rpm else None,
+            "tpm_available": round(self.tpm.level, 1) if self.tpm else None,
+        }
+
+
+_gates: Dict[str, _Gate] = {}
+
+
+def _gate(provider: str) -> _Gate:
+    g = _gates.get(provider)
+    if g is None:
+        g = _gates[provider] = _Gate(provider)
+    return g
+
+
+@dataclass
+class Grant:
+    """An admitted call. `provider` / `model` differ from the request when
+    the call was spilled to the secondary provider."""
+    provider: str
+    model: str
+    priority: str
+    caller: str
+    tokens: int
+    spilled_from: Optional[str] = None
+    waited_ms: float = 0.0
+    _gate: Optional[_Gate] = field(default=None, repr=False)
+
+    def settle(self, actual_tokens: int) -> None:
+        """Correct the token budget once the real prompt + reply size is known."""
+        if self._gate is not None:
+            self._gate.settle(self.tokens, actual_tokens)
+            self.tokens = actual_tokens
+
+
+@asynccontextmanager
+async def admit(
+    provider: str,
+    model: str,
+    *,
+    tokens: int,
+    priority: Optional[str] = None,
+    caller: Optional[str] = None,
+) -> AsyncIterator[Grant]:
+    """Wait for a slot on `provider` (or its spill target) and hold it for
+    the duration of the block. Raises `LLMBackpressure` if the class queue
+    is full."""
+    ambient_cls, ambient_caller = current()
+    cls = _check(priority or ambient_cls)
+    who = ambient_caller or caller or "default"
+    if not ENABLED:
+        yield Grant(provider, model, cls, who, tokens)
+        return
+
+    gate = _gate(provider)
+    spilled_from = None
+    spill = _spill_target(provider)
+    if spill is not None and gate.backed_up(cls, tokens):
+        secondary = _gate(spill[0])
+        if not secondary.backed_up(cls, tokens):
+            gate.spilled_out += 1
+            secondary.spilled_in += 1
+            spilled_from = provider
+            gate = secondary
+            provider, model = spill
+    t0 = time.perf_counter()
+    await gate.acquire(cls, who, tokens)
+    grant = Grant(provider, model, cls, who, tokens, spilled_from,
+                  round((time.perf_counter() - t0) * 1000.0, 2), gate)
+    try:
+        yield grant
+    finally:
+        gate.release()
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "enabled": ENABLED,
+        "default_priority": DEFAULT_PRIORITY,
+        "aging_s": AGING_S,
+        "spill_after": SPILL_AFTER,
+        "queue_max": {p: _queue_max(p) for p in PRIORITIES},
+        "providers": {name: g.stats() for name, g in sorted(_gates.items())},
+    }
+
+
+def reset_in_memory_state() -> None:
+    """Drop the gates (their futures and timers are loop-bound)."""
+    for g in _gates.values():
+        if g._timer is not None:
+            g._timer.cancel()
+    _gates.clear()
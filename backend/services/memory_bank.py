@@ -10,6 +10,10 @@ everything in one place (no separate vector DB infrastructure):
                             light entity-relation memory
   * atlas_settings        — persona embedding-provider preferences
 
+Search runs against `services.memory_index`, an in-process NumPy index
+hydrated from `memory_bank` at startup and kept in sync by
+store/reinforce/delete — Mongo is only asked for the top-k rows.
+
 Embedding providers per persona (Phase 2):
   * 'hash'      — DEFAULT: dependency-free deterministic feature-hash
                   (lexical+ngram). Works offline, never fails, no API key.
@@ -17,19 +21,23 @@ Embedding providers per persona (Phase 2):
   * 'emergent'  — OpenAI embeddings via a real OpenAI key in OPENAI_API_KEY
                   (the Emergent universal LLM key does NOT cover embeddings)
 """
-import hashlib
+import asyncio
 import logging
-import math
 import os
-import re
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from uuid import uuid4
 
 import httpx
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
 from openai import AsyncOpenAI
+from pymongo import ReturnDocument, UpdateOne
+
+from services import mongo
+from services import hash_embedder, memory_index, provider_clients
+from services.embed_pipeline import MicroBatcher, VectorLRU, content_key
 
 load_dotenv()
 logger = logging.getLogger("atlas.memory_bank")
@@ -37,15 +45,20 @@ logger = logging.getLogger("atlas.memory_bank")
 EMERGENT_LLM_KEY = os.environ.get("EMERGENT_LLM_KEY", "")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
 
-EMBED_DIM = 384  # compact, fast cosine; matches all-MiniLM and the hash backend
+EMBED_DIM = hash_embedder.EMBED_DIM  # compact, fast cosine; matches all-MiniLM and the hash backend
 DEFAULT_EMBED_PROVIDER = "hash"
 DEFAULT_EMBED_MODEL = "atlas-hash-v1"
 DEFAULT_OLLAMA_EMBED = "nomic-embed-text"
 DEFAULT_OPENAI_EMBED = "text-embedding-3-small"
 
+# Embedding pipeline knobs — see services/embed_pipeline.py.
+EMBED_SETTINGS_TTL_S = float(os.environ.get("EMBED_SETTINGS_TTL_S", "30"))
+EMBED_CACHE_SIZE = int(os.environ.get("EMBED_CACHE_SIZE", "4096"))
+EMBED_BATCH_MAX = int(os.environ.get("EMBED_BATCH_MAX", "32"))
+EMBED_BATCH_WINDOW_MS = float(os.environ.get("EMBED_BATCH_WINDOW_MS", "5"))
+
 # Freshness curve: every day reduces freshness by `DECAY_PER_DAY`; each
 # re-citation adds `REINFORCEMENT_BUMP` back. Pinned memories ignore decay.
 DECAY_PER_DAY = 0.05
@@ -62,15 +75,12 @@ KNOWN_CATEGORIES = PERMANENT_CATEGORIES | DECAY_CATEGORIES
 
 
 # --- Mongo handles -----------------------------------------------------------
-_client: Optional[AsyncIOMotorClient] = None
 _oa_client: Optional[AsyncOpenAI] = None
+_INDEX_LOCK: Optional[asyncio.Lock] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _memory():
@@ -114,10 +124,28 @@ DEFAULT_EMBED_SETTINGS = {
 }
 
 
+# One settings doc covers every persona, so it is cached as a whole for
+# EMBED_SETTINGS_TTL_S instead of being re-read on every embed() call.
+_SETTINGS_CACHE: Dict[str, Any] = {"doc": None, "expires": 0.0}
+
+
+async def _embedding_models_doc() -> Dict[str, Any]:
+    now = time.monotonic()
+    if _SETTINGS_CACHE["doc"] is not None and now < _SETTINGS_CACHE["expires"]:
+        return _SETTINGS_CACHE["doc"]
+    doc = await _settings().find_one({"_id": "embedding_models"}, {"_id": 0}) or {}
+    _SETTINGS_CACHE.update(doc=doc, expires=now + EMBED_SETTINGS_TTL_S)
+    return doc
+
+
+def invalidate_embed_settings() -> None:
+    _SETTINGS_CACHE.update(doc=None, expires=0.0)
+
+
 async def get_embed_settings(persona: str) -> Tuple[str, str]:
     persona = (persona or "default").lower()
-    doc = await _settings().find_one({"_id": "embedding_models"}, {"_id": 0})
-    cfg = (doc or {}).get(persona) or DEFAULT_EMBED_SETTINGS.get(persona) or DEFAULT_EMBED_SETTINGS["default"]
+    doc = await _embedding_models_doc()
+    cfg = doc.get(persona) or DEFAULT_EMBED_SETTINGS.get(persona) or DEFAULT_EMBED_SETTINGS["default"]
     return cfg["provider"], cfg["model"]
 
 
@@ -140,67 +168,77 @@ async def set_embed_settings(updates: Dict[str, Dict[str, str]]) -> Dict[str, An
         {"$set": {k: v for k, v in clean.items()}},
         upsert=True,
     )
+    invalidate_embed_settings()
     return {"updated": len(clean), "personas": clean}
 
 
 # --- Embedding generators ----------------------------------------------------
-_WORD_RE = re.compile(r"[a-z0-9]+")
-
-
 def _embed_hash(text: str) -> List[float]:
     """Deterministic feature-hash embedding — no external dependencies.
 
     Combines word-level and character-3-gram features hashed into a
     fixed EMBED_DIM bucket, then L2-normalised. Cosine of two hash
-    embeddings approximates lexical + n-gram overlap, which is more
-    than enough for memory recall in the ~few-thousand-rows regime.
+    embeddings approximates lexical + n-gram overlap. The vectorised,
+    token-memoised implementation lives in `services.hash_embedder`.
     """
-    vec = [0.0] * EMBED_DIM
-    if not text:
-        return vec
-    lower = text.lower()
-    # word features
-    words = _WORD_RE.findall(lower)
-    for w in words:
-        h = int(hashlib.blake2b(w.encode(), digest_size=4).hexdigest(), 16)
-        sign = 1.0 if (h & 1) else -1.0
-        vec[h % EMBED_DIM] += sign
-    # char-3gram features (captures roots, partial matches, mistypes)
-    padded = f"  {lower}  "
-    for i in range(len(padded) - 2):
-        g = padded[i:i + 3]
-        h = int(hashlib.blake2b(g.encode(), digest_size=4).hexdigest(), 16)
-        sign = 1.0 if (h & 2) else -1.0
-        vec[h % EMBED_DIM] += sign * 0.3        # tri-grams weighted less than words
-    # L2 normalise so cosine == dot
-    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
-    return [v / norm for v in vec]
-
-
-async def _embed_emergent(text: str, model: str) -> List[float]:
+    return hash_embedder.embed_list(text)
+
+
+def embed_hash_many(texts: List[str]) -> List[List[float]]:
+    """Batch form of `_embed_hash` for ingestion / re-index jobs."""
+    return hash_embedder.embed_many(texts).tolist()
+
+
+async def _embed_emergent_many(texts: List[str], model: str) -> List[List[float]]:
+    """One multi-input /v1/embeddings request for the whole batch."""
     if not OPENAI_API_KEY:
         raise EmbedError("OPENAI_API_KEY not set — Emergent universal key does not cover embeddings")
     client = _emergent_client()
-    resp = await client.embeddings.create(model=model or DEFAULT_OPENAI_EMBED, input=text[:8000])
-    return resp.data[0].embedding
+    resp = await client.embeddings.create(
+        model=model or DEFAULT_OPENAI_EMBED, input=[t[:8000] for t in texts],
+    )
+    return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+
+def _ollama_client() -> httpx.AsyncClient:
+    """Long-lived pooled client, shared with llm_provider's Ollama chat
+    calls (one connection pool per Ollama host, see provider_clients)."""
+    return provider_clients.client(OLLAMA_HOST)
 
 
 async def _embed_ollama(text: str, model: str) -> List[float]:
     url = f"{OLLAMA_HOST.rstrip('/')}/api/embeddings"
     payload = {"model": model or DEFAULT_OLLAMA_EMBED, "prompt": text[:8000]}
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            r = await client.post(url, json=payload)
-            r.raise_for_status()
-            data = r.json()
-        except httpx.RequestError as exc:
-            raise EmbedUnreachable(f"Ollama embeddings unreachable: {exc}") from exc
+    try:
+        r = await _ollama_client().post(url, json=payload, timeout=30.0)
+        r.raise_for_status()
+        data = r.json()
+    except httpx.RequestError as exc:
+        raise EmbedUnreachable(f"Ollama embeddings unreachable: {exc}") from exc
     vec = data.get("embedding") or []
     if not vec:
         raise EmbedError("Ollama returned empty embedding")
     return vec
 
 
+async def _embed_ollama_many(texts: List[str], model: str) -> List[List[float]]:
+    """Batched `/api/embed` (Ollama ≥ 0.3). Older servers without that
+    route get the per-text `/api/embeddings` calls fanned out instead."""
+    url = f"{OLLAMA_HOST.rstrip('/')}/api/embed"
+    payload = {"model": model or DEFAULT_OLLAMA_EMBED, "input": [t[:8000] for t in texts]}
+    try:
+        r = await _ollama_client().post(url, json=payload, timeout=30.0)
+    except httpx.RequestError as exc:
+        raise EmbedUnreachable(f"Ollama embeddings unreachable: {exc}") from exc
+    if r.status_code == 404:
+        return list(await asyncio.gather(*(_embed_ollama(t, model) for t in texts)))
+    r.raise_for_status()
+    vecs = r.json().get("embeddings") or []
+    if len(vecs) != len(texts) or not all(vecs):
+        raise EmbedError("Ollama returned empty embedding")
+    return vecs
+
+
 # --- Sentence-Transformers (local, CPU) ------------------------------------
 # Loaded lazily once, kept in-process. Returns 384-dim L2-normalised vectors
 # from `all-MiniLM-L6-v2` (same EMBED_DIM as the hash backend so existing
@@ -226,44 +264,75 @@ def _ensure_st_model(model_name: str):
     return _ST_MODEL
 
 
-async def _embed_st(text: str, model: str) -> List[float]:
-    import asyncio as _asyncio
-
+async def _embed_st_many(texts: List[str], model: str) -> List[List[float]]:
     def _run():
         m = _ensure_st_model(model or DEFAULT_ST_EMBED)
-        vec = m.encode(text[:8000], normalize_embeddings=True)
-        return [float(x) for x in vec.tolist()]
-    return await _asyncio.to_thread(_run)
+        vecs = m.encode([t[:8000] for t in texts], normalize_embeddings=True)
+        return [[float(x) for x in row] for row in vecs.tolist()]
+    return await asyncio.to_thread(_run)
 
 
 class EmbedUnreachable(Exception): pass    # noqa: E701
 class EmbedError(Exception): pass          # noqa: E701
 
 
+async def _embed_batch(provider: str, model: str, texts: List[str]) -> List[List[float]]:
+    """MicroBatcher flush target — one upstream call per coalesced batch."""
+    if provider == "ollama":
+        return await _embed_ollama_many(texts, model)
+    if provider == "emergent":
+        return await _embed_emergent_many(texts, model)
+    if provider == "st":
+        return await _embed_st_many(texts, model)
+    raise EmbedError(f"unknown embedding provider: {provider}")
+
+
+_VECTOR_CACHE = VectorLRU(EMBED_CACHE_SIZE)
+_BATCHER = MicroBatcher(
+    _embed_batch, max_batch=EMBED_BATCH_MAX, window_s=EMBED_BATCH_WINDOW_MS / 1000.0,
+)
+
+
+def embed_stats() -> Dict[str, Any]:
+    return {
+        "cache": _VECTOR_CACHE.stats(),
+        "batcher": _BATCHER.stats(),
+        "settings_ttl_s": EMBED_SETTINGS_TTL_S,
+    }
+
+
 async def embed(text: str, persona: str = "default") -> Tuple[List[float], Dict[str, Any]]:
     """Return (embedding_vector, meta) for `text` using the persona's
     preferred embedder. Falls back to the local hash embedder on any
-    upstream failure so the pipeline can never block on embeddings."""
+    upstream failure so the pipeline can never block on embeddings.
+
+    Vectors are served from a content-hash LRU when possible; misses for
+    remote/ST providers go through the micro-batcher so concurrent
+    callers share one upstream request."""
     provider, model = await get_embed_settings(persona)
     meta: Dict[str, Any] = {"persona": persona, "provider_requested": provider, "model": model}
-    try:
-        if provider == "ollama":
-            vec = await _embed_ollama(text, model)
-            meta["provider_used"] = "ollama"
-        elif provider == "emergent":
-            vec = await _embed_emergent(text, model)
-            meta["provider_used"] = "emergent"
-        elif provider == "st":
-            vec = await _embed_st(text, model)
-            meta["provider_used"] = "st"
-            meta["model"] = model or DEFAULT_ST_EMBED
-        else:
+    if provider == "st":
+        meta["model"] = model or DEFAULT_ST_EMBED
+    if provider not in {"ollama", "emergent", "st"}:
+        key = content_key("hash", DEFAULT_EMBED_MODEL, text)
+        vec = _VECTOR_CACHE.get(key)
+        if vec is None:
             vec = _embed_hash(text)
-            meta["provider_used"] = "hash"
-            meta["model"] = DEFAULT_EMBED_MODEL
+            _VECTOR_CACHE.put(key, vec)
+        meta["provider_used"] = "hash"
+        meta["model"] = DEFAULT_EMBED_MODEL
+        return vec, meta
+    key = content_key(provider, model, text)
+    vec = _VECTOR_CACHE.get(key)
+    if vec is not None:
+        meta["provider_used"] = provider
+        meta["cache_hit"] = True
+        return vec, meta
+    try:
+        vec = await _BATCHER.submit(provider, model, text)
+        meta["provider_used"] = provider
+        _VECTOR_CACHE.put(key, vec)
     except (EmbedUnreachable, EmbedError, Exception) as exc:    # noqa: BLE001
-        if provider == "hash":
-            raise
         logger.warning("Embed fallback to hash: %s", exc)
         meta["fallback_reason"] = str(exc)[:200]
         vec = _embed_hash(text)
@@ -272,22 +341,6 @@ async def embed(text: str, persona: str = "default") -> Tuple[List[float], Dict[
     return vec, meta
 
 
-# --- Vector math -------------------------------------------------------------
-def _cosine(a: List[float], b: List[float]) -> float:
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot = 0.0
-    na = 0.0
-    nb = 0.0
-    for x, y in zip(a, b):
-        dot += x * y
-        na += x * x
-        nb += y * y
-    if na == 0 or nb == 0:
-        return 0.0
-    return dot / (math.sqrt(na) * math.sqrt(nb))
-
-
 # --- Memory CRUD -------------------------------------------------------------
 async def store_memory(
     content: str,
@@ -326,6 +379,7 @@ async def store_memory(
         "embed_meta": embed_meta,
     }
     await _memory().insert_one(doc.copy())
+    memory_index.upsert(doc)
     return {k: v for k, v in doc.items() if k != "embedding"}    # don't echo the 1536-d vector
 
 
@@ -373,6 +427,25 @@ async def _decay_score(memory_doc: Dict[str, Any]) -> float:
     return max(MIN_FRESHNESS, base - DECAY_PER_DAY * age_days)
 
 
+async def _ensure_index() -> None:
+    """Hydrate the vector index on first use (scripts, tests, or a worker
+    that missed the startup hook), then catch up on other workers' rows."""
+    global _INDEX_LOCK
+    if not memory_index.is_hydrated():
+        if _INDEX_LOCK is None:
+            _INDEX_LOCK = asyncio.Lock()
+        async with _INDEX_LOCK:
+            if not memory_index.is_hydrated():
+                await memory_index.hydrate(_memory())
+        return
+    await memory_index.sync(_memory())
+
+
+async def hydrate_index() -> Dict[str, Any]:
+    """Startup hook — load every stored embedding into the vector index."""
+    return await memory_index.hydrate(_memory())
+
+
 async def search_memory(
     query: str,
     *,
@@ -381,33 +454,73 @@ async def search_memory(
     top_k: int = 10,
     min_score: float = 0.30,
 ) -> List[Dict[str, Any]]:
-    """Cosine-similarity search. We compute scores in Python — fine up to
-    a few thousand memories. When the architect scales past that, swap
-    this for Mongo Atlas Vector Search (same field name, same dim)."""
+    """Cosine-similarity search over the in-process vector index, blended
+    with current freshness. Only the top-k rows are read back from Mongo
+    (without their embeddings)."""
     qvec, _ = await embed(query, persona=persona or "default")
-    filt: Dict[str, Any] = {}
-    if persona:
-        filt["persona"] = persona.lower()
-    if category:
-        filt["category"] = category.lower()
-    cursor = _memory().find(filt, {"_id": 0})
-    rows = await cursor.to_list(length=2000)
-    scored: List[Tuple[float, Dict[str, Any]]] = []
-    for row in rows:
-        emb = row.get("embedding") or []
-        sim = _cosine(qvec, emb)
-        # Combine similarity with current freshness so stale memories
-        # surface less unless they're pinned.
-        fresh = await _decay_score(row)
-        score = 0.85 * sim + 0.15 * fresh
-        if score >= min_score:
-            row.pop("embedding", None)        # don't return raw vectors
+    await _ensure_index()
+    hits = memory_index.search(
+        qvec,
+        persona=persona.lower() if persona else None,
+        category=category.lower() if category else None,
+        top_k=top_k,
+        min_score=min_score,
+        decay_per_day=DECAY_PER_DAY,
+        min_freshness=MIN_FRESHNESS,
+    )
+    return (await _rows_for_hits([hits]))[0]
+
+
+async def search_memory_many(
+    query: str,
+    personas: List[str],
+    *,
+    top_k: int = 10,
+    min_score: float = 0.30,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """`search_memory` for several personas at once — one index pass per
+    persona (each with its own embedder), ONE Mongo read for all hits."""
+    vecs = [(await embed(query, persona=p))[0] for p in personas]
+    await _ensure_index()
+    per_persona = [
+        memory_index.search(
+            qvec,
+            persona=p.lower(),
+            top_k=top_k,
+            min_score=min_score,
+            decay_per_day=DECAY_PER_DAY,
+            min_freshness=MIN_FRESHNESS,
+        )
+        for p, qvec in zip(personas, vecs)
+    ]
+    return dict(zip(personas, await _rows_for_hits(per_persona)))
+
+
+async def _rows_for_hits(
+    hit_lists: List[List[Tuple[str, float, float, float]]],
+) -> List[List[Dict[str, Any]]]:
+    """Read back the rows for one or more index hit lists in a single
+    `id $in` query (without embeddings), decorated with sim / score."""
+    ids = list(dict.fromkeys(mid for hits in hit_lists for mid, _, _, _ in hits))
+    if not ids:
+        return [[] for _ in hit_lists]
+    cursor = _memory().find({"id": {"$in": ids}}, {"_id": 0, "embedding": 0})
+    by_id = {row["id"]: row for row in await cursor.to_list(length=len(ids))}
+    out: List[List[Dict[str, Any]]] = []
+    for hits in hit_lists:
+        rows: List[Dict[str, Any]] = []
+        for memory_id, sim, fresh, score in hits:
+            row = by_id.get(memory_id)
+            if row is None:    # deleted by another worker since the last sync
+                memory_index.remove(memory_id)
+                continue
+            row = dict(row)
             row["sim"] = round(sim, 4)
             row["freshness_now"] = round(fresh, 4)
             row["score"] = round(score, 4)
-            scored.append((score, row))
-    scored.sort(key=lambda t: t[0], reverse=True)
-    return [r for _, r in scored[:top_k]]
+            rows.append(row)
+        out.append(rows)
+    return out
 
 
 async def reinforce(memory_id: str) -> Optional[Dict[str, Any]]:
@@ -423,6 +536,12 @@ async def reinforce(memory_id: str) -> Optional[Dict[str, Any]]:
         "last_referenced": _utc_now(),
     }
     await _memory().update_one({"id": memory_id}, {"$set": update})
+    memory_index.touch(
+        memory_id,
+        freshness=new_freshness,
+        last_referenced=update["last_referenced"],
+        pinned=doc.get("pinned"),
+    )
     doc.update(update)
     return doc
 
@@ -452,10 +571,117 @@ async def list_memories(
 
 async def delete_memory(memory_id: str) -> bool:
     res = await _memory().delete_one({"id": memory_id})
+    memory_index.remove(memory_id)
     return res.deleted_count > 0
 
 
 # --- Graph memory ------------------------------------------------------------
+# Hot adjacency lists are cached in process: node → its edges (either
+# direction) sorted by weight, held in an LRU and re-read after
+# GRAPH_CACHE_TTL_S so writes from other workers show up. A list is either
+# `complete` (every edge of the node) or a top-by-weight prefix. Writes
+# through add_triple update cached lists in place; add_triples invalidates
+# the endpoints it touched.
+GRAPH_CACHE_NODES = int(os.environ.get("GRAPH_CACHE_NODES", "4096"))
+GRAPH_CACHE_EDGES_PER_NODE = int(os.environ.get("GRAPH_CACHE_EDGES_PER_NODE", "256"))
+GRAPH_CACHE_TTL_S = float(os.environ.get("GRAPH_CACHE_TTL_S", "300"))
+# Edges fetched per uncached frontier node, so the cached prefix can serve
+# later calls that ask for a few more than this one did.
+GRAPH_CACHE_PREFETCH = int(os.environ.get("GRAPH_CACHE_PREFETCH", "32"))
+
+_ADJ: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+# Bumped on every write so a read that raced a write doesn't cache stale rows.
+_GRAPH_EPOCH = 0
+_GRAPH_STATS: Dict[str, int] = {"hits": 0, "misses": 0, "layer_queries": 0,
+                                "writes": 0, "bulk_writes": 0, "invalidations": 0}
+
+
+def _triple_key(from_node: str, to_node: str, relation: str) -> Dict[str, str]:
+    return {
+        "from_node": from_node.strip(),
+        "to_node": to_node.strip(),
+        "relation": relation.strip().lower(),
+    }
+
+
+def _edge_id(doc: Dict[str, Any]) -> Tuple[str, str, str]:
+    return doc["from_node"], doc["to_node"], doc["relation"]
+
+
+def _by_weight(doc: Dict[str, Any]) -> float:
+    return -float(doc.get("weight") or 0.0)
+
+
+def _adj_get(node: str, need: int) -> Optional[List[Dict[str, Any]]]:
+    """Cached edges of `node` if the entry is fresh and holds at least the
+    top `need` edges."""
+    entry = _ADJ.get(node)
+    if entry is None:
+        return None
+    if entry["expires"] < time.monotonic():
+        del _ADJ[node]
+        return None
+    if not entry["complete"] and len(entry["edges"]) < need:
+        return None
+    _ADJ.move_to_end(node)
+    return entry["edges"]
+
+
+def _adj_put(node: str, edges: List[Dict[str, Any]], complete: bool) -> None:
+    if len(edges) > GRAPH_CACHE_EDGES_PER_NODE:
+        edges, complete = edges[:GRAPH_CACHE_EDGES_PER_NODE], False
+    _ADJ[node] = {"edges": edges, "complete": complete,
+                  "expires": time.monotonic() + GRAPH_CACHE_TTL_S}
+    _ADJ.move_to_end(node)
+    while len(_ADJ) > GRAPH_CACHE_NODES:
+        _ADJ.popitem(last=False)
+
+
+def _adj_write(doc: Dict[str, Any]) -> None:
+    """Write-through: place the updated edge in both endpoints' cached lists."""
+    global _GRAPH_EPOCH
+    _GRAPH_EPOCH += 1
+    eid = _edge_id(doc)
+    for node in {doc["from_node"], doc["to_node"]}:
+        entry = _ADJ.get(node)
+        if entry is None:
+            continue
+        edges = [e for e in entry["edges"] if _edge_id(e) != eid]
+        # A prefix can only take the edge if it sorts inside the prefix.
+        if entry["complete"] or (edges and _by_weight(doc) <= _by_weight(edges[-1])):
+            edges.append(doc)
+            edges.sort(key=_by_weight)
+        entry["edges"] = edges
+        if len(edges) > GRAPH_CACHE_EDGES_PER_NODE:
+            entry["edges"], entry["complete"] = edges[:GRAPH_CACHE_EDGES_PER_NODE], False
+
+
+def _adj_invalidate(nodes) -> None:
+    global _GRAPH_EPOCH
+    _GRAPH_EPOCH += 1
+    for node in nodes:
+        if _ADJ.pop(node, None) is not None:
+            _GRAPH_STATS["invalidations"] += 1
+
+
+def graph_cache_stats() -> Dict[str, Any]:
+    lookups = _GRAPH_STATS["hits"] + _GRAPH_STATS["misses"]
+    return {
+        **_GRAPH_STATS,
+        "cached_nodes": len(_ADJ),
+        "cached_edges": sum(len(e["edges"]) for e in _ADJ.values()),
+        "hit_rate": round(_GRAPH_STATS["hits"] / lookups, 4) if lookups else 0.0,
+        "max_nodes": GRAPH_CACHE_NODES,
+        "ttl_s": GRAPH_CACHE_TTL_S,
+    }
+
+
+def reset_graph_cache() -> None:
+    _ADJ.clear()
+    for key in _GRAPH_STATS:
+        _GRAPH_STATS[key] = 0
+
+
 async def add_triple(
     *,
     from_node: str,
@@ -465,20 +691,70 @@ async def add_triple(
     weight: float = 1.0,
 ) -> Dict[str, Any]:
     """Light entity-relation triple. We upsert on (from, to, relation)
-    so repeated learnings reinforce the same edge instead of duplicating."""
-    key = {
-        "from_node": from_node.strip(),
-        "to_node": to_node.strip(),
-        "relation": relation.strip().lower(),
-    }
+    so repeated learnings reinforce the same edge instead of duplicating.
+    One round trip: the upsert returns the updated document."""
+    key = _triple_key(from_node, to_node, relation)
     set_ops = {**key, "source_id": source_id, "updated_at": _utc_now()}
-    await _graph().update_one(
+    doc = await _graph().find_one_and_update(
         key,
         {"$set": set_ops, "$inc": {"weight": weight, "hits": 1}},
+        projection={"_id": 0},
         upsert=True,
+        return_document=ReturnDocument.AFTER,
     )
-    doc = await _graph().find_one(key, {"_id": 0})
-    return doc or {**set_ops, "weight": weight, "hits": 1}
+    doc = doc or {**set_ops, "weight": weight, "hits": 1}
+    _GRAPH_STATS["writes"] += 1
+    _adj_write(doc)
+    return doc
+
+
+async def add_triples(triples: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bulk `add_triple` for ingestion: one unordered bulk upsert.
+
+    Each item takes add_triple's keyword fields. Repeats of the same
+    (from, to, relation) in one batch are merged (weights and hits summed,
+    last source_id wins), matching what sequential calls would store.
+    Malformed items are skipped and counted."""
+    merged: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    requested = skipped = 0
+    for t in triples:
+        requested += 1
+        try:
+            key = _triple_key(t["from_node"], t["to_node"], t["relation"])
+            weight = float(t.get("weight", 1.0))
+        except (KeyError, AttributeError, TypeError, ValueError) as exc:
+            skipped += 1
+            logger.debug("triple skip %r: %s", t, exc)
+            continue
+        k = _edge_id(key)
+        m = merged.get(k)
+        if m is None:
+            merged[k] = {"key": key, "source_id": t.get("source_id"), "weight": weight, "hits": 1}
+        else:
+            m["source_id"] = t.get("source_id")
+            m["weight"] += weight
+            m["hits"] += 1
+    out = {"requested": requested, "written": len(merged), "skipped": skipped,
+           "upserted": 0, "modified": 0}
+    if not merged:
+        return out
+    now = _utc_now()
+    ops = [
+        UpdateOne(
+            m["key"],
+            {"$set": {**m["key"], "source_id": m["source_id"], "updated_at": now},
+             "$inc": {"weight": m["weight"], "hits": m["hits"]}},
+            upsert=True,
+        )
+        for m in merged.values()
+    ]
+    try:
+        res = await _graph().bulk_write(ops, ordered=False)
+    finally:
+        _adj_invalidate({n for k in merged for n in k[:2]})
+    _GRAPH_STATS["bulk_writes"] += 1
+    out.update(upserted=res.upserted_count, modified=res.modified_count)
+    return out
 
 
 async def list_triples(
@@ -495,6 +771,62 @@ async def list_triples(
     return await cursor.to_list(length=limit)
 
 
+async def _layer_edges(
+    frontier: List[str], limit: int, min_weight: float,
+) -> List[Dict[str, Any]]:
+    """Top `limit` edges (by weight) touching any frontier node. Cached
+    nodes are served from memory; the rest share one Mongo query, whose
+    result also fills the cache."""
+    candidates: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    missing: List[str] = []
+    for node in frontier:
+        edges = _adj_get(node, limit)
+        if edges is None:
+            _GRAPH_STATS["misses"] += 1
+            missing.append(node)
+            continue
+        _GRAPH_STATS["hits"] += 1
+        for e in edges[:limit]:
+            candidates.setdefault(_edge_id(e), e)
+
+    if missing:
+        filt: Dict[str, Any] = {
+            "$or": [
+                {"from_node": {"$in": missing}},
+                {"to_node":   {"$in": missing}},
+            ],
+        }
+        if min_weight > 0:
+            filt["weight"] = {"$gte": float(min_weight)}
+        fetch = max(limit, GRAPH_CACHE_PREFETCH * len(missing))
+        epoch = _GRAPH_EPOCH
+        cursor = _graph().find(filt, {"_id": 0}).sort("weight", -1).limit(fetch)
+        rows = await cursor.to_list(length=fetch)
+        _GRAPH_STATS["layer_queries"] += 1
+        for e in rows:
+            candidates.setdefault(_edge_id(e), e)
+        # Every node's edges above the cut-off weight came back, so each
+        # per-node list is a valid top prefix; complete when nothing was cut
+        # (and no min_weight filter hid the light edges).
+        cut = len(rows) >= fetch
+        floor = -_by_weight(rows[-1]) if cut and rows else None
+        per_node: Dict[str, List[Dict[str, Any]]] = {n: [] for n in missing}
+        for e in rows:
+            if floor is not None and float(e.get("weight") or 0.0) <= floor:
+                continue
+            for node in {e["from_node"], e["to_node"]}:
+                if node in per_node:
+                    per_node[node].append(e)
+        if epoch == _GRAPH_EPOCH:
+            for node, edges in per_node.items():
+                _adj_put(node, edges, complete=not cut and min_weight <= 0)
+
+    layer = [e for e in candidates.values()
+             if min_weight <= 0 or float(e.get("weight") or 0.0) >= min_weight]
+    layer.sort(key=_by_weight)
+    return layer[:limit]
+
+
 async def neighborhood(
     node: str,
     depth: int = 1,
@@ -507,32 +839,24 @@ async def neighborhood(
     `min_weight` filters out low-confidence edges (default 0.0 → include
     every edge). Useful for HUD graph viz where you only want the
     strongest associations.
+
+    Each layer keeps the `limit_per_layer × len(frontier)` heaviest edges
+    touching the frontier, read from the adjacency cache where possible.
     """
     seen_nodes = {node}
     edges_out: List[Dict[str, Any]] = []
-    frontier = {node}
+    frontier = [node]
     for _ in range(max(1, depth)):
         if not frontier:
             break
-        filt: Dict[str, Any] = {
-            "$or": [
-                {"from_node": {"$in": list(frontier)}},
-                {"to_node":   {"$in": list(frontier)}},
-            ],
-        }
-        if min_weight > 0:
-            filt["weight"] = {"$gte": float(min_weight)}
-        cursor = _graph().find(
-            filt, {"_id": 0},
-        ).sort("weight", -1).limit(limit_per_layer * len(frontier))
-        layer = await cursor.to_list(length=limit_per_layer * len(frontier))
-        next_frontier = set()
+        layer = await _layer_edges(frontier, limit_per_layer * len(frontier), min_weight)
+        next_frontier = []
         for e in layer:
             edges_out.append(e)
             for endpoint in (e["from_node"], e["to_node"]):
                 if endpoint not in seen_nodes:
                     seen_nodes.add(endpoint)
-                    next_frontier.add(endpoint)
+                    next_frontier.append(endpoint)
         frontier = next_frontier
     return {
         "root": node,
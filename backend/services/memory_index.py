@@ -0,0 +1,293 @@
+"""
+Memory Bank vector index.
+
+In-process NumPy index over the `memory_bank` embeddings so
+`memory_bank.search_memory` scores every candidate with one matrix
+product instead of a Python cosine loop over a capped Mongo cursor.
+
+Layout:
+  * one partition per (persona, category, dim) — persona/category
+    filters select partitions instead of scanning rows, and vectors
+    from different embedders (hash 384-d, Ollama 768-d, OpenAI 1536-d)
+    never share a matrix
+  * each partition keeps an L2-normalised float32 matrix plus the
+    pinned / freshness / last_referenced columns needed to apply the
+    freshness decay in the same vectorised pass
+  * rows are removed by swap-with-last so deletes stay O(dim)
+
+Mongo stays the source of truth: the index is hydrated at startup,
+kept in sync by store/reinforce/delete in this process, and catches up
+on rows written by other workers every `MEMORY_INDEX_SYNC_S` seconds.
+"""
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("atlas.memory_index")
+
+SYNC_INTERVAL_S = float(os.environ.get("MEMORY_INDEX_SYNC_S", "5"))
+_INITIAL_CAPACITY = 64
+
+# Fields the index needs from a memory row — everything else (content,
+# tags, embed_meta, ...) is fetched from Mongo for the top-k hits only.
+INDEX_PROJECTION = {
+    "_id": 0, "id": 1, "persona": 1, "category": 1, "pinned": 1,
+    "freshness": 1, "last_referenced": 1, "created_at": 1, "embedding": 1,
+}
+
+PartitionKey = Tuple[str, str, int]
+
+
+def _epoch(value: Any) -> float:
+    """ISO timestamp → epoch seconds; NaN when missing or unparsable so
+    the decay pass can fall back to the stored freshness."""
+    if not value:
+        return float("nan")
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return float("nan")
+
+
+def _normalise(vec: Iterable[float]) -> np.ndarray:
+    arr = np.asarray(vec, dtype=np.float32).ravel()
+    norm = float(np.linalg.norm(arr))
+    if norm > 0.0:
+        arr = arr / norm
+    return arr
+
+
+class _Partition:
+    """Growable float32 matrix + decay columns for one (persona, category, dim)."""
+
+    __slots__ = ("dim", "size", "ids", "vecs", "pinned", "freshness", "last_ref")
+
+    def __init__(self, dim: int, capacity: int = _INITIAL_CAPACITY):
+        self.dim = dim
+        self.size = 0
+        self.ids: List[str] = []
+        self.vecs = np.zeros((capacity, dim), dtype=np.float32)
+        self.pinned = np.zeros(capacity, dtype=bool)
+        self.freshness = np.ones(capacity, dtype=np.float32)
+        self.last_ref = np.full(capacity, np.nan, dtype=np.float64)
+
+    def _grow(self) -> None:
+        capacity = max(_INITIAL_CAPACITY, self.vecs.shape[0] * 2)
+        for name in ("vecs", "pinned", "freshness", "last_ref"):
+            old = getattr(self, name)
+            shape = (capacity,) + old.shape[1:]
+            new = np.empty(shape, dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, name, new)
+
+    def add(self, memory_id: str, vec: np.ndarray, pinned: bool, freshness: float, last_ref: float) -> int:
+        if self.size == self.vecs.shape[0]:
+            self._grow()
+        row = self.size
+        self.ids.append(memory_id)
+        self.set(row, vec, pinned, freshness, last_ref)
+        self.size += 1
+        return row
+
+    def set(self, row: int, vec: Optional[np.ndarray], pinned: bool, freshness: float, last_ref: float) -> None:
+        if vec is not None:
+            self.vecs[row] = vec
+        self.pinned[row] = pinned
+        self.freshness[row] = freshness
+        self.last_ref[row] = last_ref
+
+    def remove(self, row: int) -> Optional[str]:
+        """Swap-remove `row`; returns the id that moved into it (if any)."""
+        last = self.size - 1
+        moved: Optional[str] = None
+        if row != last:
+            moved = self.ids[last]
+            self.ids[row] = moved
+            self.vecs[row] = self.vecs[last]
+            self.pinned[row] = self.pinned[last]
+            self.freshness[row] = self.freshness[last]
+            self.last_ref[row] = self.last_ref[last]
+        self.ids.pop()
+        self.size = last
+        return moved
+
+
+_PARTITIONS: Dict[PartitionKey, _Partition] = {}
+_LOCATION: Dict[str, Tuple[PartitionKey, int]] = {}
+_STATE: Dict[str, Any] = {"hydrated": False, "watermark": "", "last_sync": 0.0}
+
+
+def is_hydrated() -> bool:
+    return bool(_STATE["hydrated"])
+
+
+def upsert(doc: Dict[str, Any]) -> bool:
+    """Index (or re-index) one memory row. Rows without an embedding are
+    skipped — they could never score above the freshness floor anyway."""
+    memory_id = doc.get("id")
+    emb = doc.get("embedding")
+    if not memory_id or not emb:
+        return False
+    vec = _normalise(emb)
+    key: PartitionKey = (str(doc.get("persona") or ""), str(doc.get("category") or ""), int(vec.shape[0]))
+    pinned = bool(doc.get("pinned"))
+    freshness = float(doc.get("freshness", 1.0))
+    last_ref = _epoch(doc.get("last_referenced"))
+    loc = _LOCATION.get(memory_id)
+    if loc is not None and loc[0] == key:
+        _PARTITIONS[key].set(loc[1], vec, pinned, freshness, last_ref)
+        return True
+    if loc is not None:
+        remove(memory_id)
+    part = _PARTITIONS.get(key)
+    if part is None:
+        part = _PARTITIONS[key] = _Partition(key[2])
+    _LOCATION[memory_id] = (key, part.add(memory_id, vec, pinned, freshness, last_ref))
+    return True
+
+
+def touch(memory_id: str, *, freshness: float, last_referenced: str, pinned: Optional[bool] = None) -> bool:
+    """Refresh the decay columns after a reinforce — the vector is unchanged."""
+    loc = _LOCATION.get(memory_id)
+    if loc is None:
+        return False
+    part = _PARTITIONS[loc[0]]
+    row = loc[1]
+    part.set(
+        row,
+        None,
+        bool(part.pinned[row]) if pinned is None else bool(pinned),
+        float(freshness),
+        _epoch(last_referenced),
+    )
+    return True
+
+
+def remove(memory_id: str) -> bool:
+    loc = _LOCATION.pop(memory_id, None)
+    if loc is None:
+        return False
+    key, row = loc
+    part = _PARTITIONS[key]
+    moved = part.remove(row)
+    if moved is not None:
+        _LOCATION[moved] = (key, row)
+    if part.size == 0:
+        del _PARTITIONS[key]
+    return True
+
+
+def search(
+    qvec: Iterable[float],
+    *,
+    persona: Optional[str] = None,
+    category: Optional[str] = None,
+    top_k: int = 10,
+    min_score: float = 0.30,
+    decay_per_day: float = 0.05,
+    min_freshness: float = 0.05,
+    now: Optional[float] = None,
+) -> List[Tuple[str, float, float, float]]:
+    """Top-k (memory_id, sim, freshness_now, score) tuples, best first.
+
+    score = 0.85 * cosine + 0.15 * decayed freshness — the same blend
+    `memory_bank.search_memory` has always used. Partitions whose dim
+    differs from the query contribute cosine 0, matching the old
+    length-mismatch behaviour.
+    """
+    q = _normalise(qvec)
+    qdim = int(q.shape[0])
+    now = time.time() if now is None else now
+    parts: List[_Partition] = []
+    sims: List[np.ndarray] = []
+    freshes: List[np.ndarray] = []
+    for (p_persona, p_category, dim), part in _PARTITIONS.items():
+        if persona is not None and p_persona != persona:
+            continue
+        if category is not None and p_category != category:
+            continue
+        n = part.size
+        if n == 0:
+            continue
+        if dim == qdim:
+            sim = part.vecs[:n] @ q
+        else:
+            sim = np.zeros(n, dtype=np.float32)
+        base = part.freshness[:n].astype(np.float64)
+        last_ref = part.last_ref[:n]
+        decayed = np.maximum(min_freshness, base - decay_per_day * (now - last_ref) / 86400.0)
+        fresh = np.where(part.pinned[:n], 1.0, np.where(np.isnan(last_ref), base, decayed))
+        parts.append(part)
+        sims.append(sim)
+        freshes.append(fresh)
+    if not parts:
+        return []
+    sim_all = np.concatenate(sims).astype(np.float64)
+    fresh_all = np.concatenate(freshes)
+    score_all = 0.85 * sim_all + 0.15 * fresh_all
+    candidates = np.flatnonzero(score_all >= min_score)
+    k = min(int(top_k), int(candidates.size))
+    if k <= 0:
+        return []
+    if candidates.size > k:
+        candidates = candidates[np.argpartition(-score_all[candidates], k - 1)[:k]]
+    order = candidates[np.argsort(-score_all[candidates], kind="stable")]
+    # Map flat positions back to (partition, row) without materialising
+    # one big id list per query.
+    offsets = np.cumsum([0] + [part.size for part in parts])
+    owners = np.searchsorted(offsets, order, side="right") - 1
+    return [
+        (parts[o].ids[i - offsets[o]], float(sim_all[i]), float(fresh_all[i]), float(score_all[i]))
+        for i, o in zip(order.tolist(), owners.tolist())
+    ]
+
+
+async def hydrate(collection: Any) -> Dict[str, int]:
+    """Rebuild the whole index from Mongo. Streams the cursor so the
+    raw documents never sit in memory all at once."""
+    reset_in_memory_state()
+    watermark = ""
+    async for doc in collection.find({}, INDEX_PROJECTION):
+        upsert(doc)
+        created = str(doc.get("created_at") or "")
+        if created > watermark:
+            watermark = created
+    _STATE.update(hydrated=True, watermark=watermark, last_sync=time.monotonic())
+    return stats()
+
+
+async def sync(collection: Any, *, force: bool = False) -> int:
+    """Pull rows created since the last hydrate/sync — covers memories
+    stored by other server workers sharing the same database."""
+    if not force and time.monotonic() - _STATE["last_sync"] < SYNC_INTERVAL_S:
+        return 0
+    _STATE["last_sync"] = time.monotonic()
+    watermark = _STATE["watermark"]
+    added = 0
+    async for doc in collection.find({"created_at": {"$gte": watermark}}, INDEX_PROJECTION):
+        if doc.get("id") not in _LOCATION:
+            added += 1
+        upsert(doc)
+        created = str(doc.get("created_at") or "")
+        if created > _STATE["watermark"]:
+            _STATE["watermark"] = created
+    return added
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "memories": len(_LOCATION),
+        "partitions": len(_PARTITIONS),
+        "hydrated": is_hydrated(),
+        "bytes": int(sum(p.vecs.nbytes for p in _PARTITIONS.values())),
+    }
+
+
+def reset_in_memory_state() -> None:
+    _PARTITIONS.clear()
+    _LOCATION.clear()
+    _STATE.update(hydrated=False, watermark="", last_sync=0.0)
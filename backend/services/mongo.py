@@ -0,0 +1,212 @@
+"""
+Process-wide Mongo access.
+
+Every backend service resolves its database and collections through this
+module so the process holds ONE `AsyncIOMotorClient` (one connection pool,
+one set of monitor threads) instead of one per module.
+
+  * `client()`              — the shared client, created lazily on first use
+                              so importing a route module costs no handshake.
+  * `db(name=None)`         — a database handle; `db()["x"]` and `db().x`
+                              resolve collections through `collection()`.
+  * `collection(name, ...)` — a cached collection handle with the concern
+                              profile registered for that collection.
+  * `pool_stats()`          — connection-pool counters from a pymongo
+                              pool listener (open / in use / checkout failures).
+
+Concern profiles:
+  * default — server defaults (w=1, local reads, primary).
+  * durable — w=majority + journal, majority reads. For records the rest of
+              the system treats as a ledger (research queue, commands, runs).
+  * fast    — w=1 without journal wait. For high-volume, re-derivable rows
+              (raw telemetry, buckets, chat logs).
+  * analytics — secondaryPreferred, local reads. For dashboards/aggregations
+              that tolerate slightly stale data.
+
+Pool sizing is env-tunable: MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE,
+MONGO_MAX_IDLE_MS, MONGO_SERVER_SELECTION_MS, MONGO_APP_NAME.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase,
+)
+from pymongo import ReadPreference
+from pymongo.monitoring import ConnectionPoolListener
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
+
+MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+MAX_IDLE_MS = int(os.environ.get("MONGO_MAX_IDLE_MS", "60000"))
+SERVER_SELECTION_MS = int(os.environ.get("MONGO_SERVER_SELECTION_MS", "5000"))
+APP_NAME = os.environ.get("MONGO_APP_NAME", "atlas-backend")
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "durable": {
+        "write_concern": WriteConcern(w="majority", j=True),
+        "read_concern": ReadConcern("majority"),
+    },
+    "fast": {
+        "write_concern": WriteConcern(w=1, j=False),
+    },
+    "analytics": {
+        "read_preference": ReadPreference.SECONDARY_PREFERRED,
+        "read_concern": ReadConcern("local"),
+    },
+}
+
+# Collections that don't use the default profile. Anything not listed here
+# gets "default"; callers may still pass an explicit profile.
+COLLECTION_PROFILES: Dict[str, str] = {
+    "research_queue": "durable",
+    "research_cycles": "durable",
+    "robot_commands": "durable",
+    "worldwatch_runs": "durable",
+    "robot_telemetry": "fast",
+    "robot_telemetry_buckets": "fast",
+    "persona_messages": "fast",
+    "chat_messages": "fast",
+    "llm_cache": "fast",
+}
+
+
+class _PoolMetrics(ConnectionPoolListener):
+    """Counts pool events. pymongo calls these from its own threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {
+            "pools_created": 0, "pools_cleared": 0,
+            "connections_created": 0, "connections_closed": 0,
+            "checkouts": 0, "checkins": 0, "checkout_failures": 0,
+        }
+
+    def _bump(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def pool_created(self, event): self._bump("pools_created")
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): self._bump("pools_cleared")
+    def pool_closed(self, event): pass
+    def connection_created(self, event): self._bump("connections_created")
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): self._bump("connections_closed")
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): self._bump("checkout_failures")
+    def connection_checked_out(self, event): self._bump("checkouts")
+    def connection_checked_in(self, event): self._bump("checkins")
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            c = dict(self.counts)
+        c["open"] = c["connections_created"] - c["connections_closed"]
+        c["in_use"] = c["checkouts"] - c["checkins"]
+        return c
+
+
+_client: Optional[AsyncIOMotorClient] = None
+_metrics = _PoolMetrics()
+_handles: Dict[Tuple[str, str, str], AsyncIOMotorCollection] = {}
+
+
+def default_db_name() -> str:
+    return os.environ.get("DB_NAME", "test_database")
+
+
+def client() -> AsyncIOMotorClient:
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(
+            os.environ.get("MONGO_URL", "mongodb://localhost:27017"),
+            maxPoolSize=MAX_POOL_SIZE,
+            minPoolSize=MIN_POOL_SIZE,
+            maxIdleTimeMS=MAX_IDLE_MS,
+            serverSelectionTimeoutMS=SERVER_SELECTION_MS,
+            appname=APP_NAME,
+            event_listeners=[_metrics],
+        )
+    return _client
+
+
+def collection(
+    name: str, *, profile: Optional[str] = None, db_name: Optional[str] = None,
+) -> AsyncIOMotorCollection:
+    profile = profile or COLLECTION_PROFILES.get(name, "default")
+    if profile not in PROFILES:
+        raise ValueError(f"unknown mongo profile: {profile}")
+    db_name = db_name or default_db_name()
+    key = (db_name, name, profile)
+    handle = _handles.get(key)
+    if handle is None:
+        handle = client()[db_name].get_collection(name, **PROFILES[profile])
+        _handles[key] = handle
+    return handle
+
+
+class Database:
+    """Lazy database handle. Item/attribute access returns registry
+    collections; every other attribute (command, list_collection_names,
+    ...) is forwarded to the motor database."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    @property
+    def raw(self) -> AsyncIOMotorDatabase:
+        return client()[self.name]
+
+    def __getitem__(self, name: str) -> AsyncIOMotorCollection:
+        return collection(name, db_name=self.name)
+
+    def get_collection(self, name: str, **kwargs: Any) -> AsyncIOMotorCollection:
+        if kwargs:
+            return self.raw.get_collection(name, **kwargs)
+        return collection(name, db_name=self.name)
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        value = getattr(self.raw, attr)
+        if isinstance(value, AsyncIOMotorCollection):
+            return collection(attr, db_name=self.name)
+        return value
+
+
+_databases: Dict[str, Database] = {}
+
+
+def db(name: Optional[str] = None) -> Database:
+    name = name or default_db_name()
+    handle = _databases.get(name)
+    if handle is None:
+        handle = _databases[name] = Database(name)
+    return handle
+
+
+def pool_stats() -> Dict[str, Any]:
+    return {
+        "connected": _client is not None,
+        "max_pool_size": MAX_POOL_SIZE,
+        "min_pool_size": MIN_POOL_SIZE,
+        "collection_handles": len(_handles),
+        "pool": _metrics.snapshot(),
+    }
+
+
+def close() -> None:
+    """Close the shared client (shutdown / tests). The next call to
+    `client()` opens a fresh one."""
+    global _client
+    if _client is not None:
+        _client.close()
+    _client = None
+    _handles.clear()
@@ -30,7 +30,7 @@ import json
 import logging
 import os
 import threading
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger("atlas.mqtt")
 
@@ -148,29 +148,88 @@ def shutdown() -> None:
 # Phase 8c.2 — Telemetry UPLINK subscriber
 # ---------------------------------------------------------------------------
 # When devices publish telemetry to `<prefix>/devices/<id>/telemetry`, the
-# bridge ingests them into the same `robot.ingest_telemetry` pipeline that
-# HTTP POSTs use. This closes the bidirectional loop:
+# bridge ingests them into the same telemetry pipeline that HTTP POSTs use.
+# This closes the bidirectional loop:
 #   downlink:  Atlas → device  via `<prefix>/devices/<id>/cmd`
 #   uplink:    device → Atlas  via `<prefix>/devices/<id>/telemetry`
+# Readings queue up while a drain is running and go to
+# `robot.ingest_telemetry_batch` together, so a burst is scored in one
+# anomaly-engine pass instead of one call per message.
 # ===========================================================================
 import asyncio as _asyncio
 import re as _re
 
 _UPLINK_RE = _re.compile(r"/devices/([A-Za-z0-9_\-]+)/telemetry$")
 _loop_ref: Optional[Any] = None    # main asyncio loop captured at startup
+_uplink_lock = threading.Lock()
+_uplink_pending: List[Tuple[str, Dict[str, Any]]] = []
+_uplink_draining = False           # a _drain_uplink() is scheduled or running
 
 
 def set_loop(loop: Any) -> None:
     """Capture the FastAPI event loop so the MQTT thread can submit
-    coroutine work back via `loop.call_soon_threadsafe`."""
-    global _loop_ref
+    coroutine work back via `loop.call_soon_threadsafe`. A drain left
+    scheduled on a previous loop died with it, so queued readings get a
+    fresh one here."""
+    global _loop_ref, _uplink_draining
     _loop_ref = loop
+    with _uplink_lock:
+        _uplink_draining = bool(_uplink_pending) and loop is not None
+        retry = _uplink_draining
+    if retry:
+        _schedule_drain()
+
+
+def _schedule_drain() -> None:
+    """Submit `_drain_uplink()` to the captured loop. The caller has set
+    `_uplink_draining`; it is cleared again if the submit fails."""
+    global _uplink_draining
+    try:
+        _asyncio.run_coroutine_threadsafe(_drain_uplink(), _loop_ref)
+    except Exception:
+        with _uplink_lock:
+            _uplink_draining = False
+        raise
+
+
+async def _drain_uplink() -> None:
+    """Ingest queued uplink readings in batches until the queue is empty."""
+    global _uplink_draining
+    from services import robot as _robot
+    emptied = False
+    try:
+        while True:
+            with _uplink_lock:
+                batch = list(_uplink_pending)
+                _uplink_pending.clear()
+                if not batch:
+                    _uplink_draining = False
+                    emptied = True
+                    return
+            try:
+                await _robot.ingest_telemetry_batch(batch, source="mqtt")
+            except Exception as exc:    # noqa: BLE001
+                logger.warning("uplink ingest failed (%d readings): %s", len(batch), exc)
+    finally:
+        # Cancelled (loop shutdown, reload) or failed outside the per-batch
+        # guard: release the flag so the next message can schedule a drain,
+        # and hand readings that are still queued to a fresh one.
+        if not emptied:
+            with _uplink_lock:
+                _uplink_draining = bool(_uplink_pending) and _loop_ref is not None
+                retry = _uplink_draining
+            if retry:
+                try:
+                    _schedule_drain()
+                except Exception as exc:    # noqa: BLE001
+                    logger.warning("uplink drain reschedule failed: %s", exc)
 
 
 def _on_uplink_message(_client_unused, _userdata, msg) -> None:
     """paho callback running on the MQTT network thread. We extract the
-    device_id from the topic, parse JSON, and bounce into the asyncio
-    loop to call `robot.ingest_telemetry`."""
+    device_id from the topic, parse JSON, queue the reading and make sure
+    a drain is scheduled on the asyncio loop."""
+    global _uplink_draining
     try:
         topic = getattr(msg, "topic", "") or ""
         m = _UPLINK_RE.search(topic)
@@ -187,15 +246,12 @@ def _on_uplink_message(_client_unused, _userdata, msg) -> None:
         if _loop_ref is None:
             logger.warning("MQTT uplink received but no loop captured")
             return
-        from services import robot as _robot
-
-        async def _run():
-            try:
-                await _robot.ingest_telemetry(device_id, payload, source="mqtt")
-            except Exception as exc:    # noqa: BLE001
-                logger.warning("uplink ingest failed (%s): %s", device_id, exc)
-
-        _asyncio.run_coroutine_threadsafe(_run(), _loop_ref)
+        with _uplink_lock:
+            _uplink_pending.append((device_id, payload))
+            if _uplink_draining:
+                return
+            _uplink_draining = True
+        _schedule_drain()
     except Exception as exc:    # noqa: BLE001
         logger.warning("MQTT uplink dispatch failed: %s", exc)
 
@@ -8,18 +8,26 @@ Pipeline:
   5.  Library match (peak overlap ± 12 nm tolerance + optional cosine
       against canonical fingerprints when intensities are available)
 
+Matching runs against `_LibraryMatrix`, a cached view of the whole library:
+fingerprints resampled once per scan length into one row-normalised matrix
+(cosine for every entry is a single matrix product, a burst of same-length
+scans one GEMM), and every characteristic peak in one sorted array so peak
+coverage is a `searchsorted` instead of a nested loop. It is rebuilt when
+this process changes the library and otherwise every NIR_LIBRARY_TTL_S.
+
 All steps tolerate small inputs gracefully and fall back to safe
 defaults if scipy is unavailable (we keep scipy a soft dependency
 because some downstream test environments don't ship it).
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
-from motor.motor_asyncio import AsyncIOMotorClient
 from scipy.signal import find_peaks, savgol_filter
 from scipy.spatial.distance import cosine as cosine_dist
 
@@ -29,20 +37,19 @@ from models.nir_models import (
     NIRSpectrum,
     ScanResult,
 )
+from services import mongo
 from services import memory_bank as mb
 
 logger = logging.getLogger("atlas.nir")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
+LIBRARY_TTL_S = float(os.environ.get("NIR_LIBRARY_TTL_S", "30"))
+PEAK_TOL_NM = 12.0
+TOP_MATCHES = 5
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _scans():    return _db()["nir_spectra"]
@@ -159,6 +166,130 @@ def _cosine_score(scan: np.ndarray, ref: Optional[List[float]]) -> Optional[floa
     return float(1.0 - cosine_dist(scan, ref_arr))
 
 
+class _LibraryMatrix:
+    """Library snapshot laid out for vectorised scoring.
+
+    Entries keep `list_library()` order (by name), which is also the
+    tie-break order of the original per-entry loop."""
+
+    _MAX_GRIDS = 8
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.entries = entries
+        peaks = [list(e.get("characteristic_peaks_nm") or []) for e in entries]
+        self.n_lib_peaks = np.array([len(p) for p in peaks], dtype=float)
+        owner = np.repeat(np.arange(len(entries)), [len(p) for p in peaks])
+        flat = np.asarray([x for p in peaks for x in p], dtype=float)
+        order = np.argsort(flat, kind="stable")
+        self.peak_nm = flat[order]
+        self.peak_owner = owner[order]
+        self.fingerprints = [
+            np.asarray(e["fingerprint_intensities"], dtype=float)
+            if e.get("fingerprint_intensities") else None
+            for e in entries
+        ]
+        self.has_fp = np.array([f is not None for f in self.fingerprints], dtype=bool)
+        self._grids: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def grid(self, n: int) -> np.ndarray:
+        """(entries × n) fingerprints resampled onto an n-point scan grid
+        (same positional interpolation `_cosine_score` uses), rows scaled to
+        unit norm; entries without a fingerprint are zero rows."""
+        mat = self._grids.get(n)
+        if mat is None:
+            mat = np.zeros((len(self.entries), n))
+            idx_new = np.linspace(0, 1, n)
+            for i, ref in enumerate(self.fingerprints):
+                if ref is None:
+                    continue
+                mat[i] = ref if ref.size == n else np.interp(
+                    idx_new, np.linspace(0, 1, ref.size), ref)
+            norms = np.linalg.norm(mat, axis=1)
+            mat /= np.where(norms > 0, norms, 1.0)[:, None]
+            if len(self._grids) >= self._MAX_GRIDS:
+                self._grids.pop(next(iter(self._grids)))
+            self._grids[n] = mat
+        return mat
+
+    def overlap(self, scan_peaks_nm: Sequence[float], tol_nm: float = PEAK_TOL_NM) -> np.ndarray:
+        """Per entry, how many of its peaks lie within ±tol of a scan peak."""
+        counts = np.zeros(len(self.entries), dtype=int)
+        if not len(scan_peaks_nm) or not self.peak_nm.size:
+            return counts
+        scan = np.sort(np.asarray(scan_peaks_nm, dtype=float))
+        pos = np.searchsorted(scan, self.peak_nm)
+        left = np.abs(self.peak_nm - scan[np.clip(pos - 1, 0, scan.size - 1)])
+        right = np.abs(scan[np.clip(pos, 0, scan.size - 1)] - self.peak_nm)
+        covered = np.minimum(left, right) <= tol_nm
+        return np.bincount(self.peak_owner[covered], minlength=len(self.entries))
+
+    def rank(
+        self, norm_scans: np.ndarray, peaks: List[List[float]],
+    ) -> List[List[MaterialMatch]]:
+        """Top matches for a stack of same-length, unit-norm scans."""
+        if not len(self.entries):
+            return [[] for _ in peaks]
+        cos_all = norm_scans @ self.grid(norm_scans.shape[1]).T      # one GEMM
+        out: List[List[MaterialMatch]] = []
+        for row, scan_peaks in zip(cos_all, peaks):
+            overlap = self.overlap(scan_peaks)
+            # No fingerprint → rank on the fraction of library peaks covered.
+            cos = np.where(self.has_fp, row, overlap / np.maximum(1.0, self.n_lib_peaks))
+            cos = np.round(cos, 4)
+            keep = np.flatnonzero(~((cos < 0.10) & (overlap == 0)))
+            order = keep[np.lexsort((keep, -overlap[keep], -cos[keep]))][:TOP_MATCHES]
+            out.append([
+                MaterialMatch(
+                    library_id=self.entries[i]["id"],
+                    library_name=self.entries[i]["name"],
+                    category=self.entries[i]["category"],
+                    cosine_score=float(cos[i]),
+                    peaks_matched_count=int(overlap[i]),
+                    notes=self.entries[i].get("notes"),
+                )
+                for i in order
+            ])
+        return out
+
+
+_MATRIX: Dict[str, Any] = {"lib": None, "built_at": 0.0}
+_MATRIX_LOCK: Optional[asyncio.Lock] = None
+
+
+def invalidate_library_cache() -> None:
+    _MATRIX.update(lib=None, built_at=0.0)
+
+
+async def _library_matrix() -> _LibraryMatrix:
+    global _MATRIX_LOCK
+    lib = _MATRIX["lib"]
+    if lib is not None and time.monotonic() - _MATRIX["built_at"] < LIBRARY_TTL_S:
+        return lib
+    if _MATRIX_LOCK is None:
+        _MATRIX_LOCK = asyncio.Lock()
+    async with _MATRIX_LOCK:
+        lib = _MATRIX["lib"]
+        if lib is None or time.monotonic() - _MATRIX["built_at"] >= LIBRARY_TTL_S:
+            lib = _LibraryMatrix(await list_library())
+            _MATRIX.update(lib=lib, built_at=time.monotonic())
+    return lib
+
+
+def library_cache_stats() -> Dict[str, Any]:
+    lib = _MATRIX["lib"]
+    return {
+        "entries": len(lib) if lib is not None else 0,
+        "with_fingerprint": int(lib.has_fp.sum()) if lib is not None else 0,
+        "peaks": int(lib.peak_nm.size) if lib is not None else 0,
+        "grids": sorted(lib._grids) if lib is not None else [],
+        "age_s": round(time.monotonic() - _MATRIX["built_at"], 1) if lib is not None else None,
+        "ttl_s": LIBRARY_TTL_S,
+    }
+
+
 def _interpret(
     best: Optional[MaterialMatch], confidence: float, n_peaks: int, snr: float,
 ) -> str:
@@ -185,72 +316,102 @@ def _interpret(
 
 
 # --- Public entrypoints ----------------------------------------------------
-async def ingest_and_analyse(spectrum: NIRSpectrum) -> Dict[str, Any]:
-    issues = _validate(spectrum)
-    if issues:
-        return {"ok": False, "errors": issues}
-
+def _analyse_signal(spectrum: NIRSpectrum) -> Dict[str, Any]:
     wls = np.asarray(spectrum.wavelengths_nm, dtype=float)
     raw = np.asarray(spectrum.intensities, dtype=float)
-    corrected, smoothed, baseline = _smooth_and_baseline(raw)
+    corrected, _smoothed, baseline = _smooth_and_baseline(raw)
     peaks_nm, widths_nm, snr = _detect_peaks(wls, corrected)
+    return {
+        "norm": corrected / (np.linalg.norm(corrected) or 1.0),
+        "baseline": baseline, "peaks": peaks_nm, "widths": widths_nm, "snr": snr,
+    }
 
-    # Library scan
-    library = await list_library()
-    matches: List[MaterialMatch] = []
-    norm_corr = corrected / (np.linalg.norm(corrected) or 1.0)
-    for entry in library:
-        overlap = _peak_overlap(peaks_nm, entry.get("characteristic_peaks_nm") or [])
-        cos = _cosine_score(norm_corr, entry.get("fingerprint_intensities"))
-        # If we don't have a cosine reference, build a synthetic one from the
-        # overlap ratio so the matcher still ranks entries usefully.
-        if cos is None:
-            n_lib = max(1, len(entry.get("characteristic_peaks_nm") or []))
-            cos = overlap / n_lib
-        if cos < 0.10 and overlap == 0:
-            continue
-        matches.append(MaterialMatch(
-            library_id=entry["id"],
-            library_name=entry["name"],
-            category=entry["category"],
-            cosine_score=round(cos, 4),
-            peaks_matched_count=overlap,
-            notes=entry.get("notes"),
-        ))
-    matches.sort(key=lambda m: (m.cosine_score, m.peaks_matched_count), reverse=True)
-    top = matches[:5]
+
+def _result_for(spectrum: NIRSpectrum, sig: Dict[str, Any],
+                top: List[MaterialMatch]) -> ScanResult:
     best = top[0] if top else None
     confidence = best.cosine_score if best else 0.0
-
-    # Persist spectrum + result
-    spec_doc = spectrum.model_dump()
-    await _scans().insert_one(spec_doc.copy())
-
-    res = ScanResult(
+    return ScanResult(
         spectrum_id=spectrum.id,
         captured_at=spectrum.captured_at,
-        detected_peaks_nm=peaks_nm,
-        peak_widths_nm=widths_nm,
-        baseline_intensity=baseline,
-        snr=snr,
+        detected_peaks_nm=sig["peaks"],
+        peak_widths_nm=sig["widths"],
+        baseline_intensity=sig["baseline"],
+        snr=sig["snr"],
         top_matches=top,
         best_match=best,
         confidence=confidence,
-        interpretation=_interpret(best, confidence, len(peaks_nm), snr),
+        interpretation=_interpret(best, confidence, len(sig["peaks"]), sig["snr"]),
     )
-    await _results().insert_one(res.model_dump())
 
+
+async def _remember_scan(spectrum: NIRSpectrum, res: ScanResult) -> None:
+    best = res.best_match
     await mb.auto_store(
-        f"NIR SCAN · {spectrum.label or spectrum.id[:8]} · {len(peaks_nm)} peaks · "
-        f"best={best.library_name if best else 'none'} (conf={confidence:.2f})",
+        f"NIR SCAN · {spectrum.label or spectrum.id[:8]} · {len(res.detected_peaks_nm)} peaks · "
+        f"best={best.library_name if best else 'none'} (conf={res.confidence:.2f})",
         persona="minerva", category="research",
         source_type="nir_scan", source_id=spectrum.id,
         tags=["nir", "spectroscopy", spectrum.source.value]
         + (list(spectrum.tags or [])),
     )
+
+
+async def ingest_and_analyse(spectrum: NIRSpectrum) -> Dict[str, Any]:
+    issues = _validate(spectrum)
+    if issues:
+        return {"ok": False, "errors": issues}
+
+    sig = _analyse_signal(spectrum)
+    lib = await _library_matrix()
+    top = lib.rank(sig["norm"][None, :], [sig["peaks"]])[0]
+    res = _result_for(spectrum, sig, top)
+
+    # Persist spectrum + result
+    spec_doc = spectrum.model_dump()
+    await _scans().insert_one(spec_doc.copy())
+    await _results().insert_one(res.model_dump())
+    await _remember_scan(spectrum, res)
     return {"ok": True, "spectrum": _strip(spec_doc), "result": res.model_dump()}
 
 
+async def ingest_and_analyse_many(spectra: List[NIRSpectrum]) -> List[Dict[str, Any]]:
+    """Burst variant of `ingest_and_analyse` for handheld scanners.
+
+    Same per-scan output, in order. Scans of equal length are scored
+    together (one matrix product per length), and all valid scans and
+    results are written with one `insert_many` each."""
+    out: List[Optional[Dict[str, Any]]] = [None] * len(spectra)
+    sigs: Dict[int, Dict[str, Any]] = {}
+    by_len: Dict[int, List[int]] = {}
+    for i, spectrum in enumerate(spectra):
+        issues = _validate(spectrum)
+        if issues:
+            out[i] = {"ok": False, "errors": issues}
+            continue
+        sigs[i] = _analyse_signal(spectrum)
+        by_len.setdefault(len(spectrum.intensities), []).append(i)
+    if not sigs:
+        return out
+
+    lib = await _library_matrix()
+    results: Dict[int, ScanResult] = {}
+    for idx in by_len.values():
+        tops = lib.rank(np.stack([sigs[i]["norm"] for i in idx]),
+                        [sigs[i]["peaks"] for i in idx])
+        for i, top in zip(idx, tops):
+            results[i] = _result_for(spectra[i], sigs[i], top)
+
+    order = sorted(results)
+    spec_docs = {i: spectra[i].model_dump() for i in order}
+    await _scans().insert_many([spec_docs[i].copy() for i in order])
+    await _results().insert_many([results[i].model_dump() for i in order])
+    await asyncio.gather(*(_remember_scan(spectra[i], results[i]) for i in order))
+    for i in order:
+        out[i] = {"ok": True, "spectrum": _strip(spec_docs[i]), "result": results[i].model_dump()}
+    return out
+
+
 async def list_scans(limit: int = 50) -> List[Dict[str, Any]]:
     cur = _scans().find({}, {"_id": 0}).sort("captured_at", -1).limit(limit)
     return [d async for d in cur]
@@ -272,6 +433,7 @@ async def list_library() -> List[Dict[str, Any]]:
 
 async def add_library_entry(entry: LibraryEntry) -> Dict[str, Any]:
     await _library().insert_one(entry.model_dump().copy())
+    invalidate_library_cache()
     return entry.model_dump()
 
 
@@ -320,6 +482,8 @@ async def seed_library_if_needed() -> int:
         entry = LibraryEntry(**spec)
         await _library().insert_one(entry.model_dump().copy())
         inserted += 1
+    if inserted:
+        invalidate_library_cache()
     return inserted
 
 
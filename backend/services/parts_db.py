@@ -13,28 +13,30 @@ library powers two things in the Weaver pipeline:
 The library is seeded at first call with a small starter set so the
 architect always has something to plan against. Add more via
 POST /api/weaver/parts.
+
+Name matching runs against `parts_index`, an in-process token + trigram
+index over the whole library (hydrated at startup, updated here on every
+write), so a blueprint resolves all its names in one `match_many` call.
 """
+import asyncio
 import logging
 import os
-import re
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 
 from models.weaver_models import Part, PartCategory
+from services import mongo
+from services import parts_index
 
 logger = logging.getLogger("atlas.parts_db")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _col():
@@ -92,8 +94,11 @@ async def ensure_seeded() -> int:
             p = Part(**spec)
             docs.append(p.model_dump())
         if docs:
-            await _col().insert_many(docs)
+            await _col().insert_many([d.copy() for d in docs])
             logger.info("parts_db seeded with %d starter parts", len(docs))
+            if parts_index.is_hydrated():
+                for d in docs:
+                    parts_index.upsert(d)
     _SEEDED = True
     return len(_STARTER_PARTS) if count == 0 else 0
 
@@ -103,9 +108,26 @@ async def add_part(p: Part) -> Dict[str, Any]:
     await ensure_seeded()
     doc = p.model_dump()
     await _col().insert_one(doc.copy())
+    parts_index.upsert(doc)
     return _strip(doc)
 
 
+_IMMUTABLE = ("id", "created_at")
+
+
+async def update_part(part_id: str, patch: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Apply a partial update; returns the new row or None if unknown."""
+    fields = {k: v for k, v in patch.items() if k not in _IMMUTABLE and k in Part.model_fields}
+    fields["updated_at"] = _utc_now()
+    doc = await _col().find_one_and_update(
+        {"id": part_id}, {"$set": fields},
+        projection={"_id": 0}, return_document=ReturnDocument.AFTER,
+    )
+    if doc:
+        parts_index.upsert(doc)
+    return doc
+
+
 async def list_parts(
     *, category: Optional[str] = None, q: Optional[str] = None, limit: int = 50,
 ) -> List[Dict[str, Any]]:
@@ -127,49 +149,84 @@ async def get_part(part_id: str) -> Optional[Dict[str, Any]]:
     return await _col().find_one({"id": part_id}, {"_id": 0})
 
 
+async def get_parts(part_ids) -> Dict[str, Dict[str, Any]]:
+    """Batch `get_part`: {id: row} for the ids that exist, one query."""
+    ids = list(dict.fromkeys(i for i in part_ids if i))
+    if not ids:
+        return {}
+    cur = _col().find({"id": {"$in": ids}}, {"_id": 0})
+    return {d["id"]: d async for d in cur}
+
+
 async def delete_part(part_id: str) -> bool:
     res = await _col().delete_one({"id": part_id})
+    parts_index.remove(part_id)
     return res.deleted_count > 0
 
 
 # --- Matching --------------------------------------------------------------
-async def match_part(name: str) -> Optional[Dict[str, Any]]:
-    """Best-effort case-insensitive substring match. Returns the highest-
-    confidence library row, or None if nothing crosses the threshold."""
+_INDEX_LOCK: Optional[asyncio.Lock] = None
+
+
+async def _ensure_index() -> None:
+    """Hydrate the parts index on first use, then catch up on parts
+    written by other workers."""
+    global _INDEX_LOCK
     await ensure_seeded()
-    needle = (name or "").strip().lower()
-    if len(needle) < 2:
-        return None
-    # Token-overlap scoring across name + tags + material.
-    candidates: List[Dict[str, Any]] = await list_parts(limit=500)
-    best, best_score = None, 0.0
-    needle_tokens = set(_tokenise(needle))
-    for c in candidates:
-        haystack_tokens = set(_tokenise(c["name"]))
-        haystack_tokens |= set(t.lower() for t in c.get("tags", []))
-        if c.get("material"):
-            haystack_tokens |= set(_tokenise(c["material"]))
-        if not haystack_tokens:
-            continue
-        overlap = len(needle_tokens & haystack_tokens)
-        score = overlap / max(len(needle_tokens), 1)
-        # Bonus when the full needle name is contained in the haystack
-        if needle in c["name"].lower():
-            score += 0.5
-        if score > best_score:
-            best_score = score
-            best = dict(c, _match_confidence=min(1.0, score))
-    if best and best_score >= 0.5:
-        return best
-    return None
-
-
-_TOKEN_RE = re.compile(r"[a-z0-9]+")
-
-
-def _tokenise(text: str) -> List[str]:
-    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) >= 2]
+    if not parts_index.is_hydrated():
+        if _INDEX_LOCK is None:
+            _INDEX_LOCK = asyncio.Lock()
+        async with _INDEX_LOCK:
+            if not parts_index.is_hydrated():
+                await parts_index.hydrate(_col())
+        return
+    await parts_index.sync(_col())
+
+
+async def hydrate_index() -> Dict[str, Any]:
+    """Startup hook — seed if needed and build the parts index."""
+    await ensure_seeded()
+    return await parts_index.hydrate(_col())
+
+
+async def match_part(name: str) -> Optional[Dict[str, Any]]:
+    """Best-effort token-overlap match. Returns the highest-confidence
+    library row, or None if nothing crosses the threshold."""
+    return (await match_many([name]))[0]
+
+
+async def match_many(names: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+    """Batch `match_part`: one row (or None) per name, in order, resolved
+    against the in-process index — no per-name Mongo round trip.
+
+    Sync only picks up inserts and updates, so the winners are confirmed
+    with one `id $in` read; parts deleted by another worker are dropped
+    from the index and their names re-matched."""
+    await _ensure_index()
+    names = list(names)
+    hits = parts_index.match_many(names)
+    confirmed: Set[str] = set()
+    while True:
+        ids = list({h["id"] for h in hits if h} - confirmed)
+        if not ids:
+            return hits
+        live = {d["id"] async for d in _col().find(
+            {"id": {"$in": ids}}, {"_id": 0, "id": 1},
+        )}
+        confirmed |= live
+        gone = set(ids) - live
+        if not gone:
+            return hits
+        for pid in gone:
+            parts_index.remove(pid)      # deleted by another worker
+        stale = [i for i, h in enumerate(hits) if h and h["id"] in gone]
+        for i, hit in zip(stale, parts_index.match_many(names[i] for i in stale)):
+            hits[i] = hit
 
 
 def _strip(doc: Dict[str, Any]) -> Dict[str, Any]:
     return {k: v for k, v in doc.items() if k != "_id"}
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,266 @@
+"""
+Weaver parts search index.
+
+In-process inverted index over `weaver_parts`, so matching a blueprint's
+free-text part names is a dictionary lookup per token instead of pulling
+500 rows from Mongo and scoring each one in Python per name (which also
+left anything past the first 500 parts unreachable).
+
+  * haystack per part — name and material tokens plus lower-cased tags,
+    the same set `parts_db.match_part` always scored against
+  * exact tokens go through the token → part postings; a needle token
+    that isn't in the vocabulary falls back to character-trigram
+    similarity against the vocabulary ("alumnium" → "aluminium"),
+    counted at its Jaccard similarity. Trigrams punish a swapped pair of
+    characters hardest, which is the usual typo in part codes, so a
+    token with a digit that is one adjacent transposition from a
+    vocabulary token counts at 1 − 1/len instead ("mpu6500" → "mpu6050"
+    at 0.86, where trigrams alone give 0.27)
+  * parts whose lower-cased name contains the whole needle are found
+    through a name-trigram postings list ("servo" → "MicroServo SG90")
+  * score = Σ per-token best match / #needle tokens, +0.5 when the whole
+    needle is a substring of the part name; ≥ 0.5 is a match — the
+    original rule, so known-token and substring names resolve exactly as
+    before
+
+Mongo stays the source of truth, same contract as `knowledge_search`:
+hydrated at startup, kept in sync by add/update/delete in this process,
+and catching up on rows written elsewhere by `updated_at` every
+`PARTS_INDEX_SYNC_S` seconds.
+"""
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+SYNC_INTERVAL_S = float(os.environ.get("PARTS_INDEX_SYNC_S", "5"))
+MATCH_THRESHOLD = 0.5
+FUZZY_MIN_SIM = float(os.environ.get("PARTS_FUZZY_MIN_SIM", "0.45"))
+MAX_FUZZY_EXPANSION = 8
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenise(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if len(t) >= 2]
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _haystack(doc: Dict[str, Any]) -> Set[str]:
+    tokens = set(tokenise(doc.get("name", "")))
+    tokens |= {str(t).lower() for t in doc.get("tags") or ()}
+    if doc.get("material"):
+        tokens |= set(tokenise(doc["material"]))
+    return tokens
+
+
+# part id → (insertion seq, doc, haystack tokens, lower-cased name)
+_DOCS: Dict[str, Tuple[int, Dict[str, Any], Set[str], str]] = {}
+_POSTINGS: Dict[str, Set[str]] = {}
+# trigram → vocabulary tokens containing it
+_GRAMS: Dict[str, Set[str]] = {}
+# raw trigram of a lower-cased part name → part ids (substring candidates)
+_NAME_GRAMS: Dict[str, Set[str]] = {}
+_STATE: Dict[str, Any] = {"hydrated": False, "watermark": "", "last_sync": 0.0, "seq": 0}
+
+
+def is_hydrated() -> bool:
+    return bool(_STATE["hydrated"])
+
+
+def upsert(doc: Dict[str, Any]) -> None:
+    pid = doc.get("id")
+    if not pid:
+        return
+    old = _DOCS.get(pid)
+    remove(pid)
+    if old is None:
+        _STATE["seq"] += 1
+        seq = _STATE["seq"]
+    else:
+        seq = old[0]           # an edit keeps the part's tie-break position
+    doc = {k: v for k, v in doc.items() if k != "_id"}
+    hay = _haystack(doc)
+    lname = str(doc.get("name", "")).lower()
+    _DOCS[pid] = (seq, doc, hay, lname)
+    for g in _name_grams(lname):
+        _NAME_GRAMS.setdefault(g, set()).add(pid)
+    for tok in hay:
+        postings = _POSTINGS.get(tok)
+        if postings is None:
+            postings = _POSTINGS[tok] = set()
+            for g in trigrams(tok):
+                _GRAMS.setdefault(g, set()).add(tok)
+        postings.add(pid)
+    _note_watermark(doc)
+
+
+def remove(part_id: str) -> bool:
+    entry = _DOCS.pop(part_id, None)
+    if entry is None:
+        return False
+    for g in _name_grams(entry[3]):
+        bucket = _NAME_GRAMS.get(g)
+        if bucket is not None:
+            bucket.discard(part_id)
+            if not bucket:
+                del _NAME_GRAMS[g]
+    for tok in entry[2]:
+        postings = _POSTINGS.get(tok)
+        if postings is None:
+            continue
+        postings.discard(part_id)
+        if not postings:
+            del _POSTINGS[tok]
+            for g in trigrams(tok):
+                bucket = _GRAMS.get(g)
+                if bucket is not None:
+                    bucket.discard(tok)
+                    if not bucket:
+                        del _GRAMS[g]
+    return True
+
+
+def _name_grams(lname: str) -> Set[str]:
+    return {lname[i:i + 3] for i in range(len(lname) - 2)}
+
+
+def _substring_hits(needle: str) -> Iterable[str]:
+    """Part ids whose lower-cased name contains `needle`."""
+    if len(needle) < 3:
+        # Too short for a trigram; two-character needles are rare enough
+        # to check against every name.
+        return [pid for pid, entry in _DOCS.items() if needle in entry[3]]
+    postings = [_NAME_GRAMS.get(g) for g in _name_grams(needle)]
+    if not all(postings):
+        return []
+    return [pid for pid in min(postings, key=len) if needle in _DOCS[pid][3]]
+
+
+def _note_watermark(doc: Dict[str, Any]) -> None:
+    updated = str(doc.get("updated_at") or "")
+    if updated > _STATE["watermark"]:
+        _STATE["watermark"] = updated
+
+
+async def hydrate(collection: Any) -> Dict[str, Any]:
+    """(Re)build the index from every part in the library."""
+    _DOCS.clear()
+    _POSTINGS.clear()
+    _GRAMS.clear()
+    _NAME_GRAMS.clear()
+    _STATE.update(watermark="", seq=0)
+    async for doc in collection.find({}, {"_id": 0}):
+        upsert(doc)
+    _STATE.update(hydrated=True, last_sync=time.monotonic())
+    return stats()
+
+
+async def sync(collection: Any, *, force: bool = False) -> int:
+    """Re-index parts inserted or updated since the last hydrate/sync."""
+    if not force and time.monotonic() - _STATE["last_sync"] < SYNC_INTERVAL_S:
+        return 0
+    _STATE["last_sync"] = time.monotonic()
+    seen = 0
+    async for doc in collection.find(
+        {"updated_at": {"$gte": _STATE["watermark"]}}, {"_id": 0},
+    ):
+        upsert(doc)
+        seen += 1
+    return seen
+
+
+def _transposed(a: str, b: str) -> bool:
+    """True if `b` is `a` with exactly one pair of neighbours swapped."""
+    if len(a) != len(b):
+        return False
+    diff = [i for i in range(len(a)) if a[i] != b[i]]
+    return (len(diff) == 2 and diff[1] == diff[0] + 1
+            and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+
+
+def _fuzzy(token: str) -> List[Tuple[str, float]]:
+    """Vocabulary tokens sharing enough trigrams with `token`, best first."""
+    grams = trigrams(token)
+    shared: Dict[str, int] = {}
+    for g in grams:
+        for tok in _GRAMS.get(g, ()):
+            shared[tok] = shared.get(tok, 0) + 1
+    # Any transposition in a token of 4+ characters leaves a trigram in
+    # common, so the candidates above already include it.
+    code = len(token) >= 4 and any(c.isdigit() for c in token)
+    scored = []
+    for tok, n in shared.items():
+        sim = n / (len(grams) + len(trigrams(tok)) - n)
+        if code and _transposed(token, tok):
+            sim = max(sim, 1.0 - 1.0 / len(token))
+        if sim >= FUZZY_MIN_SIM:
+            scored.append((tok, sim))
+    scored.sort(key=lambda hit: (-hit[1], hit[0]))
+    return scored[:MAX_FUZZY_EXPANSION]
+
+
+def match(name: str) -> Optional[Dict[str, Any]]:
+    """Best library row for a free-text part name, with
+    `_match_confidence`, or None below the threshold."""
+    needle = (name or "").strip().lower()
+    if len(needle) < 2:
+        return None
+    needle_tokens = set(tokenise(needle))
+    best_by_part: Dict[str, Dict[str, float]] = {}
+    for tok in needle_tokens:
+        expansions = [(tok, 1.0)] if tok in _POSTINGS else _fuzzy(tok)
+        for indexed, sim in expansions:
+            for pid in _POSTINGS[indexed]:
+                per_token = best_by_part.setdefault(pid, {})
+                if sim > per_token.get(tok, 0.0):
+                    per_token[tok] = sim
+    # The substring bonus alone (+0.5) is a match, so parts that share no
+    # token with the needle still have to be candidates.
+    for pid in _substring_hits(needle):
+        if _DOCS[pid][2]:                  # parts with no tokens never scored
+            best_by_part.setdefault(pid, {})
+    best_key, best = None, None
+    for pid, per_token in best_by_part.items():
+        seq, doc, _, lname = _DOCS[pid]
+        score = sum(per_token.values()) / max(len(needle_tokens), 1)
+        if needle in lname:
+            score += 0.5
+        # Highest score wins; ties go to the part indexed first, as the
+        # old scan over Mongo's natural order did.
+        key = (score, -seq)
+        if best_key is None or key > best_key:
+            best_key, best = key, doc
+    if best is None or best_key[0] < MATCH_THRESHOLD:
+        return None
+    return dict(best, _match_confidence=min(1.0, best_key[0]))
+
+
+def match_many(names: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+    """`match` for each name, in order; repeated names are scored once."""
+    names = list(names)
+    memo = {n: match(n) for n in dict.fromkeys(names)}
+    return [dict(memo[n]) if memo[n] else None for n in names]
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "parts": len(_DOCS),
+        "tokens": len(_POSTINGS),
+        "trigrams": len(_GRAMS),
+        "name_trigrams": len(_NAME_GRAMS),
+        "hydrated": is_hydrated(),
+        "watermark": _STATE["watermark"],
+    }
+
+
+def reset_in_memory_state() -> None:
+    _DOCS.clear()
+    _POSTINGS.clear()
+    _GRAMS.clear()
+    _NAME_GRAMS.clear()
+    _STATE.update(hydrated=False, watermark="", last_sync=0.0, seq=0)
@@ -4,8 +4,9 @@ Persona Chat orchestrator — Phase 8a.
 Pipeline per turn (single persona):
 
     1. Session lookup or create
-    2. Retrieve persona-tagged Memory Bank entries (cosine similarity to msg)
-    3. Retrieve relevant Knowledge Bank records (regex search by msg)
+    2-3. context_retrieval: persona Memory Bank entries (vector) and
+         Knowledge Bank records (BM25), RRF-fused into one token-budgeted
+         context block
     4. Pull last N messages of this session for short-term context
     5. Build the system prompt = persona_voice + grounded context
     6. llm_provider.send(persona, system, user)
@@ -13,8 +14,15 @@ Pipeline per turn (single persona):
     8. Mirror assistant turn into Memory Bank (category=agent, persona=<persona>)
        so future turns can recall this conversation.
 
+Streaming:
+    `chat_stream_any` runs the same pipeline but yields token events as
+    the LLM produces them (routes expose it as SSE and WebSocket). The
+    council stream interleaves the three sub-voices and starts the
+    synthesis as soon as the last voice finishes.
+
 Council chat:
-    Runs steps 1-4, then 5-6 in PARALLEL for ajani/minerva/hermes,
+    Runs steps 1-4 once (one retrieval pass shared by all three voices,
+    cached per query + persona), then 5-6 in PARALLEL for ajani/minerva/hermes,
     then a final synthesis call with persona='council' that sees all
     three sub-voices. Each sub-voice is returned to the caller for HUD
     display and stored in Memory Bank as category=council/permanent.
@@ -30,14 +38,12 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import os
-from typing import Any, Dict, List, Optional, Tuple
-
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
+from services import mongo
 import services.llm_provider as llmp
 import services.memory_bank as mb
-import services.knowledge_ingestion as kbase
+import services.context_retrieval as retrieval
 from models.persona_models import (
     ChatMessage, ChatRequest, ChatResponse, ChatSession,
     CouncilSubVoice, Persona, PersonaInfo, _now,
@@ -114,16 +120,10 @@ PERSONAS: Dict[Persona, PersonaInfo] = {
 
 
 # ---------------------------------------------------------------------------
-# Mongo handles (lazy, env-only — fail fast if MONGO_URL is missing)
+# Mongo handles (shared process-wide client, see services/mongo.py)
 # ---------------------------------------------------------------------------
-_client: Optional[AsyncIOMotorClient] = None
-
-
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(os.environ['MONGO_URL'])
-    return _client[os.environ['DB_NAME']]
+    return mongo.db()
 
 
 def _sessions():
@@ -137,96 +137,6 @@ def _messages():
 # ---------------------------------------------------------------------------
 # Context retrieval — the "grounded" part of the prompt
 # ---------------------------------------------------------------------------
-async def _fetch_persona_memories(persona: Persona, query: str, top_k: int) -> List[Dict[str, Any]]:
-    """Pull this persona's most relevant Memory Bank entries.
-
-    Uses cosine similarity via `memory_bank.search_memory`. We deliberately
-    omit a category filter so the persona pulls from BOTH long-term lessons
-    (category=agent) AND recent chat turns mirrored back (category=agent).
-    """
-    if top_k <= 0:
-        return []
-    try:
-        rows = await mb.search_memory(query, persona=persona, top_k=top_k, min_score=0.10)
-    except Exception as exc:    # noqa: BLE001
-        logger.warning("memory search failed for persona=%s: %s", persona, exc)
-        return []
-    return rows
-
-
-_STOPWORDS = {
-    "the", "and", "for", "with", "what", "when", "where", "why", "how",
-    "this", "that", "these", "those", "are", "was", "were", "have", "has",
-    "had", "do", "does", "did", "can", "could", "should", "would", "you",
-    "your", "yours", "we", "they", "them", "our", "their", "but", "not",
-    "tell", "give", "say", "ask", "please", "briefly", "summarise",
-    "summarize", "explain", "about", "into", "from", "than", "then",
-    "very", "just", "really", "kind", "of", "in", "on", "at", "to", "by",
-    "or", "as", "is", "be", "it", "an", "a", "i", "me", "my", "mine",
-}
-
-
-def _keywords(text: str, max_tokens: int = 6) -> List[str]:
-    """Pull the few distinctive tokens out of a natural-language prompt.
-    Used to query the Knowledge Bank (whose search is a regex substring,
-    not a real text index — so a multi-sentence prompt would otherwise
-    match nothing). Lowercased, stop-words dropped, length ≥ 4."""
-    import re as _re
-    raw = _re.findall(r"[A-Za-z][A-Za-z0-9_\-]{3,}", text or "")
-    seen: set[str] = set()
-    out: List[str] = []
-    for tok in raw:
-        low = tok.lower()
-        if low in _STOPWORDS or low in seen:
-            continue
-        seen.add(low)
-        out.append(low)
-        if len(out) >= max_tokens:
-            break
-    return out
-
-
-async def _fetch_knowledge(query: str, persona: Persona, top_k: int) -> List[Dict[str, Any]]:
-    """Pull the most relevant Knowledge Bank records.
-
-    Knowledge Bank uses a regex/text index — fast but coarse. We bias toward
-    records this persona is tagged on (`related_agents` contains the persona)
-    and fall back to a global search when the per-persona slice is empty.
-
-    The user's natural-language message is tokenised first; we run one
-    kbase.search per top keyword and merge results (dedup-by-id, preserving
-    persona-filtered hits first). Without this, a multi-sentence prompt
-    would never match an ingested record.
-    """
-    if top_k <= 0:
-        return []
-    tokens = _keywords(query) or [query.strip()[:40]]
-    seen: set[str] = set()
-    merged: List[Dict[str, Any]] = []
-    try:
-        # Two passes: persona-filtered first, then global fallback if empty.
-        for use_persona_filter in (True, False):
-            if merged and use_persona_filter is False:
-                break  # already have hits — skip global pass
-            for tok in tokens:
-                rows = await kbase.search(
-                    q=tok,
-                    agent=persona if use_persona_filter else None,
-                    limit=top_k,
-                )
-                for r in rows:
-                    rid = r.get("id")
-                    if rid and rid not in seen:
-                        seen.add(rid)
-                        merged.append(r)
-                        if len(merged) >= top_k:
-                            return merged
-        return merged
-    except Exception as exc:    # noqa: BLE001
-        logger.warning("knowledge search failed for persona=%s: %s", persona, exc)
-        return merged
-
-
 async def _recent_turns(session_id: str, limit: int = 6) -> List[Dict[str, Any]]:
     """Last N messages, oldest-first. limit ≤ 6 keeps context cheap."""
     cur = _messages().find({"session_id": session_id}, {"_id": 0}) \
@@ -238,32 +148,6 @@ async def _recent_turns(session_id: str, limit: int = 6) -> List[Dict[str, Any]]
 # ---------------------------------------------------------------------------
 # Prompt builder
 # ---------------------------------------------------------------------------
-def _format_memories(rows: List[Dict[str, Any]]) -> str:
-    if not rows:
-        return "  (none yet — this is the first relevant insight on this topic.)"
-    lines = []
-    for r in rows[:5]:
-        # search_memory returns the row + `score`. Show snippet only.
-        snip = (r.get("content") or "")[:240].strip()
-        tags = ", ".join((r.get("tags") or [])[:5])
-        score = r.get("score")
-        score_s = f" · sim={score:.2f}" if isinstance(score, (int, float)) else ""
-        lines.append(f"  • [{tags}]{score_s} {snip}")
-    return "\n".join(lines)
-
-
-def _format_knowledge(rows: List[Dict[str, Any]]) -> str:
-    if not rows:
-        return "  (no matching ingested sources yet.)"
-    lines = []
-    for r in rows[:5]:
-        title = (r.get("title") or "untitled")[:120]
-        summary = (r.get("summary") or "")[:200]
-        url = r.get("source_url") or ""
-        lines.append(f"  • {title} — {summary}  [{url}]")
-    return "\n".join(lines)
-
-
 def _format_history(rows: List[Dict[str, Any]]) -> str:
     if not rows:
         return ""
@@ -274,16 +158,15 @@ def _format_history(rows: List[Dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
-def _build_system(persona: Persona, memories: List[Dict[str, Any]],
-                  knowledge: List[Dict[str, Any]], history: List[Dict[str, Any]]) -> str:
+def _build_system(persona: Persona, context: retrieval.RetrievedContext,
+                  history: List[Dict[str, Any]]) -> str:
     info = PERSONAS[persona]
     return (
         f"{info.voice_prompt}\n\n"
         "You have access to two grounded sources of context. Use them when "
         "they are relevant; do NOT mention this context block — just speak "
         "naturally as the persona.\n\n"
-        f"YOUR DOMAIN MEMORIES (most relevant first):\n{_format_memories(memories)}\n\n"
-        f"INGESTED KNOWLEDGE (most relevant first):\n{_format_knowledge(knowledge)}\n"
+        f"{context.block}\n"
         f"{_format_history(history)}\n\n"
         "Now answer the architect's next message. Stay in voice."
     )
@@ -317,57 +200,62 @@ async def _touch_session(session_id: str, *, add_messages: int) -> None:
 # ---------------------------------------------------------------------------
 # Single-persona chat
 # ---------------------------------------------------------------------------
-async def chat(persona: Persona, req: ChatRequest) -> ChatResponse:
-    persona = persona.lower()    # type: ignore[assignment]
+def _check_persona(persona: str) -> Persona:
+    persona = persona.lower()
     if persona not in PERSONAS:
         raise ValueError(f"unknown persona: {persona!r}")
+    return persona    # type: ignore[return-value]
 
+
+async def _prepare_turn(
+    persona: Persona, req: ChatRequest,
+) -> Tuple[ChatSession, retrieval.RetrievedContext, str]:
+    """Steps 1-5: session, grounded context, persisted user turn, and the
+    system prompt. Shared by `chat` and `chat_stream`."""
     # 1. Session
     session = await _get_or_create_session(persona, req.session_id, req.project_id, req.message)
 
     # 2-4. Context (parallel)
-    memories_t = asyncio.create_task(
-        _fetch_persona_memories(persona, req.message, req.memory_top_k)
-    )
-    knowledge_t = asyncio.create_task(
-        _fetch_knowledge(req.message, persona, req.knowledge_top_k)
+    context, history = await asyncio.gather(
+        retrieval.retrieve(
+            req.message, persona,
+            memory_top_k=req.memory_top_k, knowledge_top_k=req.knowledge_top_k,
+        ),
+        _recent_turns(session.id, limit=6),
     )
-    history_t = asyncio.create_task(_recent_turns(session.id, limit=6))
-    memories, knowledge, history = await asyncio.gather(memories_t, knowledge_t, history_t)
 
     # 5. Persist USER turn first so even an LLM failure leaves a record.
     user_msg = ChatMessage(
         session_id=session.id, persona=persona, role="user", content=req.message,
     )
     await _messages().insert_one(user_msg.model_dump())
+    return session, context, _build_system(persona, context, history)
 
-    # 6. LLM call
-    system = _build_system(persona, memories, knowledge, history)
-    try:
-        res = await llmp.send(
-            persona, system, req.message,
-            session_id=session.id,
-            model_override=req.model_override,
-        )
-    except Exception as exc:    # noqa: BLE001
-        logger.exception("persona chat LLM call failed: %s", exc)
-        # Persist a placeholder assistant turn so the UI can show the error.
-        err_msg = ChatMessage(
-            session_id=session.id, persona=persona, role="assistant",
-            content=f"(LLM error: {exc})",
-        )
-        await _messages().insert_one(err_msg.model_dump())
-        await _touch_session(session.id, add_messages=2)
-        return ChatResponse(
-            session_id=session.id, persona=persona,
-            reply=err_msg.content, message_id=err_msg.id,
-            cited_memory_ids=[], cited_knowledge_ids=[],
-            provider_used=None, model_used=None, fallback_reason="llm_error",
-        )
 
+async def _llm_error_turn(session: ChatSession, persona: Persona, exc: Exception) -> ChatResponse:
+    """Persist a placeholder assistant turn so the UI can show the error."""
+    err_msg = ChatMessage(
+        session_id=session.id, persona=persona, role="assistant",
+        content=f"(LLM error: {exc})",
+    )
+    await _messages().insert_one(err_msg.model_dump())
+    await _touch_session(session.id, add_messages=2)
+    return ChatResponse(
+        session_id=session.id, persona=persona,
+        reply=err_msg.content, message_id=err_msg.id,
+        cited_memory_ids=[], cited_knowledge_ids=[],
+        provider_used=None, model_used=None, fallback_reason="llm_error",
+    )
+
+
+async def _finish_turn(
+    persona: Persona, req: ChatRequest, session: ChatSession,
+    context: retrieval.RetrievedContext, res: Dict[str, Any],
+) -> ChatResponse:
+    """Steps 7-8: persist the assistant turn and mirror it into Memory Bank."""
     reply = (res.get("text") or "").strip()
-    cited_mem = [m.get("id") for m in memories if m.get("id")]
-    cited_kbase = [k.get("id") for k in knowledge if k.get("id")]
+    cited_mem = [m.get("id") for m in context.memories if m.get("id")]
+    cited_kbase = [k.get("id") for k in context.knowledge if k.get("id")]
 
     # 7. Persist ASSISTANT turn
     asst_msg = ChatMessage(
@@ -404,15 +292,63 @@ async def chat(persona: Persona, req: ChatRequest) -> ChatResponse:
     )
 
 
+async def chat(persona: Persona, req: ChatRequest) -> ChatResponse:
+    persona = _check_persona(persona)
+    session, context, system = await _prepare_turn(persona, req)
+
+    # 6. LLM call
+    try:
+        res = await llmp.send(
+            persona, system, req.message,
+            session_id=session.id,
+            model_override=req.model_override,
+        )
+    except Exception as exc:    # noqa: BLE001
+        logger.exception("persona chat LLM call failed: %s", exc)
+        return await _llm_error_turn(session, persona, exc)
+    return await _finish_turn(persona, req, session, context, res)
+
+
+async def chat_stream(persona: Persona, req: ChatRequest) -> AsyncIterator[Dict[str, Any]]:
+    """Streaming `chat`. Yields `session`, then `delta` / `reset` events
+    (tagged with the persona) as tokens arrive, then `done` with the
+    final ChatResponse once the turn is persisted."""
+    persona = _check_persona(persona)
+    session, context, system = await _prepare_turn(persona, req)
+    yield {"type": "session", "session_id": session.id, "persona": persona}
+
+    res: Optional[Dict[str, Any]] = None
+    try:
+        async for event in llmp.stream(
+            persona, system, req.message,
+            session_id=session.id,
+            model_override=req.model_override,
+        ):
+            if event["type"] == "done":
+                res = event
+            else:
+                yield {**event, "persona": persona}
+    except Exception as exc:    # noqa: BLE001
+        logger.exception("persona chat LLM stream failed: %s", exc)
+        resp = await _llm_error_turn(session, persona, exc)
+        yield {"type": "done", "response": resp.model_dump()}
+        return
+    resp = await _finish_turn(persona, req, session, context, res or {})
+    yield {"type": "done", "response": resp.model_dump()}
+
+
 # ---------------------------------------------------------------------------
 # Council chat — fan-out + synthesis
 # ---------------------------------------------------------------------------
-async def _one_voice(persona: Persona, message: str, memories: List[Dict[str, Any]],
-                     knowledge: List[Dict[str, Any]]) -> Tuple[Persona, Dict[str, Any]]:
+_COUNCIL_VOICES: Tuple[Persona, ...] = ("ajani", "minerva", "hermes")
+
+
+async def _one_voice(persona: Persona, message: str,
+                     context: retrieval.RetrievedContext) -> Tuple[Persona, Dict[str, Any]]:
     """One sub-voice for the council. Skips persistence — the council
     response is the persisted artefact; sub-voices are mirrored into
     Memory Bank as category=council/permanent for audit."""
-    system = _build_system(persona, memories, knowledge, history=[])
+    system = _build_system(persona, context, history=[])
     try:
         res = await llmp.send(
             persona, system, message,
@@ -424,68 +360,93 @@ async def _one_voice(persona: Persona, message: str, memories: List[Dict[str, An
         return persona, {"text": f"(no response — {exc})", "provider_used": None, "model_used": None}
 
 
-async def _council_chat(req: ChatRequest) -> ChatResponse:
+async def _stream_voice(persona: Persona, message: str,
+                        context: retrieval.RetrievedContext,
+                        queue: "asyncio.Queue[Dict[str, Any]]") -> None:
+    """Streaming `_one_voice`: pushes this voice's deltas onto the shared
+    council queue and always finishes with one `voice_done` event."""
+    system = _build_system(persona, context, history=[])
+    res: Optional[Dict[str, Any]] = None
+    try:
+        async for event in llmp.stream(
+            persona, system, message,
+            session_id=f"council-sub-{persona}",
+        ):
+            if event["type"] == "done":
+                res = event
+            else:
+                await queue.put({**event, "persona": persona})
+    except Exception as exc:    # noqa: BLE001
+        logger.warning("council sub-voice %s failed: %s", persona, exc)
+        res = {"text": f"(no response — {exc})", "provider_used": None, "model_used": None}
+    await queue.put({"type": "voice_done", "persona": persona, "result": res or {}})
+
+
+async def _prepare_council(
+    req: ChatRequest,
+) -> Tuple[ChatSession, Dict[str, retrieval.RetrievedContext]]:
     session = await _get_or_create_session("council", req.session_id, req.project_id, req.message)
 
-    # All three personas pull THEIR memories in parallel.
-    contexts = await asyncio.gather(
-        _fetch_persona_memories("ajani",   req.message, req.memory_top_k),
-        _fetch_persona_memories("minerva", req.message, req.memory_top_k),
-        _fetch_persona_memories("hermes",  req.message, req.memory_top_k),
-        _fetch_knowledge(req.message, "council", req.knowledge_top_k),
+    # One retrieval pass for all three voices: each gets ITS memories and
+    # persona-boosted knowledge, but Mongo is read once per source.
+    contexts = await retrieval.retrieve_many(
+        req.message, list(_COUNCIL_VOICES),
+        memory_top_k=req.memory_top_k, knowledge_top_k=req.knowledge_top_k,
     )
-    ajani_mem, minerva_mem, hermes_mem, kbase_rows = contexts
 
     # Persist USER turn now (in case anything below fails)
     user_msg = ChatMessage(
         session_id=session.id, persona="council", role="user", content=req.message,
     )
     await _messages().insert_one(user_msg.model_dump())
+    return session, contexts
 
-    # Three sub-voices in parallel
-    sub_results = await asyncio.gather(
-        _one_voice("ajani",   req.message, ajani_mem,   kbase_rows),
-        _one_voice("minerva", req.message, minerva_mem, kbase_rows),
-        _one_voice("hermes",  req.message, hermes_mem,  kbase_rows),
+
+def _sub_voice(persona: Persona, res: Dict[str, Any]) -> CouncilSubVoice:
+    return CouncilSubVoice(
+        persona=persona,
+        text=(res.get("text") or "").strip(),
+        provider_used=res.get("provider_used"),
+        model_used=res.get("model_used"),
     )
-    sub_voices: List[CouncilSubVoice] = []
-    fold_lines = []
-    for persona_slug, res in sub_results:
-        text = (res.get("text") or "").strip()
-        sub_voices.append(CouncilSubVoice(
-            persona=persona_slug,
-            text=text,
-            provider_used=res.get("provider_used"),
-            model_used=res.get("model_used"),
-        ))
-        fold_lines.append(f"--- {persona_slug.upper()} ---\n{text}")
-
-    # Council synthesis prompt: includes the three sub-voices verbatim
-    council_system = (
+
+
+def _synthesis_system(sub_voices: List[CouncilSubVoice]) -> str:
+    """Council synthesis prompt: includes the three sub-voices verbatim."""
+    fold_lines = [f"--- {v.persona.upper()} ---\n{v.text}" for v in sub_voices]
+    return (
         PERSONAS["council"].voice_prompt + "\n\n"
         "You will now read three voices on the architect's question and "
         "synthesise ONE final answer.\n\n"
         + "\n\n".join(fold_lines) + "\n\n"
         "Architect's question follows. Give the final synthesis."
     )
-    try:
-        synth = await llmp.send(
-            "council", council_system, req.message,
-            session_id=session.id,
-        )
+
+
+async def _finish_council(
+    req: ChatRequest, session: ChatSession,
+    contexts: Dict[str, retrieval.RetrievedContext],
+    sub_voices: List[CouncilSubVoice], synth: Optional[Dict[str, Any]],
+) -> ChatResponse:
+    """Persist the council turn. `synth=None` means the synthesis call
+    failed — the reply falls back to the concatenated sub-voices."""
+    if synth is not None:
         reply = (synth.get("text") or "").strip()
         provider_used = synth.get("provider_used")
         model_used = synth.get("model_used")
         fallback_reason = synth.get("fallback_reason")
-    except Exception as exc:    # noqa: BLE001
-        logger.exception("council synthesis failed: %s", exc)
+    else:
         reply = "\n\n".join(f"{v.persona.upper()}: {v.text}" for v in sub_voices)
         provider_used = None
         model_used = None
         fallback_reason = "council_synth_failed"
 
-    cited_mem = [m.get("id") for m in (ajani_mem + minerva_mem + hermes_mem) if m.get("id")]
-    cited_kbase = [k.get("id") for k in kbase_rows if k.get("id")]
+    cited_mem = list(dict.fromkeys(
+        m.get("id") for p in _COUNCIL_VOICES for m in contexts[p].memories if m.get("id")
+    ))
+    cited_kbase = list(dict.fromkeys(
+        k.get("id") for p in _COUNCIL_VOICES for k in contexts[p].knowledge if k.get("id")
+    ))
 
     asst_msg = ChatMessage(
         session_id=session.id, persona="council", role="assistant",
@@ -529,6 +490,78 @@ async def _council_chat(req: ChatRequest) -> ChatResponse:
     )
 
 
+async def _council_chat(req: ChatRequest) -> ChatResponse:
+    session, contexts = await _prepare_council(req)
+
+    # Three sub-voices in parallel
+    sub_results = await asyncio.gather(*(
+        _one_voice(p, req.message, contexts[p]) for p in _COUNCIL_VOICES
+    ))
+    sub_voices = [_sub_voice(p, res) for p, res in sub_results]
+
+    synth: Optional[Dict[str, Any]] = None
+    try:
+        synth = await llmp.send(
+            "council", _synthesis_system(sub_voices), req.message,
+            session_id=session.id,
+        )
+    except Exception as exc:    # noqa: BLE001
+        logger.exception("council synthesis failed: %s", exc)
+    return await _finish_council(req, session, contexts, sub_voices, synth)
+
+
+async def council_stream(req: ChatRequest) -> AsyncIterator[Dict[str, Any]]:
+    """Streaming council turn. The three sub-voices stream concurrently
+    and their `delta` events are interleaved as they arrive (each tagged
+    with its persona); a `voice_done` event closes each voice. Synthesis
+    starts the moment the last voice finishes and streams as
+    persona=council, then `done` carries the final ChatResponse."""
+    session, contexts = await _prepare_council(req)
+    yield {"type": "session", "session_id": session.id, "persona": "council"}
+
+    queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+    tasks = [
+        asyncio.create_task(_stream_voice(p, req.message, contexts[p], queue))
+        for p in _COUNCIL_VOICES
+    ]
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        while len(results) < len(tasks):
+            event = await queue.get()
+            if event["type"] == "voice_done":
+                results[event["persona"]] = event["result"]
+                yield {"type": "voice_done", "persona": event["persona"],
+                       "text": (event["result"].get("text") or "").strip()}
+            else:
+                yield event
+    finally:
+        # Consumer went away mid-turn — don't leave voices generating.
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    sub_voices = [_sub_voice(p, results[p]) for p in _COUNCIL_VOICES]
+
+    synth: Optional[Dict[str, Any]] = None
+    streamed = False
+    try:
+        async for event in llmp.stream(
+            "council", _synthesis_system(sub_voices), req.message,
+            session_id=session.id,
+        ):
+            if event["type"] == "done":
+                synth = event
+            else:
+                streamed = True
+                yield {**event, "persona": "council"}
+    except Exception as exc:    # noqa: BLE001
+        logger.exception("council synthesis failed: %s", exc)
+        synth = None
+        if streamed:
+            yield {"type": "reset", "persona": "council", "reason": "council_synth_failed"}
+    resp = await _finish_council(req, session, contexts, sub_voices, synth)
+    yield {"type": "done", "response": resp.model_dump()}
+
+
 async def chat_any(persona: Persona, req: ChatRequest) -> ChatResponse:
     """Dispatcher — picks single-persona or council fan-out."""
     persona = persona.lower()    # type: ignore[assignment]
@@ -539,6 +572,14 @@ async def chat_any(persona: Persona, req: ChatRequest) -> ChatResponse:
     return await chat(persona, req)
 
 
+def chat_stream_any(persona: Persona, req: ChatRequest) -> AsyncIterator[Dict[str, Any]]:
+    """Streaming dispatcher. Validates eagerly so routes can reject an
+    unknown persona before the response starts."""
+    persona = persona.lower()    # type: ignore[assignment]
+    if persona == "council":
+        return council_stream(req)
+    return chat_stream(_check_persona(persona), req)
+
 # ---------------------------------------------------------------------------
 # Session / message read APIs
 # ---------------------------------------------------------------------------
@@ -0,0 +1,177 @@
+"""
+Pooled HTTP clients for the LLM and embedding providers.
+
+Every provider call used to open and tear down its own `httpx.AsyncClient`,
+so each Ollama / LM Studio / Emergent request paid TCP (and TLS) setup
+again — under council fan-out, local Ollama round-trips were dominated by
+connection churn. This module holds them process-wide instead:
+
+  * `client(base_url)` — one long-lived AsyncClient per origin
+                         (scheme://host:port) with keep-alive pooling.
+                         HTTP/2 is enabled when the optional `h2` package
+                         is installed (httpx negotiates it over TLS via
+                         ALPN; plain-http local servers stay on HTTP/1.1).
+  * `slot(provider)`   — per-provider concurrency semaphore. Callers past
+                         the limit queue; queue depth and wait time are
+                         recorded so a saturated provider is visible.
+  * `stats()`          — pool + semaphore counters for the system inspector.
+  * `close()`          — shutdown hook.
+
+Tuning: LLM_HTTP_MAX_CONNECTIONS, LLM_HTTP_MAX_KEEPALIVE,
+LLM_HTTP_KEEPALIVE_EXPIRY_S, LLM_HTTP2 (set 0 to force HTTP/1.1) and
+LLM_CONCURRENCY_<PROVIDER> (e.g. LLM_CONCURRENCY_OLLAMA=4).
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+MAX_CONNECTIONS = int(os.environ.get("LLM_HTTP_MAX_CONNECTIONS", "32"))
+MAX_KEEPALIVE = int(os.environ.get("LLM_HTTP_MAX_KEEPALIVE", "16"))
+KEEPALIVE_EXPIRY_S = float(os.environ.get("LLM_HTTP_KEEPALIVE_EXPIRY_S", "60"))
+HTTP2 = (
+    os.environ.get("LLM_HTTP2", "1").lower() not in ("0", "false", "no")
+    and importlib.util.find_spec("h2") is not None
+)
+DEFAULT_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+# Local servers run one model at a time — piling requests onto them only
+# grows their internal queue. The cloud gateway takes far more.
+DEFAULT_CONCURRENCY = {
+    "ollama": 4,
+    "lmstudio": 2,
+    "emergent": 16,
+}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_slots: Dict[str, "_ProviderSlot"] = {}
+
+
+def _origin(base_url: str) -> str:
+    parts = urlsplit(base_url)
+    if not parts.scheme:
+        return base_url.rstrip("/")
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def client(base_url: str) -> httpx.AsyncClient:
+    """The pooled client for `base_url`'s origin. Requests still use full
+    URLs; the client only owns the connection pool."""
+    key = _origin(base_url)
+    c = _clients.get(key)
+    if c is None or c.is_closed:
+        c = _clients[key] = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE,
+                keepalive_expiry=KEEPALIVE_EXPIRY_S,
+            ),
+            http2=HTTP2,
+        )
+    return c
+
+
+class _ProviderSlot:
+    __slots__ = ("limit", "sem", "in_flight", "waiting", "max_waiting",
+                 "requests", "errors", "wait_ms_total", "wait_ms_max")
+
+    def __init__(self, limit: int):
+        self.limit = max(1, int(limit))
+        self.sem = asyncio.Semaphore(self.limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.requests = 0
+        self.errors = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_wait_ms": round(self.wait_ms_total / self.requests, 2) if self.requests else 0.0,
+            "max_wait_ms": round(self.wait_ms_max, 2),
+        }
+
+
+def limit_for(provider: str) -> int:
+    raw = os.environ.get(f"LLM_CONCURRENCY_{provider.upper()}")
+    try:
+        return int(raw) if raw else DEFAULT_CONCURRENCY.get(provider, 8)
+    except ValueError:
+        return DEFAULT_CONCURRENCY.get(provider, 8)
+
+
+def _slot(provider: str) -> _ProviderSlot:
+    s = _slots.get(provider)
+    if s is None:
+        s = _slots[provider] = _ProviderSlot(limit_for(provider))
+    return s
+
+
+@asynccontextmanager
+async def slot(provider: str) -> AsyncIterator[None]:
+    """Hold one of `provider`'s concurrency slots for the duration of a
+    request (or a whole stream)."""
+    s = _slot(provider)
+    s.waiting += 1
+    s.max_waiting = max(s.max_waiting, s.waiting)
+    t0 = time.perf_counter()
+    try:
+        await s.sem.acquire()
+    finally:
+        s.waiting -= 1
+    waited = (time.perf_counter() - t0) * 1000.0
+    s.requests += 1
+    s.wait_ms_total += waited
+    s.wait_ms_max = max(s.wait_ms_max, waited)
+    s.in_flight += 1
+    try:
+        yield
+    except Exception:
+        s.errors += 1
+        raise
+    finally:
+        s.in_flight -= 1
+        s.sem.release()
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "http2": HTTP2,
+        "limits": {
+            "max_connections": MAX_CONNECTIONS,
+            "max_keepalive": MAX_KEEPALIVE,
+            "keepalive_expiry_s": KEEPALIVE_EXPIRY_S,
+        },
+        "clients": sorted(k for k, c in _clients.items() if not c.is_closed),
+        "providers": {name: s.stats() for name, s in sorted(_slots.items())},
+    }
+
+
+async def close() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for c in clients:
+        if not c.is_closed:
+            await c.aclose()
+
+
+def reset_in_memory_state() -> None:
+    """Drop clients and semaphores without awaiting (tests run each case
+    in a fresh event loop, and both are loop-bound)."""
+    _clients.clear()
+    _slots.clear()
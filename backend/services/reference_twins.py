@@ -10,9 +10,7 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict, List, Optional
-
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Any, Dict, List
 
 from models.twin_models import (
     Component,
@@ -26,20 +24,16 @@ from models.twin_models import (
     TwinStatus,
     TwinState,
 )
+from services import mongo
 from services import memory_bank as mb
 
 logger = logging.getLogger("atlas.reference_twins")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _twins():     return _db()["digital_twins"]
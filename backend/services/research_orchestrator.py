@@ -26,27 +26,22 @@ from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
-from motor.motor_asyncio import AsyncIOMotorClient
-
+from services import mongo
 from services import worldwatch as ww
 from services import knowledge_ingestion as ki
 from services import memory_bank as mb
 from services import lesson_generator as lg
 from services import knowledge_watcher as kw
+from services import llm_scheduler
 from services.llm_provider import send as llm_send
 
 logger = logging.getLogger("atlas.research_orchestrator")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _queue():    return _db()["research_queue"]
@@ -390,6 +385,9 @@ async def _set_state(item_id: str, new_state: str, *,
 
 
 # --- One full cycle -------------------------------------------------------
+# Every LLM call in a cycle (distillation, lessons, council review) queues
+# behind interactive chat.
+@llm_scheduler.with_priority("batch", caller="research_orchestrator")
 async def run_cycle(*,
                     discover_per_feed: int = 1,
                     max_investigate: int = 5,
@@ -441,6 +439,8 @@ async def run_cycle(*,
     proof["phases"]["1_discover"] = {
         "worldwatch_run_id": ww_run["run_id"],
         "ww_new_entries": ww_run["entries_new"],
+        "ww_not_modified": ww_run.get("feeds_not_modified", 0),
+        "ww_fetch_ms": ww_run.get("fetch_ms"),
         "enqueued": len(enqueued),
     }
 
@@ -501,19 +501,16 @@ async def run_cycle(*,
 
             # Phase 6: LINK with graph triples
             try:
-                await mb.add_triple(
-                    from_node=f"queue:{item['id'][:8]}",
-                    to_node=kb_id or "noid",
-                    relation="produced_knowledge",
-                    source_id=item["id"], weight=1.0,
-                )
-                for c in concepts[:5]:
-                    await mb.add_triple(
-                        from_node=f"queue:{item['id'][:8]}",
-                        to_node=c,
-                        relation="surfaced",
-                        source_id=item["id"], weight=1.0,
-                    )
+                queue_node = f"queue:{item['id'][:8]}"
+                await mb.add_triples([
+                    {"from_node": queue_node, "to_node": kb_id or "noid",
+                     "relation": "produced_knowledge",
+                     "source_id": item["id"], "weight": 1.0},
+                    *({"from_node": queue_node, "to_node": c,
+                       "relation": "surfaced",
+                       "source_id": item["id"], "weight": 1.0}
+                      for c in concepts[:5]),
+                ])
             except Exception as exc:    # noqa: BLE001
                 proof["errors"].append({"phase": 6, "msg": str(exc)[:160]})
             await _set_state(item["id"], "linked", by="cycle_phase6")
@@ -10,6 +10,10 @@ Simulation-first command flow:
                                     /api/robot/devices/{id}/commands/inbox)
   6. log + memory wiring         — Phase-2 mb.auto_store + project log
 
+Telemetry goes through services.telemetry_ingest (cached device state,
+buffered writes, windowed memory summaries); downsampled history lives in
+services.telemetry_store (minute / hour buckets + retention).
+
 Hard constraint: this layer never bypasses simulation.
 
 For v1, the "MQTT bridge" is HTTP-only: devices POST telemetry to
@@ -20,9 +24,7 @@ surface stays unchanged.
 """
 import logging
 import os
-from typing import Any, Dict, List, Optional
-
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Any, Dict, List, Optional, Tuple
 
 from models.robot_models import (
     ALLOWED_COMMANDS,
@@ -33,23 +35,18 @@ from models.robot_models import (
     DeviceStatus,
     OWNER_ONLY_COMMANDS,
     Role,
-    TelemetryRecord,
 )
 from models.twin_models import SimulationKind
-from services import digital_twin as dt, memory_bank as mb
+from services import mongo
+from services import digital_twin as dt, memory_bank as mb, telemetry_ingest, telemetry_store
 
 logger = logging.getLogger("atlas.robot")
 
-MONGO_URL = os.environ['MONGO_URL']
 DB_NAME = os.environ['DB_NAME']
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _devices():    return _db()["robot_devices"]
@@ -84,7 +81,8 @@ async def register_device(dev: Device) -> Dict[str, Any]:
 
 
 async def get_device(device_id: str) -> Optional[Dict[str, Any]]:
-    return await _devices().find_one({"id": device_id}, {"_id": 0})
+    doc = await _devices().find_one({"id": device_id}, {"_id": 0})
+    return telemetry_ingest.overlay(doc)
 
 
 async def list_devices(
@@ -94,7 +92,7 @@ async def list_devices(
     if status: filt["status"] = status
     if kind:   filt["kind"] = kind
     cur = _devices().find(filt, {"_id": 0}).sort("updated_at", -1).limit(limit)
-    return [d async for d in cur]
+    return [telemetry_ingest.overlay(d) async for d in cur]
 
 
 async def bind_twin(device_id: str, twin_id: str) -> Optional[Dict[str, Any]]:
@@ -116,6 +114,7 @@ async def bind_twin(device_id: str, twin_id: str) -> Optional[Dict[str, Any]]:
 async def emergency_stop(device_id: str, *, role: Role) -> Optional[Dict[str, Any]]:
     if role != Role.OWNER:
         return None
+    await telemetry_ingest.forget(device_id)
     await _devices().update_one(
         {"id": device_id},
         {"$set": {"status": DeviceStatus.SAFE_STATE.value, "updated_at": _now()}},
@@ -227,6 +226,7 @@ async def clear_safe_state(
 
     # 6. Flip device back to REGISTERED (the next telemetry burst will
     #    promote it to ONLINE — we don't fake that.)
+    await telemetry_ingest.forget(device_id)
     await _devices().update_one(
         {"id": device_id},
         {"$set": {"status": DeviceStatus.REGISTERED.value, "updated_at": cleared_at}},
@@ -270,52 +270,56 @@ async def clear_safe_state(
 
 
 # --- Telemetry --------------------------------------------------------------
-async def ingest_telemetry(device_id: str, payload: Dict[str, Any], *, source: str = "mqtt") -> Dict[str, Any]:
-    rec = TelemetryRecord(device_id=device_id, payload=payload, source=source)
-    await _telemetry().insert_one(rec.model_dump())
-
-    # SAFETY: only promote to ONLINE if the device isn't already in a
-    # sticky safety state (safe_state / quarantined). Otherwise telemetry
-    # from the device would silently undo emergency_stop or an owner's
-    # quarantine — and motors would keep running.
-    cur = await _devices().find_one({"id": device_id}, {"_id": 0, "status": 1})
-    cur_status = (cur or {}).get("status")
-    sticky = {DeviceStatus.SAFE_STATE.value, DeviceStatus.QUARANTINED.value}
-    update = {"last_seen": rec.received_at, "updated_at": rec.received_at}
-    if cur_status not in sticky:
-        update["status"] = DeviceStatus.ONLINE.value
-    await _devices().update_one({"id": device_id}, {"$set": update})
-    # Phase 8b — feed Sentinel anomaly detection. update_and_score reads
-    # the device doc we just touched, runs Welford's, and writes the
-    # envelope + anomaly flag back. Safe to fail open — anomaly detection
-    # never blocks telemetry intake.
-    try:
-        from services import anomaly  # local import to avoid circular load
-        _, drifting, z_scores = await anomaly.update_and_score(device_id, payload)
-    except Exception as exc:    # noqa: BLE001
-        logger.warning("anomaly scoring failed for %s: %s", device_id, exc)
-        drifting, z_scores = [], {}
-    # Telemetry is decaying research memory by design.
-    extra_tags = ["anomaly"] if drifting else []
-    drift_line = ""
-    if drifting:
-        drift_line = "\nANOMALY · drifting=" + ",".join(
-            f"{k}(z={z_scores.get(k):.1f})" for k in drifting
-        )
-    await mb.auto_store(
-        f"TELEMETRY · {device_id}\n" + ", ".join(f"{k}={v}" for k, v in payload.items())
-        + drift_line,
-        persona="hermes", category="research",
-        source_type="robot_telemetry", source_id=rec.id,
-        tags=["robot", "telemetry", device_id[:8]] + extra_tags,
-    )
-    return _strip(rec.model_dump())
+async def ingest_telemetry(
+    device_id: str, payload: Dict[str, Any], *, source: str = "mqtt",
+) -> Optional[Dict[str, Any]]:
+    """Hand the reading to the buffered ingest engine (services.telemetry_ingest).
+
+    Returns the stored TelemetryRecord, or None for an unregistered device.
+    SAFETY: the engine only promotes to ONLINE when the device isn't in a
+    sticky safety state (safe_state / quarantined) — enforced in the Mongo
+    filter itself, so telemetry can never silently undo emergency_stop or
+    an owner's quarantine. Anomaly scoring (Phase 8b) runs on the cached
+    envelopes and fails open; Memory Bank mirroring is per window and per
+    anomaly transition.
+    """
+    rec = await telemetry_ingest.ingest(device_id, payload, source=source)
+    return _strip(rec) if rec is not None else None
+
+
+async def ingest_telemetry_batch(
+    readings: List[Tuple[str, Dict[str, Any]]], *, source: str = "mqtt",
+) -> List[Optional[Dict[str, Any]]]:
+    """`ingest_telemetry` for many (device_id, payload) readings — one
+    anomaly-engine pass and at most one flush. Returns a record (or None
+    for an unregistered device) per reading."""
+    recs = await telemetry_ingest.ingest_batch(readings, source=source)
+    return [_strip(rec) if rec is not None else None for rec in recs]
 
 
 async def telemetry_history(device_id: str, *, limit: int = 50) -> List[Dict[str, Any]]:
+    pending = telemetry_ingest.pending_records(device_id)[:limit]
     cur = _telemetry().find({"device_id": device_id}, {"_id": 0}) \
         .sort("received_at", -1).limit(limit)
-    return [d async for d in cur]
+    seen = {r["id"] for r in pending}
+    rows = pending + [d async for d in cur if d.get("id") not in seen]
+    rows.sort(key=lambda r: r.get("received_at") or "", reverse=True)
+    return rows[:limit]
+
+
+async def telemetry_series(
+    device_id: str,
+    *,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    resolution: str = "auto",
+    keys: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Downsampled history (mean/min/max/count per key per point) from the
+    bucket store. Raises telemetry_store.TelemetryQueryError on a bad query."""
+    return await telemetry_store.series(
+        device_id, start=start, end=end, resolution=resolution, keys=keys,
+    )
 
 
 # --- Command pipeline -------------------------------------------------------
@@ -29,21 +29,16 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from services import mongo
 
 logger = logging.getLogger("atlas.self_improvement")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
 ROOT_DIR = Path(__file__).resolve().parents[2]
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _col(): return _db()["self_improvements"]
@@ -36,8 +36,7 @@ import os
 from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, Optional
 
-from motor.motor_asyncio import AsyncIOMotorClient
-
+from services import llm_scheduler, mongo
 import services.memory_bank as mb
 
 logger = logging.getLogger("atlas.sentinel.watcher")
@@ -61,14 +60,8 @@ def _cooldown_s() -> int:
         return 300
 
 
-_client: Optional[AsyncIOMotorClient] = None
-
-
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(os.environ['MONGO_URL'])
-    return _client[os.environ['DB_NAME']]
+    return mongo.db()
 
 
 def _devices():
@@ -119,6 +112,7 @@ def status() -> Dict[str, Any]:
 # ---------------------------------------------------------------------------
 # Core tick
 # ---------------------------------------------------------------------------
+@llm_scheduler.with_priority("autonomic", caller="sentinel_watcher")
 async def _fire_council(device: Dict[str, Any], anomaly: Dict[str, Any]) -> None:
     """Auto-call the council with an anomaly-framed question. Writes the
     reply to MemoryBank tagged `autonomic_council` so future Council /
@@ -0,0 +1,617 @@
+"""
+Telemetry ingest engine — Phase 8 fast path.
+
+`robot.ingest_telemetry` used to cost 5-6 Mongo round trips per reading
+(insert, two device find_one/update_one pairs, one Memory Bank embedding).
+This engine keeps the per-reading work in-process:
+
+  * device cache    — status + anomaly state per device, loaded with one
+                      find_one on first contact and re-read every
+                      TELEMETRY_DEVICE_TTL_S so changes made by other
+                      workers (a cleared safe state, an envelope reset)
+                      are picked up.
+                      Envelopes live in services.anomaly_engine (NumPy
+                      arrays) and are checkpointed to `state.envelopes`
+                      every ANOMALY_CHECKPOINT_INTERVAL_S, on `forget()`
+                      and on shutdown. `ingest_batch()` (the MQTT uplink
+                      path) scores a whole batch of readings in one
+                      engine pass; `ingest()` scores its lone reading on
+                      the engine's scalar path.
+  * write buffer    — telemetry rows are batched into `insert_many`;
+                      device updates are coalesced per device into one
+                      `bulk_write`. A flush happens when the buffer hits
+                      TELEMETRY_FLUSH_MAX rows, every
+                      TELEMETRY_FLUSH_INTERVAL_S seconds, and immediately
+                      on a status or anomaly transition. Rows carry their
+                      record id as `_id`, so a retried row that already
+                      landed is skipped, not duplicated.
+  * buckets         — every flushed batch is also folded into minute /
+                      hour aggregates (`telemetry_store.bucket_ops`); the
+                      flusher runs `telemetry_store.compact()` every
+                      TELEMETRY_COMPACT_INTERVAL_S for raw-row retention.
+                      Hours whose bucket write failed are re-rolled from
+                      raw rows on the next flush.
+  * memory mirror   — Memory Bank gets one summary per device per
+                      TELEMETRY_MEMORY_WINDOW_S (n / min / max / mean /
+                      last per key) plus one row per anomaly transition,
+                      instead of one embedding per reading.
+
+Safety: the ONLINE promotion is written with a `status ∉ {safe_state,
+quarantined}` filter, so a buffered flush can never undo an emergency
+stop issued by another worker. Anomaly state is written with an
+`envelope_epoch` filter, which `anomaly.reset_envelope` bumps, so a
+worker still holding pre-reset envelopes can't write them back. Owner
+actions that touch device state (emergency stop, clear safe state,
+envelope reset) call `forget()`, which flushes pending writes and evicts
+the cached device in the calling worker; other workers catch up on
+their next cache refresh.
+
+Reads stay consistent within the process: `pending_records()` exposes
+rows not yet flushed, `cached_state()` the live envelopes, and
+`overlay()` the buffered device fields.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from models.robot_models import DeviceStatus, TelemetryRecord
+from services import anomaly_engine, telemetry_store
+
+logger = logging.getLogger("atlas.telemetry_ingest")
+
+FLUSH_MAX = int(os.environ.get("TELEMETRY_FLUSH_MAX", "500"))
+FLUSH_INTERVAL_S = float(os.environ.get("TELEMETRY_FLUSH_INTERVAL_S", "1.0"))
+MEMORY_WINDOW_S = float(os.environ.get("TELEMETRY_MEMORY_WINDOW_S", "300"))
+CHECKPOINT_INTERVAL_S = float(os.environ.get("ANOMALY_CHECKPOINT_INTERVAL_S", "30"))
+DEVICE_TTL_S = float(os.environ.get("TELEMETRY_DEVICE_TTL_S", "5"))
+# Rows kept across failed flushes before the oldest are dropped.
+BUFFER_HARD_CAP = FLUSH_MAX * 20
+DUPLICATE_KEY = 11000
+
+STICKY_STATUSES = {DeviceStatus.SAFE_STATE.value, DeviceStatus.QUARANTINED.value}
+
+
+class _Device:
+    """Cached view of one device + its pending writes and memory window."""
+
+    __slots__ = (
+        "device_id", "status", "state", "epoch", "loaded_at", "last_seen", "dirty",
+        "promote", "unsaved", "checkpointed_at", "window", "window_n", "window_started",
+    )
+
+    def __init__(self, device_id: str, doc: Dict[str, Any]):
+        self.device_id = device_id
+        self.status: Optional[str] = doc.get("status")
+        self.state: Dict[str, Any] = dict(doc.get("state") or {})
+        self.epoch: Optional[int] = doc.get("envelope_epoch")
+        self.loaded_at = time.monotonic()
+        self.last_seen: Optional[str] = doc.get("last_seen")
+        self.dirty = False
+        self.promote = False
+        self.unsaved = False                         # envelopes not yet checkpointed
+        self.checkpointed_at = time.monotonic()
+        self.window: Dict[str, List[float]] = {}     # key → [n, min, max, sum, last]
+        self.window_n = 0
+        self.window_started = time.monotonic()
+
+
+_DEVICES: Dict[str, _Device] = {}
+_RECORDS: List[Dict[str, Any]] = []
+_INFLIGHT: List[Dict[str, Any]] = []
+# Hour-aligned {after, before} of raw rows whose bucket write failed.
+_REPAIR: Dict[str, str] = {}
+_FLUSH_LOCK: Optional[asyncio.Lock] = None
+_task: Optional[asyncio.Task] = None
+_last_compact = 0.0
+_stats: Dict[str, Any] = {
+    "ingested": 0,
+    "flushes": 0,
+    "rows_written": 0,
+    "duplicate_rows": 0,
+    "bucket_writes": 0,
+    "bucket_repairs": 0,
+    "compactions": 0,
+    "last_compaction": None,
+    "device_writes": 0,
+    "checkpoints": 0,
+    "memory_summaries": 0,
+    "memory_transitions": 0,
+    "device_loads": 0,
+    "device_refreshes": 0,
+    "dropped": 0,
+    "last_flush_at": None,
+    "last_error": None,
+}
+
+
+def _db():
+    from services import robot  # local import to avoid circular load
+    return robot._db()
+
+
+def _telemetry():  return _db()["robot_telemetry"]
+def _devices():    return _db()["robot_devices"]
+
+
+def _lock() -> asyncio.Lock:
+    global _FLUSH_LOCK
+    if _FLUSH_LOCK is None:
+        _FLUSH_LOCK = asyncio.Lock()
+    return _FLUSH_LOCK
+
+
+_DEVICE_PROJECTION = {
+    "_id": 0, "id": 1, "status": 1, "state": 1, "envelope_epoch": 1, "last_seen": 1,
+}
+
+
+def _fresh(device_id: str) -> bool:
+    dev = _DEVICES.get(device_id)
+    return dev is not None and time.monotonic() - dev.loaded_at < DEVICE_TTL_S
+
+
+def _cache(device_id: str, doc: Dict[str, Any]) -> _Device:
+    dev = _DEVICES.get(device_id)
+    if dev is None:
+        _stats["device_loads"] += 1
+        dev = _DEVICES[device_id] = _Device(device_id, doc)
+        # The engine owns the envelopes from here on.
+        anomaly_engine.load(device_id, dev.state)
+        dev.state.pop("envelopes", None)
+    else:
+        _refresh(dev, doc)
+    return dev
+
+
+def _refresh(dev: _Device, doc: Dict[str, Any]) -> None:
+    """Reconcile a cached device with a fresh read of its Mongo doc."""
+    _stats["device_refreshes"] += 1
+    dev.loaded_at = time.monotonic()
+    status = doc.get("status")
+    # A buffered promotion is kept unless the device went sticky meanwhile.
+    if status in STICKY_STATUSES or not dev.promote:
+        dev.status = status
+        dev.promote = False
+    if doc.get("envelope_epoch") != dev.epoch:
+        # Envelopes were reset elsewhere — drop ours and start from Mongo.
+        dev.epoch = doc.get("envelope_epoch")
+        dev.state = dict(doc.get("state") or {})
+        anomaly_engine.evict(dev.device_id)
+        anomaly_engine.load(dev.device_id, dev.state)
+        dev.state.pop("envelopes", None)
+        dev.unsaved = False
+
+
+async def _load(device_id: str) -> Optional[_Device]:
+    if _fresh(device_id):
+        return _DEVICES[device_id]
+    doc = await _devices().find_one({"id": device_id}, _DEVICE_PROJECTION)
+    if doc is None:
+        _drop(device_id)
+        return None
+    return _cache(device_id, doc)
+
+
+async def _load_many(device_ids: List[str]) -> None:
+    missing = [d for d in dict.fromkeys(device_ids) if not _fresh(d)]
+    if not missing:
+        return
+    async for doc in _devices().find({"id": {"$in": missing}}, _DEVICE_PROJECTION):
+        _cache(doc["id"], doc)
+        missing.remove(doc["id"])
+    for device_id in missing:
+        _drop(device_id)
+
+
+def _drop(device_id: str) -> None:
+    """Evict a device from the cache and the anomaly engine."""
+    if _DEVICES.pop(device_id, None) is not None:
+        anomaly_engine.evict(device_id)
+
+
+def _window_add(dev: _Device, payload: Dict[str, Any]) -> None:
+    dev.window_n += 1
+    for key, raw in payload.items():
+        if isinstance(raw, bool) or not isinstance(raw, (int, float)):
+            continue
+        v = float(raw)
+        agg = dev.window.get(key)
+        if agg is None:
+            dev.window[key] = [1, v, v, v, v]
+        else:
+            agg[0] += 1
+            agg[1] = min(agg[1], v)
+            agg[2] = max(agg[2], v)
+            agg[3] += v
+            agg[4] = v
+
+
+# --- Ingest ------------------------------------------------------------------
+async def ingest(device_id: str, payload: Dict[str, Any], *, source: str = "mqtt") -> Optional[Dict[str, Any]]:
+    """Accept one reading. Returns the telemetry record, or None when the
+    device is not registered."""
+    dev = await _load(device_id)
+    if dev is None:
+        return None
+    try:
+        scored = anomaly_engine.score(device_id, payload)
+    except Exception as exc:    # noqa: BLE001 — anomaly scoring never blocks intake
+        logger.warning("anomaly scoring failed for %s: %s", device_id, exc)
+        scored = ([], {}, {})
+    rec, transition = await _accept(dev, payload, source, scored)
+    _ensure_started()
+    if transition or len(_RECORDS) >= FLUSH_MAX:
+        await flush()
+    return rec
+
+
+async def ingest_batch(
+    readings: List[Tuple[str, Dict[str, Any]]], *, source: str = "mqtt",
+) -> List[Optional[Dict[str, Any]]]:
+    """Accept many (device_id, payload) readings at once — one device
+    lookup for uncached devices, one engine pass for anomaly scoring and
+    at most one flush. Returns a record (or None) per reading."""
+    await _load_many([device_id for device_id, _ in readings])
+    known = [(i, d, p) for i, (d, p) in enumerate(readings) if d in _DEVICES]
+    try:
+        scored = anomaly_engine.score_batch([(d, p) for _, d, p in known])
+    except Exception as exc:    # noqa: BLE001
+        logger.warning("batch anomaly scoring failed: %s", exc)
+        scored = [([], {}, {}) for _ in known]
+    out: List[Optional[Dict[str, Any]]] = [None] * len(readings)
+    any_transition = False
+    for (i, device_id, payload), result in zip(known, scored):
+        out[i], transition = await _accept(_DEVICES[device_id], payload, source, result)
+        any_transition = any_transition or transition
+    if known:
+        _ensure_started()
+    if any_transition or len(_RECORDS) >= FLUSH_MAX:
+        await flush()
+    return out
+
+
+async def _accept(
+    dev: _Device, payload: Dict[str, Any], source: str, scored: anomaly_engine.Result,
+) -> Tuple[Dict[str, Any], bool]:
+    """Buffer one scored reading; returns (record, status/anomaly transition)."""
+    from services import anomaly  # local import to avoid circular load
+    rec = TelemetryRecord(device_id=dev.device_id, payload=payload, source=source).model_dump()
+    _RECORDS.append(rec)
+    _stats["ingested"] += 1
+
+    transition = False
+    if dev.status not in STICKY_STATUSES and dev.status != DeviceStatus.ONLINE.value:
+        dev.status = DeviceStatus.ONLINE.value
+        dev.promote = True
+        transition = True
+    dev.last_seen = rec["received_at"]
+    dev.dirty = True
+    dev.unsaved = True
+
+    drifting, z_scores, detectors = scored
+    prev_drifting = list((dev.state.get("anomaly") or {}).get("drifting_keys") or [])
+    anomaly.apply_anomaly(
+        dev.state, drifting, z_scores, anomaly_engine.sigma(dev.device_id),
+        detectors if len(anomaly_engine.ENABLED) > 1 else None,
+    )
+    _window_add(dev, payload)
+
+    if set(drifting) != set(prev_drifting):
+        transition = True
+        await _mirror_transition(dev.device_id, payload, rec["id"], drifting, z_scores)
+    return rec, transition
+
+
+async def _mirror_transition(
+    device_id: str, payload: Dict[str, Any], record_id: str,
+    drifting: List[str], z_scores: Dict[str, float],
+) -> None:
+    from services import memory_bank as mb
+    if drifting:
+        drift_line = "\nANOMALY · drifting=" + ",".join(
+            f"{k}(z={z_scores.get(k):.1f})" for k in drifting
+        )
+        tags = ["robot", "telemetry", device_id[:8], "anomaly"]
+    else:
+        drift_line = "\nANOMALY cleared · all readings back inside envelope"
+        tags = ["robot", "telemetry", device_id[:8]]
+    _stats["memory_transitions"] += 1
+    await mb.auto_store(
+        f"TELEMETRY · {device_id}\n" + ", ".join(f"{k}={v}" for k, v in payload.items())
+        + drift_line,
+        persona="hermes", category="research",
+        source_type="robot_telemetry", source_id=record_id,
+        tags=tags,
+    )
+
+
+async def _mirror_window(dev: _Device) -> None:
+    from services import memory_bank as mb
+    lines = [
+        f"{k}={agg[4]} (min={agg[1]:g} max={agg[2]:g} mean={agg[3] / agg[0]:.3g} n={int(agg[0])})"
+        for k, agg in sorted(dev.window.items())
+    ]
+    n = dev.window_n
+    dev.window = {}
+    dev.window_n = 0
+    dev.window_started = time.monotonic()
+    _stats["memory_summaries"] += 1
+    await mb.auto_store(
+        f"TELEMETRY · {dev.device_id} · window of {n} readings\n" + ", ".join(lines),
+        persona="hermes", category="research",
+        source_type="robot_telemetry", source_id=dev.device_id,
+        tags=["robot", "telemetry", dev.device_id[:8], "telemetry_window"],
+    )
+
+
+# --- Flush -------------------------------------------------------------------
+def _device_ops(dev: _Device, checkpoint: bool) -> List[UpdateOne]:
+    seen = {"$set": {"last_seen": dev.last_seen, "updated_at": dev.last_seen}}
+    set_ops: Dict[str, Any] = {}
+    if checkpoint:
+        set_ops["state.envelopes"] = anomaly_engine.envelopes(dev.device_id) or {}
+    update: Dict[str, Any] = {}
+    if dev.state.get("anomaly"):
+        set_ops["state.anomaly"] = dev.state["anomaly"]
+    else:
+        update["$unset"] = {"state.anomaly": ""}
+    if set_ops:
+        update["$set"] = set_ops
+    ops = [
+        UpdateOne({"id": dev.device_id}, seen),
+        # Skipped if the envelopes were reset since this worker loaded them.
+        UpdateOne({"id": dev.device_id, "envelope_epoch": dev.epoch}, update),
+    ]
+    if dev.promote:
+        ops.append(UpdateOne(
+            {"id": dev.device_id, "status": {"$nin": sorted(STICKY_STATUSES)}},
+            {"$set": {"status": DeviceStatus.ONLINE.value}},
+        ))
+    return ops
+
+
+async def flush(*, close_windows: bool = False, checkpoint: bool = False) -> Dict[str, int]:
+    """Write buffered telemetry rows and coalesced device updates, then
+    emit any Memory Bank window summaries that are due. Envelopes are
+    checkpointed when `checkpoint` is set or the device's checkpoint
+    interval has elapsed."""
+    async with _lock():
+        rows = 0
+        device_writes = 0
+        await _repair_buckets()
+        if _RECORDS:
+            _INFLIGHT[:] = _RECORDS
+            _RECORDS.clear()
+            try:
+                failed = await _insert_rows(_INFLIGHT)
+                landed = [r for i, r in enumerate(_INFLIGHT) if i not in failed]
+                rows = len(landed)
+                await _write_buckets(landed)
+                if failed:              # keep only the rows that didn't land
+                    _RECORDS[:0] = [_INFLIGHT[i] for i in sorted(failed)]
+                    overflow = len(_RECORDS) - BUFFER_HARD_CAP
+                    if overflow > 0:
+                        del _RECORDS[:overflow]
+                        _stats["dropped"] += overflow
+            finally:
+                _INFLIGHT.clear()
+
+        started = time.monotonic()
+        due = {
+            d.device_id for d in _DEVICES.values()
+            if d.unsaved and (checkpoint or started - d.checkpointed_at >= CHECKPOINT_INTERVAL_S)
+        }
+        dirty = [d for d in _DEVICES.values() if d.dirty or d.device_id in due]
+        if dirty:
+            ops: List[UpdateOne] = []
+            for dev in dirty:
+                ops.extend(_device_ops(dev, dev.device_id in due))
+            try:
+                await _devices().bulk_write(ops, ordered=True)
+                for dev in dirty:
+                    dev.dirty = False
+                    dev.promote = False
+                    if dev.device_id in due:
+                        dev.unsaved = False
+                        dev.checkpointed_at = started
+                device_writes = len(dirty)
+                _stats["checkpoints"] += len(due)
+            except Exception as exc:    # noqa: BLE001 — devices stay dirty
+                _stats["last_error"] = f"bulk_write: {exc}"[:240]
+                logger.warning("device state flush failed: %s", exc)
+
+        _stats["flushes"] += 1
+        _stats["rows_written"] += rows
+        _stats["device_writes"] += device_writes
+        _stats["last_flush_at"] = time.time()
+
+    now = time.monotonic()
+    for dev in list(_DEVICES.values()):
+        if dev.window_n and (close_windows or now - dev.window_started >= MEMORY_WINDOW_S):
+            await _mirror_window(dev)
+    return {"rows": rows, "devices": device_writes}
+
+
+async def _insert_rows(records: List[Dict[str, Any]]) -> Set[int]:
+    """`insert_many` the batch; returns the indexes that did not land.
+
+    Each row is keyed by its record id, so re-sending a row that already
+    landed (an unordered insert that failed partway, or a timeout after the
+    server committed) is a duplicate-key error, counted as landed, rather
+    than a second copy of the reading."""
+    try:
+        await _telemetry().insert_many(
+            [{**r, "_id": r["id"]} for r in records], ordered=False,
+        )
+        return set()
+    except BulkWriteError as exc:
+        errors = (exc.details or {}).get("writeErrors") or []
+        failed = {e["index"] for e in errors if e.get("code") != DUPLICATE_KEY}
+        _stats["duplicate_rows"] += len(errors) - len(failed)
+        if not errors:              # write-concern error: retry the lot
+            failed = set(range(len(records)))
+        error = str(exc)
+    except Exception as exc:    # noqa: BLE001 — keep rows for the next attempt
+        failed = set(range(len(records)))
+        error = str(exc)
+    if failed:
+        _stats["last_error"] = f"insert_many: {error}"[:240]
+        logger.warning("telemetry flush failed for %d of %d rows: %s",
+                       len(failed), len(records), error)
+    return failed
+
+
+async def _write_buckets(records: List[Dict[str, Any]]) -> None:
+    # Raw rows are already durable here, so a failed bucket write never
+    # re-queues them: its hour range is marked and rebuilt from raw rows by
+    # `_repair_buckets` on a later flush. (Compaction can't do it — it only
+    # rolls up rows that are leaving raw retention.)
+    ops = telemetry_store.bucket_ops(records)
+    if not ops:
+        return
+    try:
+        await telemetry_store._buckets().bulk_write(ops, ordered=False)
+        _stats["bucket_writes"] += len(ops)
+    except Exception as exc:    # noqa: BLE001
+        _stats["last_error"] = f"buckets: {exc}"[:240]
+        logger.warning("telemetry bucket write failed: %s", exc)
+        span = telemetry_store.bucket_range(records)
+        if span:
+            after, before = span
+            _REPAIR["after"] = min(after, _REPAIR.get("after", after))
+            _REPAIR["before"] = max(before, _REPAIR.get("before", before))
+
+
+async def _repair_buckets() -> None:
+    """Re-roll the marked hours from raw rows. `rollup` `$set`s whole keys,
+    so buckets that partly landed before the failure come out exact."""
+    if not _REPAIR:
+        return
+    try:
+        await telemetry_store.rollup(after=_REPAIR["after"], before=_REPAIR["before"])
+    except Exception as exc:    # noqa: BLE001 — keep the range for the next flush
+        _stats["last_error"] = f"bucket repair: {exc}"[:240]
+        logger.warning("telemetry bucket repair failed: %s", exc)
+        return
+    _REPAIR.clear()
+    _stats["bucket_repairs"] += 1
+
+
+async def _maybe_compact() -> None:
+    global _last_compact
+    now = time.monotonic()
+    if now - _last_compact < telemetry_store.COMPACT_INTERVAL_S:
+        return
+    _last_compact = now
+    _stats["last_compaction"] = await telemetry_store.compact()
+    _stats["compactions"] += 1
+
+
+async def forget(device_id: str) -> None:
+    """Flush pending writes and drop the cached device — call before any
+    out-of-band change to the device's status or anomaly state."""
+    if device_id in _DEVICES:
+        await flush(checkpoint=True)
+        _drop(device_id)
+
+
+# --- Read-side helpers ---------------------------------------------------------
+def pending_records(device_id: str) -> List[Dict[str, Any]]:
+    """Rows for `device_id` not yet visible in Mongo, newest first."""
+    rows = [r for r in _INFLIGHT + _RECORDS if r["device_id"] == device_id]
+    rows.sort(key=lambda r: r["received_at"], reverse=True)
+    return [dict(r) for r in rows]
+
+
+def cached_state(device_id: str) -> Optional[Dict[str, Any]]:
+    """Live device state (anomaly block + engine envelopes), or None."""
+    dev = _DEVICES.get(device_id)
+    if dev is None:
+        return None
+    return {**dev.state, "envelopes": anomaly_engine.envelopes(device_id) or {}}
+
+
+def overlay(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Apply not-yet-flushed device fields onto a device doc read from Mongo."""
+    if not doc:
+        return doc
+    dev = _DEVICES.get(doc.get("id"))
+    if dev is None or not (dev.dirty or dev.unsaved):
+        return doc
+    doc["last_seen"] = dev.last_seen
+    doc["updated_at"] = dev.last_seen
+    state = dict(doc.get("state") or {})
+    state["envelopes"] = anomaly_engine.envelopes(dev.device_id) or {}
+    if dev.state.get("anomaly"):
+        state["anomaly"] = dev.state["anomaly"]
+    else:
+        state.pop("anomaly", None)
+    doc["state"] = state
+    return doc
+
+
+# --- Lifecycle ---------------------------------------------------------------
+async def _loop() -> None:
+    global _last_compact
+    # First compaction one interval after start, not on the first tick.
+    _last_compact = time.monotonic()
+    while True:
+        try:
+            await asyncio.sleep(FLUSH_INTERVAL_S)
+            await flush()
+            await _maybe_compact()
+        except asyncio.CancelledError:
+            break
+        except Exception as exc:    # noqa: BLE001
+            _stats["last_error"] = f"loop: {type(exc).__name__}: {exc}"[:240]
+            logger.exception("telemetry flusher tick failed: %s", exc)
+
+
+def _ensure_started() -> None:
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_loop(), name="telemetry-flusher")
+
+
+async def stop() -> None:
+    """Shutdown hook — stop the flusher, write everything, close windows."""
+    global _task
+    if _task is not None and not _task.done():
+        _task.cancel()
+        try:
+            await _task
+        except (asyncio.CancelledError, Exception):    # noqa: BLE001
+            pass
+    _task = None
+    await flush(close_windows=True, checkpoint=True)
+
+
+def status() -> Dict[str, Any]:
+    return {
+        "running": _task is not None and not _task.done(),
+        "buffered_rows": len(_RECORDS),
+        "cached_devices": len(_DEVICES),
+        "dirty_devices": sum(1 for d in _DEVICES.values() if d.dirty),
+        "flush_max": FLUSH_MAX,
+        "flush_interval_s": FLUSH_INTERVAL_S,
+        "memory_window_s": MEMORY_WINDOW_S,
+        "checkpoint_interval_s": CHECKPOINT_INTERVAL_S,
+        "anomaly_engine": anomaly_engine.stats(),
+        "compact_interval_s": telemetry_store.COMPACT_INTERVAL_S,
+        **_stats,
+    }
+
+
+def reset_in_memory_state() -> None:
+    anomaly_engine.reset_in_memory_state()
+    _DEVICES.clear()
+    _RECORDS.clear()
+    _INFLIGHT.clear()
+    _REPAIR.clear()
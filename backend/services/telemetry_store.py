@@ -0,0 +1,427 @@
+"""
+Telemetry bucket store — downsampled history for HUD charts.
+
+Raw readings stay in `robot_telemetry`; alongside them every flush of the
+ingest engine folds the same readings into `robot_telemetry_buckets`:
+
+    {device_id, resolution: "1m" | "1h", bucket_start: <iso>,
+     keys: {<key>: {min, max, sum, count}}, updated_at}
+
+Buckets are maintained with `$min` / `$max` / `$inc`, so concurrent
+flushes from several workers compose safely. `series()` answers
+`start / end / resolution` queries from the smallest store that fits
+(raw, 1m, 1h, or 1d rolled up from hours), returning mean/min/max/count
+per key per point.
+
+Retention (`compact()`, run by the ingest flusher every
+TELEMETRY_COMPACT_INTERVAL_S): raw readings older than
+TELEMETRY_RAW_RETENTION_DAYS are re-rolled into their minute/hour
+buckets server-side (idempotent `$set`, hour-aligned) and then deleted;
+minute buckets older than TELEMETRY_MINUTE_RETENTION_DAYS are dropped.
+Hour buckets are kept indefinitely.
+
+Backfill (`backfill()`, scheduled once per database at startup and
+re-runnable by the owner): raw rows written before the bucket store
+existed are rolled into buckets with the same idempotent `rollup`, up to
+the start of the current hour. A claim that never reached `done_at` is
+released on error and can be retaken after TELEMETRY_BACKFILL_LEASE_S.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger("atlas.telemetry_store")
+
+RAW_RETENTION_DAYS = float(os.environ.get("TELEMETRY_RAW_RETENTION_DAYS", "7"))
+MINUTE_RETENTION_DAYS = float(os.environ.get("TELEMETRY_MINUTE_RETENTION_DAYS", "30"))
+COMPACT_INTERVAL_S = float(os.environ.get("TELEMETRY_COMPACT_INTERVAL_S", "3600"))
+BACKFILL_LEASE_S = float(os.environ.get("TELEMETRY_BACKFILL_LEASE_S", "21600"))
+MAX_POINTS = 2000
+
+RESOLUTIONS = {"raw": 0, "1m": 60, "1h": 3600, "1d": 86400}
+
+
+class TelemetryQueryError(ValueError):
+    """Raised for an invalid series query (bad range or resolution)."""
+
+
+def _db():
+    from services import robot  # local import to avoid circular load
+    return robot._db()
+
+
+def _telemetry():  return _db()["robot_telemetry"]
+def _buckets():    return _db()["robot_telemetry_buckets"]
+def _meta():       return _db()["robot_telemetry_meta"]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse(ts: Any) -> datetime:
+    dt = ts if isinstance(ts, datetime) else datetime.fromisoformat(str(ts))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _floor(dt: datetime, seconds: int) -> datetime:
+    epoch = int(dt.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % seconds, tz=timezone.utc)
+
+
+def _safe_key(key: str) -> Optional[str]:
+    """Mongo field-path safe key (no dots, no leading '$')."""
+    key = str(key).replace(".", "_")
+    return None if not key or key.startswith("$") else key
+
+
+def _numeric(payload: Dict[str, Any]) -> Iterable[Tuple[str, float]]:
+    for key, raw in payload.items():
+        if isinstance(raw, bool) or not isinstance(raw, (int, float)):
+            continue
+        value = float(raw)
+        if value != value or value in (float("inf"), float("-inf")):
+            continue
+        safe = _safe_key(key)
+        if safe:
+            yield safe, value
+
+
+# --- Write path (called by telemetry_ingest.flush) ----------------------------
+def bucket_ops(records: Iterable[Dict[str, Any]]) -> List[UpdateOne]:
+    """Fold a batch of raw records into one upsert per (device, resolution,
+    bucket) — aggregated in-process first so a flush of N readings costs
+    at most one update per touched bucket."""
+    acc: Dict[Tuple[str, str, str], Dict[str, List[float]]] = {}
+    for rec in records:
+        try:
+            received = _parse(rec["received_at"])
+        except (KeyError, ValueError):
+            continue
+        for resolution in ("1m", "1h"):
+            start = _floor(received, RESOLUTIONS[resolution]).isoformat()
+            keys = acc.setdefault((rec["device_id"], resolution, start), {})
+            for key, value in _numeric(rec.get("payload") or {}):
+                agg = keys.get(key)
+                if agg is None:
+                    keys[key] = [value, value, value, 1]
+                else:
+                    agg[0] = min(agg[0], value)
+                    agg[1] = max(agg[1], value)
+                    agg[2] += value
+                    agg[3] += 1
+    ops: List[UpdateOne] = []
+    now = _now()
+    for (device_id, resolution, start), keys in acc.items():
+        if not keys:
+            continue
+        update: Dict[str, Dict[str, Any]] = {"$min": {}, "$max": {}, "$inc": {}, "$set": {"updated_at": now}}
+        for key, (lo, hi, total, count) in keys.items():
+            update["$min"][f"keys.{key}.min"] = lo
+            update["$max"][f"keys.{key}.max"] = hi
+            update["$inc"][f"keys.{key}.sum"] = total
+            update["$inc"][f"keys.{key}.count"] = count
+        ops.append(UpdateOne(
+            {"device_id": device_id, "resolution": resolution, "bucket_start": start},
+            update,
+            upsert=True,
+        ))
+    return ops
+
+
+def bucket_range(records: Iterable[Dict[str, Any]]) -> Optional[Tuple[str, str]]:
+    """Hour-aligned `(after, before)` covering a batch of raw records — the
+    `rollup` window that rebuilds their buckets."""
+    times = []
+    for rec in records:
+        try:
+            times.append(_parse(rec["received_at"]))
+        except (KeyError, ValueError):
+            continue
+    if not times:
+        return None
+    return (
+        _floor(min(times), 3600).isoformat(),
+        (_floor(max(times), 3600) + timedelta(hours=1)).isoformat(),
+    )
+
+
+# --- Query path --------------------------------------------------------------
+def _pick_resolution(span_s: float, max_points: int, age_s: float = 0.0) -> str:
+    """Smallest store that fits the span, but never one that `compact()`
+    has already emptied `age_s` back (raw and minute data expire; hour
+    buckets are kept)."""
+    raw_kept = age_s <= RAW_RETENTION_DAYS * 86400
+    minute_kept = age_s <= MINUTE_RETENTION_DAYS * 86400
+    if span_s <= 600 and raw_kept:
+        return "raw"
+    if minute_kept and span_s / RESOLUTIONS["1m"] <= max_points:
+        return "1m"
+    if span_s / RESOLUTIONS["1h"] <= max_points:
+        return "1h"
+    return "1d"
+
+
+def _point(ts: str, keys: Dict[str, Dict[str, float]], only: Optional[List[str]]) -> Dict[str, Any]:
+    values = {}
+    for key, agg in keys.items():
+        if only and key not in only:
+            continue
+        count = agg.get("count") or 0
+        values[key] = {
+            "mean": (agg.get("sum", 0.0) / count) if count else None,
+            "min": agg.get("min"),
+            "max": agg.get("max"),
+            "count": count,
+        }
+    return {"t": ts, "values": values}
+
+
+def _merge(into: Dict[str, Dict[str, float]], keys: Dict[str, Dict[str, float]]) -> None:
+    for key, agg in keys.items():
+        cur = into.get(key)
+        if cur is None:
+            into[key] = dict(agg)
+            continue
+        cur["min"] = min(cur["min"], agg["min"])
+        cur["max"] = max(cur["max"], agg["max"])
+        cur["sum"] = cur.get("sum", 0.0) + agg.get("sum", 0.0)
+        cur["count"] = cur.get("count", 0) + agg.get("count", 0)
+
+
+async def series(
+    device_id: str,
+    *,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    resolution: str = "auto",
+    keys: Optional[List[str]] = None,
+    max_points: int = MAX_POINTS,
+) -> Dict[str, Any]:
+    """Downsampled time series for one device over [start, end).
+
+    Defaults to the last 24 h. `resolution` is one of raw / 1m / 1h / 1d
+    or 'auto' (smallest store that keeps the series under `max_points`
+    and still holds data as far back as `start`). An explicit resolution
+    that yields more than `max_points` points is cut to `max_points` —
+    the newest ones for raw — and flagged `truncated`.
+    """
+    try:
+        end_dt = _parse(end) if end else datetime.now(timezone.utc)
+        start_dt = _parse(start) if start else end_dt - timedelta(days=1)
+    except ValueError as exc:
+        raise TelemetryQueryError(f"invalid timestamp: {exc}") from exc
+    if start_dt >= end_dt:
+        raise TelemetryQueryError("start must be before end")
+    raw_filter = {"device_id": device_id,
+                  "received_at": {"$gte": start_dt.isoformat(), "$lt": end_dt.isoformat()}}
+    if resolution == "auto":
+        resolution = _pick_resolution(
+            (end_dt - start_dt).total_seconds(), max_points,
+            (datetime.now(timezone.utc) - start_dt).total_seconds(),
+        )
+        # A fast reporter can put more raw rows in a short window than
+        # fit in one response; minute buckets always fit a <= 600 s span.
+        if resolution == "raw" and await _telemetry().count_documents(
+            raw_filter, limit=max_points + 1,
+        ) > max_points:
+            resolution = "1m"
+    if resolution not in RESOLUTIONS:
+        raise TelemetryQueryError(f"resolution must be one of auto, {', '.join(RESOLUTIONS)}")
+
+    points: List[Dict[str, Any]] = []
+    truncated = False
+    if resolution == "raw":
+        # Newest rows first so a truncated window keeps its recent end.
+        cur = _telemetry().find(
+            raw_filter, {"_id": 0, "received_at": 1, "payload": 1},
+        ).sort("received_at", -1).limit(max_points + 1)
+        rows = [row async for row in cur]
+        truncated = len(rows) > max_points
+        for row in reversed(rows[:max_points]):
+            values = {
+                k: {"count": 1, "sum": v, "min": v, "max": v}
+                for k, v in _numeric(row.get("payload") or {})
+            }
+            points.append(_point(row["received_at"], values, keys))
+    else:
+        stored = "1h" if resolution == "1d" else resolution
+        step = RESOLUTIONS[resolution]
+        cur = _buckets().find(
+            {"device_id": device_id, "resolution": stored,
+             "bucket_start": {"$gte": _floor(start_dt, step).isoformat(), "$lt": end_dt.isoformat()}},
+            {"_id": 0, "bucket_start": 1, "keys": 1},
+        ).sort("bucket_start", 1)
+        if resolution == "1d":
+            days: Dict[str, Dict[str, Dict[str, float]]] = {}
+            async for row in cur:
+                day = _floor(_parse(row["bucket_start"]), step).isoformat()
+                _merge(days.setdefault(day, {}), row.get("keys") or {})
+            points = [_point(day, agg, keys) for day, agg in sorted(days.items())]
+        else:
+            async for row in cur.limit(max_points + 1):
+                points.append(_point(row["bucket_start"], row.get("keys") or {}, keys))
+    return {
+        "device_id": device_id,
+        "start": start_dt.isoformat(),
+        "end": end_dt.isoformat(),
+        "resolution": resolution,
+        "count": min(len(points), max_points),
+        "truncated": truncated or len(points) > max_points,
+        "points": points[:max_points],
+    }
+
+
+# --- Rollup / retention ----------------------------------------------------------
+def _rollup_pipeline(match: Dict[str, Any], prefix_len: int) -> List[Dict[str, Any]]:
+    """Server-side aggregation of raw readings into (device, bucket, key)."""
+    return [
+        {"$match": match},
+        {"$project": {
+            "device_id": 1,
+            "bucket": {"$substrBytes": ["$received_at", 0, prefix_len]},
+            "kv": {"$objectToArray": "$payload"},
+        }},
+        {"$unwind": "$kv"},
+        {"$match": {"kv.v": {"$type": ["double", "int", "long", "decimal"]}}},
+        {"$group": {
+            "_id": {"device_id": "$device_id", "bucket": "$bucket", "key": "$kv.k"},
+            "min": {"$min": "$kv.v"},
+            "max": {"$max": "$kv.v"},
+            "sum": {"$sum": "$kv.v"},
+            "count": {"$sum": 1},
+        }},
+    ]
+
+
+async def rollup(*, before: str, after: Optional[str] = None) -> Dict[str, int]:
+    """Recompute minute + hour buckets from raw readings in [after, before).
+    Uses `$set` per key so re-running over the same range is idempotent;
+    callers should pass hour-aligned bounds."""
+    match: Dict[str, Any] = {"received_at": {"$lt": before}}
+    if after:
+        match["received_at"]["$gte"] = after
+    written = 0
+    # received_at is ISO-8601 UTC, so the first 16 / 13 chars are the
+    # minute / hour prefix ("YYYY-MM-DDTHH:MM" / "YYYY-MM-DDTHH").
+    for resolution, prefix_len, suffix in (("1m", 16, ":00+00:00"), ("1h", 13, ":00:00+00:00")):
+        grouped: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        async for row in _telemetry().aggregate(_rollup_pipeline(match, prefix_len), allowDiskUse=True):
+            key = _safe_key(row["_id"]["key"])
+            if not key:
+                continue
+            start = row["_id"]["bucket"] + suffix
+            sets = grouped.setdefault((row["_id"]["device_id"], start), {})
+            sets[f"keys.{key}"] = {
+                "min": float(row["min"]), "max": float(row["max"]),
+                "sum": float(row["sum"]), "count": int(row["count"]),
+            }
+        ops = [
+            UpdateOne(
+                {"device_id": device_id, "resolution": resolution, "bucket_start": start},
+                {"$set": {**sets, "updated_at": _now()}},
+                upsert=True,
+            )
+            for (device_id, start), sets in grouped.items()
+        ]
+        for i in range(0, len(ops), 1000):
+            await _buckets().bulk_write(ops[i:i + 1000], ordered=False)
+        written += len(ops)
+    return {"buckets": written}
+
+
+async def compact(*, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Retention job — roll expiring raw readings into buckets, delete them,
+    and drop expired minute buckets."""
+    now = now or datetime.now(timezone.utc)
+    raw_cutoff = _floor(now - timedelta(days=RAW_RETENTION_DAYS), 3600).isoformat()
+    minute_cutoff = (now - timedelta(days=MINUTE_RETENTION_DAYS)).isoformat()
+    rolled = await rollup(before=raw_cutoff)
+    raw = await _telemetry().delete_many({"received_at": {"$lt": raw_cutoff}})
+    minutes = await _buckets().delete_many(
+        {"resolution": "1m", "bucket_start": {"$lt": minute_cutoff}},
+    )
+    out = {
+        "raw_cutoff": raw_cutoff,
+        "minute_cutoff": minute_cutoff,
+        "buckets_rolled": rolled["buckets"],
+        "raw_deleted": raw.deleted_count,
+        "minute_buckets_deleted": minutes.deleted_count,
+    }
+    logger.info("telemetry compaction: %s", out)
+    return out
+
+
+_BACKFILL_ID = "bucket_backfill"
+_backfill_task: Optional[asyncio.Task] = None
+
+
+async def backfill(*, force: bool = False, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Roll raw readings that predate the bucket store into buckets.
+
+    Runs once per database: the first caller claims a marker doc, and the
+    run only counts once it stamps `done_at`. Later calls are skipped
+    unless `force`, or unless the claim is older than
+    TELEMETRY_BACKFILL_LEASE_S without finishing (a worker died mid-run);
+    a run that raises releases its claim. Stops at the start of the
+    current hour, whose buckets the live flush path is still writing; a
+    forced re-run later picks that hour up too. Safe to repeat — `rollup`
+    sets each bucket from the raw rows rather than adding to it."""
+    now = now or datetime.now(timezone.utc)
+    started = now.isoformat()
+    claim = await _meta().update_one(
+        {"id": _BACKFILL_ID}, {"$setOnInsert": {"started_at": started}}, upsert=True,
+    )
+    if claim.upserted_id is None:
+        marker = await _meta().find_one({"id": _BACKFILL_ID}, {"_id": 0}) or {}
+        stale = (marker.get("started_at") or "") < (now - timedelta(seconds=BACKFILL_LEASE_S)).isoformat()
+        if not force and (marker.get("done_at") or not stale):
+            return {"skipped": True}
+        # Retake only the claim we just read, so two workers that both
+        # find it stale don't both run.
+        retake = await _meta().update_one(
+            {"id": _BACKFILL_ID, "started_at": marker.get("started_at")},
+            {"$set": {"started_at": started}, "$unset": {"done_at": ""}},
+        )
+        if retake.modified_count == 0 and not force:
+            return {"skipped": True}
+    before = _floor(now, 3600).isoformat()
+    try:
+        rolled = await rollup(before=before)
+    except Exception:
+        await _meta().delete_one({"id": _BACKFILL_ID, "started_at": started})
+        raise
+    out = {"before": before, "buckets_rolled": rolled["buckets"], "done_at": _now()}
+    await _meta().update_one({"id": _BACKFILL_ID}, {"$set": out})
+    logger.info("telemetry bucket backfill: %s", out)
+    return out
+
+
+def schedule_backfill() -> None:
+    """Startup hook — run `backfill()` in the background so a large raw
+    collection doesn't hold up boot."""
+    global _backfill_task
+    if _backfill_task is not None and not _backfill_task.done():
+        return
+
+    async def _run() -> None:
+        try:
+            await backfill()
+        except Exception as exc:    # noqa: BLE001
+            logger.warning("telemetry bucket backfill failed: %s", exc)
+
+    _backfill_task = asyncio.get_running_loop().create_task(_run(), name="telemetry-backfill")
+
+
+async def create_indexes() -> Dict[str, Any]:
+    """Telemetry indexes are declared in `index_manifest`."""
+    from services import index_manifest
+    return await index_manifest.bootstrap(["robot_telemetry", "robot_telemetry_buckets"])
@@ -17,11 +17,21 @@ Engine list:
               critical missing sensors.
   TIMELINE  — critical-path estimate (longest dep chain × lead times).
   COST      — Σ(quantity · cost_per_unit) + 20% labour heuristic.
+  THERMAL   — lumped-node cell temperature ODE (scipy solve_ivp); an
+              optional `thermal.sweep` block adds a Monte-Carlo margin via
+              `sweep_thermal`, which evaluates every scenario in one
+              vectorised pass.
+  THERMAL_NETWORK — one node per component, conductances along the
+              dependency edges and a sink to ambient; sparse steady-state
+              solve (plus an optional BDF transient). FAILURE folds its
+              hotspots in when the twin carries a `thermal_network` block.
 """
 from __future__ import annotations
 
 from collections import defaultdict, deque
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
 
 from models.twin_models import (
     DigitalTwin,
@@ -49,6 +59,7 @@ def simulate(twin: DigitalTwin, kind: SimulationKind) -> SimulationResult:
         SimulationKind.TIMELINE:  _sim_timeline,
         SimulationKind.COST:      _sim_cost,
         SimulationKind.THERMAL:   _sim_thermal,
+        SimulationKind.THERMAL_NETWORK: _sim_thermal_network,
     }
     engine = dispatch[kind]
     findings, warnings, failures, metrics, extras = engine(twin)
@@ -252,6 +263,18 @@ def _sim_failure(twin: DigitalTwin) -> Tuple[List[str], List[str], List[str], Di
             + ", ".join(orphans[:5])
         )
 
+    # Thermal hotspots — only when the twin describes its thermal network.
+    if (state.integrations or {}).get("thermal_network") is not None:
+        try:
+            net = thermal_network(twin)
+        except (ImportError, ValueError) as exc:
+            warnings.append(f"Thermal network not evaluated: {exc}")
+        else:
+            failures.extend(net["failures"])
+            warnings.extend(net["warnings"])
+            metrics["thermal_hotspots"] = net["hotspots"][:5]
+            metrics["thermal_max_node_c"] = net["max_node_temp_c"]
+
     return findings, warnings, failures, metrics, {}
 
 
@@ -533,6 +556,36 @@ def _sim_thermal(twin: DigitalTwin) -> Tuple[List[str], List[str], List[str], Di
             "will degrade cycle life."
         )
 
+    sweep_cfg = cfg.get("sweep")
+    if isinstance(sweep_cfg, dict):
+        try:
+            sweep = sweep_thermal(
+                sweep_cfg.get("T_amb_c", p["T_amb"]),
+                sweep_cfg.get("power_w", Q_joule + p["Q_self"]),
+                sweep_cfg.get("R_th_k_w", 1.0 / (p["h"] * p["A"])),
+                C_j_k=C, T_init_c=sweep_cfg.get("T_init_c", p["T_init"]),
+                duration_s=duration, runaway_c=p["runaway"],
+                grid=bool(sweep_cfg.get("grid", False)), samples=10,
+            )
+        except ValueError as exc:
+            warnings.append(f"Thermal sweep skipped: {exc}")
+        else:
+            metrics["sweep"] = {k: v for k, v in sweep.items() if k not in ("time_s", "envelope")}
+            n_run = sweep["runaway_count"]
+            worst = sweep["worst_case"]
+            if n_run:
+                warnings.append(
+                    f"Thermal sweep · {n_run}/{sweep['scenarios']} scenarios reach runaway "
+                    f"({p['runaway']} °C); worst T_max {worst['T_max_c']} °C at "
+                    f"T_amb={worst['T_amb_c']} °C, P={worst['power_w']} W, "
+                    f"R_th={worst['R_th_k_w']} K/W"
+                )
+            findings.append(
+                f"Thermal sweep · {sweep['scenarios']} scenarios · T_max p50="
+                f"{sweep['T_max_c']['p50']} °C, p95={sweep['T_max_c']['p95']} °C, "
+                f"worst={worst['T_max_c']} °C"
+            )
+
     findings.append(
         f"ODE-integrated thermal sim · chemistry={chem} · {duration:.0f}s · "
         f"T_init={p['T_init']}°C → T_max={T_max:.1f}°C → T_final={T_final:.1f}°C"
@@ -550,3 +603,396 @@ def _sim_thermal(twin: DigitalTwin) -> Tuple[List[str], List[str], List[str], Di
     ]
 
     return findings, warnings, failures, metrics, {"timeline": timeline}
+
+
+# --- Thermal parameter sweep ------------------------------------------------
+def _thermal_ode_batch(
+    T_amb: np.ndarray, P: np.ndarray, R: np.ndarray, C: np.ndarray,
+    T0: np.ndarray, t: np.ndarray,
+) -> np.ndarray:
+    """Integrate every scenario as one N-dimensional system with solve_ivp.
+    Returns temperatures with shape (N, len(t))."""
+    from scipy.integrate import solve_ivp
+
+    def rhs(_t: float, T: np.ndarray) -> np.ndarray:
+        return (P - (T - T_amb) / R) / C
+
+    sol = solve_ivp(
+        rhs, (0.0, float(t[-1])), T0, t_eval=t,
+        max_step=max(1.0, float(t[-1]) / 200.0), rtol=1e-4, atol=1e-3,
+    )
+    if not sol.success:
+        raise ValueError(f"ODE solver failed: {sol.message}")
+    return sol.y
+
+
+SWEEP_MAX_SCENARIOS = 1_000_000
+SWEEP_MAX_POINTS = 20_000_000          # scenarios × time samples per sweep
+
+
+def sweep_thermal(
+    T_amb_c: Any,
+    power_w: Any,
+    R_th_k_w: Any,
+    *,
+    C_j_k: Any = 0.046 * 900.0,
+    T_init_c: Any = None,
+    duration_s: float = 1800.0,
+    runaway_c: float = 80.0,
+    grid: bool = False,
+    samples: int = 50,
+    percentiles: Sequence[float] = (5, 50, 95),
+    method: str = "analytic",
+) -> Dict[str, Any]:
+    """Evaluate many lumped-node thermal scenarios in one vectorised pass.
+
+    Model (same node as THERMAL, written with a thermal resistance):
+        C·dT/dt = P − (T − T_amb) / R_th
+
+    `T_amb_c`, `power_w`, `R_th_k_w` (and optionally `C_j_k`, `T_init_c`)
+    are scalars or arrays. By default they broadcast element-wise — one
+    Monte-Carlo draw per index; `grid=True` takes the Cartesian product of
+    the three axes instead. `T_init_c` defaults to each scenario's ambient.
+
+    `method="analytic"` uses the closed-form solution of the linear ODE
+    (exact for constant parameters); `method="ode"` integrates all
+    scenarios as one system with solve_ivp — slower, kept as a cross-check.
+
+    Returns the percentile envelope of T(t) over `samples` time points,
+    percentiles of peak temperature and time-to-runaway, the runaway count
+    and the worst scenario with its parameters. Raises ValueError when
+    scenarios × samples exceeds SWEEP_MAX_POINTS.
+    """
+    if method not in ("analytic", "ode"):
+        raise ValueError(f"unknown method {method!r}")
+    if duration_s <= 0:
+        raise ValueError("duration_s must be > 0")
+    axes = [np.atleast_1d(np.asarray(a, dtype=float)).ravel() for a in (T_amb_c, power_w, R_th_k_w)]
+    if grid:
+        axes = [a.ravel() for a in np.meshgrid(*axes, indexing="ij")]
+    C_arr = np.asarray(C_j_k, dtype=float)
+    T0_arr = axes[0] if T_init_c is None else np.asarray(T_init_c, dtype=float)
+    try:
+        T_amb, P, R, C, T0 = (np.ascontiguousarray(a) for a in
+                              np.broadcast_arrays(*axes, C_arr, T0_arr))
+    except ValueError:
+        raise ValueError("sweep arrays must have matching lengths (or use grid=True)") from None
+    n = T_amb.size
+    if n == 0:
+        raise ValueError("sweep needs at least one scenario")
+    if np.any(R <= 0) or np.any(C <= 0):
+        raise ValueError("R_th_k_w and C_j_k must be > 0")
+
+    t = np.linspace(0.0, float(duration_s), max(2, int(samples)))
+    if n * t.size > SWEEP_MAX_POINTS:
+        raise ValueError(f"{n} scenarios × {t.size} samples is too large "
+                         f"(max {SWEEP_MAX_POINTS:,} points)")
+    T_ss = T_amb + P * R                   # steady state
+    tau = R * C                            # time constant
+    traj = _thermal_ode_batch(T_amb, P, R, C, T0, t) if method == "ode" else None
+
+    # The response is monotone, so the peak sits at one end of the window.
+    heating = T_ss >= T0
+    if method == "ode":
+        T_max = traj.max(axis=1)
+        t_at_max = t[traj.argmax(axis=1)]
+    else:
+        T_end = T_ss + (T0 - T_ss) * np.exp(-duration_s / tau)
+        T_max = np.where(heating, T_end, T0)
+        t_at_max = np.where(heating, float(duration_s), 0.0)
+
+    # Time the trajectory first crosses the runaway threshold (inf = never).
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_cross = -tau * np.log((runaway_c - T_ss) / (T0 - T_ss))
+    t_run = np.where(T0 >= runaway_c, 0.0, np.where(T_ss > runaway_c, t_cross, np.inf))
+    t_run = np.where(t_run <= duration_s, t_run, np.inf)
+    runaway = np.isfinite(t_run)
+
+    pct = [float(q) for q in percentiles]
+    labels = [f"p{q:g}" for q in pct]
+    if traj is not None:
+        env = np.percentile(traj, pct, axis=0)
+    else:
+        # One time slice at a time: memory stays O(n) instead of n × samples.
+        env = np.empty((len(pct), t.size))
+        gap = T0 - T_ss
+        for j, tj in enumerate(t):
+            env[:, j] = np.percentile(T_ss + gap * np.exp(-tj / tau), pct)
+    peak = np.percentile(T_max, pct)
+    worst = int(np.argmax(T_max))
+
+    def _r(x: float, nd: int = 2) -> Optional[float]:
+        return round(float(x), nd) if np.isfinite(x) else None
+
+    return {
+        "scenarios": int(n),
+        "method": method,
+        "duration_s": float(duration_s),
+        "runaway_threshold_c": float(runaway_c),
+        "time_s": [round(float(x), 1) for x in t],
+        "envelope": {lab: [round(float(x), 2) for x in row] for lab, row in zip(labels, env)},
+        "T_max_c": {**{lab: _r(v) for lab, v in zip(labels, peak)},
+                    "mean": _r(T_max.mean()), "max": _r(T_max[worst])},
+        "T_steady_state_c": {lab: _r(v) for lab, v in zip(labels, np.percentile(T_ss, pct))},
+        "runaway_count": int(runaway.sum()),
+        "runaway_fraction": round(float(runaway.mean()), 4),
+        "time_to_runaway_s": (
+            {lab: _r(v, 1) for lab, v in zip(labels, np.percentile(t_run[runaway], pct))}
+            if runaway.any() else None
+        ),
+        "worst_case": {
+            "index": worst,
+            "T_amb_c": _r(T_amb[worst]),
+            "power_w": _r(P[worst], 4),
+            "R_th_k_w": _r(R[worst], 4),
+            "C_j_k": _r(C[worst]),
+            "T_init_c": _r(T0[worst]),
+            "T_max_c": _r(T_max[worst]),
+            "t_at_max_s": _r(t_at_max[worst], 1),
+            "T_steady_state_c": _r(T_ss[worst]),
+            "time_to_runaway_s": _r(t_run[worst], 1),
+        },
+    }
+
+
+# --- Engine: THERMAL_NETWORK -------------------------------------------------
+_NET_DEFAULTS = {
+    "T_amb_c": 25.0,
+    "link_g_w_k": 0.5,          # conductance along each dependency edge
+    "sink_g_w_k": 0.1,          # per-node conductance to ambient
+    "max_temp_c": 85.0,
+    "cp_j_kg_k": 900.0,
+    "default_c_j_k": 20.0,      # heat capacity when a part has no mass
+    "dissipation_fraction": 0.15,
+    "margin_warn_c": 10.0,
+}
+
+
+def thermal_network(twin: DigitalTwin) -> Dict[str, Any]:
+    """Solve the twin's component-level thermal network.
+
+    Nodes are components; every dependency adds `link_g_w_k` between its
+    endpoints, every node has `sink_g_w_k` to ambient. Read from
+    `twin.state.integrations.thermal_network` (all optional):
+
+        T_amb_c, link_g_w_k, sink_g_w_k, max_temp_c, cp_j_kg_k, margin_warn_c
+        nodes: {component id or name: {heat_w, G_amb_w_k, C_j_k, max_temp_c}}
+        links: [{from, to, G_w_k}]     extra conductances (summed with edges)
+        duration_s, T_init_c           run a transient over this window too
+
+    Without any `heat_w`, `dissipation_fraction` of `energy.average_w` is
+    spread evenly over the parts. The steady state is one sparse solve of
+    (L + diag(G_amb))·T = q + G_amb·T_amb over the nodes that have a path
+    to ambient; heated clusters with no such path are reported as runaway.
+    The transient uses BDF with the constant sparse Jacobian. Verdicts use
+    the transient peak when a window is given, else the steady state.
+    """
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+    from scipy.sparse.linalg import spsolve
+
+    state = twin.state
+    comps = state.components
+    n = len(comps)
+    if n == 0:
+        raise ValueError("no components")
+    cfg = (state.integrations or {}).get("thermal_network") or {}
+    if not isinstance(cfg, dict):
+        raise ValueError("thermal_network must be an object")
+    nodes = cfg.get("nodes") or {}
+    links = cfg.get("links") or []
+    if not isinstance(nodes, dict):
+        raise ValueError("thermal_network.nodes must map parts to {heat_w, …}")
+    if not isinstance(links, list):
+        raise ValueError("thermal_network.links must be a list of {from, to, G_w_k}")
+
+    def _num(value: Any, field: str) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a number, got {value!r}") from None
+
+    opt = {k: _num(cfg.get(k, v), k) for k, v in _NET_DEFAULTS.items()}
+
+    index = {c.id: i for i, c in enumerate(comps)}
+    for i, c in enumerate(comps):
+        index.setdefault(c.name.lower(), i)
+
+    def _node(key: Any) -> Optional[int]:
+        key = str(key)
+        return index.get(key, index.get(key.lower()))
+
+    heat = np.zeros(n)
+    g_sink = np.full(n, opt["sink_g_w_k"])
+    cap = np.array([
+        (c.mass_kg or 0.0) * (c.quantity or 1.0) * opt["cp_j_kg_k"] or opt["default_c_j_k"]
+        for c in comps
+    ])
+    limit = np.full(n, opt["max_temp_c"])
+    unknown: List[str] = []
+    for key, spec in nodes.items():
+        spec = spec or {}
+        if not isinstance(spec, dict):
+            raise ValueError(f"thermal_network.nodes[{key!r}] must be an object, got {spec!r}")
+        i = _node(key)
+        if i is None:
+            unknown.append(str(key))
+            continue
+        heat[i] = _num(spec.get("heat_w", heat[i]), f"{key}.heat_w")
+        g_sink[i] = _num(spec.get("G_amb_w_k", g_sink[i]), f"{key}.G_amb_w_k")
+        cap[i] = _num(spec.get("C_j_k", cap[i]), f"{key}.C_j_k")
+        limit[i] = _num(spec.get("max_temp_c", limit[i]), f"{key}.max_temp_c")
+    heat_assumed = False
+    if not heat.any() and state.energy and (state.energy.average_w or 0) > 0:
+        heat[:] = opt["dissipation_fraction"] * float(state.energy.average_w) / n
+        heat_assumed = True
+
+    rows: List[int] = []
+    cols: List[int] = []
+    vals: List[float] = []
+    for d in state.dependencies:
+        a, b = index.get(d.from_component), index.get(d.to_component)
+        if a is not None and b is not None and a != b:
+            rows.append(a); cols.append(b); vals.append(opt["link_g_w_k"])
+    for link in links:
+        if not isinstance(link, dict):
+            raise ValueError(f"thermal_network.links entries must be objects, got {link!r}")
+        a, b = _node(link.get("from")), _node(link.get("to"))
+        if a is None or b is None or a == b:
+            unknown.append(f"{link.get('from')}→{link.get('to')}")
+            continue
+        rows.append(a); cols.append(b); vals.append(_num(link.get("G_w_k", opt["link_g_w_k"]), "G_w_k"))
+    if np.any(np.asarray(vals) < 0) or np.any(g_sink < 0) or np.any(cap <= 0):
+        raise ValueError("conductances must be ≥ 0 and heat capacities > 0")
+    G = sparse.coo_matrix((vals, (rows, cols)), shape=(n, n)).tocsr()
+    G = G + G.T                                           # undirected, summed
+    A = (sparse.diags(np.asarray(G.sum(axis=1)).ravel() + g_sink) - G).tocsc()
+    T_amb = opt["T_amb_c"]
+    b = heat + g_sink * T_amb
+
+    # Steady state over the clusters that can shed heat to ambient.
+    n_clusters, label = connected_components(G, directed=False)
+    grounded = np.zeros(n_clusters, dtype=bool)
+    np.logical_or.at(grounded, label, g_sink > 0)
+    ok = grounded[label]
+    T_ss = np.full(n, T_amb)
+    if ok.any():
+        idx = np.flatnonzero(ok)
+        T_ss[idx] = spsolve(A[idx][:, idx].tocsc(), b[idx])
+    floating = ~ok
+    heated_floating = np.zeros(n, dtype=bool)
+    for k in np.flatnonzero(~grounded):
+        members = label == k
+        if heat[members].sum() > 0:
+            heated_floating |= members
+    T_ss[heated_floating] = np.inf
+
+    out: Dict[str, Any] = {
+        "nodes": n,
+        "links": int(G.nnz // 2),
+        "T_amb_c": T_amb,
+        "heat_total_w": round(float(heat.sum()), 3),
+        "heat_assumed": heat_assumed,
+        "unknown_refs": unknown,
+        "floating_nodes": int(floating.sum()),
+    }
+    T_eval = T_ss
+    if "duration_s" in cfg:
+        from scipy.integrate import solve_ivp
+
+        duration = _num(cfg["duration_s"], "duration_s")
+        if duration <= 0:
+            raise ValueError("duration_s must be > 0")
+        inv_c = 1.0 / cap
+        jac = (sparse.diags(-inv_c) @ A).tocsc()
+        T0 = np.full(n, _num(cfg.get("T_init_c", T_amb), "T_init_c"))
+        sol = solve_ivp(
+            lambda _t, T: inv_c * (b - A @ T), (0.0, duration), T0,
+            method="BDF", jac=jac, rtol=1e-4, atol=1e-3,
+            t_eval=np.linspace(0.0, duration, 50),
+        )
+        if not sol.success:
+            raise ValueError(f"transient solve failed: {sol.message}")
+        T_peak = sol.y.max(axis=1)
+        above = sol.y > limit[:, None]
+        first = np.where(above.any(axis=1), sol.t[above.argmax(axis=1)], np.inf)
+        out["transient"] = {
+            "duration_s": duration,
+            "steps": int(sol.t.size),
+            "nfev": int(sol.nfev),
+            "njev": int(sol.njev),
+        }
+        T_eval = T_peak
+    else:
+        first = np.full(n, np.inf)
+
+    margin = limit - T_eval
+    order = np.argsort(margin, kind="stable")
+
+    def _r(x: float) -> Optional[float]:
+        return round(float(x), 2) if np.isfinite(x) else None
+
+    hotspots = [{
+        "component_id": comps[i].id,
+        "component": comps[i].name,
+        "T_c": _r(T_eval[i]),
+        "T_steady_state_c": _r(T_ss[i]),
+        "limit_c": _r(limit[i]),
+        "margin_c": _r(margin[i]),
+        "heat_w": round(float(heat[i]), 4),
+        **({"time_to_limit_s": _r(first[i])} if "transient" in out else {}),
+    } for i in order]
+
+    failures: List[str] = []
+    warnings: List[str] = []
+    for i in order:
+        name = comps[i].name
+        if heated_floating[i]:
+            failures.append(f"THERMAL · {name} has no heat path to ambient — unbounded temperature rise.")
+        elif margin[i] < 0:
+            failures.append(
+                f"THERMAL hotspot · {name} reaches {T_eval[i]:.1f} °C > {limit[i]:.0f} °C limit"
+                + (f" after {first[i]:.0f}s" if np.isfinite(first[i]) else "")
+            )
+        elif margin[i] < opt["margin_warn_c"]:
+            warnings.append(
+                f"Thermal margin low · {name} at {T_eval[i]:.1f} °C, limit {limit[i]:.0f} °C."
+            )
+    if unknown:
+        warnings.append(f"thermal_network refers to unknown parts: {', '.join(unknown[:5])}")
+    if heat_assumed:
+        warnings.append(
+            f"No per-part heat given — assumed {opt['dissipation_fraction']:.0%} of "
+            f"average power ({out['heat_total_w']} W) spread evenly."
+        )
+    finite = T_eval[np.isfinite(T_eval)]
+    out.update(
+        max_node_temp_c=_r(finite.max()) if finite.size else None,
+        hotspots=hotspots,
+        failures=failures,
+        warnings=warnings,
+    )
+    return out
+
+
+def _sim_thermal_network(twin: DigitalTwin) -> Tuple[List[str], List[str], List[str], Dict, Dict]:
+    findings: List[str] = []
+    if not twin.state.components:
+        return findings, [], ["No components — no thermal network."], {}, {}
+    try:
+        net = thermal_network(twin)
+    except ImportError:
+        return ([], [], ["scipy not installed — THERMAL_NETWORK sim unavailable"], {}, {})
+    except ValueError as exc:
+        return findings, [], [f"Thermal network invalid: {exc}"], {}, {}
+    metrics = {k: v for k, v in net.items() if k not in ("hotspots", "failures", "warnings")}
+    metrics["hotspots"] = net["hotspots"][:10]
+    hottest = net["hotspots"][0]
+    findings.append(
+        f"Thermal network · {net['nodes']} nodes · {net['links']} links · "
+        f"{net['heat_total_w']} W total · hottest {hottest['component']} "
+        f"{hottest['T_c'] if hottest['T_c'] is not None else '∞'} °C "
+        f"(margin {hottest['margin_c'] if hottest['margin_c'] is not None else '−∞'} °C)"
+    )
+    # Full per-node table rides in the timeline slot, hottest first.
+    return findings, net["warnings"], net["failures"], metrics, {"timeline": net["hotspots"]}
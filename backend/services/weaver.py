@@ -21,8 +21,6 @@ import os
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-from motor.motor_asyncio import AsyncIOMotorClient
-
 from models.weaver_models import (
     AssemblyStep,
     BlueprintInput,
@@ -43,20 +41,16 @@ from models.twin_models import (
     TwinCategory,
     TwinState,
 )
+from services import mongo
 from services import blueprint_parser, digital_twin as dt, memory_bank as mb, parts_db
 
 logger = logging.getLogger("atlas.weaver")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _plans():
@@ -276,12 +270,7 @@ async def plan_from_blueprint(
         raise ValueError("Blueprint produced no parts; nothing to plan.")
     # 2) library enrichment
     parts = await blueprint_parser.match_against_library(parts)
-    library_by_id: Dict[str, Dict[str, Any]] = {}
-    for p in parts:
-        if p.library_part_id:
-            lib = await parts_db.get_part(p.library_part_id)
-            if lib:
-                library_by_id[p.library_part_id] = lib
+    library_by_id = await parts_db.get_parts(p.library_part_id for p in parts)
     # 3) spawn the digital twin (Phase 5 registry)
     twin_doc = await _spawn_twin(
         title=title, description=description, owner_agent=owner_agent,
@@ -290,10 +279,18 @@ async def plan_from_blueprint(
     )
     twin_id = twin_doc["id"]
     # 4) run the Phase-5 sims we need for the build/manufacturing/failure plans
-    asm_sim = (await dt.run_and_persist_simulation(twin_id, SimulationKind.ASSEMBLY)).model_dump()
-    cost_sim = (await dt.run_and_persist_simulation(twin_id, SimulationKind.COST)).model_dump()
-    time_sim = (await dt.run_and_persist_simulation(twin_id, SimulationKind.TIMELINE)).model_dump()
-    fail_sim = (await dt.run_and_persist_simulation(twin_id, SimulationKind.FAILURE)).model_dump()
+    #    in one batch — the twin was just written, so hand the doc over rather
+    #    than re-reading it; an unchanged blueprint is served from the sim memo.
+    sims = await dt.run_and_persist_simulations(
+        twin_id,
+        [SimulationKind.ASSEMBLY, SimulationKind.COST,
+         SimulationKind.TIMELINE, SimulationKind.FAILURE],
+        twin_doc=twin_doc,
+    )
+    asm_sim = sims[SimulationKind.ASSEMBLY].model_dump()
+    cost_sim = sims[SimulationKind.COST].model_dump()
+    time_sim = sims[SimulationKind.TIMELINE].model_dump()
+    fail_sim = sims[SimulationKind.FAILURE].model_dump()
     # 5) compose plans
     build = _build_plan(parts, asm_sim.get("timeline") or [])
     manuf = _manufacturing_plan(cost_sim, time_sim, parts, library_by_id)
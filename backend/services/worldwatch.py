@@ -13,6 +13,9 @@ Design honest:
     ingestion pipeline, write KB/MB/graph triples, and emit a
     "what changed" note (single sentence + 3 bullets).
   * De-dupes by entry GUID + content hash so a re-run is idempotent.
+  * Feeds are polled concurrently through one pooled client, rate limited
+    per host, with conditional GETs (ETag / Last-Modified kept on the feed
+    doc) and an incremental parse that stops reading after N entries.
   * Source list is editable at runtime via the routes layer (not in this
     file) — but the seed is shipped in `worldwatch_feeds.py`.
 
@@ -23,34 +26,33 @@ Collections:
 """
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
 import os
 import re
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 from uuid import uuid4
 from xml.etree import ElementTree as ET
 
 import httpx
-from motor.motor_asyncio import AsyncIOMotorClient
 
+from services import mongo
 from services import knowledge_ingestion as ki
 from services import memory_bank as mb
 from services.llm_provider import send as llm_send
 
 logger = logging.getLogger("atlas.worldwatch")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _feeds():   return _db()["worldwatch_feeds"]
@@ -226,6 +228,86 @@ async def status() -> Dict[str, Any]:
         "updates_by_domain": by_domain,
         "last_run": last_run,
         "domains_covered": DOMAINS,
+        "poller": poller_stats(),
+    }
+
+
+# --- Feed poller -----------------------------------------------------------
+# One pooled client for every feed request; feeds are fetched concurrently
+# (bounded by FETCH_CONCURRENCY) while requests to the same host are spaced
+# HOST_INTERVAL_S apart so one run doesn't hammer export.arxiv.org with seven
+# parallel hits. ETag/Last-Modified from the previous 200 are stored on the
+# feed doc and sent back, so an unchanged feed costs a 304 and no body.
+FETCH_CONCURRENCY = int(os.environ.get("WORLDWATCH_FETCH_CONCURRENCY", "6"))
+HOST_INTERVAL_S = float(os.environ.get("WORLDWATCH_HOST_INTERVAL_S", "1.0"))
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+_http: Optional[httpx.AsyncClient] = None
+_host_locks: Dict[str, asyncio.Lock] = {}
+_host_last: Dict[str, float] = {}
+_poll_stats: Dict[str, int] = {
+    "requests": 0, "not_modified": 0, "bytes": 0, "fetch_errors": 0,
+}
+
+
+def _http_client() -> httpx.AsyncClient:
+    global _http
+    if _http is None or _http.is_closed:
+        _http = httpx.AsyncClient(
+            timeout=20.0, follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(max_connections=FETCH_CONCURRENCY * 2,
+                                max_keepalive_connections=FETCH_CONCURRENCY),
+        )
+    return _http
+
+
+async def close_client() -> None:
+    global _http
+    if _http is not None and not _http.is_closed:
+        await _http.aclose()
+    _http = None
+
+
+def _host_key(url: str) -> str:
+    if url.startswith("patent:"):
+        return "patent"
+    return (urlsplit(url).hostname or url).lower()
+
+
+@asynccontextmanager
+async def _fetch_slot(host: str, gate: asyncio.Semaphore) -> AsyncIterator[None]:
+    """Hold one of the run's FETCH_CONCURRENCY slots for a request to
+    `host`, at least HOST_INTERVAL_S after the previous one. The spacing
+    sleep happens under the host lock *before* the slot is taken, so feeds
+    queued on a busy host (arXiv) never sit on slots other hosts could use."""
+    lock = _host_locks.setdefault(host, asyncio.Lock())
+    async with lock:
+        wait = _host_last.get(host, 0.0) + HOST_INTERVAL_S - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await gate.acquire()
+        _host_last[host] = time.monotonic()
+    try:
+        yield
+    finally:
+        gate.release()
+
+
+def reset_in_memory_state() -> None:
+    global _http
+    _http = None
+    _host_locks.clear()
+    _host_last.clear()
+    for k in _poll_stats:
+        _poll_stats[k] = 0
+
+
+def poller_stats() -> Dict[str, Any]:
+    return {
+        **_poll_stats,
+        "fetch_concurrency": FETCH_CONCURRENCY,
+        "host_interval_s": HOST_INTERVAL_S,
     }
 
 
@@ -237,7 +319,7 @@ async def run(*, max_per_feed: int = 3) -> Dict[str, Any]:
     run_id = uuid4().hex
     proof: Dict[str, Any] = {
         "run_id": run_id, "started_at": started_at,
-        "feeds_processed": 0, "entries_seen": 0,
+        "feeds_processed": 0, "feeds_not_modified": 0, "entries_seen": 0,
         "entries_new": 0, "errors": [],
         "updates_ids": [],
     }
@@ -246,84 +328,161 @@ async def run(*, max_per_feed: int = 3) -> Dict[str, Any]:
         await seed_feeds()
         feeds = await list_feeds()
 
-    for f in feeds:
-        proof["feeds_processed"] += 1
-        src_type = f.get("source_type", "rss")
-        try:
-            if src_type == "patent":
-                entries = await _fetch_patent_entries(f["url"], max_per_feed)
-            else:
-                entries = await _fetch_feed_entries(f["url"], max_per_feed)
-        except Exception as exc:    # noqa: BLE001
-            proof["errors"].append({
-                "feed_id": f["id"], "url": f["url"], "stage": "fetch",
-                "msg": str(exc)[:200],
-            })
-            continue
-        proof["entries_seen"] += len(entries)
-
-        for entry in entries:
-            try:
-                update = await _ingest_entry(f, entry)
-                if update.get("new"):
-                    proof["entries_new"] += 1
-                    proof["updates_ids"].append(update["id"])
-            except Exception as exc:    # noqa: BLE001
-                proof["errors"].append({
-                    "feed_id": f["id"], "url": entry.get("link"),
-                    "stage": "ingest_entry", "msg": str(exc)[:200],
-                })
-
-        await _feeds().update_one(
-            {"id": f["id"]},
-            {"$set": {"last_run_at": _utc()}, "$inc": {"run_count": 1}},
-        )
+    t0 = time.monotonic()
+    gate = asyncio.Semaphore(max(1, FETCH_CONCURRENCY))
+    # Two feeds may carry the same entry (cs.RO is registered twice); claim
+    # hashes up front so concurrent feeds don't both insert it.
+    claimed: set = set()
 
+    await asyncio.gather(*(_poll_feed(f, max_per_feed, proof, claimed, gate) for f in feeds))
+
+    proof["fetch_ms"] = round((time.monotonic() - t0) * 1000)
     proof["ended_at"] = _utc()
     proof["status"] = "ok" if not proof["errors"] else "partial"
     await _runs().insert_one(proof.copy())
     return proof
 
 
-async def _fetch_feed_entries(url: str, n: int) -> List[Dict[str, Any]]:
-    async with httpx.AsyncClient(
-        timeout=20.0, follow_redirects=True,
-        headers={"User-Agent": USER_AGENT},
-    ) as client:
-        r = await client.get(url)
-        r.raise_for_status()
-        xml = r.text
+async def _poll_feed(
+    f: Dict[str, Any], max_per_feed: int,
+    proof: Dict[str, Any], claimed: set, gate: asyncio.Semaphore,
+) -> None:
+    proof["feeds_processed"] += 1
+    src_type = f.get("source_type", "rss")
+    validators: Dict[str, Any] = {}
+    try:
+        # The slot covers fetch + parse only; ingest below runs outside it.
+        async with _fetch_slot(_host_key(f["url"]), gate):
+            if src_type == "patent":
+                entries = await _fetch_patent_entries(f["url"], max_per_feed)
+            else:
+                entries, validators = await _fetch_feed_entries(
+                    f["url"], max_per_feed, feed=f,
+                )
+    except Exception as exc:    # noqa: BLE001
+        _poll_stats["fetch_errors"] += 1
+        proof["errors"].append({
+            "feed_id": f["id"], "url": f["url"], "stage": "fetch",
+            "msg": str(exc)[:200],
+        })
+        return
+    if validators.get("last_status") == 304:
+        proof["feeds_not_modified"] += 1
+    proof["entries_seen"] += len(entries)
+
+    failed = False
+    for entry in entries:
+        h = _entry_hash(entry)
+        if h in claimed:
+            continue
+        claimed.add(h)
+        try:
+            update = await _ingest_entry(f, entry)
+            if update.get("new"):
+                proof["entries_new"] += 1
+                proof["updates_ids"].append(update["id"])
+        except Exception as exc:    # noqa: BLE001
+            failed = True
+            proof["errors"].append({
+                "feed_id": f["id"], "url": entry.get("link"),
+                "stage": "ingest_entry", "msg": str(exc)[:200],
+            })
 
-    # Some feeds (Dezeen) ship a BOM/leading whitespace before <?xml; strict
-    # ET.fromstring rejects anything before the prolog, so normalise first.
-    xml = xml.lstrip("\ufeff").lstrip()
+    fields: Dict[str, Any] = {"last_run_at": _utc()}
+    if validators:
+        fields["last_status"] = validators.pop("last_status")
+        # Keep the old validators if an entry failed to ingest, otherwise
+        # the next run gets a 304 and never retries it.
+        if not failed:
+            fields.update(validators)
+    await _feeds().update_one(
+        {"id": f["id"]}, {"$set": fields, "$inc": {"run_count": 1}},
+    )
 
-    try:
-        root = ET.fromstring(xml)
-    except ET.ParseError as exc:
-        raise RuntimeError(f"RSS parse: {exc}") from exc
 
+async def _fetch_feed_entries(
+    url: str, n: int, *, feed: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Conditional GET + incremental parse. Returns (entries, validators),
+    where validators are the fields to persist on the feed doc. A 304 gives
+    no entries. The body is parsed as it streams and the download stops
+    once `n` entries are in hand."""
+    feed = feed or {}
+    headers: Dict[str, str] = {}
+    # Validators only vouch for the window they were fetched with; a run
+    # asking for more entries than last time needs the full body.
+    if (feed.get("fetch_window") or 0) >= n:
+        if feed.get("etag"):
+            headers["If-None-Match"] = feed["etag"]
+        if feed.get("last_modified"):
+            headers["If-Modified-Since"] = feed["last_modified"]
+
+    _poll_stats["requests"] += 1
     out: List[Dict[str, Any]] = []
-    # RSS 2.0: <rss><channel><item>; Atom: <feed><entry>
-    items = root.findall(".//item") or root.findall(
-        ".//{http://www.w3.org/2005/Atom}entry"
-    )
-    for it in items[:n]:
-        title = _text(it, "title")
-        link = _text(it, "link") or _attr(it, "link", "href")
-        desc = _text(it, "description") or _text(it, "summary") or _text(it, "content")
-        pub  = _text(it, "pubDate") or _text(it, "published") or _text(it, "updated")
-        guid = _text(it, "guid") or link or title
-        if not (title and link):
+    async with _http_client().stream("GET", url, headers=headers) as r:
+        if r.status_code == 304:
+            _poll_stats["not_modified"] += 1
+            return [], {"last_status": 304}
+        r.raise_for_status()
+        validators: Dict[str, Any] = {
+            "last_status": r.status_code,
+            "etag": r.headers.get("etag"),
+            "last_modified": r.headers.get("last-modified"),
+            "fetch_window": n,
+        }
+        parser = ET.XMLPullParser(events=("end",))
+        started = False
+        try:
+            async for chunk in r.aiter_bytes():
+                _poll_stats["bytes"] += len(chunk)
+                if not started:
+                    # Some feeds (Dezeen) ship a BOM/leading whitespace before
+                    # <?xml; the parser rejects anything before the prolog.
+                    chunk = chunk.lstrip(b"\xef\xbb\xbf").lstrip()
+                    if not chunk:
+                        continue
+                    started = True
+                parser.feed(chunk)
+                if _drain_items(parser, out, n):
+                    break
+            else:
+                parser.close()
+                _drain_items(parser, out, n)
+        except ET.ParseError as exc:
+            raise RuntimeError(f"RSS parse: {exc}") from exc
+    return out, validators
+
+
+def _drain_items(parser: ET.XMLPullParser, out: List[Dict[str, Any]],
+                 n: int) -> bool:
+    """Move finished <item>/<entry> elements from the parser into `out`.
+    Returns True once `n` entries are collected."""
+    for _event, el in parser.read_events():
+        # RSS 2.0: <rss><channel><item>; Atom: <feed><entry>
+        if el.tag not in ("item", ATOM_NS + "entry") or len(out) >= n:
             continue
-        out.append({
-            "title": title.strip()[:300],
-            "link": link.strip(),
-            "summary": (desc or "").strip()[:6000],
-            "published": (pub or "").strip(),
-            "guid": guid.strip(),
-        })
-    return out
+        entry = _entry_from_element(el)
+        el.clear()
+        if entry is not None:
+            out.append(entry)
+    return len(out) >= n
+
+
+def _entry_from_element(it: ET.Element) -> Optional[Dict[str, Any]]:
+    title = _text(it, "title")
+    link = _text(it, "link") or _attr(it, "link", "href")
+    desc = _text(it, "description") or _text(it, "summary") or _text(it, "content")
+    pub  = _text(it, "pubDate") or _text(it, "published") or _text(it, "updated")
+    guid = _text(it, "guid") or link or title
+    if not (title and link):
+        return None
+    return {
+        "title": title.strip()[:300],
+        "link": link.strip(),
+        "summary": (desc or "").strip()[:6000],
+        "published": (pub or "").strip(),
+        "guid": guid.strip(),
+    }
 
 
 async def _fetch_patent_entries(url_or_query: str, n: int) -> List[Dict[str, Any]]:
@@ -362,9 +521,7 @@ async def _fetch_patent_entries(url_or_query: str, n: int) -> List[Dict[str, Any
 async def _ingest_entry(feed: Dict[str, Any], entry: Dict[str, Any]) -> Dict[str, Any]:
     """De-dupe by guid+content hash. New entries get a 'what changed' note +
     a KB/MB/graph triple-write."""
-    h = hashlib.sha256(
-        f"{entry['guid']}|{entry['link']}".encode(),
-    ).hexdigest()[:24]
+    h = _entry_hash(entry)
     existing = await _updates().find_one({"entry_hash": h}, {"_id": 0})
     if existing:
         return {"id": existing["id"], "new": False}
@@ -443,6 +600,12 @@ async def _ingest_entry(feed: Dict[str, Any], entry: Dict[str, Any]) -> Dict[str
     return {"id": upd_id, "new": True}
 
 
+def _entry_hash(entry: Dict[str, Any]) -> str:
+    return hashlib.sha256(
+        f"{entry['guid']}|{entry['link']}".encode(),
+    ).hexdigest()[:24]
+
+
 async def _what_changed_note(entry: Dict[str, Any], domain: str) -> Dict[str, Any]:
     """LLM-generated single-sentence 'what changed' + 3 bullets.
     Falls back gracefully if LLM fails."""
@@ -456,7 +619,10 @@ async def _what_changed_note(entry: Dict[str, Any], domain: str) -> Dict[str, An
         "Tell me what actually changed (not generic claims)."
     )
     try:
-        resp = await llm_send("minerva", sys, user)
+        # Exact tier only: the semantic tier's bag-of-words vectors can't
+        # tell "lower cost" from "higher cost", and a note from a story
+        # that says the opposite is worse than a fresh call.
+        resp = await llm_send("minerva", sys, user, cache="worldwatch.what_changed")
         raw = (resp.get("text") or "").strip()
         import json as _j, re as _re
         m = _re.search(r"\{.*\}", raw, _re.DOTALL)
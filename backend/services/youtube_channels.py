@@ -20,24 +20,19 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-from motor.motor_asyncio import AsyncIOMotorClient
 from pydantic import BaseModel, Field
 
+from services import mongo
 from services import memory_bank as mb
 from services import youtube_resolver as yt_res
 
 logger = logging.getLogger("atlas.youtube_channels")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _channels():   return _db()["youtube_channels"]
@@ -23,9 +23,8 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-from motor.motor_asyncio import AsyncIOMotorClient
-
 from models.knowledge_models import FetchedSource, SourceType, KnowledgeRecord, url_hash
+from services import mongo
 from services import knowledge_distiller as kd
 from services import memory_bank as mb
 from services import knowledge_ingestion as ki
@@ -36,16 +35,11 @@ from services.youtube_resolver import (
 
 logger = logging.getLogger("atlas.youtube")
 
-MONGO_URL = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
 DB_NAME = os.environ.get("DB_NAME", "test_database")
-_client: Optional[AsyncIOMotorClient] = None
 
 
 def _db():
-    global _client
-    if _client is None:
-        _client = AsyncIOMotorClient(MONGO_URL)
-    return _client[DB_NAME]
+    return mongo.db(DB_NAME)
 
 
 def _yt_private(): return _db()["youtube_transcripts_private"]
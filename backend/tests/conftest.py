@@ -0,0 +1,254 @@
+"""Shared test fixtures for the backend suite.
+
+`fake_collection` is an in-memory stand-in for a Motor collection —
+just enough of the query and update language for the services' hot
+paths (find/sort/limit, `$in` / `$nin` / range operators / `$or`,
+`$set` / `$setOnInsert` / `$inc` / `$min` / `$max` upserts, bulk writes)
+so tests can run without a Mongo server. Every call is recorded in
+`calls`, and every `find` / `count_documents` filter in `queries`.
+"""
+from types import SimpleNamespace
+
+import pytest
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+_MISSING = object()
+
+
+def _get(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return _MISSING
+        doc = doc[part]
+    return doc
+
+
+def _put(doc, path, value):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+
+def _cond(value, cond):
+    if cond is None:                  # Mongo: null matches a missing field too
+        return value is _MISSING or value is None
+    if not (isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond)):
+        return value == cond
+    for op, arg in cond.items():
+        if op == "$in":
+            ok = value in arg
+        elif op == "$nin":
+            ok = value not in arg
+        elif op == "$ne":
+            ok = value != arg
+        elif op == "$exists":
+            ok = (value is not _MISSING) == bool(arg)
+        elif value is _MISSING or value is None:
+            ok = False
+        elif op == "$gte":
+            ok = value >= arg
+        elif op == "$gt":
+            ok = value > arg
+        elif op == "$lte":
+            ok = value <= arg
+        elif op == "$lt":
+            ok = value < arg
+        else:
+            raise NotImplementedError(f"fake_collection: {op}")
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc, filt):
+    """True if `doc` satisfies the Mongo filter `filt`."""
+    for key, cond in (filt or {}).items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in cond):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in cond):
+                return False
+        elif not _cond(_get(doc, key), cond):
+            return False
+    return True
+
+
+def _project(doc, projection):
+    if not projection:
+        return dict(doc)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if any(fields.values()):
+        return {k: doc[k] for k, v in fields.items() if v and k in doc}
+    out = {k: v for k, v in doc.items() if k not in fields}
+    if projection.get("_id") == 0:
+        out.pop("_id", None)
+    return out
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def sort(self, key, direction=1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self.rows.sort(key=lambda r: r.get(field), reverse=order < 0)
+        return self
+
+    def limit(self, n):
+        if n:
+            self.rows = self.rows[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self.rows if length is None else self.rows[:length]
+
+    def __aiter__(self):
+        async def gen():
+            for row in self.rows:
+                yield row
+        return gen()
+
+
+class FakeCollection:
+    """In-memory collection; `docs` is the backing list and may be edited
+    directly to simulate writes made by another worker."""
+
+    def __init__(self, docs=(), *, failing_indexes=()):
+        self.docs = [dict(d) for d in docs]
+        self.calls = []
+        self.queries = []
+        self.indexes = []
+        self.failing_indexes = set(failing_indexes)
+
+    # --- reads ---------------------------------------------------------
+    def find(self, filt=None, projection=None):
+        self.calls.append("find")
+        self.queries.append(filt or {})
+        return FakeCursor([_project(d, projection) for d in self.docs if matches(d, filt)])
+
+    async def find_one(self, filt=None, projection=None):
+        self.calls.append("find_one")
+        doc = next((d for d in self.docs if matches(d, filt)), None)
+        return None if doc is None else _project(doc, projection)
+
+    async def count_documents(self, filt, limit=0):
+        self.calls.append("count_documents")
+        self.queries.append(filt)
+        n = sum(1 for d in self.docs if matches(d, filt))
+        return min(n, limit) if limit else n
+
+    # --- writes --------------------------------------------------------
+    async def insert_one(self, doc):
+        self.calls.append("insert_one")
+        self.docs.append(doc)
+
+    async def insert_many(self, docs, ordered=True):
+        """Enforces a unique `_id`; duplicates raise `BulkWriteError` after
+        the rest of an unordered batch has landed, as Mongo does."""
+        self.calls.append("insert_many")
+        ids = {d["_id"] for d in self.docs if "_id" in d}
+        errors, inserted = [], 0
+        for i, doc in enumerate(docs):
+            if "_id" in doc and doc["_id"] in ids:
+                errors.append({"index": i, "code": 11000, "errmsg": "E11000 duplicate key error"})
+                if ordered:
+                    break
+                continue
+            self.docs.append(doc)
+            ids.add(doc.get("_id"))
+            inserted += 1
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": inserted})
+
+    def _update(self, filt, update, upsert):
+        """Apply `update` to the first match; returns (doc, upserted)."""
+        doc = next((d for d in self.docs if matches(d, filt)), None)
+        upserted = doc is None
+        if upserted:
+            if not upsert:
+                return None, False
+            doc = {k: v for k, v in filt.items()
+                   if not k.startswith("$") and not isinstance(v, dict)}
+            for path, v in update.get("$setOnInsert", {}).items():
+                _put(doc, path, v)
+            self.docs.append(doc)
+        for path, v in update.get("$set", {}).items():
+            _put(doc, path, v)
+        for path, v in update.get("$inc", {}).items():
+            cur = _get(doc, path)
+            _put(doc, path, v if cur is _MISSING else cur + v)
+        for op, pick in (("$min", min), ("$max", max)):
+            for path, v in update.get(op, {}).items():
+                cur = _get(doc, path)
+                _put(doc, path, v if cur is _MISSING else pick(cur, v))
+        for path in update.get("$unset", {}):
+            *parents, leaf = path.split(".")
+            parent = _get(doc, ".".join(parents)) if parents else doc
+            if isinstance(parent, dict):
+                parent.pop(leaf, None)
+        return doc, upserted
+
+    async def update_one(self, filt, update, upsert=False):
+        self.calls.append("update_one")
+        doc, upserted = self._update(filt, update, upsert)
+        return SimpleNamespace(
+            matched_count=int(doc is not None and not upserted),
+            modified_count=int(doc is not None and not upserted),
+            upserted_id=filt.get("id", True) if upserted else None,
+        )
+
+    async def find_one_and_update(self, filt, update, projection=None, upsert=False,
+                                  return_document=False, **_kw):
+        self.calls.append("find_one_and_update")
+        before = next((dict(d) for d in self.docs if matches(d, filt)), None)
+        doc, _ = self._update(filt, update, upsert)
+        out = doc if return_document else before
+        return None if out is None else _project(out, projection)
+
+    async def bulk_write(self, ops, ordered=True):
+        self.calls.append("bulk_write")
+        upserted = modified = inserted = 0
+        for op in ops:
+            if isinstance(op, InsertOne):
+                self.docs.append(op._doc)
+                inserted += 1
+            elif isinstance(op, UpdateOne):
+                doc, new = self._update(op._filter, op._doc, op._upsert)
+                upserted += int(new and doc is not None)
+                modified += int(doc is not None and not new)
+            else:
+                raise NotImplementedError(f"fake_collection: {type(op).__name__}")
+        return SimpleNamespace(upserted_count=upserted, modified_count=modified,
+                               inserted_count=inserted)
+
+    async def delete_one(self, filt):
+        self.calls.append("delete_one")
+        for i, d in enumerate(self.docs):
+            if matches(d, filt):
+                del self.docs[i]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, filt):
+        self.calls.append("delete_many")
+        keep = [d for d in self.docs if not matches(d, filt)]
+        gone, self.docs = len(self.docs) - len(keep), keep
+        return SimpleNamespace(deleted_count=gone)
+
+    async def create_indexes(self, models):
+        self.calls.append("create_indexes")
+        names = [m.document["name"] for m in models]
+        if self.failing_indexes & set(names):
+            raise OperationFailure("E11000 duplicate key error")
+        self.indexes.extend(names)
+        return names
+
+
+@pytest.fixture
+def fake_collection():
+    """Factory for in-memory Mongo collections: `fake_collection(docs)`."""
+    return FakeCollection
@@ -0,0 +1,111 @@
+"""Tests for the vectorised anomaly engine against anomaly.score_state."""
+import random
+
+import pytest
+
+from services import anomaly
+from services import anomaly_engine as ae
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    ae.reset_in_memory_state(detectors=("welford",))
+    yield
+    ae.reset_in_memory_state()
+
+
+def _stream(seed, devices=5, ticks=60):
+    rng = random.Random(seed)
+    out = []
+    for t in range(ticks):
+        for d in range(devices):
+            payload = {"temp": 20 + rng.gauss(0, 0.5), "rssi": rng.randint(-72, -55), "ok": True}
+            if t == 40 and d == 2:
+                payload["temp"] = 90.0
+            if d == 3 and t % 2:
+                payload["extra"] = rng.random()
+            out.append((f"dev-{d}", payload))
+    return out
+
+
+def test_batch_matches_reference_score_state_bit_for_bit():
+    readings = _stream(7)
+    ref_states = {}
+    ref = []
+    for device_id, payload in readings:
+        state = ref_states.setdefault(device_id, {})
+        _, drifting, z = anomaly.score_state(state, payload)
+        ref.append((drifting, z))
+    for device_id in ref_states:
+        ae.load(device_id, {})
+    got = []
+    for i in range(0, len(readings), 17):          # batches span several readings per device
+        got.extend(ae.score_batch(readings[i:i + 17]))
+
+    assert [(d, z) for d, z, _ in got] == ref
+    assert any(d for d, _ in ref)
+    for device_id, state in ref_states.items():
+        envs = ae.envelopes(device_id)
+        for key, env in state["envelopes"].items():
+            for field in ("n", "mean", "m2", "last_value"):
+                assert envs[key][field] == env[field]
+            assert envs[key].get("last_z") == env.get("last_z")
+
+
+def test_single_reading_path_matches_batches_with_every_detector():
+    readings = _stream(11)
+    results = []
+    for single in (False, True):
+        ae.reset_in_memory_state(detectors=("welford", "ewma", "window"), window=8)
+        for d in range(5):
+            ae.load(f"dev-{d}", {})
+        if single:
+            got = [ae.score(device_id, payload) for device_id, payload in readings]
+        else:
+            got = [r for i in range(0, len(readings), 17) for r in ae.score_batch(readings[i:i + 17])]
+        results.append((got, {f"dev-{d}": ae.envelopes(f"dev-{d}") for d in range(5)}))
+
+    (batched, batch_envs), (single, single_envs) = results
+    assert single == batched and single_envs == batch_envs
+    assert {name for _, _, dets in single for names in dets.values() for name in names} \
+        == {"welford", "ewma", "window"}
+
+
+def test_load_resumes_from_persisted_envelopes():
+    readings = _stream(3, devices=1)
+    state = {}
+    for _, payload in readings[:30]:
+        anomaly.score_state(state, payload)
+    ae.load("dev-0", {"envelopes": state["envelopes"]})
+    got = ae.score_batch(readings[30:])
+    ref = [anomaly.score_state(state, p)[1:] for _, p in readings[30:]]
+    assert [(d, z) for d, z, _ in got] == ref
+
+
+def test_unknown_devices_and_non_numeric_are_ignored():
+    ae.load("a", {})
+    out = ae.score_batch([("a", {"s": "x", "b": False, "n": float("nan")}), ("zz", {"t": 1.0})])
+    assert out == [([], {}, {}), ([], {}, {})]
+    assert ae.envelopes("a") == {}
+    assert ae.envelopes("zz") is None
+
+
+def test_ewma_and_window_detectors_fire_on_spike():
+    ae.reset_in_memory_state(detectors=("ewma", "window"), window=8)
+    ae.load("d", {"anomaly_warmup": 5})
+    for i in range(20):
+        assert ae.score("d", {"v": 10.0 + (i % 2) * 0.2})[0] == []
+    drifting, z, detectors = ae.score("d", {"v": 30.0})
+    assert drifting == ["v"] and z["v"] > 3
+    assert detectors == {"v": ["ewma", "window"]}
+
+
+def test_evict_recycles_rows_and_grows():
+    for i in range(40):
+        ae.load(f"d{i}", {})
+        ae.score(f"d{i}", {f"k{i}": 1.0})
+    assert ae.stats()["devices"] == 40 and ae.stats()["keys"] == 40
+    ae.evict("d0")
+    ae.load("fresh", {})
+    assert ae.envelopes("fresh") == {}
+    assert ae.envelopes("d39")["k39"]["n"] == 1
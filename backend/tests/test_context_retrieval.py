@@ -0,0 +1,116 @@
+"""Tests for hybrid (vector + lexical) persona context retrieval."""
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from services import context_retrieval as cr
+from services import memory_bank as mb
+from services import memory_index
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    cr.reset_in_memory_state()
+    memory_index.reset_in_memory_state()
+    yield
+    cr.reset_in_memory_state()
+    memory_index.reset_in_memory_state()
+
+
+def _mem(mid, content, score):
+    return {"id": mid, "content": content, "tags": ["t"], "score": score}
+
+
+def _rec(rid, title, summary=""):
+    return {"id": rid, "title": title, "summary": summary, "source_url": f"https://x/{rid}"}
+
+
+def test_fusion_lets_a_lexical_match_outrank_a_weak_vector_hit():
+    memories = [
+        _mem("m1", "unrelated musings about lunch", 0.41),
+        _mem("m2", "servo torque limits under load", 0.40),
+    ]
+    ctx = cr.fuse("servo torque", "ajani", memories, [], memory_top_k=1, knowledge_top_k=1)
+    assert [m["id"] for m in ctx.memories] == ["m2"]
+    assert "servo torque limits" in ctx.block
+    assert "(no matching ingested sources yet.)" in ctx.block
+
+
+def test_fusion_respects_token_budget_and_section_caps():
+    memories = [_mem(f"m{i}", "gearbox " + "x" * 200, 0.9 - i / 100) for i in range(4)]
+    knowledge = [_rec(f"k{i}", "Gearbox design", "y" * 150) for i in range(4)]
+    ctx = cr.fuse("gearbox", "ajani", memories, knowledge,
+                  memory_top_k=3, knowledge_top_k=3, token_budget=150)
+    assert ctx.tokens <= 150
+    assert ctx.dropped > 0
+    assert len(ctx.memories) + len(ctx.knowledge) == 2
+
+    roomy = cr.fuse("gearbox", "ajani", memories, knowledge,
+                    memory_top_k=3, knowledge_top_k=2, token_budget=10_000)
+    assert len(roomy.memories) == 3 and len(roomy.knowledge) == 2
+
+
+def test_council_retrieves_once_and_reuses_the_cache(monkeypatch):
+    calls = {"memory": [], "knowledge": []}
+
+    async def fake_memory(query, personas, *, top_k, min_score):
+        calls["memory"].append(list(personas))
+        return {p: [_mem(f"{p}-m", f"{p} notes on {query}", 0.8)] for p in personas}
+
+    async def fake_knowledge(q, agents, *, limit):
+        calls["knowledge"].append(list(agents))
+        return {a: [_rec("k1", "Shared record", q)] for a in agents}
+
+    monkeypatch.setattr(cr.mb, "search_memory_many", fake_memory)
+    monkeypatch.setattr(cr.kbase, "search_many", fake_knowledge)
+
+    voices = ["ajani", "minerva", "hermes"]
+    first = asyncio.run(cr.retrieve_many("bearing wear", voices))
+    assert calls == {"memory": [voices], "knowledge": [voices]}
+    assert first["minerva"].memories[0]["id"] == "minerva-m"
+
+    again = asyncio.run(cr.retrieve_many("  Bearing   WEAR ", voices))
+    single = asyncio.run(cr.retrieve("bearing wear", "hermes"))
+    assert len(calls["memory"]) == 1 and len(calls["knowledge"]) == 1
+    assert again["ajani"] is first["ajani"] and single is first["hermes"]
+    assert cr.stats()["hits"] == 4 and cr.stats()["misses"] == 3
+
+
+def test_source_failure_degrades_to_empty_section(monkeypatch):
+    async def broken(*a, **kw):
+        raise RuntimeError("index offline")
+
+    async def fake_knowledge(q, agents, *, limit):
+        return {a: [_rec("k1", "Kiln firing")] for a in agents}
+
+    monkeypatch.setattr(cr.mb, "search_memory_many", broken)
+    monkeypatch.setattr(cr.kbase, "search_many", fake_knowledge)
+    ctx = asyncio.run(cr.retrieve("kiln firing", "ajani"))
+    assert ctx.memories == [] and [k["id"] for k in ctx.knowledge] == ["k1"]
+
+
+def test_search_memory_many_reads_mongo_once(monkeypatch, fake_collection):
+    now = datetime.now(timezone.utc).isoformat()
+    for mid, persona in (("a1", "ajani"), ("h1", "hermes")):
+        memory_index.upsert({
+            "id": mid, "persona": persona, "category": "agent", "pinned": False,
+            "freshness": 1.0, "last_referenced": now, "created_at": now,
+            "embedding": [1.0, 0.0, 0.0],
+        })
+
+    col = fake_collection([{"id": i, "content": i} for i in ("a1", "h1")])
+
+    async def fake_embed(text, persona="default"):
+        return [1.0, 0.0, 0.0], {}
+
+    async def no_sync():
+        return None
+
+    monkeypatch.setattr(mb, "_memory", lambda: col)
+    monkeypatch.setattr(mb, "embed", fake_embed)
+    monkeypatch.setattr(mb, "_ensure_index", no_sync)
+    out = asyncio.run(mb.search_memory_many("q", ["ajani", "hermes"], top_k=3, min_score=0.1))
+    assert [r["id"] for r in out["ajani"]] == ["a1"]
+    assert [r["id"] for r in out["hermes"]] == ["h1"]
+    assert col.calls == ["find"]
@@ -0,0 +1,82 @@
+"""Tests for the Memory Bank embedding pipeline (LRU + micro-batcher)."""
+import asyncio
+
+from services.embed_pipeline import MicroBatcher, VectorLRU, content_key
+
+
+def test_lru_evicts_oldest_and_returns_copies():
+    cache = VectorLRU(max_items=2)
+    a, b, c = (content_key("hash", "m", t) for t in ("a", "b", "c"))
+    cache.put(a, [1.0])
+    cache.put(b, [2.0])
+    assert cache.get(a) == [1.0]          # a is now most recent
+    cache.put(c, [3.0])                   # evicts b
+    assert cache.get(b) is None
+    got = cache.get(a)
+    got.append(9.0)
+    assert cache.get(a) == [1.0]
+    stats = cache.stats()
+    assert stats["size"] == 2 and stats["hits"] == 3 and stats["misses"] == 1
+
+
+def test_content_key_separates_provider_and_model():
+    assert content_key("ollama", "x", "hi") != content_key("st", "x", "hi")
+    assert content_key("ollama", "x", "hi") != content_key("ollama", "y", "hi")
+    assert content_key("ollama", "x", "hi") == content_key("ollama", "x", "hi")
+
+
+def test_concurrent_submits_are_coalesced_per_provider():
+    calls = []
+
+    async def flush(provider, model, texts):
+        calls.append((provider, model, list(texts)))
+        return [[float(len(t))] for t in texts]
+
+    async def run():
+        batcher = MicroBatcher(flush, max_batch=16, window_s=0.01)
+        results = await asyncio.gather(
+            batcher.submit("ollama", "nomic", "a"),
+            batcher.submit("ollama", "nomic", "bb"),
+            batcher.submit("st", "mini", "ccc"),
+            batcher.submit("ollama", "nomic", "dddd"),
+        )
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+    assert results == [[1.0], [2.0], [3.0], [4.0]]
+    assert sorted((p, len(t)) for p, _, t in calls) == [("ollama", 3), ("st", 1)]
+    assert batcher.stats()["batches"] == 2
+
+
+def test_full_batch_flushes_without_waiting_for_window():
+    sizes = []
+
+    async def flush(provider, model, texts):
+        sizes.append(len(texts))
+        return [[0.0] for _ in texts]
+
+    async def run():
+        batcher = MicroBatcher(flush, max_batch=2, window_s=60.0)
+        await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit("st", "m", str(i)) for i in range(4))),
+            timeout=1.0,
+        )
+
+    asyncio.run(run())
+    assert sizes == [2, 2]
+
+
+def test_batch_failure_reaches_every_waiter():
+    async def flush(provider, model, texts):
+        raise RuntimeError("upstream down")
+
+    async def run():
+        batcher = MicroBatcher(flush, window_s=0.0)
+        return await asyncio.gather(
+            batcher.submit("ollama", "m", "a"),
+            batcher.submit("ollama", "m", "b"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
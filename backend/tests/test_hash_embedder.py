@@ -0,0 +1,44 @@
+"""Tests for the vectorised feature-hash embedder (atlas-hash-v1)."""
+import random
+import string
+
+import numpy as np
+import pytest
+
+from services import hash_embedder as he
+
+
+def _random_text(rng, n):
+    alphabet = string.ascii_letters + string.digits + "    ,.-_éß漢😀"
+    return "".join(rng.choice(alphabet) for _ in range(n))
+
+
+@pytest.mark.parametrize("n_chars", [0, 1, 2, 3, 40, 255, 256, 2_000, 8_000])
+def test_bit_identical_to_reference(n_chars):
+    rng = random.Random(n_chars)
+    for _ in range(5):
+        text = _random_text(rng, n_chars)
+        assert he.embed_list(text) == he.embed_reference(text)
+
+
+def test_identical_with_cold_and_warm_cache():
+    text = "Servo torque envelope exceeded on POSEIDON-BUOY " * 20
+    he.clear_cache()
+    cold = he.embed_list(text)
+    warm = he.embed_list(text)
+    assert cold == warm == he.embed_reference(text)
+    assert he.cache_info()["trigrams"] > 0
+
+
+def test_embed_many_matches_single_calls():
+    texts = ["battery voltage low", "", "lidar spin fault " * 40]
+    out = he.embed_many(texts)
+    assert out.shape == (3, he.EMBED_DIM)
+    for row, text in zip(out, texts):
+        assert row.tolist() == he.embed_reference(text)
+    assert not np.any(out[1])
+
+
+def test_vectors_are_unit_length():
+    vec = he.embed("memory reinforcement freshness decay")
+    assert float(np.linalg.norm(vec)) == pytest.approx(1.0)
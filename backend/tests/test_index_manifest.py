@@ -0,0 +1,55 @@
+"""Tests for the declarative index manifest (no Mongo server required)."""
+import asyncio
+
+from services import index_manifest as im
+
+
+def test_bootstrap_isolates_a_failing_index(monkeypatch, fake_collection):
+    cols = {
+        "graph_triples": fake_collection(failing_indexes={"edge_unique"}),
+        "memory_bank": fake_collection(),
+    }
+    monkeypatch.setattr(im.mongo, "collection", lambda name, **kw: cols[name])
+
+    report = asyncio.run(im.bootstrap(["graph_triples", "memory_bank"]))
+
+    assert report["errors"] == 1
+    graph = report["collections"]["graph_triples"]
+    assert graph["errors"][0]["index"] == "edge_unique"
+    assert "from_node_weight" in graph["ensured"]
+    assert cols["memory_bank"].indexes == [m.document["name"] for m in im.MANIFEST["memory_bank"]]
+
+
+def test_manifest_index_names_are_unique_per_collection():
+    for name, models in im.MANIFEST.items():
+        names = [m.document["name"] for m in models]
+        assert len(names) == len(set(names)), name
+
+
+class _FakeDb:
+    def __init__(self, indexed):
+        self.indexed = indexed
+        self.calls = []
+
+    async def command(self, name, cmd, verbosity=None):
+        self.calls.append(cmd)
+        if cmd["find"] in self.indexed:
+            plan = {"stage": "LIMIT", "inputStage": {"stage": "FETCH",
+                    "inputStage": {"stage": "IXSCAN"}}}
+        else:
+            plan = {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}
+        return {"queryPlanner": {"winningPlan": plan}}
+
+
+def test_explain_report_flags_collscans(monkeypatch):
+    db = _FakeDb(indexed={"memory_bank", "graph_triples"})
+    monkeypatch.setattr(im.mongo, "db", lambda name=None: db)
+
+    report = asyncio.run(im.explain_report())
+
+    assert report["probes"] == len(im.PROBES)
+    assert "persona_chat._recent_turns" in report["collscans"]
+    assert not any(q.startswith("memory_bank.") for q in report["collscans"])
+    neighborhood = next(r for r in report["results"] if r["query"] == "memory_bank.neighborhood")
+    assert neighborhood["stages"] == ["LIMIT", "FETCH", "IXSCAN"]
+    assert db.calls[0]["sort"] == {"last_referenced": -1}
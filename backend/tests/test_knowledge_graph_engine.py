@@ -0,0 +1,154 @@
+"""Tests for the knowledge graph engine's adjacency indexes and traversals."""
+import asyncio
+import random
+
+import pytest
+
+from services import knowledge_graph_engine as kg
+
+
+def setup_function():
+    kg.reset_in_memory_state()
+
+
+def _chain(*labels):
+    return [kg.create_node(label=label, node_id=label)["node_id"] for label in labels]
+
+
+def _edge(src, dst, weight=1.0, edge_type="related_to", **kw):
+    return kg.create_edge(source_node_id=src, target_node_id=dst,
+                          edge_type=edge_type, weight=weight, **kw)
+
+
+def _random_graph(seed=7, nodes=60, edges=400):
+    rng = random.Random(seed)
+    ids = _chain(*[f"n{i}" for i in range(nodes)])
+    types = sorted(kg.VALID_EDGE_TYPES)
+    for i in range(edges):
+        e = _edge(rng.choice(ids), rng.choice(ids), rng.random(), rng.choice(types))
+        # Coarse timestamps so ties exercise the stable ordering.
+        e["updated_at"] = e["created_at"] = f"2026-01-01T00:00:{i % 17:02d}"
+    # Rebuild the ordered views from the patched timestamps.
+    edges_now = list(kg._EDGES.values())
+    kg._clear_indexes()
+    for e in edges_now:
+        kg._index_edge(e)
+    return ids
+
+
+def test_indexed_views_match_the_linear_scans():
+    ids = _random_graph()
+
+    def scan(node_id=None, edge_type=None):
+        edges = list(kg._EDGES.values())
+        if node_id:
+            edges = [e for e in edges if node_id in (e["source_node_id"], e["target_node_id"])]
+        if edge_type:
+            edges = [e for e in edges if e["edge_type"] == edge_type]
+        return sorted(edges, key=lambda e: e["updated_at"], reverse=True)
+
+    for node_id in (None, *ids[:10]):
+        for edge_type in (None, "supports", "cites"):
+            assert kg.list_edges(node_id=node_id, edge_type=edge_type) == scan(node_id, edge_type)
+
+
+def test_neighborhood_matches_the_frontier_scan():
+    ids = _random_graph(edges=120)
+
+    def scan(node_id, depth):
+        seen, frontier, found = {node_id}, {node_id}, {}
+        for _ in range(depth):
+            nxt = set()
+            for e in kg._EDGES.values():
+                s, t = e["source_node_id"], e["target_node_id"]
+                if s in frontier or t in frontier:
+                    found[e["edge_id"]] = e
+                    nxt |= {s, t} - seen
+                    seen |= {s, t}
+            frontier = nxt
+        return seen, list(found.values())
+
+    for node_id in ids[:8]:
+        for depth in (1, 2, 3):
+            hood = kg.neighborhood(node_id, depth=depth)
+            nodes, edges = scan(node_id, depth)
+            assert {n["node_id"] for n in hood["nodes"]} == nodes
+            assert hood["edges"] == edges
+
+
+def test_recreated_edge_id_is_reindexed():
+    a, b, c = _chain("a", "b", "c")
+    e = _edge(a, b, edge_id="e1")
+    _edge(a, c, edge_type="supports", edge_id="e1")
+    assert kg.list_edges(node_id=b) == []
+    assert [x["edge_type"] for x in kg.list_edges(node_id=a)] == ["supports"]
+    assert kg.list_edges(edge_type="related_to") == []
+    assert e["edge_id"] == "e1" and len(kg._ORDER_ALL) == 1
+
+
+def test_k_hop_ranks_by_path_strength():
+    a, b, c, d = _chain("a", "b", "c", "d")
+    _edge(a, b, 0.9)
+    _edge(b, c, 0.9)
+    _edge(a, c, 0.3)
+    _edge(c, d, 0.5, edge_type="supports")
+
+    out = kg.k_hop(a, 2)
+    # c is reached more strongly through b than directly; d only through
+    # the weak direct a→c link within two hops.
+    assert [(n["node_id"], n["hops"]) for n in out["nodes"]] == [("b", 1), ("c", 2), ("d", 2)]
+    assert [n["strength"] for n in out["nodes"]] == pytest.approx([0.9, 0.81, 0.15])
+
+    only_related = kg.k_hop(a, 3, edge_types=["related_to"])
+    assert "d" not in {n["node_id"] for n in only_related["nodes"]}
+    assert kg.k_hop(c, 1, direction="in", min_weight=0.5)["nodes"][0]["node_id"] == "b"
+    with pytest.raises(kg.KnowledgeGraphError):
+        kg.k_hop(a, 2, direction="sideways")
+
+
+def test_shortest_path_hops_and_strength():
+    a, b, c, d = _chain("a", "b", "c", "d")
+    _edge(a, b, 0.9)
+    _edge(b, c, 0.9)
+    _edge(a, c, 0.2)
+    fewest = kg.shortest_path(a, c)
+    strongest = kg.shortest_path(a, c, weighted=True)
+    assert [n["node_id"] for n in fewest["nodes"]] == ["a", "c"] and fewest["hops"] == 1
+    assert [n["node_id"] for n in strongest["nodes"]] == ["a", "b", "c"]
+    assert strongest["strength"] == pytest.approx(0.81)
+    assert kg.shortest_path(c, a, direction="out")["found"] is False
+    assert kg.shortest_path(a, d)["found"] is False
+    assert kg.shortest_path(a, a)["hops"] == 0
+
+
+def test_subgraph_is_induced_and_can_expand():
+    a, b, c, d = _chain("a", "b", "c", "d")
+    _edge(a, b)
+    _edge(b, c)
+    _edge(c, d)
+    _edge(d, d)
+    sub = kg.subgraph([a, b, "ghost"])
+    assert [e["target_node_id"] for e in sub["edges"]] == ["b"]
+    assert sub["missing"] == ["ghost"]
+    grown = kg.subgraph([c], expand=1)
+    assert {n["node_id"] for n in grown["nodes"]} == {"b", "c", "d"}
+    assert len(grown["edges"]) == 3
+
+
+def test_hydrate_rebuilds_indexes(fake_collection):
+    nodes = [{"node_id": n, "label": n, "node_type": "concept"} for n in ("x", "y")]
+    edges = [{"edge_id": "e", "source_node_id": "x", "target_node_id": "y",
+              "edge_type": "cites", "weight": 0.4, "updated_at": "2026-01-01"}]
+
+    class _DB:
+        knowledge_graph_nodes = fake_collection(nodes)
+        knowledge_graph_edges = fake_collection(edges)
+
+    _chain("stale")
+    kg.attach_mongo(_DB())
+    try:
+        asyncio.run(kg.hydrate_from_mongo())
+    finally:
+        kg.attach_mongo(None)
+    assert [e["edge_id"] for e in kg.list_edges(node_id="y", edge_type="cites")] == ["e"]
+    assert kg.shortest_path("x", "y")["hops"] == 1
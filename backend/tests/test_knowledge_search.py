@@ -0,0 +1,93 @@
+"""Tests for the Knowledge Bank BM25 index (no Mongo server required)."""
+import asyncio
+
+import pytest
+
+from services import knowledge_ingestion as ki
+from services import knowledge_search as ks
+
+
+def _rec(rid, title="", summary="", tags=(), agents=(), updated_at="2026-01-01", **kw):
+    return {
+        "id": rid, "title": title, "summary": summary, "tags": list(tags),
+        "related_agents": list(agents), "updated_at": updated_at,
+        "source_type": kw.get("source_type", "web"),
+        "concepts": kw.get("concepts", []), "key_points": kw.get("key_points", []),
+        "related_projects": kw.get("related_projects", []),
+    }
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index():
+    ks.reset_in_memory_state()
+    yield
+    ks.reset_in_memory_state()
+
+
+def test_title_match_outranks_summary_match():
+    ks.upsert(_rec("a", title="General notes", summary="a short aside on actuators"))
+    ks.upsert(_rec("b", title="Actuator design", summary="general notes"))
+    ranked = [rid for rid, _ in ks.search("actuator")]
+    assert ranked == ["b", "a"]
+
+
+def test_multi_term_query_prefers_records_matching_more_terms():
+    ks.upsert(_rec("a", title="Battery chemistry"))
+    ks.upsert(_rec("b", title="Thermal runaway"))
+    ks.upsert(_rec("c", title="Battery thermal runaway"))
+    assert ks.search("battery thermal")[0][0] == "c"
+
+
+def test_unknown_term_expands_to_indexed_prefixes():
+    ks.upsert(_rec("a", title="Robotics primer"))
+    ks.upsert(_rec("b", title="Botany primer"))
+    assert [rid for rid, _ in ks.search("robot")] == ["a"]
+    # Short fragments don't expand — too noisy.
+    assert ks.search("ro") == []
+
+
+def test_filters_apply_inside_the_index_and_boost_reorders():
+    ks.upsert(_rec("a", title="Sensor fusion", agents=["ajani"], tags=["robotics"]))
+    ks.upsert(_rec("b", title="Sensor fusion sensor", agents=["minerva"], tags=["biology"]))
+    assert [rid for rid, _ in ks.search("sensor")] == ["b", "a"]
+    assert [rid for rid, _ in ks.search("sensor", agent="ajani")] == ["a"]
+    assert [rid for rid, _ in ks.search("sensor", tag="biology")] == ["b"]
+    boosted = [rid for rid, _ in ks.search("sensor", boost_agent="ajani")]
+    assert boosted == ["a", "b"]
+
+
+def test_upsert_replaces_and_remove_drops_postings():
+    ks.upsert(_rec("a", title="Hydraulic press"))
+    ks.upsert(_rec("a", title="Pneumatic press"))
+    assert ks.search("hydraulic") == []
+    assert ks.search("pneumatic")[0][0] == "a"
+    assert ks.remove("a") is True
+    assert ks.stats()["records"] == 0
+    assert ks.stats()["terms"] == 0
+
+
+def test_sync_picks_up_rows_written_elsewhere(fake_collection):
+    col = fake_collection([_rec("a", title="Lidar mapping", updated_at="2026-01-01")])
+    asyncio.run(ks.hydrate(col))
+    col.docs.append(_rec("b", title="Lidar calibration", updated_at="2026-02-01"))
+    assert asyncio.run(ks.sync(col, force=True)) == 2   # $gte re-reads the watermark row
+    assert {rid for rid, _ in ks.search("lidar")} == {"a", "b"}
+    assert ks.stats()["watermark"] == "2026-02-01"
+
+
+def test_ingestion_search_fetches_hits_in_one_query_and_drops_stale_ids(monkeypatch, fake_collection):
+    col = fake_collection([
+        _rec("a", title="Gear reduction", agents=["ajani"]),
+        _rec("b", title="Gear train backlash"),
+    ])
+    monkeypatch.setattr(ki, "_records", lambda: col)
+    asyncio.run(ki.hydrate_search_index())
+    col.docs = [d for d in col.docs if d["id"] != "b"]   # deleted by another worker
+    col.queries.clear()
+
+    out = asyncio.run(ki.search(q="gear backlash", limit=5))
+
+    assert [d["id"] for d in out] == ["a"]
+    assert "search_score" in out[0]
+    assert [q for q in col.queries if "id" in q] == [{"id": {"$in": ["b", "a"]}}]
+    assert ks.search("backlash") == []
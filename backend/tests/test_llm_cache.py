@@ -0,0 +1,163 @@
+"""Tests for the opt-in LLM response cache behind llm_provider.send."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import llm_cache
+from services import llm_provider as llmp
+
+
+class _Collection:
+    """Just enough of a Motor collection for the cache's Mongo tier."""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, filt, projection=None):
+        doc = self.docs.get(filt["key"])
+        if doc is None or doc["expires_at"] <= filt["expires_at"]["$gt"].replace(tzinfo=None):
+            return None
+        return dict(doc)
+
+    async def update_one(self, filt, update, upsert=False):
+        # Store naive UTC, as motor hands it back.
+        doc = dict(update["$set"])
+        doc["expires_at"] = doc["expires_at"].replace(tzinfo=None)
+        self.docs[filt["key"]] = doc
+
+    async def delete_many(self, filt):
+        class _Res:
+            deleted_count = 0
+        res = _Res()
+        for key in [k for k, d in self.docs.items()
+                    if all(d.get(f) == v for f, v in filt.items())]:
+            del self.docs[key]
+            res.deleted_count += 1
+        return res
+
+    def find(self, filt, projection=None):
+        docs = [d for d in self.docs.values() if all(d.get(f) == v for f, v in filt.items())]
+
+        async def gen():
+            for d in docs:
+                yield d
+        return gen()
+
+
+@pytest.fixture
+def env(monkeypatch):
+    llm_cache.reset_in_memory_state()
+    col = _Collection()
+    calls = []
+
+    async def model(persona):
+        return "emergent", "gpt-5.2"
+
+    async def emergent(system_msg, user_text, model, session_id):
+        calls.append(user_text)
+        return f"answer to {user_text}"
+
+    monkeypatch.setattr(llm_cache, "_col", lambda: col)
+    monkeypatch.setattr(llm_cache, "ENABLED", True)
+    monkeypatch.setattr(llmp, "get_persona_model", model)
+    monkeypatch.setattr(llmp, "_send_emergent", emergent)
+    yield col, calls
+    llm_cache.reset_in_memory_state()
+
+
+def test_exact_hit_skips_the_provider_and_counts_savings(env):
+    col, calls = env
+
+    async def go():
+        first = await llmp.send("minerva", "sys", "what changed?", cache="ww")
+        second = await llmp.send("minerva", "sys", "what changed?", cache="ww")
+        return first, second
+
+    first, second = asyncio.run(go())
+    assert calls == ["what changed?"]
+    assert first["cache_hit"] is None and second["cache_hit"] == "exact"
+    assert second["text"] == first["text"] and second["provider_used"] == "emergent"
+    assert len(col.docs) == 1
+    ns = llm_cache.stats()["namespaces"]["ww"]
+    assert ns["exact_hits"] == 1 and ns["misses"] == 1 and ns["hit_rate"] == 0.5
+    assert ns["saved_tokens_est"] > 0
+
+
+def test_uncached_callers_are_untouched(env):
+    col, calls = env
+
+    async def go():
+        await llmp.send("minerva", "sys", "hi")
+        return await llmp.send("minerva", "sys", "hi")
+
+    out = asyncio.run(go())
+    assert calls == ["hi", "hi"] and "cache_hit" not in out and not col.docs
+
+
+def test_store_tier_survives_a_process_restart(env):
+    col, calls = env
+    asyncio.run(llmp.send("ajani", "sys", "distil this", cache="kd"))
+    llm_cache.reset_in_memory_state()              # simulated restart
+    out = asyncio.run(llmp.send("ajani", "sys", "distil this", cache="kd"))
+    assert calls == ["distil this"] and out["cache_hit"] == "store"
+
+    # Expired rows are ignored.
+    for doc in col.docs.values():
+        doc["expires_at"] = datetime.utcnow() - timedelta(seconds=1)
+    llm_cache.reset_in_memory_state()
+    asyncio.run(llmp.send("ajani", "sys", "distil this", cache="kd"))
+    assert len(calls) == 2
+
+
+def test_semantic_tier_is_opt_in_and_partitioned(env):
+    _, calls = env
+    a = "SUMMARY: New solid-state battery doubles energy density in lab cells."
+    b = "SUMMARY:  new solid-state battery doubles energy density in lab cells!"
+
+    async def go():
+        await llmp.send("minerva", "sys", a, cache="ww", cache_semantic=True)
+        near = await llmp.send("minerva", "sys", b, cache="ww", cache_semantic=True)
+        other_system = await llmp.send("minerva", "other", b, cache="ww", cache_semantic=True)
+        exact_only = await llmp.send("minerva", "sys", b, cache="lessons")
+        return near, other_system, exact_only
+
+    near, other_system, exact_only = asyncio.run(go())
+    assert near["cache_hit"] == "semantic" and near["text"] == f"answer to {a}"
+    assert other_system["cache_hit"] is None and exact_only["cache_hit"] is None
+    assert calls == [a, b, b]
+
+
+def test_fallback_answers_are_not_cached(env, monkeypatch):
+    _, calls = env
+
+    async def local(persona):
+        return "ollama", "llama3"
+
+    async def down(system_msg, user_text, model):
+        raise llmp.OllamaUnreachable("refused")
+
+    monkeypatch.setattr(llmp, "get_persona_model", local)
+    monkeypatch.setattr(llmp, "_send_ollama", down)
+
+    async def go():
+        await llmp.send("hermes", "sys", "q", cache="twin")
+        return await llmp.send("hermes", "sys", "q", cache="twin")
+
+    out = asyncio.run(go())
+    assert calls == ["q", "q"] and out["fallback_reason"]
+    assert llm_cache.stats()["namespaces"]["twin"]["stores"] == 0
+
+
+def test_clear_drops_one_namespace(env):
+    col, _ = env
+
+    async def go():
+        await llmp.send("minerva", "sys", "one", cache="a")
+        await llmp.send("minerva", "sys", "two", cache="b")
+        return await llm_cache.clear("a")
+
+    out = asyncio.run(go())
+    assert out == {"namespace": "a", "memory_dropped": 1, "store_dropped": 1}
+    assert [d["namespace"] for d in col.docs.values()] == ["b"]
+    assert llm_cache.stats()["cached"] == 1
@@ -0,0 +1,204 @@
+"""Tests for priority admission control in front of the LLM providers."""
+import asyncio
+
+import pytest
+
+from services import llm_provider as llmp
+from services import llm_scheduler as sched
+
+
+@pytest.fixture(autouse=True)
+def fresh_gates(monkeypatch):
+    sched.reset_in_memory_state()
+    monkeypatch.setattr(sched, "ENABLED", True)
+    yield
+    sched.reset_in_memory_state()
+
+
+def _limit(monkeypatch, provider, n):
+    monkeypatch.setenv(f"LLM_CONCURRENCY_{provider.upper()}", str(n))
+
+
+async def _hold(provider, model, order, label, release, **kw):
+    async with sched.admit(provider, model, tokens=10, **kw) as grant:
+        order.append(label)
+        await release.wait()
+        return grant
+
+
+def test_interactive_jumps_queued_batch_work(monkeypatch):
+    _limit(monkeypatch, "emergent", 1)
+    order = []
+
+    async def go():
+        release = asyncio.Event()
+        blocker = asyncio.create_task(_hold("emergent", "m", order, "first", release))
+        await asyncio.sleep(0)
+        with sched.priority("batch", caller="research"):
+            batch = [asyncio.create_task(_hold("emergent", "m", order, f"batch{i}", release))
+                     for i in range(2)]
+        await asyncio.sleep(0)
+        chat = asyncio.create_task(
+            _hold("emergent", "m", order, "chat", release, priority="interactive"))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(blocker, chat, *batch)
+
+    asyncio.run(go())
+    assert order == ["first", "chat", "batch0", "batch1"]
+    stats = sched.stats()["providers"]["emergent"]
+    assert stats["admitted"] == {"interactive": 2, "autonomic": 0, "batch": 2}
+
+
+def test_round_robin_between_callers_within_a_class(monkeypatch):
+    _limit(monkeypatch, "emergent", 1)
+    order = []
+
+    async def go():
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold("emergent", "m", order, "first", release))]
+        await asyncio.sleep(0)
+        for label, caller in (("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b")):
+            tasks.append(asyncio.create_task(
+                _hold("emergent", "m", order, label, release, priority="batch", caller=caller)))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(go())
+    assert order == ["first", "a1", "b1", "a2", "a3"]
+
+
+def test_full_queue_pushes_back(monkeypatch):
+    _limit(monkeypatch, "emergent", 1)
+    monkeypatch.setenv("LLM_QUEUE_MAX_BATCH", "1")
+
+    async def go():
+        release = asyncio.Event()
+        order = []
+        held = asyncio.create_task(_hold("emergent", "m", order, "x", release))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(_hold("emergent", "m", order, "y", release, priority="batch"))
+        await asyncio.sleep(0)
+        with pytest.raises(sched.LLMBackpressure):
+            async with sched.admit("emergent", "m", tokens=10, priority="batch"):
+                pass
+        release.set()
+        await asyncio.gather(held, queued)
+
+    asyncio.run(go())
+    assert sched.stats()["providers"]["emergent"]["rejected"]["batch"] == 1
+
+
+def test_token_budget_delays_admission(monkeypatch):
+    # 6000 tokens/min = 100/s: a second 50-token call waits ~0.5 s.
+    monkeypatch.setenv("LLM_TPM_EMERGENT", "6000")
+    monkeypatch.setattr(sched, "_spill_target", lambda provider: None)
+    loop_time = {}
+
+    async def go():
+        async with sched.admit("emergent", "m", tokens=6000):
+            pass
+        t0 = asyncio.get_running_loop().time()
+        async with sched.admit("emergent", "m", tokens=50) as grant:
+            loop_time["waited"] = asyncio.get_running_loop().time() - t0
+        return grant
+
+    grant = asyncio.run(go())
+    assert 0.3 < loop_time["waited"] < 2.0
+    assert grant.waited_ms > 300
+
+
+def test_backed_up_local_provider_spills_to_emergent(monkeypatch):
+    _limit(monkeypatch, "ollama", 1)
+    monkeypatch.setattr(sched, "SPILL_AFTER", 1)
+    calls = []
+
+    async def local_model(persona):
+        return "ollama", "llama3"
+
+    async def slow_ollama(system_msg, user_text, model):
+        calls.append(("ollama", user_text))
+        await asyncio.sleep(0.05)
+        return "local"
+
+    async def emergent(system_msg, user_text, model, session_id):
+        calls.append(("emergent", user_text))
+        return "cloud"
+
+    monkeypatch.setattr(llmp, "get_persona_model", local_model)
+    monkeypatch.setattr(llmp, "_send_ollama", slow_ollama)
+    monkeypatch.setattr(llmp, "_send_emergent", emergent)
+
+    async def go():
+        return await asyncio.gather(*[
+            llmp.send("ajani", "sys", f"q{i}", priority="batch") for i in range(3)
+        ])
+
+    results = asyncio.run(go())
+    assert [r["provider_used"] for r in results] == ["ollama", "ollama", "emergent"]
+    assert results[2]["fallback_reason"] == "spilled: ollama backlog"
+    stats = sched.stats()["providers"]
+    assert stats["ollama"]["spilled_out"] == 1 and stats["emergent"]["spilled_in"] == 1
+
+
+def test_fallback_releases_the_local_slot_and_is_admitted_on_emergent(monkeypatch):
+    seen = []
+
+    async def local_model(persona):
+        return "ollama", "llama3"
+
+    async def down(system_msg, user_text, model):
+        raise llmp.OllamaUnreachable("connection refused")
+
+    async def emergent(system_msg, user_text, model, session_id):
+        gates = sched.stats()["providers"]
+        seen.append((gates["ollama"]["in_flight"], gates["emergent"]["in_flight"]))
+        return "cloud" if not session_id.endswith("-retry") else "retry"
+
+    async def down_stream(system_msg, user_text, model):
+        yield "partial"
+        raise llmp.OllamaError("model crashed")
+
+    monkeypatch.setattr(llmp, "get_persona_model", local_model)
+    monkeypatch.setattr(llmp, "_send_ollama", down)
+    monkeypatch.setattr(llmp, "_stream_ollama", down_stream)
+    monkeypatch.setattr(llmp, "_send_emergent", emergent)
+
+    out = asyncio.run(llmp.send("ajani", "sys", "q"))
+    assert out["provider_used"] == "emergent" and out["text"] == "cloud"
+
+    async def drain():
+        return [e async for e in llmp.stream("ajani", "sys", "q")]
+    events = asyncio.run(drain())
+    assert [e["type"] for e in events] == ["delta", "reset", "delta", "done"]
+    assert events[-1]["provider_used"] == "emergent"
+
+    assert seen == [(0, 1), (0, 1)]               # local slot freed, emergent slot held
+    gates = sched.stats()["providers"]
+    assert sum(gates["emergent"]["admitted"].values()) == 2
+    assert gates["emergent"]["tokens_charged"] == 2 * sched.count_tokens("sys", "q", "cloud")
+    assert gates["ollama"]["tokens_charged"] == (
+        sched.count_tokens("sys", "q") + sched.count_tokens("sys", "q", "partial"))
+
+    async def empty(system_msg, user_text, model):
+        return ""
+    monkeypatch.setattr(llmp, "_send_ollama", empty)
+    out = asyncio.run(llmp.send("ajani", "sys", "q"))
+    assert out["text"] == "retry" and out["fallback_reason"] == "empty_response_retry"
+    assert seen[-1] == (0, 1)
+    assert sum(sched.stats()["providers"]["emergent"]["admitted"].values()) == 3
+
+
+def test_decorator_sets_ambient_priority_for_nested_tasks():
+    seen = []
+
+    @sched.with_priority("autonomic", caller="sentinel_watcher")
+    async def job():
+        async def inner():
+            seen.append(sched.current())
+        await asyncio.gather(inner(), inner())
+
+    asyncio.run(job())
+    assert seen == [("autonomic", "sentinel_watcher")] * 2
+    assert sched.current() == (sched.DEFAULT_PRIORITY, None)
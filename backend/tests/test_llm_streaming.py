@@ -0,0 +1,145 @@
+"""Tests for token streaming in llm_provider and the persona chat streams."""
+import asyncio
+
+import httpx
+import pytest
+
+from models.persona_models import ChatRequest, ChatSession
+from services import context_retrieval as cr
+from services import llm_provider as llmp
+from services import persona_chat as pc
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    llmp.provider_clients.reset_in_memory_state()
+    yield
+    llmp.provider_clients.reset_in_memory_state()
+
+
+def _collect(agen):
+    async def go():
+        return [event async for event in agen]
+    return asyncio.run(go())
+
+
+def test_openai_compat_stream_yields_deltas(monkeypatch):
+    sse = (
+        'data: {"choices":[{"delta":{"role":"assistant"}}]}\n\n'
+        'data: {"choices":[{"delta":{"content":"Hel"}}]}\n\n'
+        'data: {"choices":[{"delta":{"content":"lo"}}]}\n\n'
+        "data: [DONE]\n\n"
+    )
+    seen = {}
+
+    def handler(request):
+        seen["body"] = request.content
+        return httpx.Response(200, text=sse, headers={"content-type": "text/event-stream"})
+
+    mock = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(llmp.provider_clients, "client", lambda base_url: mock)
+    chunks = _collect(llmp._stream_ollama("sys", "hi", "llama3"))
+    assert chunks == ["Hel", "lo"]
+    assert b'"stream": true' in seen["body"] or b'"stream":true' in seen["body"]
+
+
+def test_stream_resets_and_falls_back_when_local_provider_dies(monkeypatch):
+    async def local_model(persona):
+        return "ollama", "llama3"
+
+    async def dying(system_msg, user_text, model):
+        yield "partial "
+        raise llmp.OllamaUnreachable("connection reset")
+
+    async def emergent(system_msg, user_text, model, session_id):
+        return "full answer"
+
+    monkeypatch.setattr(llmp, "get_persona_model", local_model)
+    monkeypatch.setattr(llmp, "_stream_ollama", dying)
+    monkeypatch.setattr(llmp, "_send_emergent", emergent)
+
+    events = _collect(llmp.stream("ajani", "sys", "hi"))
+    assert [e["type"] for e in events] == ["delta", "reset", "delta", "done"]
+    done = events[-1]
+    assert done["text"] == "full answer"
+    assert done["provider_used"] == "emergent"
+    assert "connection reset" in done["fallback_reason"]
+
+
+@pytest.fixture
+def council_env(monkeypatch):
+    stored = []
+
+    async def fake_session(persona, session_id, project_id, seed):
+        return ChatSession(persona=persona, title=seed[:20])
+
+    class _Messages:
+        async def insert_one(self, doc):
+            stored.append(doc)
+
+    async def noop(*a, **kw):
+        return None
+
+    async def fake_contexts(query, personas, **kw):
+        return {p: cr.fuse(query, p, [], [], memory_top_k=3, knowledge_top_k=3) for p in personas}
+
+    monkeypatch.setattr(pc, "_get_or_create_session", fake_session)
+    monkeypatch.setattr(pc, "_messages", lambda: _Messages())
+    monkeypatch.setattr(pc, "_touch_session", noop)
+    monkeypatch.setattr(pc.mb, "auto_store", noop)
+    monkeypatch.setattr(pc.retrieval, "retrieve_many", fake_contexts)
+    return stored
+
+
+def test_council_stream_interleaves_voices_then_synthesises(monkeypatch, council_env):
+    async def fake_stream(persona, system_msg, user_text, **kw):
+        for i in range(2):
+            yield {"type": "delta", "text": f"{persona}{i} "}
+            await asyncio.sleep(0)
+        yield {"type": "done", "text": f"{persona} says", "provider_used": "emergent",
+               "model_used": "gpt-5.2", "fallback_reason": None}
+
+    monkeypatch.setattr(pc.llmp, "stream", fake_stream)
+    events = _collect(pc.chat_stream_any("council", ChatRequest(message="Should we ship?")))
+
+    types = [e["type"] for e in events]
+    assert types[0] == "session" and types[-1] == "done"
+    voice_deltas = [e["persona"] for e in events if e["type"] == "delta" and e["persona"] != "council"]
+    # Sub-voices stream concurrently, so their tokens interleave.
+    assert voice_deltas[:3] == ["ajani", "minerva", "hermes"]
+    last_voice_done = max(i for i, t in enumerate(types) if t == "voice_done")
+    first_synth = next(i for i, e in enumerate(events)
+                       if e["type"] == "delta" and e["persona"] == "council")
+    assert first_synth > last_voice_done
+    resp = events[-1]["response"]
+    assert resp["reply"] == "council says"
+    assert [v["persona"] for v in resp["council_voices"]] == ["ajani", "minerva", "hermes"]
+    assert [d["role"] for d in council_env] == ["user", "assistant"]
+
+
+def test_single_persona_stream_persists_final_turn(monkeypatch, council_env):
+    async def fake_recent(session_id, limit=6):
+        return []
+
+    async def fake_retrieve(query, persona, **kw):
+        return cr.fuse(query, persona, [], [], memory_top_k=3, knowledge_top_k=3)
+
+    async def fake_stream(persona, system_msg, user_text, **kw):
+        yield {"type": "delta", "text": "Torque "}
+        yield {"type": "delta", "text": "first."}
+        yield {"type": "done", "text": "Torque first.", "provider_used": "ollama",
+               "model_used": "llama3", "fallback_reason": None}
+
+    monkeypatch.setattr(pc, "_recent_turns", fake_recent)
+    monkeypatch.setattr(pc.retrieval, "retrieve", fake_retrieve)
+    monkeypatch.setattr(pc.llmp, "stream", fake_stream)
+
+    events = _collect(pc.chat_stream_any("Ajani", ChatRequest(message="What fails first?")))
+    assert "".join(e["text"] for e in events if e["type"] == "delta") == "Torque first."
+    assert events[-1]["response"]["reply"] == "Torque first."
+    assert council_env[-1]["content"] == "Torque first."
+
+
+def test_stream_dispatcher_rejects_unknown_persona():
+    with pytest.raises(ValueError):
+        pc.chat_stream_any("zeus", ChatRequest(message="hi"))
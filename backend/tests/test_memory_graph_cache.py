@@ -0,0 +1,102 @@
+"""Tests for the graph-memory adjacency cache and bulk triple writes."""
+import asyncio
+import random
+
+import pytest
+
+from services import memory_bank as mb
+
+
+@pytest.fixture
+def graph(monkeypatch, fake_collection):
+    col = fake_collection()
+    monkeypatch.setattr(mb, "_graph", lambda: col)
+    mb.reset_graph_cache()
+    yield col
+    mb.reset_graph_cache()
+
+
+def _add(a, b, rel="rel", w=1.0):
+    return asyncio.run(mb.add_triple(from_node=a, to_node=b, relation=rel, weight=w))
+
+
+def _scan(col, node, depth, limit_per_layer, min_weight=0.0):
+    """The pre-cache algorithm: one weight-sorted query per layer."""
+    seen, frontier, edges = {node}, [node], []
+    for _ in range(depth):
+        if not frontier:
+            break
+        nodes = set(frontier)
+        rows = [d for d in col.docs
+                if (d["from_node"] in nodes or d["to_node"] in nodes) and d["weight"] >= min_weight]
+        rows.sort(key=lambda r: -r["weight"])
+        frontier = []
+        for e in rows[:limit_per_layer * len(nodes)]:
+            edges.append(e)
+            for n in (e["from_node"], e["to_node"]):
+                if n not in seen:
+                    seen.add(n)
+                    frontier.append(n)
+    return sorted(seen), {(e["from_node"], e["to_node"], e["relation"]) for e in edges}
+
+
+def test_add_triple_reinforces_in_one_round_trip(graph):
+    _add(" a ", "b", "Uses")
+    doc = _add("a", "b", "uses", 2.0)
+    assert doc["weight"] == 3.0 and doc["hits"] == 2 and doc["relation"] == "uses"
+    assert len(graph.docs) == 1
+
+
+def test_second_neighborhood_is_served_from_cache(graph):
+    for i in range(5):
+        _add("root", f"n{i}", w=float(i + 1))
+    first = asyncio.run(mb.neighborhood("root"))
+    finds = graph.calls.count("find")
+    second = asyncio.run(mb.neighborhood("root"))
+    assert graph.calls.count("find") == finds
+    assert second == first
+    assert mb.graph_cache_stats()["hits"] == 1
+
+
+def test_add_triple_writes_through_cached_lists(graph):
+    _add("root", "x", w=1.0)
+    _add("root", "y", w=2.0)
+    asyncio.run(mb.neighborhood("root"))
+    _add("z", "root", w=5.0)
+    finds = graph.calls.count("find")
+    hood = asyncio.run(mb.neighborhood("root"))
+    assert graph.calls.count("find") == finds
+    assert [e["from_node"] for e in hood["edges"]][0] == "z"
+    assert hood["nodes"] == ["root", "x", "y", "z"]
+
+
+def test_add_triples_coalesces_and_invalidates(graph):
+    _add("p", "q")
+    asyncio.run(mb.neighborhood("p"))
+    out = asyncio.run(mb.add_triples([
+        {"from_node": "p", "to_node": "q", "relation": "rel", "weight": 2.0},
+        {"from_node": "p", "to_node": "q", "relation": "REL ", "source_id": "s2"},
+        {"from_node": "p", "to_node": "r", "relation": "rel"},
+        {"to_node": "missing-from"},
+    ]))
+    assert out == {"requested": 4, "written": 2, "skipped": 1, "upserted": 1, "modified": 1}
+    pq = next(d for d in graph.docs if (d["from_node"], d["to_node"], d["relation"]) == ("p", "q", "rel"))
+    assert pq["weight"] == 4.0 and pq["hits"] == 3 and pq["source_id"] == "s2"
+    assert "p" not in mb._ADJ
+    assert {e["to_node"] for e in asyncio.run(mb.neighborhood("p"))["edges"]} == {"q", "r"}
+
+
+def test_multi_hop_matches_the_per_layer_query(graph):
+    rng = random.Random(3)
+    nodes = [f"n{i}" for i in range(40)]
+    for _ in range(300):
+        a, b = rng.sample(nodes, 2)
+        _add(a, b, rng.choice(["rel", "uses"]), rng.uniform(0.1, 5.0))
+    for node in nodes[:10]:
+        for depth, lpl, mw in ((1, 4, 0.0), (2, 3, 0.0), (3, 2, 1.5), (2, 12, 0.0)):
+            hood = asyncio.run(mb.neighborhood(node, depth=depth, limit_per_layer=lpl,
+                                               min_weight=mw))
+            want_nodes, want_edges = _scan(graph, node, depth, lpl, mw)
+            got_edges = {(e["from_node"], e["to_node"], e["relation"]) for e in hood["edges"]}
+            assert hood["nodes"] == want_nodes and got_edges == want_edges
+    assert mb.graph_cache_stats()["hits"] > 0
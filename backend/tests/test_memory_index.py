@@ -0,0 +1,122 @@
+"""Tests for the Memory Bank in-process vector index."""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from services import memory_index as idx
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    idx.reset_in_memory_state()
+    yield
+    idx.reset_in_memory_state()
+
+
+def _vec(*hot, dim=8):
+    v = [0.0] * dim
+    for i in hot:
+        v[i] = 1.0
+    return v
+
+
+def _doc(memory_id, emb, persona="ajani", category="research", **extra):
+    now = datetime.now(timezone.utc).isoformat()
+    doc = {
+        "id": memory_id,
+        "persona": persona,
+        "category": category,
+        "pinned": False,
+        "freshness": 1.0,
+        "last_referenced": now,
+        "created_at": now,
+        "embedding": emb,
+    }
+    doc.update(extra)
+    return doc
+
+
+def test_search_ranks_by_cosine_and_respects_top_k():
+    idx.upsert(_doc("a", _vec(0)))
+    idx.upsert(_doc("b", _vec(0, 1)))
+    idx.upsert(_doc("c", _vec(2)))
+    hits = idx.search(_vec(0), top_k=2, min_score=0.0)
+    assert [h[0] for h in hits] == ["a", "b"]
+    assert hits[0][1] == pytest.approx(1.0)
+    assert hits[0][3] == pytest.approx(0.85 + 0.15, abs=1e-4)
+
+
+def test_partition_filters_on_persona_and_category():
+    idx.upsert(_doc("a", _vec(0), persona="ajani"))
+    idx.upsert(_doc("m", _vec(0), persona="minerva"))
+    idx.upsert(_doc("h", _vec(0), persona="hermes", category="chat"))
+    assert [h[0] for h in idx.search(_vec(0), persona="minerva", min_score=0.0)] == ["m"]
+    assert [h[0] for h in idx.search(_vec(0), category="chat", min_score=0.0)] == ["h"]
+    assert idx.stats()["partitions"] == 3
+
+
+def test_decay_lowers_stale_rows_unless_pinned():
+    old = (datetime.now(timezone.utc) - timedelta(days=10)).isoformat()
+    idx.upsert(_doc("stale", _vec(0), last_referenced=old))
+    idx.upsert(_doc("pinned", _vec(0), last_referenced=old, pinned=True))
+    hits = {h[0]: h for h in idx.search(_vec(0), min_score=0.0)}
+    assert hits["stale"][2] == pytest.approx(0.5, abs=1e-3)
+    assert hits["pinned"][2] == pytest.approx(1.0)
+    assert hits["pinned"][3] > hits["stale"][3]
+
+
+def test_touch_refreshes_freshness():
+    old = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+    idx.upsert(_doc("a", _vec(0), last_referenced=old, freshness=0.4))
+    assert idx.search(_vec(0), min_score=0.0)[0][2] == pytest.approx(0.05, abs=1e-3)
+    idx.touch("a", freshness=0.6, last_referenced=datetime.now(timezone.utc).isoformat())
+    assert idx.search(_vec(0), min_score=0.0)[0][2] == pytest.approx(0.6, abs=1e-3)
+
+
+def test_remove_swaps_last_row_and_keeps_locations_valid():
+    for i in range(5):
+        idx.upsert(_doc(f"m{i}", _vec(i)))
+    assert idx.remove("m1") is True
+    assert idx.remove("m1") is False
+    for i in (0, 2, 3, 4):
+        assert idx.search(_vec(i), top_k=1, min_score=0.0)[0][0] == f"m{i}"
+    assert idx.stats()["memories"] == 4
+
+
+def test_mismatched_dims_score_zero_cosine():
+    idx.upsert(_doc("wide", _vec(0, dim=16)))
+    idx.upsert(_doc("narrow", _vec(0)))
+    hits = {h[0]: h for h in idx.search(_vec(0), min_score=0.0)}
+    assert hits["wide"][1] == 0.0
+    assert hits["narrow"][1] == pytest.approx(1.0)
+    assert idx.search(_vec(0), min_score=0.30)[0][0] == "narrow"
+    assert len(idx.search(_vec(0), min_score=0.30)) == 1
+
+
+def test_hydrate_streams_collection_and_marks_ready(fake_collection):
+    col = fake_collection([_doc("a", _vec(0)), _doc("b", _vec(1))])
+    counts = asyncio.run(idx.hydrate(col))
+    assert counts["memories"] == 2 and idx.is_hydrated()
+
+    late = _doc("c", _vec(2), created_at="9999-01-01T00:00:00+00:00")
+    col.docs.append(late)
+    assert asyncio.run(idx.sync(col, force=True)) == 1
+    assert idx.search(_vec(2), top_k=1, min_score=0.0)[0][0] == "c"
+
+
+def test_search_over_large_partition_is_fast():
+    rng = np.random.default_rng(7)
+    part = idx._Partition(384)
+    idx._PARTITIONS[("ajani", "research", 384)] = part
+    vecs = rng.standard_normal((100_000, 384)).astype(np.float32)
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    for i in range(vecs.shape[0]):
+        part.add(f"m{i}", vecs[i], False, 1.0, time.time())
+    start = time.perf_counter()
+    hits = idx.search(vecs[123], top_k=10, min_score=0.0)
+    elapsed = time.perf_counter() - start
+    assert hits[0][0] == "m123"
+    assert elapsed < 0.5
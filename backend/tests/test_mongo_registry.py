@@ -0,0 +1,47 @@
+"""Tests for the shared Mongo client registry (no Mongo server required)."""
+import pytest
+
+from services import mongo
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry(monkeypatch):
+    monkeypatch.setenv("MONGO_URL", "mongodb://localhost:27017")
+    mongo.close()
+    yield
+    mongo.close()
+
+
+def test_one_client_shared_across_services():
+    from services import memory_bank, persona_chat, robot, worldwatch
+
+    handles = [memory_bank._db(), persona_chat._db(), robot._db(), worldwatch._db()]
+    clients = {id(h.raw.client) for h in handles}
+    assert len(clients) == 1
+    assert mongo.pool_stats()["connected"] is True
+
+
+def test_collection_handles_are_cached_with_profiles():
+    queue = mongo.db("atlas_test")["research_queue"]
+    assert queue is mongo.collection("research_queue", db_name="atlas_test")
+    assert queue.write_concern.document == {"w": "majority", "j": True}
+    assert mongo.db("atlas_test").research_queue is queue
+
+    plain = mongo.db("atlas_test")["lessons"]
+    assert plain.write_concern.document == {}
+    telemetry = mongo.collection("robot_telemetry", db_name="atlas_test")
+    assert telemetry.write_concern.document == {"w": 1, "j": False}
+
+    analytics = mongo.collection("lessons", profile="analytics", db_name="atlas_test")
+    assert analytics is not plain
+    assert analytics.read_preference.mongos_mode == "secondaryPreferred"
+
+    with pytest.raises(ValueError):
+        mongo.collection("lessons", profile="nope")
+
+
+def test_close_drops_handles():
+    first = mongo.collection("lessons", db_name="atlas_test")
+    mongo.close()
+    assert mongo.pool_stats()["connected"] is False
+    assert mongo.collection("lessons", db_name="atlas_test") is not first
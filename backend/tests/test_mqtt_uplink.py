@@ -0,0 +1,91 @@
+"""Tests for MQTT uplink batching (no broker, no Mongo)."""
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+from services import mqtt_bridge
+from services import robot
+
+
+def _msg(device_id, payload):
+    return SimpleNamespace(topic=f"atlas/devices/{device_id}/telemetry",
+                           payload=json.dumps(payload).encode())
+
+
+def test_uplink_bursts_reach_ingest_as_batches(monkeypatch):
+    batches = []
+    first_started = threading.Event()
+    release = asyncio.Event()
+
+    async def ingest_batch(readings, *, source):
+        batches.append((list(readings), source))
+        if len(batches) == 1:
+            first_started.set()
+            await release.wait()       # later messages pile up behind this one
+        return [None] * len(readings)
+    monkeypatch.setattr(robot, "ingest_telemetry_batch", ingest_batch)
+
+    async def go():
+        loop = asyncio.get_running_loop()
+        mqtt_bridge.set_loop(loop)
+
+        def publish():
+            mqtt_bridge._on_uplink_message(None, None, _msg("dev-0", {"t": 0}))
+            first_started.wait(2)
+            for i in range(1, 6):
+                mqtt_bridge._on_uplink_message(None, None, _msg(f"dev-{i % 2}", {"t": i}))
+            mqtt_bridge._on_uplink_message(None, None, SimpleNamespace(topic="atlas/other", payload=b"{}"))
+
+        await loop.run_in_executor(None, publish)
+        release.set()
+        while mqtt_bridge._uplink_draining:
+            await asyncio.sleep(0.01)
+
+    try:
+        asyncio.run(go())
+    finally:
+        mqtt_bridge.set_loop(None)
+
+    assert [len(b) for b, _ in batches] == [1, 5]
+    assert [p["t"] for b, _ in batches for _, p in b] == list(range(6))
+    assert batches[1][0][0] == ("dev-1", {"t": 1})
+    assert {source for _, source in batches} == {"mqtt"}
+    assert not mqtt_bridge._uplink_pending
+
+
+def test_cancelled_drain_releases_the_flag_and_requeues(monkeypatch):
+    batches = []
+    blocked = asyncio.Event()
+
+    async def ingest_batch(readings, *, source):
+        batches.append(list(readings))
+        if len(batches) == 1:
+            blocked.set()
+            await asyncio.sleep(3600)  # cancelled mid-ingest
+        return [None] * len(readings)
+    monkeypatch.setattr(robot, "ingest_telemetry_batch", ingest_batch)
+
+    async def go():
+        loop = asyncio.get_running_loop()
+        mqtt_bridge.set_loop(loop)
+        drain = loop.create_task(mqtt_bridge._drain_uplink())
+        with mqtt_bridge._uplink_lock:
+            mqtt_bridge._uplink_pending.append(("dev-0", {"t": 0}))
+            mqtt_bridge._uplink_draining = True
+        await blocked.wait()
+        mqtt_bridge._on_uplink_message(None, None, _msg("dev-1", {"t": 1}))
+        drain.cancel()
+        await asyncio.gather(drain, return_exceptions=True)
+        for _ in range(100):
+            if not mqtt_bridge._uplink_draining:
+                break
+            await asyncio.sleep(0.01)
+
+    try:
+        asyncio.run(go())
+    finally:
+        mqtt_bridge.set_loop(None)
+
+    assert batches == [[("dev-0", {"t": 0})], [("dev-1", {"t": 1})]]
+    assert not mqtt_bridge._uplink_draining and not mqtt_bridge._uplink_pending
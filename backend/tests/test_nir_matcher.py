@@ -0,0 +1,108 @@
+"""Tests for the cached NIR library matrix and burst analysis."""
+import asyncio
+
+import numpy as np
+import pytest
+
+from models.nir_models import LibraryEntry
+from services import nir
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    nir.invalidate_library_cache()
+    yield
+    nir.invalidate_library_cache()
+
+
+def _loop(norm_corr, peaks_nm, library):
+    """The pre-matrix per-entry scan in `ingest_and_analyse`."""
+    matches = []
+    for entry in library:
+        overlap = nir._peak_overlap(peaks_nm, entry.get("characteristic_peaks_nm") or [])
+        cos = nir._cosine_score(norm_corr, entry.get("fingerprint_intensities"))
+        if cos is None:
+            cos = overlap / max(1, len(entry.get("characteristic_peaks_nm") or []))
+        if cos < 0.10 and overlap == 0:
+            continue
+        matches.append((entry["id"], round(cos, 4), overlap))
+    matches.sort(key=lambda m: (m[1], m[2]), reverse=True)
+    return matches[:5]
+
+
+def _library(rng, n=300):
+    lib = [LibraryEntry(**s).model_dump() for s in nir.SEED_LIBRARY]
+    for i in range(n):
+        fp = None
+        if i % 3 == 0:
+            fp = rng.random(int(rng.integers(50, 400))).tolist()
+        elif i % 3 == 1:
+            fp = [0.0] * 64                   # zero-norm reference
+        lib.append(LibraryEntry(
+            name=f"ref {i:04d}", category="organic_compound",
+            characteristic_peaks_nm=sorted(rng.uniform(900, 2500, int(rng.integers(0, 6))).tolist()),
+            fingerprint_intensities=fp,
+        ).model_dump())
+    return sorted(lib, key=lambda e: e["name"])
+
+
+def test_rank_matches_the_per_entry_loop():
+    rng = np.random.default_rng(3)
+    library = _library(rng)
+    lib = nir._LibraryMatrix(library)
+    for seed in nir.SEED_LIBRARY:
+        for n_points in (128, 256):
+            sig = nir._analyse_signal(nir.synthesize_spectrum(seed["name"], n_points=n_points))
+            top = lib.rank(sig["norm"][None, :], [sig["peaks"]])[0]
+            got = [(m.library_id, m.cosine_score, m.peaks_matched_count) for m in top]
+            assert got == _loop(sig["norm"], sig["peaks"], library), seed["name"]
+    assert sorted(lib._grids) == [128, 256]
+
+
+def test_peak_overlap_counts_each_library_peak_once():
+    lib = nir._LibraryMatrix([
+        {"id": "a", "name": "a", "category": "x", "characteristic_peaks_nm": [1000, 1010, 1500]},
+        {"id": "b", "name": "b", "category": "x", "characteristic_peaks_nm": [2000]},
+        {"id": "c", "name": "c", "category": "x", "characteristic_peaks_nm": []},
+    ])
+    scan = [1005.0, 1512.0, 1987.9]
+    assert lib.overlap(scan).tolist() == [3, 0, 0]
+    assert lib.overlap([]).tolist() == [0, 0, 0]
+    for entry, n in zip(lib.entries, lib.overlap(scan)):
+        assert nir._peak_overlap(scan, entry["characteristic_peaks_nm"]) == n
+
+
+@pytest.fixture
+def cols(monkeypatch, fake_collection):
+    lib = fake_collection(LibraryEntry(**s).model_dump() for s in nir.SEED_LIBRARY)
+    scans, results, stored = fake_collection(), fake_collection(), []
+
+    async def auto_store(content, **kw):
+        stored.append(kw["source_id"])
+    monkeypatch.setattr(nir, "_library", lambda: lib)
+    monkeypatch.setattr(nir, "_scans", lambda: scans)
+    monkeypatch.setattr(nir, "_results", lambda: results)
+    monkeypatch.setattr(nir.mb, "auto_store", auto_store)
+    return lib, scans, results, stored
+
+
+def test_burst_loads_the_library_once_and_refreshes_on_change(cols):
+    lib, scans, results, stored = cols
+    names = [s["name"] for s in nir.SEED_LIBRARY]
+    burst = [nir.synthesize_spectrum(n, n_points=p) for n in names for p in (128, 256)]
+    bad = nir.synthesize_spectrum(names[0])
+    bad.intensities = bad.intensities[:10]
+    out = asyncio.run(nir.ingest_and_analyse_many(burst[:3] + [bad] + burst[3:]))
+
+    assert len(out) == len(burst) + 1 and out[3]["ok"] is False
+    ok = [r for r in out if r["ok"]]
+    assert [r["result"]["spectrum_id"] for r in ok] == [s.id for s in burst] == stored
+    assert len(scans.docs) == len(results.docs) == len(burst)
+    single = asyncio.run(nir.ingest_and_analyse(burst[5]))
+    assert single["result"]["top_matches"] == ok[5]["result"]["top_matches"]
+    assert lib.calls.count("find") == 1
+
+    asyncio.run(nir.add_library_entry(LibraryEntry(
+        name="AAA test resin", category="plastic", characteristic_peaks_nm=[1000.0])))
+    asyncio.run(nir.ingest_and_analyse(burst[0]))
+    assert lib.calls.count("find") == 2 and nir.library_cache_stats()["entries"] == len(names) + 1
@@ -0,0 +1,142 @@
+"""Tests for the Weaver parts search index and batched matching."""
+import asyncio
+import random
+
+import pytest
+
+from services import parts_db, parts_index
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    parts_index.reset_in_memory_state()
+    yield
+    parts_index.reset_in_memory_state()
+
+
+def _starter():
+    return [dict(spec, id=f"p{i}", updated_at=f"2026-01-01T00:00:{i:02d}")
+            for i, spec in enumerate(parts_db._STARTER_PARTS)]
+
+
+def _scan(name, docs):
+    """The pre-index `match_part` loop."""
+    needle = name.strip().lower()
+    if len(needle) < 2:
+        return None
+    best, best_score = None, 0.0
+    needle_tokens = set(parts_index.tokenise(needle))
+    for c in docs:
+        hay = set(parts_index.tokenise(c["name"])) | {t.lower() for t in c.get("tags", [])}
+        if c.get("material"):
+            hay |= set(parts_index.tokenise(c["material"]))
+        if not hay:
+            continue
+        score = len(needle_tokens & hay) / max(len(needle_tokens), 1)
+        if needle in c["name"].lower():
+            score += 0.5
+        if score > best_score:
+            best, best_score = c, score
+    return best["id"] if best and best_score >= 0.5 else None
+
+
+def test_known_tokens_match_like_the_old_scan():
+    docs = _starter()
+    for d in docs:
+        parts_index.upsert(d)
+    vocab = sorted({t for d in docs for t in parts_index.tokenise(d["name"])} | {"bracket", "xyz"})
+    rng = random.Random(5)
+    names = [d["name"] for d in docs] + [
+        " ".join(rng.sample(vocab, rng.randint(1, 3))) for _ in range(300)
+    ]
+    for name in names:
+        hit = parts_index.match(name)
+        assert (hit["id"] if hit else None) == _scan(name, docs), name
+
+
+def test_substring_only_needles_match_like_the_old_scan():
+    docs = _starter() + [
+        {"id": "ms", "name": "MicroServo SG90", "tags": []},
+        {"id": "st", "name": "Stepper-motor NEMA17", "tags": []},
+        {"id": "x", "name": "-", "tags": []},
+    ]
+    for d in docs:
+        parts_index.upsert(d)
+    assert parts_index.match("servo")["name"] == "SG90 micro servo"   # token beats substring
+    assert parts_index.match("microse")["id"] == "ms"
+    assert parts_index.match("nema")["id"] == "st"
+    assert parts_index.match("per-mo")["id"] == "st"
+    assert parts_index.match("r-m")["id"] == "st"                       # no needle tokens
+    needles = {d["name"].lower()[i:i + k] for d in docs
+               for k in (2, 3, 5, 8) for i in range(0, len(d["name"]) - k + 1, 3)}
+    for needle in sorted(needles):
+        hit = parts_index.match(needle)
+        assert (hit["id"] if hit else None) == _scan(needle, docs), needle
+
+
+def test_typos_fall_back_to_trigrams():
+    for d in _starter():
+        parts_index.upsert(d)
+    hit = parts_index.match("mpu6500 imu")
+    assert hit["name"] == "MPU6050 IMU" and 0.5 <= hit["_match_confidence"] < 1.0
+    # A single-token part code with a swapped pair has no other token to
+    # lean on; trigram overlap alone (3/11) would miss it.
+    hit = parts_index.match("mpu6500")
+    assert hit["name"] == "MPU6050 IMU" and hit["_match_confidence"] == pytest.approx(6 / 7)
+    assert parts_index.match("esp23-s3 modul")["name"] == "ESP32-S3 module"
+    assert parts_index.match("quantum flux capacitor") is None
+
+
+def test_upsert_and_remove_keep_the_index_current():
+    parts_index.upsert({"id": "a", "name": "Widget frame", "tags": []})
+    assert parts_index.match("widget")["id"] == "a"
+    parts_index.upsert({"id": "a", "name": "Gadget frame", "tags": []})
+    assert parts_index.match("widget") is None and parts_index.match("gadget")["id"] == "a"
+    parts_index.remove("a")
+    assert parts_index.match("gadget") is None
+    assert parts_index.stats()["tokens"] == 0 and parts_index.stats()["trigrams"] == 0
+    assert parts_index.stats()["name_trigrams"] == 0
+
+
+def _reads(col):
+    """(catalogue reads, `$in` confirmation reads) seen by the fake."""
+    confirms = sum("id" in q for q in col.queries)
+    return len(col.queries) - confirms, confirms
+
+
+def test_match_many_is_one_lookup_over_a_large_catalogue(monkeypatch, fake_collection):
+    rng = random.Random(11)
+    words = ["servo", "bracket", "hinge", "sensor", "module", "plate", "gear", "shaft",
+             "bearing", "spring", "cable", "relay", "pump", "valve", "frame", "mount"]
+    docs = _starter() + [
+        {"id": f"x{i}", "name": f"{rng.choice(words)} {rng.choice(words)} {i}",
+         "tags": [rng.choice(words)], "updated_at": "2026-01-01"}
+        for i in range(50_000)
+    ]
+    col = fake_collection(docs)
+    monkeypatch.setattr(parts_db, "_col", lambda: col)
+    monkeypatch.setattr(parts_db, "_SEEDED", True)
+    deep = docs[-1]["name"]                  # far past the old 500-row window
+    names = ["M3 cap screw", deep, "BME280", "mpu6050", deep] * 12
+    hits = asyncio.run(parts_db.match_many(names))
+    assert len(hits) == 60
+    assert hits[0]["name"] == "M3 cap screw 10mm" and hits[2]["name"] == "BME280 env sensor"
+    assert hits[1]["id"] == hits[4]["id"] == "x49999"
+    # Hydrate only, no per-name query; one `$in` read for all winners.
+    assert _reads(col) == (1, 1)
+    asyncio.run(parts_db.match_many(["gear"]))
+    assert _reads(col)[0] == 1                # sync is rate-limited
+
+
+def test_parts_deleted_elsewhere_are_dropped_and_rematched(monkeypatch, fake_collection):
+    docs = _starter()
+    col = fake_collection(docs)
+    monkeypatch.setattr(parts_db, "_col", lambda: col)
+    monkeypatch.setattr(parts_db, "_SEEDED", True)
+    assert asyncio.run(parts_db.match_many(["servo"]))[0]["name"] == "SG90 micro servo"
+    # Another worker deletes both servos; this worker's sync never sees it.
+    col.docs = [d for d in col.docs if "servo" not in d["tags"]]
+    hits = asyncio.run(parts_db.match_many(["servo", "M3 hex nut", "servo"]))
+    assert hits[0] is None and hits[2] is None and hits[1]["name"] == "M3 hex nut"
+    assert parts_index.stats()["parts"] == len(col.docs)
+    assert _reads(col)[1] == 1 + 2            # MG996R was re-matched, then dropped too
@@ -0,0 +1,103 @@
+"""Tests for pooled provider clients and per-provider concurrency slots."""
+import asyncio
+
+import httpx
+import pytest
+
+from emergentintegrations.llm.chat import LlmChat, UserMessage
+from services import llm_provider as llmp
+from services import provider_clients as pc
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    pc.reset_in_memory_state()
+    yield
+    pc.reset_in_memory_state()
+
+
+def test_one_client_per_origin():
+    a = pc.client("http://localhost:11434")
+    b = pc.client("http://LOCALHOST:11434/v1/chat/completions")
+    c = pc.client("http://localhost:1234/v1")
+    assert a is b
+    assert a is not c
+    assert pc.stats()["clients"] == ["http://localhost:11434", "http://localhost:1234"]
+
+
+def test_slot_caps_concurrency_and_reports_queue_depth(monkeypatch):
+    monkeypatch.setenv("LLM_CONCURRENCY_OLLAMA", "2")
+    peak = {"now": 0, "max": 0}
+
+    async def call():
+        async with pc.slot("ollama"):
+            peak["now"] += 1
+            peak["max"] = max(peak["max"], peak["now"])
+            await asyncio.sleep(0.01)
+            peak["now"] -= 1
+
+    async def go():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(go())
+    stats = pc.stats()["providers"]["ollama"]
+    assert peak["max"] == 2
+    assert stats["limit"] == 2 and stats["requests"] == 6
+    assert stats["max_queue_depth"] >= 4
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+
+
+def test_slot_counts_errors_and_releases():
+    async def boom():
+        async with pc.slot("lmstudio"):
+            raise RuntimeError("bad gateway")
+
+    async def go():
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await boom()
+
+    asyncio.run(go())
+    stats = pc.stats()["providers"]["lmstudio"]
+    assert stats["errors"] == 3 and stats["in_flight"] == 0
+
+
+def test_ollama_sends_reuse_the_pooled_client(monkeypatch):
+    built = []
+
+    def handler(request):
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    def fake_client(base_url):
+        if not built:
+            built.append(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return built[0]
+
+    monkeypatch.setattr(pc, "client", fake_client)
+
+    async def go():
+        return [await llmp._send_ollama("sys", "hi", "llama3") for _ in range(3)]
+
+    assert asyncio.run(go()) == ["ok", "ok", "ok"]
+    assert len(built) == 1
+    assert pc.stats()["providers"]["ollama"]["requests"] == 3
+
+
+def test_llm_chat_uses_the_injected_client_factory(monkeypatch):
+    monkeypatch.setenv("OPENAI_BASE_URL", "https://gateway.test/v1")
+    asked = []
+
+    def handler(request):
+        return httpx.Response(200, json={"choices": [{"message": {"content": "pong"}}]})
+
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def factory(base_url):
+        asked.append(base_url)
+        return shared
+
+    chat = LlmChat(api_key="k", session_id="s", system_message="sys",
+                   client_factory=factory).with_model("openai", "gpt-5.2")
+    assert asyncio.run(chat.send_message(UserMessage(text="ping"))) == "pong"
+    assert asked == ["https://gateway.test/v1"]
+    assert not shared.is_closed
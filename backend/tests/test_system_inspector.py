@@ -1,4 +1,9 @@
-from services import system_inspector
+import pytest
+from fastapi import HTTPException
+
+from models.robot_models import Role
+from routes import system_inspector as system_inspector_routes
+from services import index_manifest, system_inspector
 
 
 def test_system_inspector_report_has_headquarters_structure():
@@ -34,3 +39,20 @@ def test_certification_report_has_seven_seals():
     assert "Performance" in seals
     assert "Luxury Review" in seals
     assert report["overall_status"] in {"approved", "needs_refinement"}
+
+
+@pytest.mark.asyncio
+async def test_index_bootstrap_is_owner_only(monkeypatch):
+    calls = []
+
+    async def bootstrap():
+        calls.append(1)
+        return {"created": 0}
+
+    monkeypatch.setattr(index_manifest, "bootstrap", bootstrap)
+    for role in (Role.GUEST, Role.COUNCIL):
+        with pytest.raises(HTTPException) as exc:
+            await system_inspector_routes.index_bootstrap(role=role)
+        assert exc.value.status_code == 403
+    assert calls == []
+    assert await system_inspector_routes.index_bootstrap(role=Role.OWNER) == {"created": 0}
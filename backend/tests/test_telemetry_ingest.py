@@ -0,0 +1,248 @@
+"""Tests for the buffered telemetry ingest engine (no Mongo required)."""
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from services import memory_bank as mb
+from services import telemetry_ingest as ti
+from services import telemetry_store as ts
+
+
+def _doc(col, device_id):
+    return next(d for d in col.docs if d["id"] == device_id)
+
+
+@pytest.fixture
+def fakes(monkeypatch, fake_collection):
+    telemetry = fake_collection()
+    devices = fake_collection([
+        {"id": "dev-1", "status": "registered", "state": {}},
+        {"id": "dev-stop", "status": "safe_state", "state": {}},
+    ])
+    memories = []
+
+    async def auto_store(content, **kwargs):
+        memories.append((content, kwargs))
+        return {"content": content}
+
+    monkeypatch.setattr(ti, "_telemetry", lambda: telemetry)
+    monkeypatch.setattr(ti, "_devices", lambda: devices)
+    buckets = fake_collection()
+    monkeypatch.setattr(ts, "_buckets", lambda: buckets)
+    monkeypatch.setattr(mb, "auto_store", auto_store)
+    monkeypatch.setattr(ti, "_ensure_started", lambda: None)
+    ti.reset_in_memory_state()
+    yield telemetry, devices, memories
+    ti.reset_in_memory_state()
+
+
+def test_readings_are_buffered_and_device_loaded_once(fakes):
+    telemetry, devices, memories = fakes
+
+    async def run():
+        for i in range(5):
+            await ti.ingest("dev-1", {"temp": 20.0 + i * 0.1}, source="test")
+        assert len(ti.pending_records("dev-1")) == 4    # first reading flushed (ONLINE transition)
+        await ti.flush()
+        assert "envelopes" not in _doc(devices, "dev-1")["state"]    # checkpoint not yet due
+        await ti.flush(checkpoint=True)
+
+    asyncio.run(run())
+    assert devices.calls.count("find_one") == 1
+    assert len(telemetry.docs) == 5
+    assert telemetry.calls.count("insert_many") == 2
+    assert _doc(devices, "dev-1")["status"] == "online"
+    assert _doc(devices, "dev-1")["state"]["envelopes"]["temp"]["n"] == 5
+    assert memories == []                               # no per-reading embeddings
+
+
+def test_unknown_device_returns_none(fakes):
+    assert asyncio.run(ti.ingest("nope", {"temp": 1.0})) is None
+
+
+def test_sticky_safe_state_is_never_promoted(fakes):
+    _, devices, _ = fakes
+
+    async def run():
+        await ti.ingest("dev-stop", {"temp": 1.0})
+        await ti.flush()
+
+    asyncio.run(run())
+    assert _doc(devices, "dev-stop")["status"] == "safe_state"
+
+
+def test_anomaly_transition_flushes_and_mirrors_memory(fakes):
+    _, devices, memories = fakes
+
+    async def run():
+        for i in range(12):
+            await ti.ingest("dev-1", {"temperature": 20.0 + (i % 3) * 0.1})
+        await ti.ingest("dev-1", {"temperature": 500.0})
+
+    asyncio.run(run())
+    anomaly = _doc(devices, "dev-1")["state"]["anomaly"]
+    assert anomaly["drifting_keys"] == ["temperature"]
+    assert len(memories) == 1
+    content, kwargs = memories[0]
+    assert "dev-1" in content and "anomaly" in kwargs["tags"]
+
+
+def test_window_summary_written_when_closed(fakes):
+    _, _, memories = fakes
+
+    async def run():
+        for v in (1.0, 3.0, 2.0):
+            await ti.ingest("dev-1", {"temp": v})
+        await ti.flush(close_windows=True)
+
+    asyncio.run(run())
+    assert len(memories) == 1
+    content, kwargs = memories[0]
+    assert "window of 3 readings" in content
+    assert "min=1 max=3 mean=2" in content
+    assert "telemetry_window" in kwargs["tags"]
+
+
+def test_overlay_and_forget(fakes):
+    _, devices, _ = fakes
+
+    async def run():
+        await ti.ingest("dev-1", {"temp": 1.0})
+        await ti.ingest("dev-1", {"temp": 2.0})
+        doc = ti.overlay({"id": "dev-1", "state": {}})
+        assert doc["state"]["envelopes"]["temp"]["n"] == 2
+        await ti.forget("dev-1")
+
+    asyncio.run(run())
+    assert ti.cached_state("dev-1") is None
+    assert _doc(devices, "dev-1")["state"]["envelopes"]["temp"]["n"] == 2
+
+
+def test_ingest_batch_scores_in_one_pass(fakes):
+    telemetry, devices, _ = fakes
+
+    async def run():
+        readings = [("dev-1", {"temp": 20.0 + (i % 3) * 0.1}) for i in range(12)]
+        readings.append(("nope", {"temp": 1.0}))
+        readings.append(("dev-1", {"temp": 500.0}))
+        return await ti.ingest_batch(readings, source="test")
+
+    out = asyncio.run(run())
+    assert out[12] is None and all(r is not None for r in out[:12] + out[13:])
+    assert _doc(devices, "dev-1")["state"]["anomaly"]["drifting_keys"] == ["temp"]
+    assert ti.cached_state("dev-1")["envelopes"]["temp"]["n"] == 13
+
+
+def test_cached_device_follows_changes_made_by_other_workers(fakes, monkeypatch):
+    _, devices, _ = fakes
+
+    async def run():
+        await ti.ingest("dev-stop", {"temp": 1.0})
+        # Another worker clears the safe state; this one still caches it.
+        _doc(devices, "dev-stop")["status"] = "registered"
+        await ti.ingest("dev-stop", {"temp": 1.0})
+        await ti.flush()
+        assert _doc(devices, "dev-stop")["status"] == "registered"
+        monkeypatch.setattr(ti, "DEVICE_TTL_S", 0.0)
+        await ti.ingest("dev-stop", {"temp": 1.0})
+        await ti.flush()
+        assert _doc(devices, "dev-stop")["status"] == "online"
+
+        # Another worker resets dev-1's envelopes while this one holds them.
+        monkeypatch.setattr(ti, "DEVICE_TTL_S", 60.0)
+        for v in (20.0, 20.1, 20.2):
+            await ti.ingest("dev-1", {"temp": v})
+        await ti.flush(checkpoint=True)
+        dev1 = _doc(devices, "dev-1")
+        dev1["state"].pop("envelopes")
+        dev1["envelope_epoch"] = 1
+        await ti.ingest("dev-1", {"temp": 20.3})
+        await ti.flush(checkpoint=True)
+        assert "envelopes" not in dev1["state"]         # stale envelopes not written back
+        monkeypatch.setattr(ti, "DEVICE_TTL_S", 0.0)
+        await ti.ingest("dev-1", {"temp": 20.4})
+        await ti.flush(checkpoint=True)
+        assert dev1["state"]["envelopes"]["temp"]["n"] == 1
+
+    asyncio.run(run())
+    assert ti.status()["device_refreshes"] >= 2
+
+
+def test_partially_failed_insert_is_retried_without_duplicates(fakes, monkeypatch):
+    telemetry, _, _ = fakes
+    insert_many = telemetry.insert_many
+    attempts = []
+
+    async def flaky(docs, ordered=True):
+        attempts.append(len(docs))
+        if len(attempts) == 1:              # two rows land, then the connection drops
+            await insert_many(docs[:2], ordered=ordered)
+            raise AutoReconnect("connection reset")
+        if len(attempts) == 2:              # one row is rejected outright
+            bad = next(i for i, d in enumerate(docs) if d["_id"] not in
+                       {t["_id"] for t in telemetry.docs})
+            ok = [d for i, d in enumerate(docs) if i != bad]
+            try:
+                await insert_many(ok, ordered=ordered)
+            except BulkWriteError as exc:
+                errors = [{**e, "index": e["index"] + (e["index"] >= bad)}
+                          for e in exc.details["writeErrors"]]
+            errors.append({"index": bad, "code": 50, "errmsg": "operation exceeded time limit"})
+            raise BulkWriteError({"writeErrors": errors})
+        return await insert_many(docs, ordered=ordered)
+
+    monkeypatch.setattr(telemetry, "insert_many", flaky)
+
+    async def run():
+        await ti.ingest("dev-stop", {"temp": 1.0})
+        for i in range(4):
+            await ti.ingest("dev-stop", {"temp": 2.0 + i})
+        for _ in range(3):
+            await ti.flush()
+
+    asyncio.run(run())
+    assert attempts == [5, 5, 1]
+    assert sorted(d["payload"]["temp"] for d in telemetry.docs) == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert ti.status()["duplicate_rows"] == 2
+    assert ti.pending_records("dev-stop") == []
+    minutes = [b for b in ts._buckets().docs if b["resolution"] == "1m"]
+    assert sum(b["keys"]["temp"]["count"] for b in minutes) == 5
+
+
+def test_failed_bucket_write_is_rebuilt_on_a_later_flush(fakes, monkeypatch):
+    telemetry, _, _ = fakes
+    buckets = ts._buckets()
+    bulk_write = buckets.bulk_write
+    down = [True]
+    rollups = []
+
+    async def flaky(ops, ordered=True):
+        if down[0]:
+            raise AutoReconnect("buckets unavailable")
+        return await bulk_write(ops, ordered=ordered)
+
+    async def rollup(*, before, after=None):
+        if down[0]:
+            raise AutoReconnect("still unavailable")
+        rollups.append((after, before))
+        return {"buckets": 0}
+
+    monkeypatch.setattr(buckets, "bulk_write", flaky)
+    monkeypatch.setattr(ts, "rollup", rollup)
+
+    async def run():
+        for v in (1.0, 2.0):
+            await ti.ingest("dev-stop", {"temp": v})
+        await ti.flush()
+        await ti.flush()                        # repair fails too: range kept
+        down[0] = False
+        await ti.flush()
+        await ti.flush()                        # nothing left to repair
+
+    asyncio.run(run())
+    assert len(rollups) == 1
+    after, before = rollups[0]
+    assert after.endswith(":00:00+00:00") and before.endswith(":00:00+00:00")
+    assert all(after <= d["received_at"] < before for d in telemetry.docs)
+    assert ti.status()["bucket_repairs"] == 1
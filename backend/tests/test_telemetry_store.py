@@ -0,0 +1,171 @@
+"""Tests for the telemetry bucket store (no Mongo required)."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services import telemetry_store as ts
+
+
+def _rec(device_id, ts_iso, **payload):
+    return {"device_id": device_id, "received_at": ts_iso, "payload": payload}
+
+
+@pytest.fixture
+def buckets(monkeypatch, fake_collection):
+    fake = fake_collection()
+    monkeypatch.setattr(ts, "_buckets", lambda: fake)
+    return fake
+
+
+def test_bucket_ops_aggregate_per_bucket():
+    ops = ts.bucket_ops([
+        _rec("d1", "2026-01-01T10:00:05+00:00", temp=1.0, ok=True, label="x"),
+        _rec("d1", "2026-01-01T10:00:40+00:00", temp=3.0),
+        _rec("d1", "2026-01-01T10:01:10+00:00", temp=5.0),
+    ])
+    by_key = {(op._filter["resolution"], op._filter["bucket_start"]): op._doc for op in ops}
+    assert set(by_key) == {
+        ("1m", "2026-01-01T10:00:00+00:00"),
+        ("1m", "2026-01-01T10:01:00+00:00"),
+        ("1h", "2026-01-01T10:00:00+00:00"),
+    }
+    minute = by_key[("1m", "2026-01-01T10:00:00+00:00")]
+    assert minute["$min"] == {"keys.temp.min": 1.0}
+    assert minute["$max"] == {"keys.temp.max": 3.0}
+    assert minute["$inc"] == {"keys.temp.sum": 4.0, "keys.temp.count": 2}
+    hour = by_key[("1h", "2026-01-01T10:00:00+00:00")]
+    assert hour["$inc"]["keys.temp.count"] == 3
+
+
+def test_bucket_ops_sanitises_keys():
+    ops = ts.bucket_ops([_rec("d1", "2026-01-01T10:00:00+00:00", **{"a.b": 1.0, "$x": 2.0})])
+    assert set(ops[0]._doc["$inc"]) == {"keys.a_b.sum", "keys.a_b.count"}
+
+
+def test_series_minute_and_daily_rollup(buckets):
+    recs = [
+        _rec("d1", f"2026-01-01T{h:02d}:{m:02d}:00+00:00", temp=float(h))
+        for h in (10, 11) for m in (0, 30)
+    ]
+    asyncio.run(buckets.bulk_write(ts.bucket_ops(recs)))
+
+    minute = asyncio.run(ts.series(
+        "d1", start="2026-01-01T10:00:00+00:00", end="2026-01-01T12:00:00+00:00", resolution="1m",
+    ))
+    assert minute["count"] == 4
+    assert minute["points"][0]["values"]["temp"] == {"mean": 10.0, "min": 10.0, "max": 10.0, "count": 1}
+
+    daily = asyncio.run(ts.series(
+        "d1", start="2026-01-01T00:00:00+00:00", end="2026-01-02T00:00:00+00:00", resolution="1d",
+    ))
+    assert daily["count"] == 1
+    assert daily["points"][0]["values"]["temp"] == {"mean": 10.5, "min": 10.0, "max": 11.0, "count": 4}
+
+
+def test_auto_resolution_and_validation(buckets):
+    out = asyncio.run(ts.series(
+        "d1", start="2026-01-01T00:00:00+00:00", end="2026-01-08T00:00:00+00:00",
+    ))
+    assert out["resolution"] == "1h"
+    assert ts._pick_resolution(300, 2000) == "raw"
+    assert ts._pick_resolution(86400, 2000) == "1m"
+    assert ts._pick_resolution(86400 * 400, 2000) == "1d"
+    with pytest.raises(ts.TelemetryQueryError):
+        asyncio.run(ts.series("d1", start="2026-01-02T00:00:00+00:00", end="2026-01-01T00:00:00+00:00"))
+    with pytest.raises(ts.TelemetryQueryError):
+        asyncio.run(ts.series("d1", resolution="5m"))
+
+
+def test_auto_resolution_skips_expired_stores(buckets):
+    day = 86400
+    assert ts._pick_resolution(300, 2000, age_s=(ts.RAW_RETENTION_DAYS + 1) * day) == "1m"
+    assert ts._pick_resolution(86400, 2000, age_s=(ts.MINUTE_RETENTION_DAYS + 1) * day) == "1h"
+    assert ts._pick_resolution(300, 2000, age_s=(ts.MINUTE_RETENTION_DAYS + 1) * day) == "1h"
+
+    # A 5-minute window from 60 days ago: raw and minute data are gone,
+    # only the hour bucket survived compaction.
+    start = (datetime.now(timezone.utc) - timedelta(days=60)).replace(minute=10, second=0, microsecond=0)
+    recs = [_rec("d1", (start + timedelta(minutes=m)).isoformat(), temp=float(m)) for m in range(5)]
+    asyncio.run(buckets.bulk_write([op for op in ts.bucket_ops(recs) if op._filter["resolution"] == "1h"]))
+    out = asyncio.run(ts.series(
+        "d1", start=start.isoformat(), end=(start + timedelta(minutes=5)).isoformat(),
+    ))
+    assert out["resolution"] == "1h" and out["count"] == 1
+    assert out["points"][0]["values"]["temp"]["count"] == 5
+
+
+def test_dense_raw_window_falls_back_to_minutes_or_keeps_the_newest(monkeypatch, buckets, fake_collection):
+    # 10 Hz for the last 10 minutes: 6000 raw rows, more than max_points.
+    end = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    start = end - timedelta(minutes=10)
+    recs = [_rec("d1", (start + timedelta(milliseconds=100 * i)).isoformat(), temp=float(i))
+            for i in range(6000)]
+    raw = fake_collection(recs)
+    monkeypatch.setattr(ts, "_telemetry", lambda: raw)
+    asyncio.run(buckets.bulk_write(ts.bucket_ops(recs)))
+
+    auto = asyncio.run(ts.series("d1", start=start.isoformat(), end=end.isoformat()))
+    assert auto["resolution"] == "1m" and auto["count"] == 10 and not auto["truncated"]
+    assert sum(p["values"]["temp"]["count"] for p in auto["points"]) == 6000
+
+    explicit = asyncio.run(ts.series(
+        "d1", start=start.isoformat(), end=end.isoformat(), resolution="raw",
+    ))
+    assert explicit["truncated"] and explicit["count"] == ts.MAX_POINTS
+    times = [p["t"] for p in explicit["points"]]
+    assert times == sorted(times) and times[-1] == recs[-1]["received_at"]
+    assert times[0] == recs[6000 - ts.MAX_POINTS]["received_at"]
+
+    sparse = asyncio.run(ts.series(
+        "d1", start=(end - timedelta(seconds=30)).isoformat(), end=end.isoformat(),
+    ))
+    assert sparse["resolution"] == "raw" and sparse["count"] == 300 and not sparse["truncated"]
+
+
+def test_backfill_runs_once_up_to_the_current_hour(monkeypatch, fake_collection):
+    meta, calls = fake_collection(), []
+
+    async def rollup(*, before, after=None):
+        calls.append((before, after))
+        return {"buckets": 7}
+    monkeypatch.setattr(ts, "_meta", lambda: meta)
+    monkeypatch.setattr(ts, "rollup", rollup)
+    now = datetime(2025, 3, 1, 10, 42, 5, tzinfo=timezone.utc)
+
+    first = asyncio.run(ts.backfill(now=now))
+    assert first["before"] == "2025-03-01T10:00:00+00:00" and first["buckets_rolled"] == 7
+    assert calls == [("2025-03-01T10:00:00+00:00", None)]
+    assert meta.docs[0]["id"] == "bucket_backfill" and meta.docs[0]["buckets_rolled"] == 7
+
+    assert asyncio.run(ts.backfill(now=now)) == {"skipped": True}
+    assert len(calls) == 1
+    again = asyncio.run(ts.backfill(force=True, now=now + timedelta(hours=2)))
+    assert again["before"] == "2025-03-01T12:00:00+00:00" and len(calls) == 2
+
+
+def test_failed_or_abandoned_backfill_is_retried(monkeypatch, fake_collection):
+    meta, calls = fake_collection(), []
+
+    async def rollup(*, before, after=None):
+        calls.append(before)
+        if len(calls) == 1:
+            raise RuntimeError("aggregate interrupted")
+        return {"buckets": 3}
+    monkeypatch.setattr(ts, "_meta", lambda: meta)
+    monkeypatch.setattr(ts, "rollup", rollup)
+    now = datetime(2025, 3, 1, 10, 42, 5, tzinfo=timezone.utc)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(ts.backfill(now=now))
+    assert meta.docs == []                      # claim released
+    assert asyncio.run(ts.backfill(now=now))["buckets_rolled"] == 3
+    assert len(calls) == 2 and "done_at" in meta.docs[0]
+
+    # A worker that died mid-run leaves a claim without done_at: it blocks
+    # others only until the lease runs out.
+    meta.docs[0].pop("done_at")
+    assert asyncio.run(ts.backfill(now=now + timedelta(minutes=5))) == {"skipped": True}
+    later = now + timedelta(seconds=ts.BACKFILL_LEASE_S + 60)
+    assert asyncio.run(ts.backfill(now=later))["buckets_rolled"] == 3
+    assert len(calls) == 3 and meta.docs[0]["started_at"] == later.isoformat()
@@ -0,0 +1,106 @@
+"""Tests for the component-level thermal network engine."""
+import numpy as np
+import pytest
+
+from models.twin_models import (
+    Component,
+    Dependency,
+    DigitalTwin,
+    EnergyProfile,
+    SimulationKind,
+    TwinCategory,
+    TwinState,
+)
+from services import twin_simulator as ts
+
+
+def _twin(names, edges, network, **state):
+    comps = [Component(name=n) for n in names]
+    by_name = {c.name: c.id for c in comps}
+    deps = [Dependency(from_component=by_name[a], to_component=by_name[b]) for a, b in edges]
+    return DigitalTwin(name="rig", category=TwinCategory.DEVICE, state=TwinState(
+        components=comps, dependencies=deps, integrations={"thermal_network": network}, **state,
+    ))
+
+
+def test_two_node_steady_state_matches_hand_solution():
+    # driver (5 W) —1 W/K— heatsink; sinks 0.1 and 0.4 W/K to 20 °C ambient.
+    twin = _twin(["driver", "heatsink"], [("driver", "heatsink")], {
+        "T_amb_c": 20.0, "link_g_w_k": 1.0,
+        "nodes": {"driver": {"heat_w": 5.0, "G_amb_w_k": 0.1},
+                  "heatsink": {"G_amb_w_k": 0.4}},
+    })
+    A = np.array([[1.1, -1.0], [-1.0, 1.4]])
+    expected = np.linalg.solve(A, [5.0 + 0.1 * 20, 0.4 * 20])
+    net = ts.thermal_network(twin)
+    temps = {h["component"]: h["T_c"] for h in net["hotspots"]}
+    assert temps["driver"] == pytest.approx(expected[0], abs=0.01)
+    assert temps["heatsink"] == pytest.approx(expected[1], abs=0.01)
+    assert net["hotspots"][0]["component"] == "driver"
+
+
+def test_hotspot_is_a_failure_in_both_engines():
+    twin = _twin(["battery", "motor driver", "frame"],
+                 [("battery", "motor driver"), ("motor driver", "frame")],
+                 {"nodes": {"motor driver": {"heat_w": 20.0, "max_temp_c": 90}}})
+    net = ts.simulate(twin, SimulationKind.THERMAL_NETWORK)
+    assert not net.ok and "motor driver" in net.failures[0]
+    assert net.timeline[0]["component"] == "motor driver"
+    fail = ts.simulate(twin, SimulationKind.FAILURE)
+    assert any(f.startswith("THERMAL hotspot · motor driver") for f in fail.failures)
+    assert fail.metrics["thermal_hotspots"][0]["component"] == "motor driver"
+
+
+def test_transient_uses_the_window_peak():
+    network = {"nodes": {"cell": {"heat_w": 4.0, "G_amb_w_k": 0.05, "C_j_k": 500.0}}}
+    twin = _twin(["cell"], [], network)
+    assert not ts.simulate(twin, SimulationKind.THERMAL_NETWORK).ok   # 25 + 80 °C long-run
+    network["duration_s"] = 600.0                                     # τ = 10 000 s
+    net = ts.thermal_network(twin)
+    peak = net["hotspots"][0]["T_c"]
+    assert peak == pytest.approx(25 + 80 * (1 - np.exp(-600 / 10_000)), abs=0.2)
+    assert net["failures"] == [] and net["transient"]["steps"] == 50
+
+
+def test_unsinked_heated_cluster_runs_away():
+    twin = _twin(["a", "b", "c"], [("a", "b")], {
+        "sink_g_w_k": 0.0,
+        "nodes": {"a": {"heat_w": 1.0}, "c": {"G_amb_w_k": 0.2}},
+    })
+    net = ts.thermal_network(twin)
+    assert net["floating_nodes"] == 2
+    assert sum("no heat path" in f for f in net["failures"]) == 2
+
+
+def test_heat_defaults_from_the_energy_profile():
+    twin = _twin(["a", "b"], [("a", "b")], {}, energy=EnergyProfile(average_w=40.0))
+    net = ts.thermal_network(twin)
+    assert net["heat_assumed"] and net["heat_total_w"] == pytest.approx(6.0)
+    assert any("assumed 15%" in w for w in net["warnings"])
+
+
+def test_large_assembly_solves():
+    rng = np.random.default_rng(0)
+    names = [f"p{i}" for i in range(500)]
+    edges = [(names[int(rng.integers(i))], names[i]) for i in range(1, 500)]
+    nodes = {n: {"heat_w": float(rng.uniform(0, 0.3))} for n in names[::5]}
+    net = ts.thermal_network(_twin(names, edges, {"nodes": nodes, "duration_s": 1800}))
+    assert net["nodes"] == 500 and net["links"] == 499
+    assert all(h["T_c"] is not None for h in net["hotspots"])
+
+
+@pytest.mark.parametrize("network", [
+    {"nodes": {"a": 5}},
+    {"nodes": ["a"]},
+    {"links": [["a", "b"]]},
+    {"nodes": {"a": {"heat_w": None}}},
+    ["a"],
+])
+def test_malformed_network_is_reported_not_raised(network):
+    twin = _twin(["a", "b"], [("a", "b")], network)
+    with pytest.raises(ValueError):
+        ts.thermal_network(twin)
+    fail = ts.simulate(twin, SimulationKind.FAILURE)
+    assert any(w.startswith("Thermal network not evaluated") for w in fail.warnings)
+    net = ts.simulate(twin, SimulationKind.THERMAL_NETWORK)
+    assert any(f.startswith("Thermal network invalid") for f in net.failures)
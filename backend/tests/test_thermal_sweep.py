@@ -0,0 +1,60 @@
+"""Tests for the vectorised thermal parameter sweep."""
+import numpy as np
+import pytest
+
+from models.twin_models import DigitalTwin, SimulationKind, TwinCategory, TwinState
+from services import twin_simulator as ts
+
+
+def test_analytic_matches_the_vectorised_ode():
+    rng = np.random.default_rng(1)
+    t_amb, power, r_th = rng.uniform(15, 40, 300), rng.uniform(0.1, 4, 300), rng.uniform(5, 25, 300)
+    exact = ts.sweep_thermal(t_amb, power, r_th)
+    ode = ts.sweep_thermal(t_amb, power, r_th, method="ode")
+    for key in ("p5", "p50", "p95", "max"):
+        assert ode["T_max_c"][key] == pytest.approx(exact["T_max_c"][key], abs=0.05)
+    assert ode["runaway_count"] == exact["runaway_count"]
+    for lab in ("p5", "p50", "p95"):
+        assert ode["envelope"][lab] == pytest.approx(exact["envelope"][lab], abs=0.05)
+
+
+def test_worst_case_and_runaway_timing():
+    # C=100 J/K, R=10 K/W → τ=1000 s; P=10 W → T_ss = 25 + 100 = 125 °C.
+    out = ts.sweep_thermal([25.0, 25.0], [1.0, 10.0], [10.0], C_j_k=100.0,
+                           duration_s=1800.0, runaway_c=80.0)
+    worst = out["worst_case"]
+    assert out["scenarios"] == 2 and worst["index"] == 1
+    assert worst["T_max_c"] == pytest.approx(125 - 100 * np.exp(-1.8), abs=0.01)
+    # 80 = 125 - 100·e^(-t/1000)  →  t = 1000·ln(100/45)
+    assert worst["time_to_runaway_s"] == pytest.approx(1000 * np.log(100 / 45), abs=0.1)
+    assert out["runaway_count"] == 1 and out["runaway_fraction"] == 0.5
+    assert out["envelope"]["p50"][0] == 25.0
+
+
+def test_grid_takes_the_cartesian_product():
+    out = ts.sweep_thermal([20, 30], [0.5, 1, 2], [10, 15], grid=True, samples=5)
+    assert out["scenarios"] == 12 and len(out["time_s"]) == 5
+    with pytest.raises(ValueError):
+        ts.sweep_thermal([20, 30], [0.5, 1, 2], [10])
+    with pytest.raises(ValueError):
+        ts.sweep_thermal([20], [1], [0.0])
+
+
+def test_thermal_engine_reports_the_sweep():
+    twin = DigitalTwin(name="cell", category=TwinCategory.POWER_SYSTEM, state=TwinState(
+        integrations={"thermal": {"I_amps": 2.0, "sweep": {
+            "T_amb_c": [20, 30, 45], "power_w": [0.2, 1.5, 4.0], "grid": True}}},
+    ))
+    result = ts.simulate(twin, SimulationKind.THERMAL)
+    sweep = result.metrics["sweep"]
+    assert sweep["scenarios"] == 9 and sweep["runaway_count"] > 0
+    assert any(w.startswith("Thermal sweep") for w in result.warnings)
+    assert any(f.startswith("Thermal sweep") for f in result.findings)
+
+
+def test_sweep_caps_scenarios_times_samples(monkeypatch):
+    monkeypatch.setattr(ts, "SWEEP_MAX_POINTS", 1000)
+    t_amb = np.linspace(15, 40, 30)
+    assert ts.sweep_thermal(t_amb, 1.0, 10.0, samples=30)["scenarios"] == 30
+    with pytest.raises(ValueError, match="too large"):
+        ts.sweep_thermal(t_amb, 1.0, 10.0, samples=50)
@@ -0,0 +1,103 @@
+"""Tests for the batched, memoised digital-twin simulation runner."""
+import asyncio
+
+import pytest
+
+from models.twin_models import (
+    Component,
+    Dependency,
+    DigitalTwin,
+    SimulationKind,
+    TwinCategory,
+    TwinState,
+)
+from services import digital_twin as dt
+
+KINDS = [SimulationKind.ASSEMBLY, SimulationKind.COST,
+         SimulationKind.TIMELINE, SimulationKind.FAILURE]
+
+
+@pytest.fixture
+def db(monkeypatch, fake_collection):
+    twins, sims, stored = fake_collection(), fake_collection(), []
+
+    async def auto_store(content, **kw):
+        stored.append(kw["source_id"])
+
+    monkeypatch.setattr(dt, "_twins", lambda: twins)
+    monkeypatch.setattr(dt, "_sims", lambda: sims)
+    monkeypatch.setattr(dt.mb, "auto_store", auto_store)
+    dt.reset_sim_memo()
+    yield twins, sims, stored
+    dt.reset_sim_memo()
+
+
+def _twin(name="rig", **state):
+    # Fresh component ids every time, like weaver's _spawn_twin.
+    frame, motor, mcu = (Component(name=n, cost_per_unit=c, lead_time_days=d)
+                         for n, c, d in (("frame", 20.0, 3), ("motor", 12.0, 5), ("mcu", 6.5, 4)))
+    return DigitalTwin(
+        name=name, category=TwinCategory.DEVICE,
+        state=TwinState(components=[frame, motor, mcu], dependencies=[
+            Dependency(from_component=frame.id, to_component=motor.id),
+            Dependency(from_component=motor.id, to_component=mcu.id),
+        ], **state),
+    )
+
+
+def test_batch_reads_once_and_writes_once(db):
+    twins, sims, stored = db
+    twin = _twin()
+    twins.docs.append(twin.model_dump())
+    out = asyncio.run(dt.run_and_persist_simulations(twin.id, KINDS))
+    assert list(out) == KINDS
+    assert twins.calls == ["find_one", "update_one"]
+    assert sims.calls == ["insert_many"] and len(sims.docs) == 4
+    assert len(stored) == 8
+    assert dt.sim_memo_stats()["misses"] == 4
+
+
+def test_unchanged_spec_is_served_from_the_memo(db):
+    twins, sims, stored = db
+    first, second = _twin(), _twin("rig v2")
+    assert dt.state_hash(first) == dt.state_hash(second)
+    a = asyncio.run(dt.run_and_persist_simulations(first.id, KINDS, twin_doc=first.model_dump()))
+    b = asyncio.run(dt.run_and_persist_simulations(second.id, KINDS, twin_doc=second.model_dump()))
+    assert dt.sim_memo_stats()["hits"] == 4
+    assert len(stored) == 8                     # hits are not re-remembered
+    for kind in KINDS:
+        assert b[kind].id != a[kind].id and b[kind].twin_id == second.id
+        assert b[kind].findings == a[kind].findings and b[kind].metrics == a[kind].metrics
+    # Timelines are re-bound to the second twin's component ids.
+    ids = {c.id for c in second.state.components}
+    assert {row["component_id"] for row in b[SimulationKind.ASSEMBLY].timeline} == ids
+    assert {d["state_hash"] for d in sims.docs} == {dt.state_hash(first)}
+
+
+def test_memo_hit_rebinds_hotspot_ids_in_metrics(db):
+    network = {"thermal_network": {"nodes": {"motor": {"heat_w": 20.0, "max_temp_c": 90}}}}
+    kinds = [SimulationKind.FAILURE, SimulationKind.THERMAL_NETWORK]
+    first, second = _twin(integrations=network), _twin("rig v2", integrations=network)
+    asyncio.run(dt.run_and_persist_simulations(first.id, kinds, twin_doc=first.model_dump()))
+    out = asyncio.run(dt.run_and_persist_simulations(second.id, kinds, twin_doc=second.model_dump()))
+    assert dt.sim_memo_stats()["hits"] == 2
+    id_of = {c.name: c.id for c in second.state.components}
+    failure = out[SimulationKind.FAILURE].metrics["thermal_hotspots"]
+    network = out[SimulationKind.THERMAL_NETWORK]
+    assert failure[0]["component"] == "motor"
+    for row in failure + network.metrics["hotspots"] + network.timeline:
+        assert row["component_id"] == id_of[row["component"]]
+
+
+def test_spec_change_misses_the_memo(db):
+    twin = _twin()
+    asyncio.run(dt.run_and_persist_simulations(twin.id, KINDS, twin_doc=twin.model_dump()))
+    twin.state.components[1].lead_time_days = 9
+    out = asyncio.run(dt.run_and_persist_simulations(twin.id, KINDS, twin_doc=twin.model_dump()))
+    assert dt.sim_memo_stats()["hits"] == 0
+    assert out[SimulationKind.TIMELINE].metrics["critical_path_days"] == 16.0
+
+
+def test_missing_twin_returns_none(db):
+    assert asyncio.run(dt.run_and_persist_simulations("nope", KINDS)) is None
+    assert asyncio.run(dt.run_and_persist_simulation("nope", SimulationKind.COST)) is None
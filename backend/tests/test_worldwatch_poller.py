@@ -0,0 +1,205 @@
+"""Tests for the worldwatch feed poller (no network, no Mongo)."""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from services import worldwatch as ww
+
+
+RSS = (
+    "﻿\n<?xml version='1.0'?><rss><channel><title>t</title>"
+    + "".join(
+        f"<item><title>Item {i}</title><link>https://ex.org/{i}</link>"
+        f"<guid>g{i}</guid><description>d{i}</description></item>"
+        for i in range(50)
+    )
+    + "</channel></rss>"
+).encode()
+
+ATOM = (
+    b"<feed xmlns='http://www.w3.org/2005/Atom'>"
+    b"<entry><title>A</title><link href='https://ex.org/a'/><id>a</id>"
+    b"<summary>s</summary></entry></feed>"
+)
+
+
+class _FakeFeeds:
+    def __init__(self, docs):
+        self.docs = {d["id"]: d for d in docs}
+
+    async def update_one(self, filt, update):
+        doc = self.docs[filt["id"]]
+        doc.update(update.get("$set", {}))
+        for k, v in update.get("$inc", {}).items():
+            doc[k] = doc.get(k, 0) + v
+
+
+class _FakeRuns:
+    async def insert_one(self, doc):
+        pass
+
+
+@pytest.fixture
+def poller(monkeypatch):
+    ww.reset_in_memory_state()
+    monkeypatch.setattr(ww, "HOST_INTERVAL_S", 0.0)
+    seen = []
+
+    def use(handler, feeds):
+        def wrapped(request):
+            seen.append(request)
+            return handler(request)
+        ww._http = httpx.AsyncClient(transport=httpx.MockTransport(wrapped))
+        coll = _FakeFeeds(feeds)
+        monkeypatch.setattr(ww, "_feeds", lambda: coll)
+        monkeypatch.setattr(ww, "_runs", lambda: _FakeRuns())
+
+        async def list_feeds(domain=None):
+            return list(coll.docs.values())
+        monkeypatch.setattr(ww, "list_feeds", list_feeds)
+        return coll
+
+    yield use, seen
+    ww.reset_in_memory_state()
+
+
+def _feed(i, url):
+    return {"id": f"f{i}", "url": url, "domain": "AI", "agent": "minerva",
+            "label": f"feed {i}", "source_type": "rss"}
+
+
+def test_streaming_parse_stops_after_n_entries():
+    async def go():
+        transport = httpx.MockTransport(lambda r: httpx.Response(
+            200, headers={"etag": '"v1"'}, content=RSS))
+        ww._http = httpx.AsyncClient(transport=transport)
+        try:
+            return await ww._fetch_feed_entries("https://ex.org/rss", 3)
+        finally:
+            ww.reset_in_memory_state()
+
+    entries, validators = asyncio.run(go())
+    # BOM + leading whitespace before the prolog is tolerated.
+    assert [e["guid"] for e in entries] == ["g0", "g1", "g2"]
+    assert entries[0]["summary"] == "d0"
+    assert validators["etag"] == '"v1"' and validators["fetch_window"] == 3
+
+
+def test_atom_entries_use_link_href():
+    async def go():
+        ww._http = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda r: httpx.Response(200, content=ATOM)))
+        try:
+            return await ww._fetch_feed_entries("https://ex.org/atom", 3)
+        finally:
+            ww.reset_in_memory_state()
+
+    entries, _ = asyncio.run(go())
+    assert entries == [{"title": "A", "link": "https://ex.org/a", "summary": "s",
+                        "published": "", "guid": "https://ex.org/a"}]
+
+
+def test_conditional_get_persists_validators_and_skips_on_304(poller, monkeypatch):
+    use, seen = poller
+
+    def handler(request):
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"etag": '"v1"',
+                                            "last-modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+                              content=RSS)
+
+    coll = use(handler, [_feed(1, "https://ex.org/rss")])
+    ingested = []
+
+    async def fake_ingest(feed, entry):
+        ingested.append(entry["guid"])
+        return {"id": entry["guid"], "new": True}
+    monkeypatch.setattr(ww, "_ingest_entry", fake_ingest)
+
+    first = asyncio.run(ww.run(max_per_feed=2))
+    assert first["entries_new"] == 2 and first["feeds_not_modified"] == 0
+    doc = coll.docs["f1"]
+    assert doc["etag"] == '"v1"' and doc["last_status"] == 200
+    assert doc["last_modified"].startswith("Mon")
+
+    second = asyncio.run(ww.run(max_per_feed=2))
+    assert second["feeds_not_modified"] == 1 and second["entries_seen"] == 0
+    assert seen[-1].headers["if-modified-since"].startswith("Mon")
+    assert ingested == ["g0", "g1"]
+    assert coll.docs["f1"]["run_count"] == 2
+
+    # A wider window than the validators were taken with refetches the body.
+    third = asyncio.run(ww.run(max_per_feed=3))
+    assert "if-none-match" not in seen[-1].headers
+    assert third["entries_seen"] == 3
+
+
+def test_failed_ingest_keeps_old_validators(poller, monkeypatch):
+    use, _ = poller
+    coll = use(lambda r: httpx.Response(200, headers={"etag": '"v2"'}, content=RSS),
+               [{**_feed(1, "https://ex.org/rss"), "etag": '"v1"', "fetch_window": 1}])
+
+    async def boom(feed, entry):
+        raise RuntimeError("kbase down")
+    monkeypatch.setattr(ww, "_ingest_entry", boom)
+
+    proof = asyncio.run(ww.run(max_per_feed=1))
+    assert proof["status"] == "partial"
+    assert coll.docs["f1"]["etag"] == '"v1"'
+
+
+def _timed(starts):
+    """Handler that records when each host is actually requested."""
+    def handler(request):
+        starts.setdefault(request.url.host, []).append(time.monotonic())
+        return httpx.Response(200, content=RSS)
+    return handler
+
+
+def test_feeds_fetch_concurrently_but_same_host_is_spaced(poller, monkeypatch):
+    use, _ = poller
+    monkeypatch.setattr(ww, "HOST_INTERVAL_S", 0.05)
+    feeds = [_feed(i, f"https://host{i % 3}.org/rss") for i in range(6)]
+    starts = {}
+    use(_timed(starts), feeds)
+
+    async def fake_ingest(feed, entry):
+        return {"id": entry["guid"], "new": False}
+    monkeypatch.setattr(ww, "_ingest_entry", fake_ingest)
+
+    proof = asyncio.run(ww.run(max_per_feed=1))
+    assert proof["feeds_processed"] == 6 and not proof["errors"]
+    # Two same-host hits are >= HOST_INTERVAL_S apart; distinct hosts overlap.
+    for times in starts.values():
+        assert len(times) == 2 and times[1] - times[0] >= 0.045
+    firsts = sorted(t[0] for t in starts.values())
+    assert firsts[-1] - firsts[0] < 0.045
+    # Both feeds carry the same entries: each hash is ingested only once.
+    assert proof["entries_seen"] == 6
+
+
+def test_host_spacing_does_not_hold_fetch_slots(poller, monkeypatch):
+    use, _ = poller
+    monkeypatch.setattr(ww, "HOST_INTERVAL_S", 0.1)
+    monkeypatch.setattr(ww, "FETCH_CONCURRENCY", 2)
+    # Five feeds on one host ahead of three other hosts, like the arXiv
+    # block in the seed list.
+    feeds = ([_feed(i, f"https://busy.org/rss{i}") for i in range(5)]
+             + [_feed(10 + i, f"https://other{i}.org/rss") for i in range(3)])
+    starts = {}
+    use(_timed(starts), feeds)
+
+    async def fake_ingest(feed, entry):
+        return {"id": entry["guid"], "new": False}
+    monkeypatch.setattr(ww, "_ingest_entry", fake_ingest)
+
+    proof = asyncio.run(ww.run(max_per_feed=1))
+    assert proof["feeds_processed"] == 8 and not proof["errors"]
+    t0 = starts["busy.org"][0]
+    # The other hosts don't queue behind the busy host's 0.1 s spacing.
+    assert all(starts[f"other{i}.org"][0] - t0 < 0.08 for i in range(3))
+    busy = starts["busy.org"]
+    assert len(busy) == 5 and all(b - a >= 0.095 for a, b in zip(busy, busy[1:]))